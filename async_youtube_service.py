@@ -0,0 +1,779 @@
+import asyncio
+import atexit
+import heapq
+import threading
+import time
+import logging
+from urllib.parse import urlsplit
+import aiohttp
+from google.auth.transport.requests import Request
+from src.services.cache_service import response_cache, make_cache_key, MISSING
+from src.services.quota_service import quota_tracker
+from src.services.metrics import YOUTUBE_API_DURATION, YOUTUBE_API_ERRORS, YOUTUBE_API_COALESCED
+from src.services.singleflight import upstream_flight, flight_key
+from src.services.youtube_service import (
+    MAX_IDS_PER_REQUEST, DEMOGRAPHIC_DIMENSIONS, DEFAULT_DEMOGRAPHIC_KEYS, NOT_MODIFIED,
+    etag_stats, private_scope, scan_limit, _parse_datetime, _projection, _payload_meta, _playlist_page_video_ids, _first_item
+)
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 各API的根網址
+API_BASE_URLS = {
+    'youtube': 'https://www.googleapis.com/youtube/v3',
+    'youtubeAnalytics': 'https://youtubeanalytics.googleapis.com/v2'
+}
+
+# API方法對應的服務與資源路徑
+METHOD_PATHS = {
+    'search.list': ('youtube', 'search'),
+    'channels.list': ('youtube', 'channels'),
+    'playlistItems.list': ('youtube', 'playlistItems'),
+    'videos.list': ('youtube', 'videos'),
+    'reports.query': ('youtubeAnalytics', 'reports')
+}
+
+class AsyncYouTubeError(Exception):
+    """非同步客戶端收到的API錯誤響應"""
+    
+    def __init__(self, status, reason, method):
+        super().__init__(f"{method} 返回 {status}: {reason}")
+        self.status = status
+        self.reason = reason
+        self.method = method
+
+def _error_reason(payload):
+    """從錯誤響應取出錯誤訊息"""
+    if isinstance(payload, dict):
+        error = payload.get('error')
+        if isinstance(error, dict):
+            return error.get('message') or str(error)
+        if error:
+            return str(error)
+    return 'unknown error'
+
+def create_session(max_connections=None, timeout=None):
+    """
+    建立共用連線池的HTTP session（必須在事件迴圈中呼叫）
+    
+    Args:
+        max_connections: 連線池的連線總數上限
+        timeout: 單次請求的逾時秒數
+        
+    Returns:
+        aiohttp.ClientSession: 保持連線（keep-alive）的session
+    """
+    connector = aiohttp.TCPConnector(
+        limit=max_connections or Config.ASYNC_MAX_CONNECTIONS,
+        keepalive_timeout=60,
+        ttl_dns_cache=300
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout or Config.ASYNC_REQUEST_TIMEOUT)
+    )
+
+class HostLimiter:
+    """以主機為單位限制同時進行的請求數量"""
+    
+    def __init__(self, per_host=None):
+        self.per_host = per_host or Config.ASYNC_MAX_PER_HOST
+        self._semaphores = {}
+    
+    def for_url(self, url):
+        """
+        獲取網址所屬主機的信號量
+        
+        Args:
+            url: 請求網址
+            
+        Returns:
+            asyncio.Semaphore: 該主機的信號量
+        """
+        host = urlsplit(url).netloc
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return semaphore
+
+class AsyncYouTubeClient:
+    """以asyncio實作的YouTube API客戶端
+    
+    回傳的資料結構與YouTubeService相同，並共用響應緩存、配額計量與指標。
+    多個獨立呼叫以asyncio.gather並行送出，由HostLimiter限制每個主機的並行數量。
+    """
+    
+    def __init__(self, session=None, api_key=None, credentials=None, user_id=None, cache=response_cache,
+                 quota=quota_tracker, limiter=None, base_urls=None, coalesce=None):
+        """
+        初始化非同步YouTube客戶端
+        
+        Args:
+            session: 共用的aiohttp session（None表示在async with區塊中自行建立）
+            api_key: YouTube Data API金鑰（用於公開數據）
+            credentials: OAuth2認證憑證（用於私人數據）
+            user_id: 憑證所屬的用戶ID，用於區隔OAuth數據的緩存
+            cache: 響應緩存（None表示停用緩存）
+            quota: 配額計量器（None表示不計量）
+            limiter: 每個主機的並行限制
+            base_urls: 覆寫API根網址（例如指向本機的測試伺服器）
+            coalesce: 是否合併相同的進行中上游呼叫（預設依YOUTUBE_SINGLE_FLIGHT設定）
+        """
+        self.api_key = api_key or Config.YOUTUBE_API_KEY
+        self.credentials = credentials
+        self.user_id = user_id
+        self.cache = cache if Config.CACHE_TYPE != 'null' else None
+        self.cache_timeouts = Config.CACHE_TIMEOUTS
+        self.quota = quota
+        self.limiter = limiter or HostLimiter()
+        self.base_urls = {**API_BASE_URLS, **(base_urls or {})}
+        self.coalesce = Config.YOUTUBE_SINGLE_FLIGHT if coalesce is None else coalesce
+        self.session = session
+        self._owns_session = session is None
+        self._refresh_lock = asyncio.Lock()
+        
+        if not self.credentials and not self.api_key:
+            raise ValueError("需要提供API金鑰或OAuth2認證憑證")
+    
+    async def __aenter__(self):
+        if self.session is None:
+            self.session = create_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def _auth_headers(self):
+        """獲取OAuth2授權標頭，憑證過期時在執行緒池中刷新"""
+        if not self.credentials:
+            return {}
+        
+        if not self.credentials.valid:
+            async with self._refresh_lock:
+                if not self.credentials.valid:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, self.credentials.refresh, Request())
+        
+        return {'Authorization': f'Bearer {self.credentials.token}'}
+    
+    async def _execute(self, method, params, etag=None):
+        """
+        送出API請求並計量配額
+        
+        相同方法、參數與憑證範圍的請求正在進行時，直接等待並共用其結果。
+        
+        Args:
+            method: API方法名稱 (例如 channels.list)
+            params: 查詢參數
+            etag: 先前響應的ETag，提供時以If-None-Match送出條件式請求
+            
+        Returns:
+            dict: API響應，內容未變更時返回NOT_MODIFIED
+            
+        Raises:
+            QuotaExceededError: 配額不足，請求未送出
+            AsyncYouTubeError: API返回錯誤
+        """
+        if not self.coalesce:
+            return await self._send(method, params, etag)
+        
+        scope = self._private_scope() if self.credentials else 'public'
+        response, shared = await upstream_flight.do_async(
+            flight_key(method, params, scope, etag),
+            lambda: self._send(method, params, etag)
+        )
+        if shared:
+            YOUTUBE_API_COALESCED.inc(method)
+        return response
+    
+    async def _send(self, method, params, etag=None):
+        """送出API請求（配額計量與指標記錄）"""
+        service, path = METHOD_PATHS[method]
+        url = f"{self.base_urls[service]}/{path}"
+        query = {key: str(value) for key, value in params.items() if value is not None}
+        
+        headers = await self._auth_headers()
+        if not self.credentials:
+            query['key'] = self.api_key
+        if etag:
+            headers['If-None-Match'] = etag
+        
+        async with self.limiter.for_url(url):
+            if self.quota is not None:
+                # 檢查並預先扣除配額（失敗的請求同樣會消耗配額）
+                self.quota.acquire(method)
+            started = time.perf_counter()
+            try:
+                async with self.session.get(url, params=query, headers=headers) as response:
+                    if etag and response.status == 304:
+                        return NOT_MODIFIED
+                    payload = await response.json(content_type=None)
+                    if response.status >= 400:
+                        raise AsyncYouTubeError(response.status, _error_reason(payload), method)
+                    return payload
+            except Exception:
+                YOUTUBE_API_ERRORS.inc(method)
+                raise
+            finally:
+                YOUTUBE_API_DURATION.observe(time.perf_counter() - started, method)
+    
+    def _private_scope(self):
+        """獲取OAuth私人數據的緩存範圍（與YouTubeService相同）"""
+        return private_scope(self.user_id, self.credentials)
+    
+    async def _cached(self, resource, key, loader, scope='public'):
+        """
+        透過響應緩存讀取數據
+        
+        Args:
+            resource: 資源類型，決定存活時間
+            key: 緩存鍵參數（tuple）
+            loader: 未命中時呼叫的協程函數
+            scope: 數據範圍
+            
+        Returns:
+            object: 緩存或新載入的數據
+        """
+        if self.cache is None:
+            return await loader()
+        
+        cache_key = make_cache_key(resource, scope, *key)
+        value = self.cache.get(cache_key)
+        if value is MISSING:
+            value = await loader()
+            self.cache.set(cache_key, value, ttl=self.cache_timeouts.get(resource))
+        return value
+    
+    async def _cached_conditional(self, resource, key, method, params, extract, scope='public'):
+        """
+        透過響應緩存讀取數據，過期時以ETag條件式請求重新驗證
+        
+        Args:
+            resource: 資源類型，決定存活時間
+            key: 緩存鍵參數（tuple）
+            method: API方法名稱
+            params: 查詢參數
+            extract: 從API響應取出要緩存的數據
+            scope: 數據範圍
+            
+        Returns:
+            object: 緩存或新載入的數據
+        """
+        if self.cache is None:
+            return extract(await self._execute(method, params))
+        
+        cache_key = make_cache_key(resource, scope, *key)
+        value = self.cache.get(cache_key)
+        if value is not MISSING:
+            return value
+        
+        ttl = self.cache_timeouts.get(resource)
+        stale = self.cache.get_stale(cache_key)
+        etag = stale[1] if stale else None
+        
+        response = await self._execute(method, params, etag=etag)
+        if response is NOT_MODIFIED:
+            value, etag, meta = stale
+            etag_stats.record(True, meta)
+            self.cache.set(cache_key, value, ttl=ttl, etag=etag, meta=meta)
+            return value
+        
+        if etag:
+            etag_stats.record(False)
+        
+        value = extract(response)
+        self.cache.set(cache_key, value, ttl=ttl, etag=response.get('etag'), meta=_payload_meta(response))
+        return value
+    
+    async def search_channels(self, query, max_results=10):
+        """
+        搜尋YouTube頻道
+        
+        Args:
+            query: 搜尋關鍵字
+            max_results: 最大結果數量
+            
+        Returns:
+            list: 頻道列表
+        """
+        response = await self._execute('search.list', {
+            **_projection('searchChannelIds'),
+            'q': query,
+            'type': 'channel',
+            'maxResults': max_results
+        })
+        channel_ids = [item['id']['channelId'] for item in response.get('items', [])]
+        return await self.get_channels_details(channel_ids)
+    
+    async def get_channels_details(self, channel_ids):
+        """
+        批次獲取多個頻道的詳細資訊，每50個ID一批並行查詢
+        
+        Args:
+            channel_ids: YouTube頻道ID列表
+            
+        Returns:
+            list: 依傳入順序排列的頻道詳細資訊，找不到的頻道會被略過
+        """
+        unique_ids = list(dict.fromkeys(channel_ids))
+        
+        items_by_id = {}
+        missing_ids = []
+        for channel_id in unique_ids:
+            cached = MISSING
+            if self.cache is not None:
+                cached = self.cache.get(make_cache_key('channelBasicInfo', 'public', 'id', channel_id))
+            if cached is MISSING:
+                missing_ids.append(channel_id)
+            elif cached is not None:
+                items_by_id[channel_id] = cached
+        
+        responses = await asyncio.gather(*(
+            self._execute('channels.list', {
+                **_projection('channelFull'),
+                'id': ','.join(missing_ids[start:start + MAX_IDS_PER_REQUEST]),
+                'maxResults': len(missing_ids[start:start + MAX_IDS_PER_REQUEST])
+            })
+            for start in range(0, len(missing_ids), MAX_IDS_PER_REQUEST)
+        ))
+        for response in responses:
+            for item in response.get('items', []):
+                items_by_id[item['id']] = item
+        
+        if self.cache is not None:
+            for channel_id in missing_ids:
+                self.cache.set(
+                    make_cache_key('channelBasicInfo', 'public', 'id', channel_id),
+                    items_by_id.get(channel_id),
+                    ttl=self.cache_timeouts.get('channelBasicInfo')
+                )
+        
+        return [items_by_id[channel_id] for channel_id in unique_ids if channel_id in items_by_id]
+    
+    async def get_channel_details(self, channel_id):
+        """
+        獲取頻道詳細資訊
+        
+        Args:
+            channel_id: YouTube頻道ID
+            
+        Returns:
+            dict: 頻道詳細資訊
+        """
+        return await self._cached_conditional(
+            'channelBasicInfo', ('id', channel_id),
+            'channels.list', {**_projection('channelFull'), 'id': channel_id},
+            _first_item
+        )
+    
+    async def get_uploads_playlist_id(self, channel_id):
+        """
+        獲取頻道的上傳播放列表ID
+        
+        Args:
+            channel_id: YouTube頻道ID
+            
+        Returns:
+            str: 上傳播放列表ID，找不到頻道時返回None
+        """
+        if self.cache is not None:
+            channel_details = self.cache.get(make_cache_key('channelBasicInfo', 'public', 'id', channel_id))
+            if channel_details is not MISSING:
+                if not channel_details:
+                    return None
+                return channel_details.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+        
+        async def load():
+            response = await self._execute('channels.list', {**_projection('channelUploads'), 'id': channel_id})
+            channel = _first_item(response)
+            if not channel:
+                return None
+            return channel.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+        
+        return await self._cached('channelBasicInfo', ('uploads', channel_id), load)
+    
+    async def get_channels_statistics(self, channel_ids):
+        """
+        批次獲取多個頻道的最新統計數據（只請求statistics，不經過緩存）
+        
+        Args:
+            channel_ids: YouTube頻道ID列表
+            
+        Returns:
+            list: 依傳入順序排列的頻道項目（只包含id與statistics）
+        """
+        unique_ids = list(dict.fromkeys(channel_ids))
+        responses = await asyncio.gather(*(
+            self._execute('channels.list', {
+                **_projection('channelStatistics'),
+                'id': ','.join(unique_ids[start:start + MAX_IDS_PER_REQUEST]),
+                'maxResults': len(unique_ids[start:start + MAX_IDS_PER_REQUEST])
+            })
+            for start in range(0, len(unique_ids), MAX_IDS_PER_REQUEST)
+        ))
+        
+        items_by_id = {}
+        for response in responses:
+            for item in response.get('items', []):
+                items_by_id[item['id']] = item
+        
+        return [items_by_id[channel_id] for channel_id in unique_ids if channel_id in items_by_id]
+    
+    async def get_channel_videos(self, channel_id, max_results=10, order='viewCount', max_scan=None):
+        """
+        獲取頻道的影片列表
+        
+        Args:
+            channel_id: YouTube頻道ID
+            max_results: 最大結果數量
+            order: 排序方式（viewCount為觀看數最高，其他為最新上傳）
+            max_scan: viewCount排序時最多掃描的影片數量（None為VIDEO_SCAN_LIMIT，SCAN_ALL表示不限制）
+            
+        Returns:
+            list: 影片列表
+        """
+        async def load():
+            if order == 'viewCount':
+                return await self.get_top_videos_by_views(channel_id, max_results, max_scan=max_scan)
+            return await self._collect_channel_videos(channel_id, max_videos=max_results)
+        
+        return await self._cached('videosList', (channel_id, max_results, order, max_scan), load)
+    
+    async def get_top_videos_by_views(self, channel_id, n=10, max_scan=None, published_after=None):
+        """
+        獲取頻道觀看數最高的N部影片
+        
+        Args:
+            channel_id: YouTube頻道ID
+            n: 回傳的影片數量
+            max_scan: 最多掃描的影片數量（None為VIDEO_SCAN_LIMIT，SCAN_ALL表示不限制）
+            published_after: 只考慮此時間之後發布的影片
+            
+        Returns:
+            list: 依觀看數由高至低排序的影片列表
+        """
+        videos = await self._collect_channel_videos(channel_id, max_videos=scan_limit(max_scan, n), published_after=published_after)
+        return heapq.nlargest(n, videos, key=lambda x: int(x.get('statistics', {}).get('viewCount', 0)))
+    
+    async def _collect_channel_videos(self, channel_id, max_videos=None, published_after=None):
+        """走訪頻道的上傳播放列表，翻頁的同時並行補齊前一頁的影片資訊"""
+        uploads_playlist_id = await self.get_uploads_playlist_id(channel_id)
+        if not uploads_playlist_id:
+            return []
+        
+        # 補齊中的頁數達到上限時暫停翻頁，避免大型頻道一次建立大量任務
+        pending = asyncio.Semaphore(Config.ASYNC_MAX_TASKS)
+        
+        async def details(video_ids):
+            try:
+                return await self.get_videos_details(video_ids)
+            finally:
+                pending.release()
+        
+        tasks = []
+        try:
+            async for video_ids in self.iter_playlist_pages(uploads_playlist_id, max_videos=max_videos, published_after=published_after):
+                await pending.acquire()
+                tasks.append(asyncio.ensure_future(details(video_ids)))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        pages = await asyncio.gather(*tasks)
+        return [video for page in pages for video in page]
+    
+    async def iter_playlist_pages(self, playlist_id, max_videos=None, published_after=None,
+                                  published_before=None, max_pages=None):
+        """
+        依nextPageToken逐頁產生播放列表中的影片ID
+        
+        Args:
+            playlist_id: 播放列表ID
+            max_videos: 最多產生的影片ID數量（None表示不限制）
+            published_after: 發布時間下限 (datetime或RFC 3339字串)
+            published_before: 發布時間上限，較新的影片在翻頁時略過
+            max_pages: 最多讀取的頁數（None表示不限制）
+            
+        Yields:
+            list: 每頁的影片ID列表
+        """
+        cutoff = _parse_datetime(published_after) if published_after else None
+        before = _parse_datetime(published_before) if published_before else None
+        yielded = 0
+        pages = 0
+        page_token = None
+        
+        while True:
+            response = await self._execute('playlistItems.list', {
+                **_projection('playlistVideoIds'),
+                'playlistId': playlist_id,
+                'maxResults': MAX_IDS_PER_REQUEST,
+                'pageToken': page_token
+            })
+            pages += 1
+            video_ids, reached_cutoff = _playlist_page_video_ids(response, cutoff, before)
+            
+            if max_videos is not None:
+                video_ids = video_ids[:max_videos - yielded]
+            
+            if video_ids:
+                yield video_ids
+                yielded += len(video_ids)
+            
+            page_token = response.get('nextPageToken')
+            if reached_cutoff or not page_token or (max_videos is not None and yielded >= max_videos):
+                return
+            if max_pages is not None and pages >= max_pages:
+                return
+    
+    async def collect_playlist_video_ids(self, playlists, max_videos=None, published_after=None,
+                                         published_before=None, max_pages=None):
+        """
+        並行走訪多個播放列表並收集影片ID（同時走訪的數量以ASYNC_MAX_TASKS為上限）
+        
+        Args:
+            playlists: {鍵: 播放列表ID}
+            max_videos: 每個播放列表最多收集的影片數量
+            published_after: 發布時間下限
+            published_before: 發布時間上限
+            max_pages: 每個播放列表最多讀取的頁數
+            
+        Returns:
+            dict: {鍵: 影片ID列表}
+        """
+        limit = asyncio.Semaphore(Config.ASYNC_MAX_TASKS)
+        
+        async def collect(playlist_id):
+            video_ids = []
+            async with limit:
+                async for page in self.iter_playlist_pages(
+                    playlist_id, max_videos=max_videos, published_after=published_after,
+                    published_before=published_before, max_pages=max_pages
+                ):
+                    video_ids.extend(page)
+            return video_ids
+        
+        results = await asyncio.gather(*(collect(playlist_id) for playlist_id in playlists.values()))
+        return dict(zip(playlists, results))
+    
+    async def get_videos_details(self, video_ids):
+        """
+        批次獲取多部影片的詳細資訊，每50個ID一批並行查詢
+        
+        Args:
+            video_ids: YouTube影片ID列表
+            
+        Returns:
+            list: 依傳入順序排列的影片詳細資訊，找不到的影片會被略過
+        """
+        responses = await asyncio.gather(*(
+            self._execute('videos.list', {
+                **_projection('videoFull'),
+                'id': ','.join(video_ids[start:start + MAX_IDS_PER_REQUEST]),
+                'maxResults': len(video_ids[start:start + MAX_IDS_PER_REQUEST])
+            })
+            for start in range(0, len(video_ids), MAX_IDS_PER_REQUEST)
+        ))
+        
+        items_by_id = {}
+        for response in responses:
+            for item in response.get('items', []):
+                items_by_id[item['id']] = item
+        
+        return [items_by_id[video_id] for video_id in video_ids if video_id in items_by_id]
+    
+    async def get_channel_analytics(self, channel_id, start_date, end_date, metrics='views,estimatedMinutesWatched', dimensions=None):
+        """
+        獲取頻道的分析數據（需要OAuth2認證）
+        
+        Args:
+            channel_id: YouTube頻道ID
+            start_date: 開始日期 (YYYY-MM-DD)
+            end_date: 結束日期 (YYYY-MM-DD)
+            metrics: 指標列表
+            dimensions: 維度列表
+            
+        Returns:
+            dict: 分析數據
+        """
+        if not self.credentials:
+            raise ValueError("YouTube Analytics API需要OAuth2認證")
+        
+        params = {
+            'ids': f'channel=={channel_id}',
+            'startDate': start_date,
+            'endDate': end_date,
+            'metrics': metrics,
+            'dimensions': dimensions
+        }
+        return await self._cached(
+            'channelStatistics', (channel_id, start_date, end_date, metrics, dimensions),
+            lambda: self._execute('reports.query', params),
+            scope=self._private_scope()
+        )
+    
+    async def get_audience_demographics(self, channel_id, start_date, end_date, extra_dimensions=None):
+        """
+        獲取受眾輪廓數據，各維度並行查詢
+        
+        單一維度失敗時只記錄在errors中，不影響其他維度。
+        
+        Args:
+            channel_id: YouTube頻道ID
+            start_date: 開始日期 (YYYY-MM-DD)
+            end_date: 結束日期 (YYYY-MM-DD)
+            extra_dimensions: 額外的維度鍵，例如 ['deviceTypes', 'trafficSources']
+            
+        Returns:
+            dict: 受眾輪廓數據，失敗的維度列於errors
+        """
+        if not self.credentials:
+            raise ValueError("YouTube Analytics API需要OAuth2認證")
+        
+        keys = list(DEFAULT_DEMOGRAPHIC_KEYS)
+        for key in extra_dimensions or []:
+            if key not in DEMOGRAPHIC_DIMENSIONS:
+                raise ValueError(f"不支援的受眾輪廓維度: {key}")
+            if key not in keys:
+                keys.append(key)
+        
+        scope = self._private_scope()
+        cache_key = make_cache_key('audienceDemographics', scope, channel_id, start_date, end_date, *keys)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not MISSING:
+                return cached
+        
+        results = await asyncio.gather(*(
+            self.get_channel_analytics(channel_id, start_date, end_date, dimensions=DEMOGRAPHIC_DIMENSIONS[key])
+            for key in keys
+        ), return_exceptions=True)
+        
+        demographics_data = {'errors': {}}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.warning(f"獲取受眾輪廓維度{key}時發生錯誤: {result}")
+                demographics_data[key] = None
+                demographics_data['errors'][key] = str(result)
+            else:
+                demographics_data[key] = result
+        
+        if len(demographics_data['errors']) == len(keys):
+            # 所有維度皆失敗時視為整體失敗
+            raise results[0]
+        
+        if self.cache is not None and not demographics_data['errors']:
+            self.cache.set(cache_key, demographics_data, ttl=self.cache_timeouts.get('audienceDemographics'))
+        
+        return demographics_data
+
+class AsyncBridge:
+    """讓同步程式碼（例如Flask路由）使用非同步客戶端的橋接器
+    
+    在背景執行緒中運行單一事件迴圈，所有客戶端共用同一個保持連線的session
+    與每個主機的並行限制；呼叫端以run_coroutine_threadsafe提交協程並等待結果。
+    """
+    
+    def __init__(self, base_urls=None, max_connections=None, per_host=None):
+        """
+        Args:
+            base_urls: 覆寫API根網址
+            max_connections: 連線池的連線總數上限
+            per_host: 每個主機的並行請求上限
+        """
+        self.base_urls = base_urls
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._limiter = None
+        self._lock = threading.Lock()
+    
+    def _ensure_loop(self):
+        """啟動背景事件迴圈（只啟動一次）"""
+        if self._loop is not None:
+            return self._loop
+        
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='youtube-async', daemon=True)
+                thread.start()
+                self._thread = thread
+                self._loop = loop
+        return self._loop
+    
+    async def _client(self, api_key=None, credentials=None, user_id=None):
+        """在事件迴圈中建立使用共用session的客戶端"""
+        if self._session is None:
+            self._session = create_session(self.max_connections)
+            self._limiter = HostLimiter(self.per_host)
+        return AsyncYouTubeClient(
+            session=self._session, api_key=api_key, credentials=credentials, user_id=user_id,
+            limiter=self._limiter, base_urls=self.base_urls
+        )
+    
+    def run(self, func, api_key=None, credentials=None, user_id=None, timeout=None):
+        """
+        在背景事件迴圈中以客戶端執行協程函數並等待結果
+        
+        Args:
+            func: 接收AsyncYouTubeClient並返回協程的函數
+            api_key: YouTube Data API金鑰
+            credentials: OAuth2認證憑證
+            user_id: 憑證所屬的用戶ID
+            timeout: 等待結果的逾時秒數
+            
+        Returns:
+            object: 協程的結果（協程拋出的例外會原樣拋出）
+        """
+        async def invoke():
+            client = await self._client(api_key, credentials, user_id)
+            return await func(client)
+        
+        future = asyncio.run_coroutine_threadsafe(invoke(), self._ensure_loop())
+        return future.result(timeout)
+    
+    def call(self, method, *args, api_key=None, credentials=None, user_id=None, timeout=None, **kwargs):
+        """
+        以同步方式呼叫AsyncYouTubeClient的方法
+        
+        Args:
+            method: 方法名稱 (例如 get_channels_details)
+            *args, **kwargs: 方法參數
+            
+        Returns:
+            object: 方法的返回值
+        """
+        return self.run(
+            lambda client: getattr(client, method)(*args, **kwargs),
+            api_key=api_key, credentials=credentials, user_id=user_id, timeout=timeout
+        )
+    
+    def close(self):
+        """關閉共用session並停止背景事件迴圈"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        
+        async def shutdown():
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+        
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+        except Exception as e:
+            logger.warning(f"關閉非同步session時發生錯誤: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(5)
+
+# 全域非同步橋接器
+async_bridge = AsyncBridge()
+atexit.register(async_bridge.close)
@@ -76,8 +76,8 @@ def oauth_callback():
         credentials = oauth_service.exchange_code_for_token(code, state)
         
         # 獲取用戶資訊
-        from googleapiclient.discovery import build
-        oauth2_service = build('oauth2', 'v2', credentials=credentials)
+        from src.services.client_pool import client_pool
+        oauth2_service = client_pool.get_client('oauth2', 'v2', credentials=credentials)
         user_info = oauth2_service.userinfo().get().execute()
         
         # 查找或建立用戶
@@ -0,0 +1,27 @@
+import argparse
+from benchmarks import (
+    async_client, clients, columnar, durations, export, hydration, ingest, insights,
+    overhead, projections, replay, rollups, search
+)
+from benchmarks.common import write_output
+
+# 子命令依序註冊；未指定子命令時執行回放情境
+SCENARIOS = (
+    replay, async_client, export, columnar, insights, durations, search,
+    hydration, clients, ingest, rollups, projections, overhead
+)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='YouTube頻道分析器效能測試')
+    subparsers = parser.add_subparsers(dest='command')
+    for scenario in SCENARIOS:
+        scenario.register(subparsers)
+    
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(['replay'])
+    
+    write_output(args.run(args), args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.transport import DEFAULT_STUB_LATENCY, start_stub_server
+
+def _logical_request(client, index):
+    """一次邏輯請求：讀取頻道詳細資訊並取得觀看數最高的影片"""
+    async def run():
+        channel_id = f'UCbench{index:06d}'
+        await client.get_channels_details([channel_id])
+        return await client.get_top_videos_by_views(channel_id, n=10, max_scan=200)
+    return run()
+
+async def _run_async(base_urls, concurrency, total):
+    """以asyncio.gather直接並行執行邏輯請求"""
+    from src.services.async_youtube_service import AsyncYouTubeClient, HostLimiter
+    
+    async with AsyncYouTubeClient(api_key='benchmark', cache=None, quota=None, base_urls=base_urls,
+                                  limiter=HostLimiter(max(concurrency, 1) * 4)) as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def one(index):
+            async with semaphore:
+                await _logical_request(client, index)
+        
+        await asyncio.gather(*(one(index) for index in range(total)))
+
+def _run_bridge(base_urls, concurrency, total):
+    """以工作執行緒透過同步橋接器執行邏輯請求（模擬Flask路由的呼叫方式）"""
+    from src.services.async_youtube_service import AsyncBridge
+    
+    bridge = AsyncBridge(base_urls=base_urls, per_host=max(concurrency, 1) * 4)
+    
+    def one(index):
+        bridge.run(lambda client: _logical_request(_uncached(client), index), api_key='benchmark')
+    
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(one, range(total)))
+    finally:
+        bridge.close()
+
+def _uncached(client):
+    """停用客戶端的緩存與配額計量，確保每次都打到測試伺服器"""
+    client.cache = None
+    client.quota = None
+    return client
+
+def benchmark_async_client(levels=(1, 10, 100), requests_per_level=100, latency=DEFAULT_STUB_LATENCY):
+    """
+    比較不同並行數下非同步客戶端的吞吐量
+    
+    每個邏輯請求包含1次channels.list、1次channels.list（上傳播放列表）、
+    4次playlistItems.list與4次videos.list，共10次上游呼叫。
+    
+    Args:
+        levels: 並行邏輯請求數量
+        requests_per_level: 每個並行數執行的邏輯請求總數
+        latency: 測試伺服器模擬的上游延遲（秒）
+        
+    Returns:
+        dict: 各模式與並行數的耗時與吞吐量
+    """
+    server, base_urls = start_stub_server(latency)
+    results = {'latency': latency, 'requestsPerLevel': requests_per_level, 'runs': []}
+    
+    try:
+        for concurrency in levels:
+            for mode, run in (
+                ('asyncio', lambda: asyncio.run(_run_async(base_urls, concurrency, requests_per_level))),
+                ('bridge', lambda: _run_bridge(base_urls, concurrency, requests_per_level))
+            ):
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+                results['runs'].append({
+                    'mode': mode,
+                    'concurrency': concurrency,
+                    'seconds': round(elapsed, 4),
+                    'requestsPerSecond': round(requests_per_level / elapsed, 2)
+                })
+    finally:
+        server.shutdown()
+    
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('async', help='比較不同並行數下非同步客戶端的吞吐量')
+    parser.add_argument('--levels', default='1,10,100', help='並行邏輯請求數量（以逗號分隔）')
+    parser.add_argument('--requests', type=int, default=100, help='每個並行數執行的邏輯請求總數')
+    parser.add_argument('--latency', type=float, default=DEFAULT_STUB_LATENCY, help='模擬的上游延遲（秒）')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_async_client(
+        levels=tuple(int(level) for level in args.levels.split(',')),
+        requests_per_level=args.requests,
+        latency=args.latency
+    ))
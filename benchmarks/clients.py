@@ -0,0 +1,53 @@
+import os
+from benchmarks.common import prepare_environment, timed
+
+def benchmark_client_construction(iterations=200):
+    """
+    量測每個請求建立YouTube客戶端的成本
+    
+    比較原本每次呼叫build()（讀取並解析內建探索文件）、以已解析的探索文件
+    呼叫build_from_document（OAuth客戶端的作法），以及由客戶端池取得
+    API金鑰客戶端與完整建立YouTubeService的耗時。
+    
+    Args:
+        iterations: 每種方式的計時次數
+        
+    Returns:
+        dict: 各方式每次建立的中位數耗時（毫秒）
+    """
+    prepare_environment()
+    from googleapiclient.discovery import build, build_from_document
+    from google.oauth2.credentials import Credentials
+    from src.services.client_pool import client_pool
+    from src.services.youtube_service import YouTubeService
+    
+    api_key = os.environ['YOUTUBE_API_KEY']
+    credentials = Credentials(token='benchmark')
+    document = client_pool.get_document('youtube', 'v3')
+    
+    constructions = {
+        'build': lambda: build('youtube', 'v3', developerKey=api_key, static_discovery=True, cache_discovery=False),
+        'buildFromDocument': lambda: build_from_document(document, developerKey=api_key),
+        'pooledApiKey': lambda: client_pool.get_client('youtube', 'v3', api_key=api_key),
+        'pooledOAuth': lambda: client_pool.get_client('youtube', 'v3', credentials=credentials),
+        'youtubeService': lambda: YouTubeService(api_key=api_key),
+        'youtubeServiceOAuth': lambda: YouTubeService(credentials=credentials, user_id='benchmark')
+    }
+    
+    results = {'iterations': iterations, 'ms': {}}
+    for name, construct in constructions.items():
+        _, elapsed_ms = timed(construct, iterations)
+        results['ms'][name] = elapsed_ms
+    
+    baseline = results['ms']['build']
+    results['speedup'] = {
+        name: round(baseline / elapsed_ms, 1) if elapsed_ms else None
+        for name, elapsed_ms in results['ms'].items() if name != 'build'
+    }
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('clients', help='量測每個請求建立YouTube客戶端的成本')
+    parser.add_argument('--iterations', type=int, default=200, help='每種方式的計時次數')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_client_construction(iterations=args.iterations))
@@ -0,0 +1,152 @@
+import os
+import time
+from datetime import datetime
+from benchmarks.common import file_backed_app, seed_rows, timed
+
+def _sql_engagement_by_month(channel_ids):
+    """列式儲存的做法：以SQL GROUP BY依月份彙總（SQLite的strftime）"""
+    from sqlalchemy import func, select
+    from src.models.user import db
+    from src.models.channel import Video
+    
+    month = func.strftime('%Y-%m', Video.published_at)
+    stmt = (
+        select(month, func.count(), func.sum(Video.view_count), func.sum(Video.like_count), func.sum(Video.comment_count))
+        .where(Video.published_at.is_not(None))
+        .group_by(month)
+        .order_by(month)
+    )
+    if channel_ids:
+        stmt = stmt.where(Video.channel_id.in_(channel_ids))
+    return [
+        {'month': row[0], 'videos': row[1], 'views': row[2], 'likes': row[3], 'comments': row[4]}
+        for row in db.session.execute(stmt)
+    ]
+
+def _sql_view_percentiles(channel_ids, percentiles):
+    """列式儲存的做法：依頻道與觀看次數排序讀取，在Python中逐頻道計算百分位數"""
+    from itertools import groupby
+    from sqlalchemy import select
+    from src.models.user import db
+    from src.models.channel import Video
+    
+    stmt = select(Video.channel_id, Video.view_count).order_by(Video.channel_id, Video.view_count)
+    if channel_ids:
+        stmt = stmt.where(Video.channel_id.in_(channel_ids))
+    
+    results = []
+    for channel_id, group in groupby(db.session.execute(stmt), key=lambda row: row[0]):
+        views = [row[1] or 0 for row in group]
+        values = {}
+        for percentile in percentiles:
+            position = (len(views) - 1) * (percentile / 100.0)
+            lower = int(position)
+            upper = min(lower + 1, len(views) - 1)
+            values[f'p{percentile:g}'] = round(views[lower] + (views[upper] - views[lower]) * (position - lower), 2)
+        results.append({'channelId': channel_id, 'videos': len(views), 'percentiles': values})
+    return results
+
+def benchmark_columnar(sizes=(1000000, 10000000), channels=500, iterations=5, update_fraction=0.01):
+    """
+    比較欄位快照與SQL路徑的分析查詢
+    
+    每個規模各自建立暫存SQLite檔案與欄位快照目錄，量測完整建立快照、
+    更新部分影片後的增量刷新，以及全部頻道與單一頻道兩種查詢的中位數延遲，
+    並檢查兩條路徑的結果一致。
+    
+    Args:
+        sizes: 影片數量
+        channels: 影片平均分配到的頻道數量
+        iterations: 每個查詢的計時次數
+        update_fraction: 增量刷新前更新的影片比例
+        
+    Returns:
+        dict: 各規模的刷新耗時、查詢延遲與加速倍數
+    """
+    results = {'channels': channels, 'iterations': iterations, 'sizes': []}
+    
+    for size in sizes:
+        app, workdir = file_backed_app('columnar-bench-')
+        from sqlalchemy import update
+        from src.models.user import db
+        from src.models.channel import Video
+        from src.services.columnar_service import ColumnarStore, engagement_by_month, view_percentiles
+        
+        channel_ids = [f'UCcolumnar{i:06d}' for i in range(channels)]
+        store = ColumnarStore(base_dir=os.path.join(workdir, 'columnar'))
+        entry = {'videos': size}
+        
+        with app.app_context():
+            started = time.perf_counter()
+            seed_rows('videos', size, channel_ids)
+            entry['seedSeconds'] = round(time.perf_counter() - started, 2)
+            entry['fullRefresh'] = store.refresh('videos', full=True)
+            
+            # 更新一部分影片，量測只讀取變更資料列的增量刷新
+            step = max(1, int(1 / update_fraction))
+            db.session.execute(
+                update(Video).where(Video.id % step == 0).values(view_count=Video.view_count + 1, last_updated=datetime.utcnow())
+            )
+            db.session.commit()
+            entry['incrementalRefresh'] = store.refresh('videos')
+            
+            table = store.require('videos')
+            single = channel_ids[:1]
+            queries = {
+                'engagementByMonth': (
+                    lambda: engagement_by_month(table),
+                    lambda: _sql_engagement_by_month(None)
+                ),
+                'engagementByMonthOneChannel': (
+                    lambda: engagement_by_month(table, single),
+                    lambda: _sql_engagement_by_month(single)
+                ),
+                'viewPercentiles': (
+                    lambda: view_percentiles(table),
+                    lambda: _sql_view_percentiles(None, (50, 90, 99))
+                ),
+                'viewPercentilesOneChannel': (
+                    lambda: view_percentiles(table, single),
+                    lambda: _sql_view_percentiles(single, (50, 90, 99))
+                )
+            }
+            
+            entry['queries'] = {}
+            for name, (columnar, sql) in queries.items():
+                columnar_result, columnar_ms = timed(columnar, iterations)
+                sql_result, sql_ms = timed(sql, iterations)
+                if name.startswith('engagement'):
+                    keys = ('month', 'videos', 'views', 'likes', 'comments')
+                else:
+                    keys = ('channelId', 'videos', 'percentiles')
+                matches = [{key: item[key] for key in keys} for item in columnar_result] == [
+                    {key: item[key] for key in keys} for item in sql_result
+                ]
+                entry['queries'][name] = {
+                    'columnarMs': columnar_ms,
+                    'sqlMs': sql_ms,
+                    'speedup': round(sql_ms / columnar_ms, 1) if columnar_ms else None,
+                    'matches': matches
+                }
+            
+            entry['snapshotBytes'] = sum(
+                os.path.getsize(os.path.join(table.path, filename)) for filename in os.listdir(table.path)
+            )
+            entry['databaseBytes'] = os.path.getsize(os.path.join(workdir, 'bench.db'))
+            db.session.remove()
+        
+        results['sizes'].append(entry)
+    
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('columnar', help='比較欄位快照與SQL路徑的分析查詢')
+    parser.add_argument('--sizes', default='1000000,10000000', help='影片數量（以逗號分隔）')
+    parser.add_argument('--channels', type=int, default=500, help='影片分配到的頻道數量')
+    parser.add_argument('--iterations', type=int, default=5, help='每個查詢的計時次數')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_columnar(
+        sizes=tuple(int(size) for size in args.sizes.split(',')),
+        channels=args.channels,
+        iterations=args.iterations
+    ))
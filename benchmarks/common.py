@@ -0,0 +1,112 @@
+import os
+import json
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+def percentile(sorted_values, percentile):
+    """以最近排名法計算百分位數"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, -(-len(sorted_values) * percentile // 100) - 1))
+    return sorted_values[int(index)]
+
+def prepare_environment():
+    """在載入應用程式前設定回放所需的環境變數"""
+    os.environ.setdefault('YOUTUBE_API_KEY', 'benchmark')
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
+    # 配額只保存在記憶體且不設上限，避免回放耗盡或寫入真實的配額檔案
+    os.environ['QUOTA_STATE_FILE'] = ''
+    os.environ['YOUTUBE_DATA_API_DAILY_QUOTA'] = str(10 ** 12)
+    os.environ['YOUTUBE_ANALYTICS_API_DAILY_QUOTA'] = str(10 ** 12)
+    os.environ['SNAPSHOT_INTERVAL_SECONDS'] = '0'
+    os.environ['COLUMNAR_REFRESH_SECONDS'] = '0'
+    os.environ['JOB_MAX_WORKERS'] = '0'
+
+def current_rss():
+    """獲取目前的常駐記憶體（位元組），非Linux時以峰值代替"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def file_backed_app(prefix):
+    """
+    建立使用暫存SQLite檔案的測試應用程式（避免資料庫本身佔用行程記憶體）
+    
+    Returns:
+        tuple: (Flask應用程式, 暫存目錄)
+    """
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    prepare_environment()
+    from src.config import config as app_configs
+    # 測試配置固定使用記憶體資料庫，此處改為暫存檔案
+    app_configs['testing'].SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(workdir, "bench.db")}'
+    from src.main import create_app
+    return create_app('testing'), workdir
+
+def seed_rows(dataset, rows, channel_ids, chunk_size=10000):
+    """以批次INSERT寫入測試用的影片或每日統計資料列"""
+    from sqlalchemy import insert
+    from src.models.user import db
+    from src.models.channel import Video, ChannelStatisticsHistory
+    
+    per_channel = -(-rows // len(channel_ids))
+    first_day = date(2015, 1, 1)
+    
+    def generate():
+        for index in range(rows):
+            channel_id = channel_ids[index // per_channel]
+            offset = index % per_channel
+            if dataset == 'videos':
+                yield {
+                    'video_id': f'vbench{index:09d}',
+                    'channel_id': channel_id,
+                    'title': f'Benchmark video {index}',
+                    'published_at': datetime(2015, 1, 1) + timedelta(hours=offset),
+                    'duration': 'PT10M',
+                    'view_count': index * 7,
+                    'like_count': index % 1000,
+                    'comment_count': index % 100,
+                    'engagement_rate': 1.5
+                }
+            else:
+                yield {
+                    'channel_id': channel_id,
+                    'date': first_day + timedelta(days=offset),
+                    'view_count': index * 11,
+                    'subscriber_count': index * 3,
+                    'video_count': offset
+                }
+    
+    model = Video if dataset == 'videos' else ChannelStatisticsHistory
+    chunk = []
+    for row in generate():
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert(model), chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert(model), chunk)
+    db.session.commit()
+
+def timed(fn, iterations):
+    """執行fn多次並返回 (最後一次的結果, 中位數毫秒)"""
+    durations = []
+    result = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    return result, round(percentile(durations, 50), 3)
+
+def write_output(results, path):
+    """輸出結果JSON"""
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
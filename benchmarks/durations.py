@@ -0,0 +1,87 @@
+from benchmarks.common import timed
+
+def _format_duration(seconds):
+    """將秒數格式化為YouTube使用的ISO 8601時間長度"""
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    value = f'P{days}D' if days else 'P'
+    if hours or minutes or seconds or not days:
+        value += 'T' + (f'{hours}H' if hours else '') + (f'{minutes}M' if minutes else '') + (f'{seconds}S' if seconds or not (hours or minutes) else '')
+    return value
+
+def _synthetic_durations(count, seed=0):
+    """產生合成的時間長度字串（約三成為Shorts，少數直播超過一天）"""
+    import random
+    
+    rng = random.Random(seed)
+    values = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.3:
+            seconds = rng.randint(5, 60)
+        elif roll < 0.999:
+            seconds = int(rng.lognormvariate(6.5, 0.9))
+        else:
+            seconds = rng.randint(86400, 3 * 86400)
+        values.append(_format_duration(seconds))
+    return values
+
+def _regex_duration(value):
+    """以正規表示式逐一解析（效能比較基準）"""
+    import re
+    
+    match = re.match(r'^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$', value)
+    if not match:
+        return None
+    weeks, days, hours, minutes, seconds = match.groups()
+    return int(round(
+        int(weeks or 0) * 604800 + int(days or 0) * 86400 + int(hours or 0) * 3600
+        + int(minutes or 0) * 60 + float(seconds or 0)
+    )) or None
+
+def benchmark_durations(count=1000000, iterations=3):
+    """
+    比較時間長度解析器與正規表示式、isodate（若已安裝）的吞吐量
+    
+    Args:
+        count: 字串數量
+        iterations: 計時次數
+        
+    Returns:
+        dict: 各解析器的中位數耗時、每秒解析數量與結果是否與正規表示式一致
+    """
+    from src.services.duration import parse_duration, parse_durations
+    
+    values = _synthetic_durations(count)
+    parsers = {
+        'regex': lambda: [_regex_duration(value) for value in values],
+        'parseDuration': lambda: [parse_duration(value) for value in values],
+        'parseDurations': lambda: parse_durations(values)
+    }
+    try:
+        import isodate
+        parsers['isodate'] = lambda: [int(round(isodate.parse_duration(value).total_seconds())) for value in values]
+    except ImportError:
+        pass
+    
+    results = {'strings': count, 'distinct': len(set(values)), 'iterations': iterations, 'parsers': {}}
+    expected = None
+    for name, parse in parsers.items():
+        parsed, elapsed_ms = timed(parse, iterations)
+        if expected is None:
+            expected = parsed
+        results['parsers'][name] = {
+            'ms': elapsed_ms,
+            'stringsPerSecond': round(count / (elapsed_ms / 1000), 1) if elapsed_ms else None,
+            'matchesRegex': parsed == expected
+        }
+    
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('durations', help='比較時間長度解析器的吞吐量')
+    parser.add_argument('--count', type=int, default=1000000, help='字串數量')
+    parser.add_argument('--iterations', type=int, default=3, help='計時次數')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_durations(count=args.count, iterations=args.iterations))
@@ -0,0 +1,101 @@
+import json
+import time
+from benchmarks.common import current_rss, file_backed_app, seed_rows
+
+def benchmark_export(rows=1000000, dataset='statistics', formats=('ndjson', 'csv'), channels=500, compare_orm=False):
+    """
+    量測串流匯出的吞吐量與常駐記憶體
+    
+    資料寫入暫存的SQLite檔案（避免資料庫本身佔用行程記憶體），
+    再以測試客戶端逐區塊讀取匯出響應，每個區塊取樣一次RSS。
+    
+    Args:
+        rows: 匯出的資料列總數
+        dataset: 'videos' 或 'statistics'
+        formats: 要量測的輸出格式
+        channels: 資料列平均分配到的頻道數量
+        compare_orm: 另外量測載入全部ORM物件後以to_dict()序列化的舊做法
+        
+    Returns:
+        dict: 各格式的資料列數、位元組數、耗時、吞吐量與RSS變化
+    """
+    app, workdir = file_backed_app('export-bench-')
+    from src.models.channel import Video, ChannelStatisticsHistory
+    
+    client = app.test_client()
+    channel_ids = [f'UCexport{i:06d}' for i in range(channels)]
+    results = {'dataset': dataset, 'rows': rows, 'channels': channels, 'formats': {}}
+    
+    with app.app_context():
+        started = time.perf_counter()
+        seed_rows(dataset, rows, channel_ids)
+        results['seedSeconds'] = round(time.perf_counter() - started, 2)
+    
+    url = f'/api/channel/export/{dataset}?channelIds={",".join(channel_ids)}'
+    for output_format in formats:
+        rss_start = rss_peak = current_rss()
+        exported = size = 0
+        started = time.perf_counter()
+        
+        response = client.get(f'{url}&format={output_format}', buffered=False)
+        if response.status_code != 200:
+            raise RuntimeError(f'匯出返回 {response.status_code}: {response.get_data(as_text=True)[:200]}')
+        try:
+            for chunk in response.response:
+                exported += chunk.count(b'\n') if isinstance(chunk, bytes) else chunk.count('\n')
+                size += len(chunk)
+                rss_peak = max(rss_peak, current_rss())
+        finally:
+            response.close()
+        
+        elapsed = time.perf_counter() - started
+        if output_format == 'csv':
+            exported -= 1  # 標題列
+        results['formats'][output_format] = {
+            'rows': exported,
+            'bytes': size,
+            'seconds': round(elapsed, 3),
+            'rowsPerSecond': round(exported / elapsed, 1),
+            'rssStartBytes': rss_start,
+            'rssPeakBytes': rss_peak,
+            'rssGrowthBytes': rss_peak - rss_start
+        }
+    
+    if compare_orm:
+        model = Video if dataset == 'videos' else ChannelStatisticsHistory
+        with app.app_context():
+            rss_start = current_rss()
+            started = time.perf_counter()
+            items = model.query.filter(model.channel_id.in_(channel_ids)).all()
+            body = json.dumps([item.to_dict() for item in items])
+            rss_peak = current_rss()
+            elapsed = time.perf_counter() - started
+            results['formats']['ormToDict'] = {
+                'rows': len(items),
+                'bytes': len(body),
+                'seconds': round(elapsed, 3),
+                'rowsPerSecond': round(len(items) / elapsed, 1),
+                'rssStartBytes': rss_start,
+                'rssPeakBytes': rss_peak,
+                'rssGrowthBytes': rss_peak - rss_start
+            }
+            del items, body
+    
+    results['workdir'] = workdir
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('export', help='量測串流匯出的吞吐量與常駐記憶體')
+    parser.add_argument('--rows', type=int, default=1000000, help='匯出的資料列總數')
+    parser.add_argument('--dataset', choices=('videos', 'statistics'), default='statistics', help='匯出的數據集')
+    parser.add_argument('--formats', default='ndjson,csv', help='輸出格式（以逗號分隔）')
+    parser.add_argument('--channels', type=int, default=500, help='資料列分配到的頻道數量')
+    parser.add_argument('--compare-orm', action='store_true', help='另外量測載入ORM物件後以to_dict()序列化的做法')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_export(
+        rows=args.rows,
+        dataset=args.dataset,
+        formats=tuple(args.formats.split(',')),
+        channels=args.channels,
+        compare_orm=args.compare_orm
+    ))
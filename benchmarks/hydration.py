@@ -0,0 +1,62 @@
+from benchmarks.common import prepare_environment, timed
+from benchmarks.transport import ReplayTransport
+
+def benchmark_hydration(sizes=(10, 25, 50), iterations=20, latency=0.02):
+    """
+    比較搜尋結果以單次channels.list批次補齊與逐一呼叫get_channel_details
+    
+    以ReplayTransport回放search.list與channels.list，每次上游呼叫加上固定延遲，
+    量測兩種補齊方式的上游往返次數與牆鐘時間。
+    
+    Args:
+        sizes: 搜尋結果數量
+        iterations: 每個數量的計時次數
+        latency: 每次上游呼叫模擬的延遲（秒）
+        
+    Returns:
+        dict: 各結果數量下兩種方式的往返次數與中位數耗時
+    """
+    prepare_environment()
+    from src.services.youtube_service import YouTubeService
+    
+    service = YouTubeService(cache=None, quota=None, coalesce=False)
+    transport = ReplayTransport(latency=latency)
+    
+    def per_hit(max_results):
+        # 原本的作法：search.list之後每個頻道各呼叫一次channels.list
+        request = service.youtube.search().list(part='snippet', q='benchmark', type='channel', maxResults=max_results)
+        response = service._execute(request, 'search.list')
+        return [service.get_channel_details(item['id']['channelId']) for item in response.get('items', [])]
+    
+    def batched(max_results):
+        return service.search_channels('benchmark', max_results=max_results)
+    
+    results = {'iterations': iterations, 'latency': latency, 'sizes': {}}
+    with transport.installed():
+        for size in sizes:
+            entry = {}
+            for name, hydrate in (('perHit', per_hit), ('batched', batched)):
+                before = transport.snapshot()
+                channels, elapsed_ms = timed(lambda: hydrate(size), iterations)
+                calls = transport.snapshot() - before
+                entry[name] = {
+                    'roundTrips': round(sum(calls.values()) / iterations, 2),
+                    'ms': elapsed_ms,
+                    'channels': len(channels)
+                }
+            entry['speedup'] = round(entry['perHit']['ms'] / entry['batched']['ms'], 1) if entry['batched']['ms'] else None
+            results['sizes'][str(size)] = entry
+    
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('hydrate', help='比較搜尋結果批次補齊與逐一呼叫channels.list')
+    parser.add_argument('--sizes', default='10,25,50', help='搜尋結果數量（以逗號分隔）')
+    parser.add_argument('--iterations', type=int, default=20, help='每個數量的計時次數')
+    parser.add_argument('--latency', type=float, default=0.02, help='每次上游呼叫模擬的延遲（秒）')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_hydration(
+        sizes=tuple(int(size) for size in args.sizes.split(',')),
+        iterations=args.iterations,
+        latency=args.latency
+    ))
@@ -0,0 +1,102 @@
+import time
+from datetime import datetime
+from benchmarks.common import file_backed_app
+
+def _ingest_items(count, channels, generation=0):
+    """產生videos.list響應格式的影片項目（generation不同時統計數字不同）"""
+    return [
+        {
+            'id': f'vingest{index:09d}',
+            'snippet': {
+                'channelId': f'UCingest{index % channels:06d}',
+                'title': f'Ingest video {index}',
+                'publishedAt': '2024-01-01T00:00:00Z'
+            },
+            'statistics': {
+                'viewCount': str(index * 7 + generation),
+                'likeCount': str(index % 1000),
+                'commentCount': str(index % 100)
+            },
+            'contentDetails': {'duration': 'PT10M'}
+        }
+        for index in range(count)
+    ]
+
+def _orm_upsert_videos(items):
+    """逐筆查詢再新增或更新ORM物件的寫入方式（批次寫入之前的做法）"""
+    from src.models.user import db
+    from src.models.channel import Video
+    
+    for item in items:
+        row = Video.row_from_youtube_data(item, item['snippet']['channelId'])
+        video = Video.query.filter_by(video_id=row['video_id']).first()
+        if video is None:
+            db.session.add(Video(**row))
+        else:
+            for column, value in row.items():
+                setattr(video, column, value)
+            video.last_updated = datetime.utcnow()
+    db.session.commit()
+
+def benchmark_bulk_upsert(rows=100000, channels=100, chunk_size=None):
+    """
+    比較逐筆ORM寫入與bulk_upsert_videos的耗時
+    
+    每種方式使用各自的暫存SQLite檔案，先寫入rows支新影片，
+    再以相同的鍵與新的統計數字寫入一次（全部走更新路徑）。
+    
+    Args:
+        rows: 影片數量
+        channels: 影片分配到的頻道數量
+        chunk_size: bulk_upsert_videos每個語句的資料列數量
+        
+    Returns:
+        dict: 各方式新增與更新的耗時、每秒資料列數與最終列數
+    """
+    from sqlalchemy import func, select
+    
+    first = _ingest_items(rows, channels)
+    second = _ingest_items(rows, channels, generation=1)
+    
+    results = {'rows': rows, 'channels': channels, 'methods': {}}
+    for name in ('orm', 'bulkUpsert'):
+        app, workdir = file_backed_app(f'ingest-bench-{name}-')
+        from src.models.user import db
+        from src.models.channel import Video
+        from src.services.ingestion_service import bulk_upsert_videos
+        
+        if name == 'orm':
+            write = _orm_upsert_videos
+        else:
+            write = lambda items: bulk_upsert_videos(items, chunk_size=chunk_size)
+        
+        timings = {}
+        with app.app_context():
+            for phase, items in (('insert', first), ('update', second)):
+                started = time.perf_counter()
+                write(items)
+                elapsed = time.perf_counter() - started
+                timings[phase] = {
+                    'seconds': round(elapsed, 3),
+                    'rowsPerSecond': round(rows / elapsed, 1)
+                }
+                db.session.remove()
+            timings['rowCount'] = db.session.execute(select(func.count()).select_from(Video.__table__)).scalar()
+            timings['maxViewCount'] = db.session.execute(select(func.max(Video.view_count))).scalar()
+        timings['workdir'] = workdir
+        results['methods'][name] = timings
+    
+    orm, bulk = results['methods']['orm'], results['methods']['bulkUpsert']
+    results['speedup'] = {
+        phase: round(orm[phase]['seconds'] / bulk[phase]['seconds'], 1) if bulk[phase]['seconds'] else None
+        for phase in ('insert', 'update')
+    }
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('ingest', help='比較逐筆ORM寫入與批次upsert')
+    parser.add_argument('--rows', type=int, default=100000, help='影片數量')
+    parser.add_argument('--channels', type=int, default=100, help='影片分配到的頻道數量')
+    parser.add_argument('--chunk-size', type=int, help='每個語句的資料列數量（預設INGEST_CHUNK_SIZE）')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_bulk_upsert(rows=args.rows, channels=args.channels, chunk_size=args.chunk_size))
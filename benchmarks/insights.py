@@ -0,0 +1,217 @@
+from datetime import datetime
+from benchmarks.common import prepare_environment, timed
+
+def _py_percentile(sorted_values, percentile):
+    """線性插值的百分位數（與numpy.percentile預設方法相同）"""
+    position = (len(sorted_values) - 1) * (percentile / 100.0)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def _py_round(value):
+    return None if value is None else round(float(value), 2)
+
+def _py_distribution(pairs):
+    """純Python版本的分佈統計，pairs為 (影片ID, 數值) 列表"""
+    from src.services.insights_service import DISTRIBUTION_PERCENTILES, OUTLIER_IQR_FACTOR, TOP_OUTLIERS
+    
+    if not pairs:
+        return {'count': 0}
+    values = sorted(value for _, value in pairs)
+    quantiles = {percentile: _py_percentile(values, percentile) for percentile in DISTRIBUTION_PERCENTILES}
+    iqr = quantiles[75] - quantiles[25]
+    lower = quantiles[25] - OUTLIER_IQR_FACTOR * iqr
+    upper = quantiles[75] + OUTLIER_IQR_FACTOR * iqr
+    high = [(video_id, value) for video_id, value in pairs if value > upper]
+    top = sorted(high, key=lambda item: -item[1])[:TOP_OUTLIERS]
+    return {
+        'count': len(values),
+        'mean': _py_round(sum(values) / len(values)),
+        'min': _py_round(values[0]),
+        'max': _py_round(values[-1]),
+        'percentiles': {f'p{percentile}': _py_round(value) for percentile, value in quantiles.items()},
+        'iqr': _py_round(iqr),
+        'outlierBounds': {'lower': _py_round(lower), 'upper': _py_round(upper)},
+        'outliers': {
+            'low': sum(1 for value in values if value < lower),
+            'high': len(high),
+            'top': [{'videoId': video_id, 'value': _py_round(value)} for video_id, value in top]
+        }
+    }
+
+def _py_channel_insights(rows, now):
+    """
+    以逐列迴圈計算與insights_service.channel_insights相同的結果（效能比較基準）
+    
+    Args:
+        rows: 影片字典列表（video_id, published_at, view_count, like_count, comment_count, duration_seconds）
+        now: 基準時間
+    """
+    from src.services.insights_service import DURATION_BUCKETS
+    
+    epoch = datetime(1970, 1, 1)
+    now_seconds = int((now - epoch).total_seconds())
+    engagement, views, views_per_day, times = [], [], [], []
+    total_views = total_interactions = 0
+    names = [name for name, _ in DURATION_BUCKETS] + ['unknown']
+    buckets = {name: {'videos': 0, 'views': 0, 'interactions': 0, 'viewList': [], 'perDay': []} for name in names}
+    
+    for row in rows:
+        view_count = row['view_count']
+        interactions = row['like_count'] + row['comment_count']
+        total_views += view_count
+        total_interactions += interactions
+        views.append((row['video_id'], float(view_count)))
+        if view_count > 0:
+            engagement.append((row['video_id'], interactions / view_count * 100))
+        
+        per_day = None
+        if row['published_at'] is not None:
+            published = int((row['published_at'] - epoch).total_seconds())
+            times.append(published)
+            per_day = view_count / max((now_seconds - published) / 86400.0, 1.0)
+            views_per_day.append((row['video_id'], per_day))
+        
+        bucket = 'unknown'
+        if row['duration_seconds'] is not None:
+            for name, limit in DURATION_BUCKETS:
+                if limit is None or row['duration_seconds'] <= limit:
+                    bucket = name
+                    break
+        stats = buckets[bucket]
+        stats['videos'] += 1
+        stats['views'] += view_count
+        stats['interactions'] += interactions
+        stats['viewList'].append(float(view_count))
+        if per_day is not None:
+            stats['perDay'].append(per_day)
+    
+    times.sort()
+    gaps = [(later - earlier) / 86400.0 for earlier, later in zip(times, times[1:])]
+    sorted_gaps = sorted(gaps)
+    span_days = (times[-1] - times[0]) / 86400.0 if times else 0
+    weekdays = [0] * 7
+    hours = [0] * 24
+    for published in times:
+        weekdays[(published // 86400 + 3) % 7] += 1
+        hours[(published % 86400) // 3600] += 1
+    
+    breakout = []
+    for index, name in enumerate(names):
+        stats = buckets[name]
+        if not stats['videos']:
+            continue
+        breakout.append({
+            'bucket': name,
+            'videos': stats['videos'],
+            'views': stats['views'],
+            'engagementRate': _py_round(stats['interactions'] / stats['views'] * 100) if stats['views'] else 0,
+            'medianViews': _py_round(_py_percentile(sorted(stats['viewList']), 50)),
+            'medianViewsPerDay': _py_round(_py_percentile(sorted(stats['perDay']), 50)) if stats['perDay'] else None
+        })
+    
+    return {
+        'videoCount': len(rows),
+        'totalViews': total_views,
+        'overallEngagementRate': _py_round(total_interactions / total_views * 100) if total_views else 0,
+        'engagementRate': _py_distribution(engagement),
+        'views': _py_distribution(views),
+        'viewsPerDay': _py_distribution(views_per_day),
+        'uploadCadence': {
+            'uploads': len(times),
+            'uploadsPerWeek': _py_round((len(times) - 1) / span_days * 7) if span_days > 0 else None,
+            'medianGapDays': _py_round(_py_percentile(sorted_gaps, 50)) if gaps else None,
+            'longestGapDays': _py_round(sorted_gaps[-1]) if gaps else None,
+            'last90Days': sum(1 for published in times if published >= now_seconds - 90 * 86400),
+            'byWeekday': weekdays,
+            'byHourUtc': hours
+        },
+        'durationBuckets': breakout
+    }
+
+def _approx_equal(expected, actual, tolerance=0.011):
+    """遞迴比較expected中的每個欄位（數值允許捨入誤差）"""
+    if isinstance(expected, dict):
+        return all(key in actual and _approx_equal(value, actual[key], tolerance) for key, value in expected.items())
+    if isinstance(expected, list):
+        if len(expected) != len(actual):
+            return False
+        return all(_approx_equal(left, right, tolerance) for left, right in zip(expected, actual))
+    if isinstance(expected, float) and isinstance(actual, (int, float)):
+        return abs(expected - actual) <= tolerance * max(1.0, abs(expected) * 1e-9)
+    return expected == actual
+
+def _synthetic_channel_videos(count, now, seed=0):
+    """產生一個頻道的合成影片欄位（對數常態分佈的觀看次數）"""
+    import numpy as np
+    
+    rng = np.random.default_rng(seed)
+    ages = rng.integers(3600, 10 * 365 * 86400, size=count)
+    published = np.datetime64(now, 's') - ages.astype('timedelta64[s]')
+    views = rng.lognormal(mean=9, sigma=1.5, size=count).astype(np.int64)
+    durations = rng.choice([30.0, 45.0, 180.0, 600.0, 1500.0, 3600.0, np.nan], size=count)
+    return {
+        'video_id': np.array([f'vsynth{i:08d}' for i in range(count)], dtype=object),
+        'published_at': published,
+        'view_count': views,
+        'like_count': (views * rng.uniform(0.01, 0.06, size=count)).astype(np.int64),
+        'comment_count': (views * rng.uniform(0.0, 0.01, size=count)).astype(np.int64),
+        'duration_seconds': durations
+    }
+
+def benchmark_insights(counts=(1000, 10000, 100000), iterations=5):
+    """
+    比較向量化的頻道洞察與逐列Python實作
+    
+    合成資料不經過資料庫，只量測計算本身；兩者的結果會互相比對。
+    
+    Args:
+        counts: 每個頻道的影片數量
+        iterations: 計時次數
+        
+    Returns:
+        dict: 各影片數量的中位數延遲、加速倍數與結果是否一致
+    """
+    prepare_environment()
+    from src.services.insights_service import channel_insights
+    
+    now = datetime(2025, 1, 1)
+    results = {'iterations': iterations, 'runs': []}
+    for count in counts:
+        videos = _synthetic_channel_videos(count, now)
+        rows = [
+            {
+                'video_id': video_id,
+                'published_at': published,
+                'view_count': view_count,
+                'like_count': like_count,
+                'comment_count': comment_count,
+                'duration_seconds': None if duration != duration else duration
+            }
+            for video_id, published, view_count, like_count, comment_count, duration in zip(
+                videos['video_id'].tolist(), videos['published_at'].tolist(), videos['view_count'].tolist(),
+                videos['like_count'].tolist(), videos['comment_count'].tolist(), videos['duration_seconds'].tolist()
+            )
+        ]
+        
+        vectorized, vectorized_ms = timed(lambda: channel_insights(videos, now=now), iterations)
+        python, python_ms = timed(lambda: _py_channel_insights(rows, now), iterations)
+        results['runs'].append({
+            'videos': count,
+            'vectorizedMs': vectorized_ms,
+            'pythonMs': python_ms,
+            'speedup': round(python_ms / vectorized_ms, 1) if vectorized_ms else None,
+            'matches': _approx_equal(python, vectorized)
+        })
+    
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('insights', help='比較向量化頻道洞察與純Python實作')
+    parser.add_argument('--counts', default='1000,10000,100000', help='每個頻道的影片數量（以逗號分隔）')
+    parser.add_argument('--iterations', type=int, default=5, help='計時次數')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_insights(
+        counts=tuple(int(count) for count in args.counts.split(',')),
+        iterations=args.iterations
+    ))
@@ -0,0 +1,69 @@
+import time
+from benchmarks.common import prepare_environment, timed
+
+def benchmark_instrumentation(iterations=2000, queries=20000):
+    """
+    量測請求延遲直方圖與資料庫查詢計時的額外成本
+    
+    請求：以測試客戶端呼叫不查詢資料庫的/health與會查詢資料庫的/stats，
+    比較保留與移除before_request/after_request計時函數的中位數延遲。
+    查詢：在兩個記憶體SQLite引擎上執行相同的查詢，其中一個套用instrument_database。
+    
+    Args:
+        iterations: 每個端點的請求次數
+        queries: 每個引擎執行的查詢次數
+        
+    Returns:
+        dict: 各端點有無計時的延遲（毫秒）與每個請求、每個查詢的額外成本（微秒）
+    """
+    prepare_environment()
+    from sqlalchemy import create_engine, text
+    from src.main import create_app
+    from src.services.metrics import instrument_database
+    
+    app = create_app('testing')
+    client = app.test_client()
+    hooks = {
+        'before': (app.before_request_funcs, 'start_request_timer'),
+        'after': (app.after_request_funcs, 'record_request_latency')
+    }
+    removed = {
+        name: [fn for fn in funcs[None] if fn.__name__ == fn_name]
+        for name, (funcs, fn_name) in hooks.items()
+    }
+    
+    def set_hooks(enabled):
+        for name, (funcs, fn_name) in hooks.items():
+            funcs[None] = [fn for fn in funcs[None] if fn.__name__ != fn_name] + (removed[name] if enabled else [])
+    
+    results = {'iterations': iterations, 'requests': {}}
+    for path in ('/api/system/health', '/api/system/stats'):
+        timings = {}
+        for label, enabled in (('instrumented', True), ('bare', False)):
+            set_hooks(enabled)
+            for _ in range(min(iterations, 50)):
+                client.get(path)
+            _, timings[label] = timed(lambda: client.get(path), iterations)
+        set_hooks(True)
+        timings['overheadUs'] = round((timings['instrumented'] - timings['bare']) * 1000, 2)
+        results['requests'][path] = timings
+    
+    engines = {'instrumented': create_engine('sqlite://'), 'bare': create_engine('sqlite://')}
+    instrument_database(engines['instrumented'])
+    results['queries'] = {'count': queries}
+    for label, engine in engines.items():
+        with engine.connect() as connection:
+            statement = text('SELECT 1')
+            started = time.perf_counter()
+            for _ in range(queries):
+                connection.execute(statement).scalar()
+            results['queries'][f'{label}Us'] = round((time.perf_counter() - started) / queries * 1e6, 2)
+    results['queries']['overheadUs'] = round(results['queries']['instrumentedUs'] - results['queries']['bareUs'], 2)
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('overhead', help='量測請求與查詢計時指標的額外成本')
+    parser.add_argument('--iterations', type=int, default=2000, help='每個端點的請求次數')
+    parser.add_argument('--queries', type=int, default=20000, help='每個引擎執行的查詢次數')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_instrumentation(iterations=args.iterations, queries=args.queries))
@@ -0,0 +1,167 @@
+import json
+from benchmarks.common import prepare_environment, timed
+
+def _thumbnails(prefix):
+    """產生default、medium、high三種尺寸的縮圖資訊"""
+    return {
+        size: {'url': f'https://yt3.ggpht.com/{prefix}/{size}.jpg', 'width': width, 'height': height}
+        for size, width, height in (('default', 88, 88), ('medium', 240, 240), ('high', 800, 800))
+    }
+
+def _full_resource(resource, index):
+    """產生包含所有part、欄位數量接近真實API的資源（用於量測部分響應）"""
+    description = ' '.join(f'word{(index * 7 + i) % 500}' for i in range(150))
+    published_at = '2024-01-01T00:00:00Z'
+    if resource == 'search':
+        channel_id = f'UCproj{index:06d}'
+        return {
+            'kind': 'youtube#searchResult',
+            'etag': f'etag-search-{index}',
+            'id': {'kind': 'youtube#channel', 'channelId': channel_id},
+            'snippet': {
+                'publishedAt': published_at,
+                'channelId': channel_id,
+                'title': f'Projection channel {index}',
+                'description': description[:160],
+                'thumbnails': _thumbnails(channel_id),
+                'channelTitle': f'Projection channel {index}',
+                'liveBroadcastContent': 'none',
+                'publishTime': published_at
+            }
+        }
+    if resource == 'channels':
+        channel_id = f'UCproj{index:06d}'
+        title = f'Projection channel {index}'
+        return {
+            'kind': 'youtube#channel',
+            'etag': f'etag-channel-{index}',
+            'id': channel_id,
+            'snippet': {
+                'title': title,
+                'description': description,
+                'customUrl': f'@projection{index}',
+                'publishedAt': published_at,
+                'thumbnails': _thumbnails(channel_id),
+                'localized': {'title': title, 'description': description},
+                'country': 'TW'
+            },
+            'contentDetails': {'relatedPlaylists': {'likes': '', 'uploads': 'UU' + channel_id[2:]}},
+            'statistics': {
+                'viewCount': str(index * 1000), 'subscriberCount': str(index * 10),
+                'hiddenSubscriberCount': False, 'videoCount': str(index)
+            },
+            'brandingSettings': {
+                'channel': {
+                    'title': title, 'description': description,
+                    'keywords': ' '.join(f'keyword{i}' for i in range(20)),
+                    'unsubscribedTrailer': f'trailer{index}', 'country': 'TW'
+                },
+                'image': {'bannerExternalUrl': f'https://yt3.googleusercontent.com/banner/{channel_id}'}
+            }
+        }
+    if resource == 'playlistItems':
+        video_id = f'vproj{index:06d}'
+        return {
+            'kind': 'youtube#playlistItem',
+            'etag': f'etag-item-{index}',
+            'id': f'UExpcm9q{index:010d}',
+            'contentDetails': {'videoId': video_id, 'videoPublishedAt': published_at}
+        }
+    raise ValueError(resource)
+
+# 使用情境、資源、部分響應之前請求的part與之後的PROJECTIONS名稱
+PROJECTION_CASES = (
+    ('searchChannelIds', 'search', 'snippet'),
+    ('channelUploads', 'channels', 'snippet,statistics,contentDetails,brandingSettings'),
+    ('channelStatistics', 'channels', 'snippet,statistics,contentDetails,brandingSettings'),
+    ('playlistVideoIds', 'playlistItems', 'contentDetails')
+)
+
+def _parse_fields(mask):
+    """將fields參數解析為巢狀字典（空字典表示保留整個值）"""
+    tree = {}
+    
+    def parse(position, node):
+        while position < len(mask):
+            end = position
+            while end < len(mask) and mask[end] not in ',()':
+                end += 1
+            target = node
+            for name in mask[position:end].split('/'):
+                target = target.setdefault(name, {})
+            position = end
+            if position < len(mask) and mask[position] == '(':
+                position = parse(position + 1, target) + 1
+            if position < len(mask) and mask[position] == ')':
+                return position
+            position += 1
+        return position
+    
+    parse(0, tree)
+    return tree
+
+def _apply_fields(value, tree):
+    """依fields解析結果裁剪響應（與API端的部分響應相同）"""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_apply_fields(item, tree) for item in value]
+    return {key: _apply_fields(value[key], subtree) for key, subtree in tree.items() if key in value}
+
+def _project_response(resource, count, part, fields=None):
+    """產生只包含指定part（與fields）的list響應"""
+    parts = set(part.split(','))
+    items = [
+        {key: value for key, value in _full_resource(resource, index).items() if key in ('kind', 'etag', 'id') or key in parts}
+        for index in range(count)
+    ]
+    response = {
+        'kind': f'youtube#{resource}ListResponse',
+        'etag': f'etag-{resource}',
+        'nextPageToken': 'CDIQAA',
+        'pageInfo': {'totalResults': count * 20, 'resultsPerPage': count},
+        'items': items
+    }
+    return _apply_fields(response, _parse_fields(fields)) if fields else response
+
+def benchmark_projections(items=50, iterations=200):
+    """
+    量測部分響應（part與fields）減少的響應大小與JSON解析時間
+    
+    以欄位數量接近真實API的資源產生響應，分別套用部分響應之前請求的part
+    與PROJECTIONS中的part/fields（fields在本地以與API相同的語法裁剪），
+    比較序列化後的位元組數與json.loads的中位數耗時。
+    
+    Args:
+        items: 每個響應的項目數量（list方法每頁最多50）
+        iterations: 解析的計時次數
+        
+    Returns:
+        dict: 各使用情境之前與之後的位元組數、解析耗時與減少的百分比
+    """
+    prepare_environment()
+    from src.services.youtube_service import PROJECTIONS
+    
+    results = {'items': items, 'iterations': iterations, 'cases': {}}
+    for name, resource, previous_part in PROJECTION_CASES:
+        projection = PROJECTIONS[name]
+        payloads = {
+            'before': json.dumps(_project_response(resource, items, previous_part)),
+            'after': json.dumps(_project_response(resource, items, projection['part'], projection['fields']))
+        }
+        case = {'part': projection['part'], 'fields': projection['fields']}
+        for label, payload in payloads.items():
+            _, elapsed_ms = timed(lambda: json.loads(payload), iterations)
+            case[label] = {'bytes': len(payload.encode('utf-8')), 'decodeMs': elapsed_ms}
+        case['bytesReduction'] = round((1 - case['after']['bytes'] / case['before']['bytes']) * 100, 1)
+        case['decodeReduction'] = round((1 - case['after']['decodeMs'] / case['before']['decodeMs']) * 100, 1) if case['before']['decodeMs'] else None
+        results['cases'][name] = case
+    
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('projections', help='量測部分響應減少的響應大小與解析時間')
+    parser.add_argument('--items', type=int, default=50, help='每個響應的項目數量')
+    parser.add_argument('--iterations', type=int, default=200, help='解析的計時次數')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_projections(items=args.items, iterations=args.iterations))
@@ -0,0 +1,190 @@
+import json
+import time
+import tracemalloc
+from benchmarks.common import percentile, prepare_environment
+from benchmarks.transport import DEFAULT_REPLAY_LATENCY, ReplayTransport
+
+# 測試用的頻道ID
+BENCH_CHANNEL_IDS = [f'UCbench{i:06d}' for i in range(5)]
+
+def _build_scenarios(client):
+    """
+    建立回放情境
+    
+    Args:
+        client: Flask測試客戶端
+        
+    Returns:
+        dict: {情境名稱: 執行一次的函數}
+    """
+    from google.oauth2.credentials import Credentials
+    from src.services.youtube_service import YouTubeService
+    
+    def expect_ok(response):
+        if response.status_code != 200:
+            raise RuntimeError(f'{response.request.path} 返回 {response.status_code}: {response.get_data(as_text=True)[:200]}')
+        return response
+    
+    def demographics():
+        # 受眾輪廓需要OAuth憑證，直接以YouTubeService回放
+        service = YouTubeService(credentials=Credentials(token='benchmark'), user_id='benchmark')
+        return service.get_audience_demographics(
+            BENCH_CHANNEL_IDS[0], '2024-01-01', '2024-12-31', extra_dimensions=['deviceTypes', 'trafficSources']
+        )
+    
+    return {
+        'search': lambda: expect_ok(client.get('/api/channel/search?q=benchmark&maxResults=10')),
+        'basic': lambda: expect_ok(client.get(f'/api/channel/{BENCH_CHANNEL_IDS[0]}/basic')),
+        # 第一次讀取寫入資料表後，其餘皆由資料表直接提供
+        'profile': lambda: expect_ok(client.get(f'/api/channel/{BENCH_CHANNEL_IDS[0]}/profile')),
+        'videos': lambda: expect_ok(client.get(f'/api/channel/{BENCH_CHANNEL_IDS[0]}/videos?maxResults=10&order=viewCount')),
+        'demographics': demographics,
+        'compare': lambda: expect_ok(client.post('/api/channel/compare', json={
+            'channelIds': BENCH_CHANNEL_IDS,
+            'startDate': '2023-01-01',
+            'endDate': '2024-12-31'
+        })),
+        'stats': lambda: expect_ok(client.get('/api/system/stats'))
+    }
+
+def run_replay(scenarios=None, iterations=50, warmup=3, latency=DEFAULT_REPLAY_LATENCY, fixtures=None, warm_cache=False, record=False):
+    """
+    以create_app('testing')與測試客戶端回放各情境
+    
+    每個情境先執行warmup次，再計時iterations次；峰值記憶體另以一次
+    tracemalloc追蹤的執行量測，避免追蹤成本影響延遲數據。
+    
+    Args:
+        scenarios: 要執行的情境名稱（None表示全部）
+        iterations: 每個情境的計時次數
+        warmup: 每個情境的暖身次數
+        latency: 每次上游呼叫模擬的延遲（秒）
+        fixtures: 錄製的fixture
+        warm_cache: 為False時每次執行前清除響應緩存，量測完整的上游路徑
+        record: 呼叫真實API並錄製fixture
+        
+    Returns:
+        dict: 各情境的延遲百分位數、吞吐量、上游呼叫次數與峰值記憶體
+    """
+    prepare_environment()
+    from src.main import create_app
+    from src.services.cache_service import response_cache
+    from src.routes.system import stats_cache
+    
+    transport = ReplayTransport(fixtures, latency=latency, record=record)
+    app = create_app('testing')
+    results = {
+        'iterations': iterations,
+        'latency': latency,
+        'warmCache': warm_cache,
+        'scenarios': {}
+    }
+    
+    def reset_caches():
+        if not warm_cache:
+            response_cache.clear()
+            stats_cache.clear()
+    
+    with transport.installed(), app.app_context():
+        client = app.test_client()
+        available = _build_scenarios(client)
+        
+        for name in scenarios or available:
+            run = available[name]
+            for _ in range(warmup):
+                reset_caches()
+                run()
+            
+            before = transport.snapshot()
+            durations = []
+            started = time.perf_counter()
+            for _ in range(iterations):
+                reset_caches()
+                call_started = time.perf_counter()
+                run()
+                durations.append(time.perf_counter() - call_started)
+            elapsed = time.perf_counter() - started
+            calls = transport.snapshot() - before
+            
+            reset_caches()
+            tracemalloc.start()
+            run()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            
+            durations.sort()
+            results['scenarios'][name] = {
+                'p50Ms': round(percentile(durations, 50) * 1000, 3),
+                'p95Ms': round(percentile(durations, 95) * 1000, 3),
+                'p99Ms': round(percentile(durations, 99) * 1000, 3),
+                'requestsPerSecond': round(iterations / elapsed, 2),
+                'upstreamCallsPerRequest': round(sum(calls.values()) / iterations, 2),
+                'upstreamCalls': {resource: round(count / iterations, 2) for resource, count in sorted(calls.items())},
+                'peakMemoryBytes': peak_memory
+            }
+    
+    if record:
+        results['fixtures'] = transport.fixtures
+    return results
+
+def compare_results(baseline, current):
+    """
+    比較兩次回放結果
+    
+    Args:
+        baseline: 基準結果
+        current: 本次結果
+        
+    Returns:
+        dict: 各情境p50/p95/p99與上游呼叫次數的變化百分比
+    """
+    diff = {}
+    for name, metrics in current.get('scenarios', {}).items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        diff[name] = {
+            key: round((metrics[key] - base[key]) * 100.0 / base[key], 2) if base[key] else None
+            for key in ('p50Ms', 'p95Ms', 'p99Ms', 'upstreamCallsPerRequest', 'peakMemoryBytes')
+        }
+    return diff
+
+def run(args):
+    """依命令列參數執行回放情境"""
+    fixtures = None
+    if args.fixtures:
+        with open(args.fixtures, 'r', encoding='utf-8') as f:
+            fixtures = json.load(f)
+    
+    results = run_replay(
+        scenarios=args.scenarios.split(',') if args.scenarios else None,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        latency=args.latency,
+        fixtures=fixtures,
+        warm_cache=args.warm_cache,
+        record=bool(args.record)
+    )
+    
+    if args.record:
+        with open(args.record, 'w', encoding='utf-8') as f:
+            json.dump(results.pop('fixtures'), f, ensure_ascii=False, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            results['changeFromBaselinePercent'] = compare_results(json.load(f), results)
+    
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('replay', help='以fixture回放Flask API與YouTubeService情境')
+    parser.add_argument('--scenarios', help='要執行的情境（以逗號分隔）: search,basic,profile,videos,demographics,compare,stats')
+    parser.add_argument('--iterations', type=int, default=50, help='每個情境的計時次數')
+    parser.add_argument('--warmup', type=int, default=3, help='每個情境的暖身次數')
+    parser.add_argument('--latency', type=float, default=DEFAULT_REPLAY_LATENCY, help='每次上游呼叫模擬的延遲（秒）')
+    parser.add_argument('--fixtures', help='錄製的fixture JSON檔案')
+    parser.add_argument('--record', help='呼叫真實API並將fixture錄製到此檔案')
+    parser.add_argument('--warm-cache', action='store_true', help='保留響應緩存（量測緩存命中路徑）')
+    parser.add_argument('--baseline', help='與先前的結果JSON比較')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=run)
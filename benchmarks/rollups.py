@@ -0,0 +1,92 @@
+import time
+from datetime import date, timedelta
+from benchmarks.common import file_backed_app, seed_rows, timed
+
+def _daily_growth(channel_id, period, start_date, end_date):
+    """不使用彙總表，直接掃描每日快照計算各期間增量（彙總表之前的做法）"""
+    from src.models.channel import ChannelStatisticsHistory
+    from src.services.rollup_service import period_bounds
+    
+    history = ChannelStatisticsHistory
+    rows = (
+        history.query
+        .filter(history.channel_id == channel_id, history.date >= start_date, history.date <= end_date)
+        .order_by(history.date)
+        .all()
+    )
+    periods = {}
+    for row in rows:
+        start = period_bounds(period, row.date)[0]
+        first = periods[start][0] if start in periods else row
+        periods[start] = (first, row)
+    return [
+        {'periodStart': start.isoformat(), 'viewDelta': last.view_count - first.view_count}
+        for start, (first, last) in sorted(periods.items())
+    ]
+
+def benchmark_rollups(channels=10000, years=3, iterations=5, sample_channels=50):
+    """
+    量測週/月彙總的回填、每日增量更新與成長曲線查詢
+    
+    每日快照寫入暫存的SQLite檔案。回填以rebuild()計算全部期間；
+    增量更新量測快照器每天對所有頻道呼叫update()的成本；
+    查詢則比較由彙總表讀取一年的週成長曲線與直接掃描每日快照。
+    
+    Args:
+        channels: 頻道數量
+        years: 每個頻道的每日快照年數
+        iterations: 增量更新與查詢的計時次數
+        sample_channels: 查詢時輪流使用的頻道數量
+        
+    Returns:
+        dict: 資料量、回填秒數、增量更新與查詢的中位數耗時
+    """
+    app, workdir = file_backed_app('rollup-bench-')
+    from src.models.user import db
+    from src.models.channel import ChannelStatisticsRollup
+    from src.services.rollup_service import rollup_engine, get_rollups, summarize_growth
+    
+    days = years * 365
+    channel_ids = [f'UCrollup{i:06d}' for i in range(channels)]
+    first_day = date(2015, 1, 1)  # 與_seed_rows的起始日相同
+    last_day = first_day + timedelta(days=days - 1)
+    results = {'channels': channels, 'days': days, 'historyRows': channels * days, 'iterations': iterations}
+    
+    with app.app_context():
+        started = time.perf_counter()
+        seed_rows('statistics', channels * days, channel_ids)
+        results['seedSeconds'] = round(time.perf_counter() - started, 2)
+        
+        started = time.perf_counter()
+        results['rollupRows'] = rollup_engine.rebuild(first_day, last_day, channel_ids=channel_ids)
+        results['rebuildSeconds'] = round(time.perf_counter() - started, 2)
+        
+        # 快照器每天寫入當日快照後，為所有頻道重新計算本週與本月
+        _, elapsed_ms = timed(lambda: rollup_engine.update(channel_ids, last_day), iterations)
+        results['dailyUpdate'] = {
+            'ms': elapsed_ms,
+            'channelsPerSecond': round(channels / (elapsed_ms / 1000), 1) if elapsed_ms else None
+        }
+        
+        range_start = last_day - timedelta(days=364)
+        samples = iter(channel_ids[i % min(sample_channels, channels)] for i in range(iterations * 2))
+        queries = {
+            'rollupTable': lambda: summarize_growth(get_rollups(next(samples), 'week', start_date=range_start, end_date=last_day)),
+            'dailyScan': lambda: _daily_growth(next(samples), 'week', range_start, last_day)
+        }
+        results['yearOfWeeks'] = {}
+        for name, query in queries.items():
+            _, elapsed_ms = timed(query, iterations)
+            results['yearOfWeeks'][name] = elapsed_ms
+        results['rollupTableRows'] = db.session.query(ChannelStatisticsRollup.id).count()
+    
+    results['workdir'] = workdir
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('rollups', help='量測週/月彙總的回填、每日更新與成長曲線查詢')
+    parser.add_argument('--channels', type=int, default=10000, help='頻道數量')
+    parser.add_argument('--years', type=int, default=3, help='每個頻道的每日快照年數')
+    parser.add_argument('--iterations', type=int, default=5, help='計時次數')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_rollups(channels=args.channels, years=args.years, iterations=args.iterations))
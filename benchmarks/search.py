@@ -0,0 +1,149 @@
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from benchmarks.common import percentile, file_backed_app
+from benchmarks.transport import ReplayTransport
+
+def _synthetic_vocabulary(size, seed=0):
+    """產生由音節組成的測試詞彙（依Zipf分佈抽樣時前面的詞較常出現）"""
+    import random
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice('bcdfghklmnprstvz') + rng.choice('aeiou') for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+def _seed_search_corpus(channels, videos, vocabulary, chunk_size=10000, seed=0):
+    """以批次INSERT寫入隨機標題與描述的頻道與影片（由觸發器維護全文索引）"""
+    import random
+    from sqlalchemy import insert
+    from src.models.user import db
+    from src.models.channel import Channel, Video
+    
+    rng = random.Random(seed)
+    weights = [1.0 / rank for rank in range(1, len(vocabulary) + 1)]
+    
+    def phrase(low, high):
+        return ' '.join(rng.choices(vocabulary, weights=weights, k=rng.randint(low, high)))
+    
+    channel_ids = [f'UCsearch{i:06d}' for i in range(channels)]
+    db.session.execute(insert(Channel), [
+        {
+            'channel_id': channel_id,
+            'title': phrase(2, 4),
+            'description': phrase(10, 30),
+            'custom_url': '@' + rng.choice(vocabulary)
+        }
+        for channel_id in channel_ids
+    ])
+    
+    chunk = []
+    for index in range(videos):
+        chunk.append({
+            'video_id': f'vsearch{index:09d}',
+            'channel_id': channel_ids[index % channels],
+            'title': phrase(4, 8),
+            'description': phrase(15, 40),
+            'published_at': datetime(2020, 1, 1) + timedelta(minutes=index)
+        })
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert(Video), chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert(Video), chunk)
+    db.session.commit()
+
+def benchmark_search(videos=1000000, channels=5000, queries=200, vocabulary_size=5000, max_results=10):
+    """
+    量測本地全文搜尋的延遲、索引大小與節省的search.list配額
+    
+    以暫存SQLite檔案寫入隨機詞彙組成的頻道與影片（寫入時由觸發器同步索引），
+    再以常見詞、罕見詞與不存在的詞組成查詢；頻道搜尋以ReplayTransport攔截
+    上游呼叫，比較全部呼叫search.list與先查本地索引的配額用量。
+    
+    Args:
+        videos: 影片數量
+        channels: 頻道數量
+        queries: 查詢數量
+        vocabulary_size: 詞彙數量
+        max_results: 每次搜尋的最大結果數量
+        
+    Returns:
+        dict: 寫入耗時、索引大小、本地搜尋延遲百分位數與配額用量
+    """
+    import random
+    app, workdir = file_backed_app('search-bench-')
+    from src.services.quota_service import QUOTA_COSTS
+    from src.services.youtube_service import YouTubeService
+    from src.services.search_service import search_local, search_channels, index_size_bytes
+    
+    vocabulary = _synthetic_vocabulary(vocabulary_size)
+    rng = random.Random(1)
+    # 常見詞、罕見詞、雙詞與不存在的詞（必定回退到search.list）
+    query_pool = []
+    for index in range(queries):
+        kind = index % 4
+        if kind == 0:
+            query_pool.append(rng.choice(vocabulary[:50]))
+        elif kind == 1:
+            query_pool.append(rng.choice(vocabulary[len(vocabulary) // 2:]))
+        elif kind == 2:
+            query_pool.append(' '.join(rng.sample(vocabulary[:200], 2)))
+        else:
+            query_pool.append(f'zzq{index}')
+    
+    results = {'videos': videos, 'channels': channels, 'queries': queries, 'maxResults': max_results}
+    transport = ReplayTransport()
+    
+    with transport.installed(), app.app_context():
+        started = time.perf_counter()
+        _seed_search_corpus(channels, videos, vocabulary)
+        results['seedSeconds'] = round(time.perf_counter() - started, 2)
+        results['indexBytes'] = index_size_bytes()
+        results['databaseBytes'] = os.path.getsize(os.path.join(workdir, 'bench.db'))
+        
+        results['latencyMs'] = {}
+        for table in ('channels', 'videos'):
+            samples = []
+            hits = 0
+            for query in query_pool:
+                started = time.perf_counter()
+                hits += bool(search_local(table, query, max_results))
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            results['latencyMs'][table] = {
+                'p50': round(percentile(samples, 50), 3),
+                'p95': round(percentile(samples, 95), 3),
+                'max': round(samples[-1], 3),
+                'queriesWithResults': hits
+            }
+        
+        service = YouTubeService(cache=None, quota=None)
+        sources = Counter()
+        before = transport.snapshot()
+        for query in query_pool:
+            _, source = search_channels(query, max_results, youtube_service=service)
+            sources[source] += 1
+        calls = transport.snapshot() - before
+    
+    search_calls = calls['search']
+    baseline_units = queries * QUOTA_COSTS['search.list']
+    used_units = search_calls * QUOTA_COSTS['search.list']
+    results['quota'] = {
+        'sources': dict(sources),
+        'searchListCalls': search_calls,
+        'unitsWithoutIndex': baseline_units,
+        'unitsWithIndex': used_units,
+        'unitsSaved': baseline_units - used_units,
+        'savedPercent': round((baseline_units - used_units) / baseline_units * 100, 1) if baseline_units else 0
+    }
+    return results
+
+def register(subparsers):
+    parser = subparsers.add_parser('search', help='量測本地全文搜尋的延遲、索引大小與節省的配額')
+    parser.add_argument('--videos', type=int, default=1000000, help='影片數量')
+    parser.add_argument('--channels', type=int, default=5000, help='頻道數量')
+    parser.add_argument('--queries', type=int, default=200, help='查詢數量')
+    parser.add_argument('--output', help='結果JSON的輸出路徑')
+    parser.set_defaults(run=lambda args: benchmark_search(videos=args.videos, channels=args.channels, queries=args.queries))
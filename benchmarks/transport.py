@@ -0,0 +1,195 @@
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, parse_qsl, urlencode
+
+# 本機測試伺服器模擬的上游延遲（秒）
+DEFAULT_STUB_LATENCY = 0.02
+
+# 回放時每次上游呼叫模擬的延遲（秒），0表示只量測本地處理成本
+DEFAULT_REPLAY_LATENCY = 0.0
+
+def _stub_channel(channel_id):
+    """產生測試用的頻道資源"""
+    return {
+        'kind': 'youtube#channel',
+        'id': channel_id,
+        'snippet': {'title': f'Channel {channel_id}', 'publishedAt': '2020-01-01T00:00:00Z'},
+        'statistics': {'viewCount': '1000000', 'subscriberCount': '10000', 'videoCount': '100'},
+        'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + channel_id[2:]}}
+    }
+
+def _stub_video(video_id):
+    """產生測試用的影片資源"""
+    return {
+        'kind': 'youtube#video',
+        'id': video_id,
+        'snippet': {'title': f'Video {video_id}', 'publishedAt': '2024-01-01T00:00:00Z'},
+        'statistics': {'viewCount': str(sum(map(ord, video_id)) * 100), 'likeCount': '50', 'commentCount': '5'},
+        'contentDetails': {'duration': 'PT4M13S'}
+    }
+
+def _stub_response(path, params):
+    """依請求路徑產生測試響應"""
+    resource = path.rstrip('/').rsplit('/', 1)[-1]
+    ids = params.get('id', [''])[0].split(',') if params.get('id') else []
+    
+    if resource == 'search':
+        count = int(params.get('maxResults', ['10'])[0])
+        return {'items': [{'id': {'channelId': f'UCstub{i:04d}'}} for i in range(count)]}
+    if resource == 'channels':
+        return {'etag': 'stub-etag', 'items': [_stub_channel(channel_id) for channel_id in ids]}
+    if resource == 'videos':
+        return {'etag': 'stub-etag', 'items': [_stub_video(video_id) for video_id in ids]}
+    if resource == 'playlistItems':
+        playlist_id = params['playlistId'][0]
+        page = int(params.get('pageToken', ['0'])[0])
+        items = [
+            {'contentDetails': {'videoId': f'{playlist_id}-{page}-{i}', 'videoPublishedAt': '2024-01-01T00:00:00Z'}}
+            for i in range(50)
+        ]
+        response = {'items': items}
+        if page < 3:
+            response['nextPageToken'] = str(page + 1)
+        return response
+    if resource == 'reports':
+        dimension = params.get('dimensions', ['day'])[0]
+        return {
+            'columnHeaders': [{'name': dimension}, {'name': 'views'}, {'name': 'estimatedMinutesWatched'}],
+            'rows': [[f'{dimension}-{i}', 100 * i, 250 * i] for i in range(10)]
+        }
+    return None
+
+class StubYouTubeHandler(BaseHTTPRequestHandler):
+    """模擬YouTube Data API與Analytics API的本機HTTP伺服器"""
+    
+    protocol_version = 'HTTP/1.1'
+    latency = DEFAULT_STUB_LATENCY
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        payload = _stub_response(url.path, parse_qs(url.query))
+        time.sleep(self.latency)
+        
+        status = 200 if payload is not None else 404
+        body = json.dumps(payload if payload is not None else {'error': {'message': 'not found'}}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    """可同時處理大量連線的測試伺服器"""
+    
+    daemon_threads = True
+    request_queue_size = 512
+
+def start_stub_server(latency=DEFAULT_STUB_LATENCY):
+    """
+    在背景執行緒啟動本機測試伺服器
+    
+    Args:
+        latency: 每個請求模擬的上游延遲（秒）
+        
+    Returns:
+        tuple: (伺服器, API根網址覆寫設定)
+    """
+    handler = type('Handler', (StubYouTubeHandler,), {'latency': latency})
+    server = StubServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, name='stub-server', daemon=True).start()
+    
+    root = f'http://127.0.0.1:{server.server_address[1]}'
+    return server, {'youtube': f'{root}/youtube/v3', 'youtubeAnalytics': f'{root}/v2'}
+
+def fixture_key(uri):
+    """
+    將上游請求網址正規化為固定鍵（去除API金鑰並排序參數）
+    
+    Args:
+        uri: 請求網址
+        
+    Returns:
+        str: 例如 channels?id=UC...&part=statistics
+    """
+    url = urlsplit(uri)
+    params = sorted((key, value) for key, value in parse_qsl(url.query, keep_blank_values=True) if key not in ('key', 'alt', 'prettyPrint'))
+    resource = url.path.rstrip('/').rsplit('/', 1)[-1]
+    return f'{resource}?{urlencode(params)}' if params else resource
+
+class ReplayTransport:
+    """取代httplib2的假傳輸層，以錄製的fixture回放YouTube/Analytics響應
+    
+    googleapiclient與google-auth-httplib2最終都呼叫httplib2.Http.request，
+    因此在類別層級替換即可攔截所有客戶端的上游呼叫。
+    有錄製的fixture時原樣回放，否則以測試伺服器相同的規則合成響應。
+    批次HTTP請求（multipart）不在回放範圍內。
+    """
+    
+    def __init__(self, fixtures=None, latency=DEFAULT_REPLAY_LATENCY, record=False):
+        """
+        Args:
+            fixtures: {fixture_key: 響應} 錄製的響應
+            latency: 每次上游呼叫模擬的延遲（秒）
+            record: 為True時改為呼叫真實API並錄製響應
+        """
+        self.fixtures = fixtures or {}
+        self.latency = latency
+        self.record = record
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._original = None
+    
+    def request(self, http, uri, method='GET', body=None, headers=None, **kwargs):
+        """處理一次上游請求"""
+        import httplib2
+        
+        key = fixture_key(uri)
+        with self._lock:
+            self.calls[key.split('?', 1)[0]] += 1
+        
+        if self.record:
+            response, content = self._original(http, uri, method, body=body, headers=headers, **kwargs)
+            if response.status == 200:
+                with self._lock:
+                    self.fixtures[key] = json.loads(content)
+            return response, content
+        
+        url = urlsplit(uri)
+        payload = self.fixtures.get(key)
+        if payload is None:
+            payload = _stub_response(url.path, parse_qs(url.query))
+        if self.latency:
+            time.sleep(self.latency)
+        
+        status = 200 if payload is not None else 404
+        content = json.dumps(payload if payload is not None else {'error': {'message': 'not found'}}).encode('utf-8')
+        return httplib2.Response({'status': str(status), 'content-type': 'application/json'}), content
+    
+    @contextmanager
+    def installed(self):
+        """在區塊內以此傳輸層取代httplib2.Http.request"""
+        import httplib2
+        
+        transport = self
+        self._original = httplib2.Http.request
+        
+        def request(http, uri, method='GET', body=None, headers=None, **kwargs):
+            return transport.request(http, uri, method, body=body, headers=headers, **kwargs)
+        
+        httplib2.Http.request = request
+        try:
+            yield self
+        finally:
+            httplib2.Http.request = self._original
+    
+    def snapshot(self):
+        """獲取目前各資源的呼叫次數"""
+        with self._lock:
+            return Counter(self.calls)
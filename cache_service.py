@@ -0,0 +1,154 @@
+import time
+import threading
+from collections import OrderedDict
+from src.config import Config
+
+# 用於區分「未命中」與「緩存的值為None」
+MISSING = object()
+
+def make_cache_key(resource, scope, *parts):
+    """
+    建立正規化的緩存鍵
+    
+    字串參數會去除前後空白，None會被略過，確保同義的呼叫對應到同一個鍵。
+    
+    Args:
+        resource: 資源類型 (例如 channelBasicInfo)
+        scope: 數據範圍（公開數據為'public'，OAuth數據為各用戶的範圍）
+        *parts: 其他組成鍵的參數
+        
+    Returns:
+        tuple: 緩存鍵
+    """
+    normalized = []
+    for part in parts:
+        if part is None:
+            continue
+        if isinstance(part, str):
+            part = part.strip()
+        normalized.append(part)
+    return (resource, scope) + tuple(normalized)
+
+class TTLCache:
+    """具有存活時間（TTL）與LRU淘汰機制的記憶體緩存"""
+    
+    def __init__(self, max_entries=1024, default_ttl=300):
+        """
+        初始化緩存
+        
+        Args:
+            max_entries: 最大項目數量，超過時淘汰最久未使用的項目
+            default_ttl: 預設存活時間（秒）
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key):
+        """
+        讀取緩存項目
+        
+        Args:
+            key: 緩存鍵
+            
+        Returns:
+            object: 緩存的值，未命中或已過期時返回MISSING
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            
+            value, expires_at, etag, meta = entry
+            if expires_at <= time.monotonic():
+                # 帶有ETag的過期項目保留下來，供條件式請求重新驗證
+                if etag is None:
+                    del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def get_stale(self, key):
+        """
+        讀取緩存項目（包含已過期但帶有ETag的項目），不影響命中統計
+        
+        Args:
+            key: 緩存鍵
+            
+        Returns:
+            tuple: (值, ETag, 附加資訊)，不存在時返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, _, etag, meta = entry
+            return value, etag, meta
+    
+    def set(self, key, value, ttl=None, etag=None, meta=None):
+        """
+        寫入緩存項目
+        
+        Args:
+            key: 緩存鍵
+            value: 要緩存的值（應視為唯讀）
+            ttl: 存活時間（秒），未指定時使用預設值
+            etag: 上游響應的ETag，用於過期後的條件式請求
+            meta: 附加資訊（例如原始響應大小）
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl, etag, meta)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key):
+        """刪除緩存項目"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        """清除所有緩存項目與統計"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+    
+    def stats(self):
+        """
+        獲取緩存統計
+        
+        Returns:
+            dict: 命中、未命中、淘汰次數等統計
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxEntries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0
+            }
+
+# 全域YouTube API響應緩存
+response_cache = TTLCache(
+    max_entries=Config.CACHE_MAX_ENTRIES,
+    default_ttl=Config.CACHE_DEFAULT_TIMEOUT
+)
@@ -1,5 +1,6 @@
 from datetime import datetime
 from src.models.user import db
+from src.services.duration import parse_duration
 
 class Channel(db.Model):
     """YouTube頻道模型"""
@@ -19,6 +20,7 @@ class Channel(db.Model):
     subscriber_count = db.Column(db.BigInteger, default=0)
     video_count = db.Column(db.Integer, default=0)
     uploads_playlist_id = db.Column(db.String(255))
+    etag = db.Column(db.String(64))  # 單一頻道channels.list響應的ETag，用於條件式刷新
     last_updated = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -51,26 +53,31 @@ class Channel(db.Model):
     @classmethod
     def from_youtube_data(cls, youtube_data):
         """從YouTube API數據建立頻道物件"""
+        return cls(**cls.row_from_youtube_data(youtube_data))
+    
+    @staticmethod
+    def row_from_youtube_data(youtube_data):
+        """將YouTube API數據轉換為資料列字典（供批次寫入使用）"""
         snippet = youtube_data.get('snippet', {})
         statistics = youtube_data.get('statistics', {})
         content_details = youtube_data.get('contentDetails', {})
         thumbnails = snippet.get('thumbnails', {})
         
-        return cls(
-            channel_id=youtube_data.get('id'),
-            title=snippet.get('title'),
-            description=snippet.get('description'),
-            custom_url=snippet.get('customUrl'),
-            published_at=datetime.fromisoformat(snippet.get('publishedAt', '').replace('Z', '+00:00')) if snippet.get('publishedAt') else None,
-            thumbnail_default=thumbnails.get('default', {}).get('url'),
-            thumbnail_medium=thumbnails.get('medium', {}).get('url'),
-            thumbnail_high=thumbnails.get('high', {}).get('url'),
-            country=snippet.get('country'),
-            view_count=int(statistics.get('viewCount', 0)),
-            subscriber_count=int(statistics.get('subscriberCount', 0)),
-            video_count=int(statistics.get('videoCount', 0)),
-            uploads_playlist_id=content_details.get('relatedPlaylists', {}).get('uploads')
-        )
+        return {
+            'channel_id': youtube_data.get('id'),
+            'title': snippet.get('title'),
+            'description': snippet.get('description'),
+            'custom_url': snippet.get('customUrl'),
+            'published_at': datetime.fromisoformat(snippet.get('publishedAt', '').replace('Z', '+00:00')) if snippet.get('publishedAt') else None,
+            'thumbnail_default': thumbnails.get('default', {}).get('url'),
+            'thumbnail_medium': thumbnails.get('medium', {}).get('url'),
+            'thumbnail_high': thumbnails.get('high', {}).get('url'),
+            'country': snippet.get('country'),
+            'view_count': int(statistics.get('viewCount', 0)),
+            'subscriber_count': int(statistics.get('subscriberCount', 0)),
+            'video_count': int(statistics.get('videoCount', 0)),
+            'uploads_playlist_id': content_details.get('relatedPlaylists', {}).get('uploads')
+        }
 
 class ChannelStatisticsHistory(db.Model):
     """頻道統計歷史記錄模型"""
@@ -101,6 +108,56 @@ class ChannelStatisticsHistory(db.Model):
             'createdAt': self.created_at.isoformat()
         }
 
+class ChannelStatisticsRollup(db.Model):
+    """頻道統計週/月彙總模型"""
+    __tablename__ = 'channel_statistics_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    channel_id = db.Column(db.String(255), nullable=False, index=True)
+    period = db.Column(db.String(10), nullable=False)  # 'week', 'month'
+    period_start = db.Column(db.Date, nullable=False)
+    period_end = db.Column(db.Date, nullable=False)
+    days = db.Column(db.Integer, default=0)  # 期間內的每日快照數
+    start_view_count = db.Column(db.BigInteger, default=0)
+    end_view_count = db.Column(db.BigInteger, default=0)
+    start_subscriber_count = db.Column(db.BigInteger, default=0)
+    end_subscriber_count = db.Column(db.BigInteger, default=0)
+    end_video_count = db.Column(db.Integer, default=0)
+    view_delta = db.Column(db.BigInteger, default=0)
+    subscriber_delta = db.Column(db.BigInteger, default=0)
+    video_delta = db.Column(db.Integer, default=0)
+    view_growth_rate = db.Column(db.Float)  # 百分比，起始值為0時為空
+    subscriber_growth_rate = db.Column(db.Float)
+    view_delta_moving_avg = db.Column(db.Float)
+    subscriber_delta_moving_avg = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('channel_id', 'period', 'period_start', name='_channel_period_uc'),
+        db.Index('idx_rollup_period_start', 'period', 'period_start')
+    )
+    
+    def to_dict(self):
+        """轉換為字典格式"""
+        return {
+            'channelId': self.channel_id,
+            'period': self.period,
+            'periodStart': self.period_start.isoformat(),
+            'periodEnd': self.period_end.isoformat(),
+            'days': self.days,
+            'viewCount': self.end_view_count,
+            'subscriberCount': self.end_subscriber_count,
+            'videoCount': self.end_video_count,
+            'viewDelta': self.view_delta,
+            'subscriberDelta': self.subscriber_delta,
+            'videoDelta': self.video_delta,
+            'viewGrowthRate': self.view_growth_rate,
+            'subscriberGrowthRate': self.subscriber_growth_rate,
+            'viewDeltaMovingAverage': self.view_delta_moving_avg,
+            'subscriberDeltaMovingAverage': self.subscriber_delta_moving_avg,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
+
 class AudienceDemographics(db.Model):
     """受眾輪廓模型"""
     __tablename__ = 'audience_demographics'
@@ -146,6 +203,7 @@ class Video(db.Model):
     description = db.Column(db.Text)
     published_at = db.Column(db.DateTime, index=True)
     duration = db.Column(db.String(20))  # ISO 8601 duration format
+    duration_seconds = db.Column(db.Integer, index=True)  # 由duration解析的秒數，供長度篩選使用索引
     thumbnail_default = db.Column(db.Text)
     thumbnail_medium = db.Column(db.Text)
     thumbnail_high = db.Column(db.Text)
@@ -153,9 +211,14 @@ class Video(db.Model):
     like_count = db.Column(db.Integer, default=0)
     comment_count = db.Column(db.Integer, default=0)
     engagement_rate = db.Column(db.Numeric(5, 2), default=0)
+    etag = db.Column(db.String(64))  # 單一影片videos.list響應的ETag，用於條件式刷新
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_videos_channel_duration', 'channel_id', 'duration_seconds'),
+    )
+    
     def to_dict(self):
         """轉換為字典格式"""
         return {
@@ -165,6 +228,7 @@ class Video(db.Model):
             'description': self.description,
             'publishedAt': self.published_at.isoformat() if self.published_at else None,
             'duration': self.duration,
+            'durationSeconds': self.duration_seconds,
             'thumbnails': {
                 'default': self.thumbnail_default,
                 'medium': self.thumbnail_medium,
@@ -183,6 +247,11 @@ class Video(db.Model):
     @classmethod
     def from_youtube_data(cls, youtube_data, channel_id):
         """從YouTube API數據建立影片物件"""
+        return cls(**cls.row_from_youtube_data(youtube_data, channel_id))
+    
+    @staticmethod
+    def row_from_youtube_data(youtube_data, channel_id):
+        """將YouTube API數據轉換為資料列字典（供批次寫入使用）"""
         snippet = youtube_data.get('snippet', {})
         statistics = youtube_data.get('statistics', {})
         content_details = youtube_data.get('contentDetails', {})
@@ -197,19 +266,20 @@ class Video(db.Model):
         if view_count > 0:
             engagement_rate = ((like_count + comment_count) / view_count) * 100
         
-        return cls(
-            video_id=youtube_data.get('id'),
-            channel_id=channel_id,
-            title=snippet.get('title'),
-            description=snippet.get('description'),
-            published_at=datetime.fromisoformat(snippet.get('publishedAt', '').replace('Z', '+00:00')) if snippet.get('publishedAt') else None,
-            duration=content_details.get('duration'),
-            thumbnail_default=thumbnails.get('default', {}).get('url'),
-            thumbnail_medium=thumbnails.get('medium', {}).get('url'),
-            thumbnail_high=thumbnails.get('high', {}).get('url'),
-            view_count=view_count,
-            like_count=like_count,
-            comment_count=comment_count,
-            engagement_rate=engagement_rate
-        )
+        return {
+            'video_id': youtube_data.get('id'),
+            'channel_id': channel_id,
+            'title': snippet.get('title'),
+            'description': snippet.get('description'),
+            'published_at': datetime.fromisoformat(snippet.get('publishedAt', '').replace('Z', '+00:00')) if snippet.get('publishedAt') else None,
+            'duration': content_details.get('duration'),
+            'duration_seconds': parse_duration(content_details.get('duration')),
+            'thumbnail_default': thumbnails.get('default', {}).get('url'),
+            'thumbnail_medium': thumbnails.get('medium', {}).get('url'),
+            'thumbnail_high': thumbnails.get('high', {}).get('url'),
+            'view_count': view_count,
+            'like_count': like_count,
+            'comment_count': comment_count,
+            'engagement_rate': engagement_rate
+        }
 
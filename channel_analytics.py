@@ -0,0 +1,496 @@
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from src.services.youtube_service import YouTubeService, parse_max_scan
+from src.services.compare_service import ChannelCompareEngine, max_upstream_calls
+from src.services.rollup_service import get_rollups, summarize_growth
+from src.services.freshness_service import channel_reader, video_reader
+from src.services.export_service import ExportQuery
+from src.services.columnar_service import columnar_store, engagement_by_month, view_percentiles, SnapshotUnavailableError
+from src.services.insights_service import load_channel_videos, channel_insights
+from src.services.duration import SHORTS_MAX_SECONDS, LONG_FORM_MIN_SECONDS
+from src.services.quota_service import QuotaExceededError
+from src.models.channel import Video
+from src.config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 影片長度分類對應的秒數範圍 (下限, 上限)，皆包含邊界
+DURATION_TYPES = {
+    'shorts': (None, SHORTS_MAX_SECONDS),
+    'long': (LONG_FORM_MIN_SECONDS, None)
+}
+
+# 已儲存影片列表的排序方式
+STORED_VIDEO_ORDERS = {
+    'date': Video.published_at.desc(),
+    'viewCount': Video.view_count.desc(),
+    'duration': Video.duration_seconds.desc()
+}
+
+channel_analytics_bp = Blueprint('channel_analytics', __name__)
+
+@channel_analytics_bp.route('/compare', methods=['POST'])
+def compare_channels():
+    """比較多個頻道的統計數據"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        channel_ids = payload.get('channelIds') or []
+        
+        if not channel_ids or not isinstance(channel_ids, list):
+            return jsonify({
+                'success': False,
+                'error': {
+                    'code': 'MISSING_PARAMETERS',
+                    'message': '請提供要比較的頻道ID列表'
+                }
+            }), 400
+        
+        if len(set(channel_ids)) > Config.MAX_CHANNELS_COMPARE:
+            return jsonify({
+                'success': False,
+                'error': {
+                    'code': 'TOO_MANY_CHANNELS',
+                    'message': f'最多只能比較{Config.MAX_CHANNELS_COMPARE}個頻道'
+                }
+            }), 400
+        
+        engine = ChannelCompareEngine(YouTubeService())
+        comparison = engine.compare(
+            channel_ids,
+            metrics=payload.get('metrics'),
+            start_date=payload.get('startDate'),
+            end_date=payload.get('endDate')
+        )
+        
+        # channels.list沒有返回的ID（拼字錯誤或已刪除的頻道）明確列出，而不是默默略過
+        resolved = {entry['channelId'] for entry in comparison}
+        not_found = [channel_id for channel_id in dict.fromkeys(channel_ids) if channel_id not in resolved]
+        if not comparison:
+            return jsonify({
+                'success': False,
+                'error': {
+                    'code': 'NOT_FOUND',
+                    'message': '找不到指定的頻道',
+                    'notFound': not_found
+                }
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'comparison': comparison,
+                'notFound': not_found,
+                'period': {
+                    'startDate': payload.get('startDate'),
+                    'endDate': payload.get('endDate')
+                },
+                'maxUpstreamCalls': max_upstream_calls(
+                    len(set(channel_ids)), engine.max_videos_per_channel, engine.max_pages(payload.get('endDate'))
+                )
+            }
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': str(e)
+            }
+        }), 400
+    except QuotaExceededError:
+        # 交由應用程式的錯誤處理返回429
+        raise
+    except Exception as e:
+        logger.error(f"比較頻道失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'COMPARE_ERROR',
+                'message': '比較頻道時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+def _fresh_response(data, freshness, not_found_message):
+    """以新鮮度資訊包裝資料表讀取的結果"""
+    if data is None:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'NOT_FOUND',
+                'message': not_found_message
+            }
+        }), 404
+    
+    response = jsonify({
+        'success': True,
+        'data': data,
+        'freshness': freshness
+    })
+    if freshness.get('ageSeconds') is not None:
+        response.headers['Age'] = str(int(freshness['ageSeconds']))
+    return response
+
+@channel_analytics_bp.route('/<channel_id>/profile', methods=['GET'])
+def get_channel_profile(channel_id):
+    """從頻道資料表讀取頻道資訊（stale-while-revalidate）"""
+    try:
+        data, freshness = channel_reader.get(channel_id)
+        return _fresh_response(data, freshness, '找不到指定的頻道')
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"獲取頻道資訊失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'CHANNEL_ERROR',
+                'message': '獲取頻道資訊時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+@channel_analytics_bp.route('/videos/<video_id>', methods=['GET'])
+def get_video(video_id):
+    """從影片資料表讀取影片資訊（stale-while-revalidate）"""
+    try:
+        data, freshness = video_reader.get(video_id)
+        return _fresh_response(data, freshness, '找不到指定的影片')
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"獲取影片資訊失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'VIDEO_ERROR',
+                'message': '獲取影片資訊時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+def _video_summary(item):
+    """將videos.list的影片項目轉換為API響應格式"""
+    row = Video.row_from_youtube_data(item, item.get('snippet', {}).get('channelId'))
+    return {
+        'videoId': row['video_id'],
+        'title': row['title'],
+        'description': row['description'],
+        'publishedAt': item.get('snippet', {}).get('publishedAt'),
+        'thumbnails': {
+            'default': row['thumbnail_default'],
+            'medium': row['thumbnail_medium'],
+            'high': row['thumbnail_high']
+        },
+        'statistics': {
+            'viewCount': row['view_count'],
+            'likeCount': row['like_count'],
+            'commentCount': row['comment_count']
+        },
+        'duration': row['duration'],
+        'durationSeconds': row['duration_seconds'],
+        'engagementRate': round(row['engagement_rate'], 2)
+    }
+
+@channel_analytics_bp.route('/<channel_id>/videos', methods=['GET'])
+def get_channel_videos(channel_id):
+    """
+    獲取頻道的熱門或最新影片
+    
+    order=viewCount時預設只掃描最新VIDEO_SCAN_LIMIT部上傳影片；maxScan=all掃描全部上傳影片以取得真正的前N名。
+    掃描達到上限時響應的truncated為True。
+    """
+    try:
+        max_results = min(request.args.get('maxResults', 10, type=int), 50)
+        order = request.args.get('order', 'viewCount')
+        max_scan = parse_max_scan(request.args.get('maxScan'))
+        if max_results <= 0:
+            raise ValueError("maxResults必須大於0")
+        
+        result = YouTubeService().get_channel_videos_scan(channel_id, max_results, order, max_scan)
+        data = {
+            'channelId': channel_id,
+            'videos': [_video_summary(item) for item in result['videos']],
+            'totalResults': len(result['videos'])
+        }
+        if result['scan'] is not None:
+            data['scanned'] = result['scan']['scanned']
+            data['scanLimit'] = result['scan']['limit']
+            data['truncated'] = result['scan']['truncated']
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': str(e)
+            }
+        }), 400
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"獲取頻道影片失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'VIDEOS_ERROR',
+                'message': '獲取頻道影片時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+@channel_analytics_bp.route('/<channel_id>/insights', methods=['GET'])
+def get_channel_insights(channel_id):
+    """以頻道已儲存的全部影片計算互動、觀看、上傳頻率與影片長度洞察"""
+    try:
+        videos = load_channel_videos(channel_id)
+        if videos is None:
+            return jsonify({
+                'success': False,
+                'error': {
+                    'code': 'NO_VIDEOS',
+                    'message': '此頻道尚無已儲存的影片，請先建立crawl_uploads工作'
+                }
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'channelId': channel_id,
+                **channel_insights(videos)
+            }
+        })
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"計算頻道洞察失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INSIGHTS_ERROR',
+                'message': '計算頻道洞察時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+@channel_analytics_bp.route('/<channel_id>/stored-videos', methods=['GET'])
+def list_stored_videos(channel_id):
+    """從資料表列出頻道已儲存的影片，可依影片長度範圍（秒）或分類篩選"""
+    try:
+        min_duration = request.args.get('minDuration', type=int)
+        max_duration = request.args.get('maxDuration', type=int)
+        duration_type = request.args.get('durationType')
+        order = request.args.get('order', 'date')
+        max_results = min(request.args.get('maxResults', 50, type=int), 200)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        
+        if duration_type:
+            if duration_type not in DURATION_TYPES:
+                raise ValueError(f"不支援的影片長度分類: {duration_type}")
+            type_min, type_max = DURATION_TYPES[duration_type]
+            if type_min is not None:
+                min_duration = type_min if min_duration is None else max(min_duration, type_min)
+            if type_max is not None:
+                max_duration = type_max if max_duration is None else min(max_duration, type_max)
+        if min_duration is not None and max_duration is not None and min_duration > max_duration:
+            raise ValueError("影片長度下限不能大於上限")
+        if order not in STORED_VIDEO_ORDERS:
+            raise ValueError(f"不支援的排序方式: {order}")
+        
+        # 以duration_seconds的索引篩選，不需在Python中解析長度字串
+        query = Video.query.filter(Video.channel_id == channel_id)
+        if min_duration is not None:
+            query = query.filter(Video.duration_seconds >= min_duration)
+        if max_duration is not None:
+            query = query.filter(Video.duration_seconds <= max_duration)
+        
+        videos = query.order_by(STORED_VIDEO_ORDERS[order], Video.id).offset(offset).limit(max_results + 1).all()
+        has_more = len(videos) > max_results
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'channelId': channel_id,
+                'filters': {
+                    'minDuration': min_duration,
+                    'maxDuration': max_duration,
+                    'order': order
+                },
+                'videos': [video.to_dict() for video in videos[:max_results]],
+                'nextOffset': offset + max_results if has_more else None
+            }
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': str(e)
+            }
+        }), 400
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"列出已儲存影片失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'VIDEOS_ERROR',
+                'message': '列出已儲存影片時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+@channel_analytics_bp.route('/<channel_id>/growth', methods=['GET'])
+def get_channel_growth(channel_id):
+    """從週/月彙總表獲取頻道的成長曲線"""
+    try:
+        period = request.args.get('period', 'week')
+        start_date = request.args.get('startDate')
+        end_date = request.args.get('endDate')
+        
+        rollups = get_rollups(channel_id, period, start_date=start_date, end_date=end_date)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'channelId': channel_id,
+                'period': {
+                    'type': period,
+                    'startDate': start_date,
+                    'endDate': end_date
+                },
+                'rollups': rollups,
+                'growthRate': summarize_growth(rollups)
+            }
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': str(e)
+            }
+        }), 400
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"獲取頻道成長曲線失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'GROWTH_ERROR',
+                'message': '獲取頻道成長曲線時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+@channel_analytics_bp.route('/export/<dataset>', methods=['GET'])
+def export_dataset(dataset):
+    """以NDJSON或CSV串流匯出影片或頻道統計歷史（videos, statistics）"""
+    try:
+        query = ExportQuery(
+            dataset,
+            request.args.get('channelIds', '').split(','),
+            start_date=request.args.get('startDate'),
+            end_date=request.args.get('endDate'),
+            output_format=request.args.get('format', 'ndjson')
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': str(e)
+            }
+        }), 400
+    
+    response = Response(stream_with_context(query.stream()), mimetype=query.mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={query.filename}'
+    return response
+
+def _channel_ids_arg():
+    """解析以逗號分隔的channelIds參數（未提供時返回None）"""
+    channel_ids = [channel_id for channel_id in request.args.get('channelIds', '').split(',') if channel_id]
+    return channel_ids or None
+
+def _snapshot_unavailable(e):
+    return jsonify({
+        'success': False,
+        'error': {
+            'code': 'SNAPSHOT_UNAVAILABLE',
+            'message': str(e)
+        }
+    }), 503
+
+@channel_analytics_bp.route('/analytics/engagement-by-month', methods=['GET'])
+def get_engagement_by_month():
+    """從影片欄位快照依發布月份彙總觀看與互動"""
+    try:
+        table = columnar_store.require('videos')
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'months': engagement_by_month(table, _channel_ids_arg()),
+                'snapshot': table.info()
+            }
+        })
+    except SnapshotUnavailableError as e:
+        return _snapshot_unavailable(e)
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"彙總每月互動數據失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'ANALYTICS_ERROR',
+                'message': '彙總每月互動數據時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+@channel_analytics_bp.route('/analytics/view-percentiles', methods=['GET'])
+def get_view_percentiles():
+    """從影片欄位快照計算每個頻道的觀看次數百分位數"""
+    try:
+        percentiles = tuple(float(value) for value in request.args.get('percentiles', '50,90,99').split(','))
+        if any(value < 0 or value > 100 for value in percentiles):
+            raise ValueError("百分位數必須介於0到100之間")
+        
+        table = columnar_store.require('videos')
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'channels': view_percentiles(table, _channel_ids_arg(), percentiles),
+                'snapshot': table.info()
+            }
+        })
+    except SnapshotUnavailableError as e:
+        return _snapshot_unavailable(e)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': str(e)
+            }
+        }), 400
+    except QuotaExceededError:
+        raise
+    except Exception as e:
+        logger.error(f"計算觀看次數百分位數失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'ANALYTICS_ERROR',
+                'message': '計算觀看次數百分位數時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
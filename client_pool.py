@@ -0,0 +1,99 @@
+import json
+import threading
+import logging
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+logger = logging.getLogger(__name__)
+
+class DiscoveryClientPool:
+    """Google API客戶端池
+    
+    每個API服務的探索文件（discovery document）在每個process中只解析一次，
+    之後依憑證產生輕量的客戶端。httplib2連線不是執行緒安全的，
+    因此API金鑰客戶端以執行緒為單位快取重用。
+    
+    OAuth客戶端不在池中重用：每個請求帶著各自用戶的憑證，仍會以已解析的
+    探索文件呼叫build_from_document建立資源樹，只省下探索文件的讀取與解析
+    （成本見 python -m benchmarks clients）。
+    """
+    
+    def __init__(self):
+        self._documents = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def get_document(self, service_name, version):
+        """
+        獲取已解析的探索文件
+        
+        優先使用google-api-python-client內建的靜態探索文件，
+        找不到時才透過網路下載一次。
+        
+        Args:
+            service_name: API服務名稱 (例如 youtube)
+            version: API版本 (例如 v3)
+            
+        Returns:
+            dict: 探索文件
+        """
+        key = (service_name, version)
+        document = self._documents.get(key)
+        if document is not None:
+            return document
+        
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                content = get_static_doc(service_name, version)
+                if content:
+                    document = json.loads(content)
+                else:
+                    logger.warning(f"找不到內建的探索文件 {service_name} {version}，改為線上下載")
+                    document = build(service_name, version, static_discovery=False)._rootDesc
+                self._documents[key] = document
+        
+        return document
+    
+    def get_client(self, service_name, version, api_key=None, credentials=None):
+        """
+        獲取API客戶端
+        
+        Args:
+            service_name: API服務名稱
+            version: API版本
+            api_key: API金鑰（用於公開數據）
+            credentials: OAuth2認證憑證（用於私人數據）
+            
+        Returns:
+            Resource: API客戶端
+        """
+        document = self.get_document(service_name, version)
+        
+        if credentials:
+            # 每個OAuth憑證屬於單一用戶，不跨請求重用；以已解析的文件建立新的客戶端
+            return build_from_document(document, credentials=credentials)
+        
+        if not api_key:
+            raise ValueError("需要提供API金鑰或OAuth2認證憑證")
+        
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        
+        key = (service_name, version, api_key)
+        client = clients.get(key)
+        if client is None:
+            client = build_from_document(document, developerKey=api_key)
+            clients[key] = client
+        
+        return client
+    
+    def clear(self):
+        """清除已快取的探索文件（目前執行緒的客戶端也會一併清除）"""
+        with self._lock:
+            self._documents.clear()
+        self._local.clients = {}
+
+# 全域客戶端池
+client_pool = DiscoveryClientPool()
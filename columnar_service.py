@@ -0,0 +1,511 @@
+import os
+import json
+import shutil
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import func, select
+from src.models.user import db
+from src.models.channel import Video, ChannelStatisticsHistory
+from src.config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows沒有fcntl，只能在單一程序內協調刷新
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 欄位快照定義：(模型, 增量刷新的水位欄位檔名, [(欄位檔名, 模型欄位, dtype)])
+# dtype為'channel'時以字典編碼（int32代碼 + 頻道ID列表）儲存
+COLUMNAR_TABLES = {
+    'videos': (
+        Video, 'last_updated', [
+            ('id', Video.id, 'int64'),
+            ('channel', Video.channel_id, 'channel'),
+            ('published_at', Video.published_at, 'datetime64[s]'),
+            ('view_count', Video.view_count, 'int64'),
+            ('like_count', Video.like_count, 'int64'),
+            ('comment_count', Video.comment_count, 'int64'),
+            ('engagement_rate', Video.engagement_rate, 'float64'),
+            ('last_updated', Video.last_updated, 'datetime64[s]')
+        ]
+    ),
+    # 每日快照只會新增，以自動遞增的id作為水位
+    'statistics': (
+        ChannelStatisticsHistory, 'id', [
+            ('id', ChannelStatisticsHistory.id, 'int64'),
+            ('channel', ChannelStatisticsHistory.channel_id, 'channel'),
+            ('date', ChannelStatisticsHistory.date, 'datetime64[D]'),
+            ('view_count', ChannelStatisticsHistory.view_count, 'int64'),
+            ('subscriber_count', ChannelStatisticsHistory.subscriber_count, 'int64'),
+            ('video_count', ChannelStatisticsHistory.video_count, 'int64')
+        ]
+    )
+}
+
+# 每個資料表保留的世代數量（讀取中的舊世代在下一次切換前不會被刪除）
+KEEP_GENERATIONS = 2
+
+# 以時間為水位時往前重疊讀取的範圍，涵蓋較晚提交但時間戳記較早的交易
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+class SnapshotUnavailableError(Exception):
+    """欄位快照尚未建立"""
+    pass
+
+def _to_array(values, dtype):
+    """將一批資料庫值轉換為NumPy陣列（整數欄位的空值視為0）"""
+    if dtype == 'int64':
+        return np.fromiter((value or 0 for value in values), dtype=np.int64, count=len(values))
+    if dtype == 'float64':
+        return np.fromiter((np.nan if value is None else float(value) for value in values), dtype=np.float64, count=len(values))
+    # 日期時間欄位的None會轉換為NaT
+    return np.array(values, dtype=dtype)
+
+class ColumnarTable:
+    """已載入的欄位快照，欄位以唯讀記憶體映射開啟"""
+    
+    def __init__(self, name, path, manifest):
+        self.name = name
+        self.path = path
+        self.generation = manifest['generation']
+        self.generated_at = manifest['generatedAt']
+        self.watermark = manifest['watermark']
+        self.rows = manifest['rows']
+        self.channels = manifest['channels']
+        self.channel_codes = {channel_id: code for code, channel_id in enumerate(self.channels)}
+        self.columns = {
+            column: np.load(os.path.join(path, f'{column}.npy'), mmap_mode='r')
+            for column in manifest['columns']
+        }
+    
+    def __getitem__(self, column):
+        return self.columns[column]
+    
+    def channel_mask(self, channel_ids=None):
+        """
+        獲取指定頻道的資料列遮罩
+        
+        Args:
+            channel_ids: 頻道ID列表（None表示全部）
+            
+        Returns:
+            numpy.ndarray: 布林遮罩，全部時返回None
+        """
+        if channel_ids is None:
+            return None
+        codes = [self.channel_codes[channel_id] for channel_id in channel_ids if channel_id in self.channel_codes]
+        if len(codes) == 1:
+            return self.columns['channel'] == codes[0]
+        return np.isin(self.columns['channel'], np.array(codes, dtype=np.int32))
+    
+    def info(self):
+        """快照的中繼資訊"""
+        return {
+            'generation': self.generation,
+            'generatedAt': self.generated_at,
+            'watermark': self.watermark,
+            'rows': self.rows
+        }
+
+class ColumnarStore:
+    """Video與ChannelStatisticsHistory的欄位快照
+    
+    每個欄位寫成一個.npy檔，channel_id以字典編碼為int32代碼，資料列依主鍵排序。
+    每次刷新寫入新的世代目錄後才以CURRENT檔切換，讀取端以mmap載入，
+    不複製資料也不會讀到寫一半的檔案。
+    刷新在資料表目錄的檔案鎖內進行，多個程序同時刷新時依序執行，後者以前者的世代為基礎增量刷新。
+    增量刷新只查詢水位之後的資料列，依主鍵覆蓋既有資料列或附加新資料列；
+    合併後的資料列數與資料庫不同時，再讀取主鍵移除已被刪除的資料列。
+    """
+    
+    def __init__(self, base_dir=None, chunk_size=None):
+        """
+        Args:
+            base_dir: 快照目錄
+            chunk_size: 每次從資料庫游標讀取的資料列數量
+        """
+        self.base_dir = base_dir or Config.COLUMNAR_DIR
+        self.chunk_size = chunk_size or Config.COLUMNAR_CHUNK_SIZE
+        self._loaded = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+    
+    def _table_dir(self, name):
+        return os.path.join(self.base_dir, name)
+    
+    @contextmanager
+    def _table_lock(self, name):
+        """持有資料表的刷新鎖（程序內的鎖加上跨程序的檔案鎖）"""
+        table_dir = self._table_dir(name)
+        os.makedirs(table_dir, exist_ok=True)
+        with self._refresh_lock, open(os.path.join(table_dir, '.refresh.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _current_generation(self, name):
+        try:
+            with open(os.path.join(self._table_dir(name), 'CURRENT'), 'r') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def load(self, name):
+        """
+        載入最新世代的欄位快照
+        
+        Args:
+            name: 'videos' 或 'statistics'
+            
+        Returns:
+            ColumnarTable: 欄位快照，尚未建立時返回None
+        """
+        generation = self._current_generation(name)
+        if generation is None:
+            return None
+        
+        with self._lock:
+            table = self._loaded.get(name)
+            if table is not None and table.generation == generation:
+                return table
+            
+            path = os.path.join(self._table_dir(name), generation)
+            with open(os.path.join(path, 'manifest.json'), 'r', encoding='utf-8') as f:
+                table = ColumnarTable(name, path, json.load(f))
+            self._loaded[name] = table
+            return table
+    
+    def require(self, name):
+        """載入欄位快照，尚未建立時拋出SnapshotUnavailableError"""
+        table = self.load(name)
+        if table is None:
+            raise SnapshotUnavailableError(f"{name}的欄位快照尚未建立，請先執行 flask refresh-columnar")
+        return table
+    
+    def run(self, full=False):
+        """
+        刷新所有欄位快照
+        
+        Args:
+            full: 是否忽略水位完整重建
+            
+        Returns:
+            dict: 各資料表的刷新結果
+        """
+        return {name: self.refresh(name, full=full) for name in COLUMNAR_TABLES}
+    
+    def refresh(self, name, full=False):
+        """
+        刷新單一資料表的欄位快照
+        
+        Args:
+            name: 'videos' 或 'statistics'
+            full: 是否忽略水位完整重建
+            
+        Returns:
+            dict: 讀取的資料列數、移除的資料列數、快照資料列數與耗時
+        """
+        with self._table_lock(name):
+            started = time.perf_counter()
+            current = None if full else self.load(name)
+            channels = list(current.channels) if current else []
+            
+            fresh, watermark = self._read_rows(name, current, channels)
+            read = len(fresh['id'])
+            
+            removed = 0
+            if current is None:
+                order = np.argsort(fresh['id'], kind='stable')
+                columns = {column: values[order] for column, values in fresh.items()}
+            else:
+                columns, changed = self._merge(current, fresh)
+                if not changed:
+                    columns = current.columns
+                # 已刪除的資料列不會出現在水位之後的查詢結果中，需另外比對
+                columns, removed = self._drop_deleted(name, columns)
+                if not changed and not removed:
+                    # 重疊讀取到的資料列都與快照相同，不需寫入新世代
+                    return {'mode': 'incremental', 'read': read, 'removed': 0, 'rows': current.rows, 'elapsedSeconds': round(time.perf_counter() - started, 3)}
+                if current.watermark is not None:
+                    watermark = current.watermark if watermark is None else max(watermark, current.watermark)
+            
+            self._write_generation(name, columns, channels, watermark)
+            report = {
+                'mode': 'full' if current is None else 'incremental',
+                'read': read,
+                'removed': removed,
+                'rows': len(columns['id']),
+                'elapsedSeconds': round(time.perf_counter() - started, 3)
+            }
+            logger.info(f"{name}欄位快照已刷新: {report}")
+            return report
+    
+    def _read_rows(self, name, current, channels):
+        """讀取需要寫入快照的資料列並轉換為欄位陣列"""
+        model, watermark_name, spec = COLUMNAR_TABLES[name]
+        watermark_column = getattr(model, watermark_name)
+        stmt = select(*[column for _, column, _ in spec])
+        
+        if current is not None and current.watermark is not None:
+            if watermark_column.type.python_type is datetime:
+                # 重疊讀取一段時間，讀到的既有資料列再依主鍵比對是否真的變更
+                stmt = stmt.where(watermark_column >= datetime.fromisoformat(current.watermark) - WATERMARK_OVERLAP)
+            else:
+                stmt = stmt.where(watermark_column > current.watermark)
+        
+        codes = {channel_id: code for code, channel_id in enumerate(channels)}
+        parts = {column: [] for column, _, _ in spec}
+        watermark_index = [column for column, _, _ in spec].index(watermark_name)
+        watermark = None
+        
+        result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=self.chunk_size))
+        try:
+            for partition in result.partitions():
+                values = list(zip(*partition))
+                for (column, _, dtype), column_values in zip(spec, values):
+                    if dtype == 'channel':
+                        parts[column].append(self._encode_channels(column_values, codes, channels))
+                    else:
+                        parts[column].append(_to_array(column_values, dtype))
+                
+                high = max((value for value in values[watermark_index] if value is not None), default=None)
+                if high is not None:
+                    watermark = high if watermark is None else max(watermark, high)
+        finally:
+            result.close()
+        
+        fresh = {}
+        for column, _, dtype in spec:
+            empty_dtype = np.int32 if dtype == 'channel' else dtype
+            fresh[column] = np.concatenate(parts[column]) if parts[column] else np.empty(0, dtype=empty_dtype)
+        
+        if isinstance(watermark, datetime):
+            watermark = watermark.isoformat()
+        return fresh, watermark
+    
+    def _drop_deleted(self, name, columns):
+        """
+        移除資料庫中已不存在的資料列
+        
+        資料列數與資料庫相同時不讀取主鍵。讀取之後才新增的資料列恰好抵銷刪除的數量時，
+        會在下一次刷新讀入這些新資料列後移除。
+        
+        Returns:
+            tuple: (欄位, 移除的資料列數)
+        """
+        model = COLUMNAR_TABLES[name][0]
+        ids = columns['id']
+        count = db.session.execute(select(func.count()).select_from(model.__table__)).scalar()
+        if count == len(ids):
+            return columns, 0
+        
+        result = db.session.execute(select(model.id).execution_options(stream_results=True, yield_per=self.chunk_size))
+        try:
+            live = np.concatenate([
+                np.fromiter((row[0] for row in partition), dtype=np.int64, count=len(partition))
+                for partition in result.partitions()
+            ] or [np.empty(0, dtype=np.int64)])
+        finally:
+            result.close()
+        
+        keep = np.isin(ids, live, assume_unique=True)
+        removed = int(len(ids) - np.count_nonzero(keep))
+        if not removed:
+            return columns, 0
+        return {column: values[keep] for column, values in columns.items()}, removed
+    
+    @staticmethod
+    def _encode_channels(values, codes, channels):
+        """以字典編碼頻道ID（新的頻道ID附加到字典末端，既有代碼不變）"""
+        uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        lookup = np.empty(len(uniques), dtype=np.int32)
+        for index, channel_id in enumerate(uniques.tolist()):
+            code = codes.get(channel_id)
+            if code is None:
+                code = codes[channel_id] = len(channels)
+                channels.append(channel_id)
+            lookup[index] = code
+        return lookup[inverse]
+    
+    @staticmethod
+    def _merge(current, fresh):
+        """
+        依主鍵將新讀取的資料列合併到既有快照
+        
+        Returns:
+            tuple: (合併後的欄位, 是否有資料列變更或新增)
+        """
+        old_ids = current['id']
+        order = np.argsort(fresh['id'], kind='stable')
+        fresh = {column: values[order] for column, values in fresh.items()}
+        
+        positions = np.searchsorted(old_ids, fresh['id'])
+        if len(old_ids):
+            positions = np.minimum(positions, len(old_ids) - 1)
+            exists = old_ids[positions] == fresh['id']
+        else:
+            exists = np.zeros(len(positions), dtype=bool)
+        appended = ~exists
+        targets = positions[exists]
+        
+        changed = bool(appended.any()) or any(
+            not np.array_equal(current[column][targets], values[exists], equal_nan=values.dtype.kind in 'fmM')
+            for column, values in fresh.items()
+        )
+        if not changed:
+            return None, False
+        
+        merged = {}
+        for column, values in fresh.items():
+            column_values = np.array(current[column])
+            column_values[targets] = values[exists]
+            merged[column] = np.concatenate((column_values, values[appended]))
+        
+        # 新資料列的主鍵通常大於既有的最大值，只有在順序被打亂時才重新排序
+        if appended.any() and len(old_ids) and fresh['id'][appended][0] < old_ids[-1]:
+            order = np.argsort(merged['id'], kind='stable')
+            merged = {column: values[order] for column, values in merged.items()}
+        return merged, True
+    
+    def _write_generation(self, name, columns, channels, watermark):
+        """寫入新的世代目錄並切換CURRENT"""
+        table_dir = self._table_dir(name)
+        generation = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        path = os.path.join(table_dir, generation)
+        os.makedirs(path)
+        
+        for column, values in columns.items():
+            np.save(os.path.join(path, f'{column}.npy'), np.ascontiguousarray(values))
+        
+        manifest = {
+            'generation': generation,
+            'generatedAt': datetime.utcnow().isoformat(),
+            'watermark': watermark,
+            'rows': len(columns['id']),
+            'columns': list(columns),
+            'channels': channels
+        }
+        with open(os.path.join(path, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        
+        temp_path = os.path.join(table_dir, f'CURRENT.{os.getpid()}.tmp')
+        with open(temp_path, 'w') as f:
+            f.write(generation)
+        os.replace(temp_path, os.path.join(table_dir, 'CURRENT'))
+        
+        generations = sorted(entry for entry in os.listdir(table_dir) if os.path.isdir(os.path.join(table_dir, entry)))
+        for old in generations[:-KEEP_GENERATIONS]:
+            shutil.rmtree(os.path.join(table_dir, old), ignore_errors=True)
+
+def engagement_by_month(table, channel_ids=None):
+    """
+    依發布月份彙總影片的觀看與互動
+    
+    Args:
+        table: videos的ColumnarTable
+        channel_ids: 頻道ID列表（None表示全部）
+        
+    Returns:
+        list: 依月份排序的彙總
+    """
+    mask = table.channel_mask(channel_ids)
+    published = table['published_at'] if mask is None else table['published_at'][mask]
+    valid = ~np.isnat(published)
+    if mask is None:
+        mask = valid
+    else:
+        mask = mask.copy()
+        mask[mask] = valid
+    
+    months, inverse = np.unique(published[valid].astype('datetime64[M]'), return_inverse=True)
+    if not len(months):
+        return []
+    
+    counts = np.bincount(inverse)
+    views = np.bincount(inverse, weights=table['view_count'][mask])
+    likes = np.bincount(inverse, weights=table['like_count'][mask])
+    comments = np.bincount(inverse, weights=table['comment_count'][mask])
+    rates = table['engagement_rate'][mask]
+    rate_valid = ~np.isnan(rates)
+    rate_sums = np.bincount(inverse, weights=np.where(rate_valid, rates, 0.0), minlength=len(months))
+    rate_counts = np.bincount(inverse, weights=rate_valid, minlength=len(months))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        engagement = np.where(views > 0, (likes + comments) / views * 100, 0.0)
+        average_rate = np.where(rate_counts > 0, rate_sums / rate_counts, 0.0)
+    
+    return [
+        {
+            'month': str(month),
+            'videos': int(count),
+            'views': int(view),
+            'likes': int(like),
+            'comments': int(comment),
+            'engagementRate': round(float(rate), 2),
+            'averageEngagementRate': round(float(average), 2)
+        }
+        for month, count, view, like, comment, rate, average in zip(
+            months, counts, views, likes, comments, engagement, average_rate
+        )
+    ]
+
+def view_percentiles(table, channel_ids=None, percentiles=(50, 90, 99)):
+    """
+    計算每個頻道影片觀看次數的百分位數（線性插值，與numpy.percentile相同）
+    
+    Args:
+        table: videos的ColumnarTable
+        channel_ids: 頻道ID列表（None表示全部）
+        percentiles: 百分位數
+        
+    Returns:
+        list: 每個頻道的影片數、平均觀看次數與百分位數
+    """
+    mask = table.channel_mask(channel_ids)
+    codes = np.asarray(table['channel'] if mask is None else table['channel'][mask])
+    views = np.asarray(table['view_count'] if mask is None else table['view_count'][mask])
+    if not len(codes):
+        return []
+    
+    # 依頻道代碼再依觀看次數排序，每個頻道成為一段連續且已排序的區間
+    order = np.lexsort((views, codes))
+    codes = codes[order]
+    views = views[order].astype(np.float64)
+    boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(codes)]))
+    counts = ends - starts
+    totals = np.add.reduceat(views, starts)
+    
+    values = {}
+    for percentile in percentiles:
+        position = (counts - 1) * (percentile / 100.0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        low_values = views[starts + lower]
+        values[percentile] = low_values + (views[starts + upper] - low_values) * (position - lower)
+    
+    results = [
+        {
+            'channelId': table.channels[codes[start]],
+            'videos': int(count),
+            'averageViews': round(float(total / count), 2),
+            'percentiles': {f'p{percentile:g}': round(float(values[percentile][index]), 2) for percentile in percentiles}
+        }
+        for index, (start, count, total) in enumerate(zip(starts, counts, totals))
+    ]
+    # 字典代碼依首次出現的順序配發，輸出改依頻道ID排序
+    results.sort(key=lambda item: item['channelId'])
+    return results
+
+# 全域欄位快照
+columnar_store = ColumnarStore()
@@ -0,0 +1,235 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from src.services.youtube_service import MAX_IDS_PER_REQUEST, _parse_datetime, _playlist_page_video_ids, _projection
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 並行走訪上傳播放列表的共用執行緒池
+_crawl_executor = ThreadPoolExecutor(max_workers=Config.MAX_CHANNELS_COMPARE, thread_name_prefix='compare')
+
+# 可比較的指標
+COMPARE_METRICS = (
+    'views', 'subscriberCount', 'videoCount',
+    'recentVideoCount', 'recentViews', 'averageViews', 'averageEngagementRate'
+)
+
+class ChannelCompareEngine:
+    """多頻道比較引擎
+    
+    上游呼叫次數上限（N個頻道、每個頻道最多V部影片）：
+        1次channels.list
+        + N * ceil(V / 50)次playlistItems.list
+        + ceil(N * V / 50)次videos.list
+    以預設上限（N=5、V=50）計算，每次比較最多11次呼叫，共11個配額單位。
+    批次模式下，同類呼叫會合併為批次HTTP請求，實際HTTP往返最多3次。
+    
+    指定結束日期時，較新的上傳影片在翻頁時略過，每個頻道改為最多讀取
+    ceil(max(V, VIDEO_SCAN_LIMIT) / 50)頁播放列表。
+    """
+    
+    def __init__(self, youtube_service, max_videos_per_channel=None):
+        """
+        初始化比較引擎
+        
+        Args:
+            youtube_service: YouTubeService實例
+            max_videos_per_channel: 每個頻道最多取樣的影片數量
+        """
+        self.youtube_service = youtube_service
+        self.max_videos_per_channel = max_videos_per_channel or Config.MAX_VIDEOS_PER_CHANNEL
+    
+    def max_pages(self, end_date=None):
+        """
+        獲取每個頻道最多讀取的播放列表頁數
+        
+        Args:
+            end_date: 影片發布日期上限（需略過較新的影片時才需要多讀幾頁）
+            
+        Returns:
+            int: 頁數上限
+        """
+        videos = self.max_videos_per_channel
+        if end_date:
+            videos = max(videos, Config.VIDEO_SCAN_LIMIT)
+        return -(-videos // MAX_IDS_PER_REQUEST)
+    
+    def compare(self, channel_ids, metrics=None, start_date=None, end_date=None):
+        """
+        比較多個頻道
+        
+        Args:
+            channel_ids: YouTube頻道ID列表（最多MAX_CHANNELS_COMPARE個）
+            metrics: 要回傳的指標（None表示全部）
+            start_date: 影片發布日期下限 (YYYY-MM-DD)
+            end_date: 影片發布日期上限 (YYYY-MM-DD)
+            
+        Returns:
+            list: 依傳入順序排列的各頻道比較結果
+        """
+        channel_ids = list(dict.fromkeys(channel_ids))
+        if len(channel_ids) > Config.MAX_CHANNELS_COMPARE:
+            raise ValueError(f"最多只能比較{Config.MAX_CHANNELS_COMPARE}個頻道")
+        
+        metrics = list(metrics or COMPARE_METRICS)
+        unknown = [metric for metric in metrics if metric not in COMPARE_METRICS]
+        if unknown:
+            raise ValueError(f"不支援的比較指標: {', '.join(unknown)}")
+        
+        # 以一次channels.list獲取所有頻道，並直接沿用其上傳播放列表ID
+        channels = self.youtube_service.get_channels_details(channel_ids)
+        
+        published_after = _parse_datetime(start_date) if start_date else None
+        published_before = _parse_datetime(f'{end_date}T23:59:59') if end_date else None
+        max_pages = self.max_pages(end_date)
+        
+        playlists = {}
+        for channel in channels:
+            uploads_playlist_id = channel.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+            if uploads_playlist_id:
+                playlists[channel['id']] = uploads_playlist_id
+        
+        if self.youtube_service.batch_mode and self.max_videos_per_channel <= MAX_IDS_PER_REQUEST:
+            # 每個播放列表只需一頁，合併為單一批次HTTP請求
+            video_ids_by_channel = self._collect_first_pages(playlists, published_after, published_before, max_pages)
+        elif Config.YOUTUBE_ASYNC_CLIENT:
+            # 在共用的事件迴圈中並行走訪，不佔用額外的工作執行緒
+            # 只有啟用非同步客戶端時才需要aiohttp，因此延遲匯入
+            from src.services.async_youtube_service import async_bridge
+            video_ids_by_channel = async_bridge.run(
+                lambda client: client.collect_playlist_video_ids(
+                    playlists, self.max_videos_per_channel, published_after, published_before, max_pages
+                ),
+                api_key=self.youtube_service.api_key,
+                credentials=self.youtube_service.credentials,
+                user_id=self.youtube_service.user_id
+            )
+        else:
+            # 並行走訪各頻道的上傳播放列表
+            futures = {
+                channel_id: _crawl_executor.submit(
+                    self._collect_video_ids, playlist_id, published_after, published_before, max_pages
+                )
+                for channel_id, playlist_id in playlists.items()
+            }
+            video_ids_by_channel = {channel_id: future.result() for channel_id, future in futures.items()}
+        
+        # 所有頻道的影片共用50個ID一批的videos.list
+        all_video_ids = [video_id for video_ids in video_ids_by_channel.values() for video_id in video_ids]
+        videos_by_id = {video['id']: video for video in self.youtube_service.get_videos_details(all_video_ids)}
+        
+        comparison = []
+        for channel in channels:
+            videos = [
+                videos_by_id[video_id]
+                for video_id in video_ids_by_channel.get(channel['id'], [])
+                if video_id in videos_by_id
+            ]
+            
+            channel_metrics = self._channel_metrics(channel, videos)
+            comparison.append({
+                'channelId': channel['id'],
+                'channelTitle': channel.get('snippet', {}).get('title'),
+                'metrics': {metric: channel_metrics[metric] for metric in metrics}
+            })
+        
+        return comparison
+    
+    def _collect_video_ids(self, playlist_id, published_after, published_before=None, max_pages=None,
+                           page_token=None, max_videos=None):
+        """在工作執行緒中收集播放列表的影片ID"""
+        client = self.youtube_service.thread_client()
+        video_ids = []
+        for page in self.youtube_service.iter_playlist_pages(
+            playlist_id,
+            max_videos=max_videos or self.max_videos_per_channel,
+            published_after=published_after,
+            client=client,
+            published_before=published_before,
+            max_pages=max_pages,
+            page_token=page_token
+        ):
+            video_ids.extend(page)
+        return video_ids
+    
+    def _collect_first_pages(self, playlists, published_after, published_before=None, max_pages=None):
+        """
+        以一次批次請求獲取各播放列表的第一頁影片ID
+        
+        指定published_before時，第一頁可能全是較新的影片；
+        影片不足的播放列表再從第二頁起並行補齊。
+        """
+        youtube = self.youtube_service.youtube
+        calls = [
+            (youtube.playlistItems().list(
+                **_projection('playlistVideoIds'),
+                playlistId=playlist_id,
+                maxResults=MAX_IDS_PER_REQUEST if published_before else self.max_videos_per_channel
+            ), 'playlistItems.list')
+            for playlist_id in playlists.values()
+        ]
+        responses = self.youtube_service.execute_batch(calls)
+        
+        video_ids_by_channel = {}
+        futures = {}
+        for (channel_id, playlist_id), response in zip(playlists.items(), responses):
+            video_ids, reached_cutoff = _playlist_page_video_ids(response, published_after, published_before)
+            video_ids = video_ids[:self.max_videos_per_channel]
+            video_ids_by_channel[channel_id] = video_ids
+            
+            page_token = response.get('nextPageToken')
+            remaining = self.max_videos_per_channel - len(video_ids)
+            if published_before and remaining > 0 and page_token and not reached_cutoff and max_pages > 1:
+                futures[channel_id] = _crawl_executor.submit(
+                    self._collect_video_ids, playlist_id, published_after, published_before,
+                    max_pages - 1, page_token, remaining
+                )
+        
+        for channel_id, future in futures.items():
+            video_ids_by_channel[channel_id].extend(future.result())
+        return video_ids_by_channel
+    
+    @staticmethod
+    def _channel_metrics(channel, videos):
+        """計算單一頻道的比較指標"""
+        statistics = channel.get('statistics', {})
+        
+        recent_views = 0
+        engagement_rates = []
+        for video in videos:
+            video_statistics = video.get('statistics', {})
+            view_count = int(video_statistics.get('viewCount', 0))
+            like_count = int(video_statistics.get('likeCount', 0))
+            comment_count = int(video_statistics.get('commentCount', 0))
+            recent_views += view_count
+            
+            # 計算互動率 (按讚數 + 留言數) / 觀看數 * 100
+            if view_count > 0:
+                engagement_rates.append((like_count + comment_count) / view_count * 100)
+        
+        return {
+            'views': int(statistics.get('viewCount', 0)),
+            'subscriberCount': int(statistics.get('subscriberCount', 0)),
+            'videoCount': int(statistics.get('videoCount', 0)),
+            'recentVideoCount': len(videos),
+            'recentViews': recent_views,
+            'averageViews': round(recent_views / len(videos), 2) if videos else 0,
+            'averageEngagementRate': round(sum(engagement_rates) / len(engagement_rates), 2) if engagement_rates else 0
+        }
+
+def max_upstream_calls(channel_count, max_videos_per_channel, pages_per_channel=None):
+    """
+    計算一次比較的上游呼叫次數上限
+    
+    Args:
+        channel_count: 頻道數量
+        max_videos_per_channel: 每個頻道最多取樣的影片數量
+        pages_per_channel: 每個頻道最多讀取的播放列表頁數（預設依影片數量計算）
+        
+    Returns:
+        int: 上游呼叫次數上限
+    """
+    if pages_per_channel is None:
+        pages_per_channel = -(-max_videos_per_channel // MAX_IDS_PER_REQUEST)
+    video_batches = -(-(channel_count * max_videos_per_channel) // MAX_IDS_PER_REQUEST)
+    return 1 + channel_count * pages_per_channel + video_batches
@@ -31,6 +31,78 @@ class Config:
     # 緩存配置
     CACHE_TYPE = os.environ.get('CACHE_TYPE', 'simple')
     CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', 300))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 2048))
+    STATS_CACHE_TIMEOUT = int(os.environ.get('STATS_CACHE_TIMEOUT', 5))
+    CACHE_TIMEOUTS = {
+        'channelBasicInfo': int(os.environ.get('CACHE_CHANNEL_BASIC_INFO_TIMEOUT', 3600)),  # 1小時
+        'channelStatistics': int(os.environ.get('CACHE_CHANNEL_STATISTICS_TIMEOUT', 1800)),  # 30分鐘
+        'audienceDemographics': int(os.environ.get('CACHE_AUDIENCE_DEMOGRAPHICS_TIMEOUT', 21600)),  # 6小時
+        'videosList': int(os.environ.get('CACHE_VIDEOS_LIST_TIMEOUT', 3600))  # 1小時
+    }
+    
+    # 批次HTTP請求配置（以multipart合併多個獨立呼叫）
+    YOUTUBE_BATCH_MODE = os.environ.get('YOUTUBE_BATCH_MODE', 'false').lower() == 'true'
+    BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 50))
+    
+    # 頻道比較與影片列表限制
+    MAX_CHANNELS_COMPARE = int(os.environ.get('MAX_CHANNELS_COMPARE', 5))
+    MAX_VIDEOS_PER_CHANNEL = int(os.environ.get('MAX_VIDEOS_PER_CHANNEL', 50))
+    # 依觀看數排序時預設最多掃描的上傳影片數量（每50部約2單位配額）
+    VIDEO_SCAN_LIMIT = int(os.environ.get('VIDEO_SCAN_LIMIT', 10 * MAX_VIDEOS_PER_CHANNEL))
+    
+    # 批次寫入資料庫時每個語句的資料列數量
+    INGEST_CHUNK_SIZE = int(os.environ.get('INGEST_CHUNK_SIZE', 500))
+    
+    # 串流匯出配置（每次從資料庫游標讀取的資料列數量）
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+    EXPORT_MAX_CHANNELS = int(os.environ.get('EXPORT_MAX_CHANNELS', 500))
+    
+    # 欄位快照配置（分析查詢使用的.npy欄位檔），刷新間隔0表示不自動執行；只在python main.py或flask run-jobs程序中排程
+    COLUMNAR_DIR = os.environ.get('COLUMNAR_DIR', 'columnar')
+    COLUMNAR_REFRESH_SECONDS = int(os.environ.get('COLUMNAR_REFRESH_SECONDS', 0))
+    COLUMNAR_CHUNK_SIZE = int(os.environ.get('COLUMNAR_CHUNK_SIZE', 50000))
+    
+    # 頻道統計快照間隔（秒），0表示不自動執行；只在python main.py或flask run-jobs程序中排程
+    SNAPSHOT_INTERVAL_SECONDS = int(os.environ.get('SNAPSHOT_INTERVAL_SECONDS', 0))
+    
+    # 並行查詢YouTube Analytics API的最大執行緒數
+    ANALYTICS_MAX_WORKERS = int(os.environ.get('ANALYTICS_MAX_WORKERS', 8))
+    
+    # 頻道/影片資料表的stale-while-revalidate視窗（秒）
+    FRESHNESS_WINDOW_SECONDS = int(os.environ.get('FRESHNESS_WINDOW_SECONDS', 900))  # 15分鐘內直接提供
+    STALENESS_WINDOW_SECONDS = int(os.environ.get('STALENESS_WINDOW_SECONDS', 86400))  # 1天內先提供再背景刷新
+    REFRESH_MAX_WORKERS = int(os.environ.get('REFRESH_MAX_WORKERS', 4))
+    
+    # 背景工作配置（以資料庫作為工作佇列）
+    JOB_MAX_WORKERS = int(os.environ.get('JOB_MAX_WORKERS', 2))  # python main.py啟動時的工作者數量，0表示只由flask run-jobs處理
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 2))
+    JOB_HEARTBEAT_TIMEOUT = int(os.environ.get('JOB_HEARTBEAT_TIMEOUT', 300))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    JOB_RETRY_DELAY = int(os.environ.get('JOB_RETRY_DELAY', 30))  # 第N次重試延後N倍秒數
+    JOB_CONCURRENCY = int(os.environ.get('JOB_CONCURRENCY', 2))  # 單一工作預設的並行上游請求數量
+    JOB_MAX_CONCURRENCY = int(os.environ.get('JOB_MAX_CONCURRENCY', 8))
+    
+    # 本地全文搜尋配置：SQLite FTS5的分詞器（trigram以子字串比對，中文標題不需斷詞，需要SQLite 3.34以上；
+    # 只有拉丁字母時可改用'unicode61 remove_diacritics 2'），變更後啟動時會重建索引；
+    # 本地結果達到此數量時不呼叫search.list
+    SEARCH_FTS_TOKENIZER = os.environ.get('SEARCH_FTS_TOKENIZER', 'trigram')
+    SEARCH_MIN_LOCAL_RESULTS = int(os.environ.get('SEARCH_MIN_LOCAL_RESULTS', 5))
+    
+    # 合併相同的進行中上游呼叫（single-flight）
+    YOUTUBE_SINGLE_FLIGHT = os.environ.get('YOUTUBE_SINGLE_FLIGHT', 'true').lower() == 'true'
+    
+    # 非同步YouTube客戶端配置
+    YOUTUBE_ASYNC_CLIENT = os.environ.get('YOUTUBE_ASYNC_CLIENT', 'false').lower() == 'true'
+    ASYNC_MAX_CONNECTIONS = int(os.environ.get('ASYNC_MAX_CONNECTIONS', 100))
+    ASYNC_MAX_PER_HOST = int(os.environ.get('ASYNC_MAX_PER_HOST', 20))
+    ASYNC_REQUEST_TIMEOUT = int(os.environ.get('ASYNC_REQUEST_TIMEOUT', 30))
+    ASYNC_MAX_TASKS = int(os.environ.get('ASYNC_MAX_TASKS', 10))  # 單一呼叫同時走訪的播放列表或補齊中的頁數
+    
+    # API配額配置
+    YOUTUBE_DATA_API_DAILY_QUOTA = int(os.environ.get('YOUTUBE_DATA_API_DAILY_QUOTA', 10000))
+    YOUTUBE_ANALYTICS_API_DAILY_QUOTA = int(os.environ.get('YOUTUBE_ANALYTICS_API_DAILY_QUOTA', 10000))
+    QUOTA_RESERVE = int(os.environ.get('QUOTA_RESERVE', 500))  # 保留給低成本呼叫的配額
+    QUOTA_STATE_FILE = os.environ.get('QUOTA_STATE_FILE', 'quota_usage.json')  # 所有程序共用的配額計數檔案（空字串表示只計數在記憶體）
     
     # 速率限制配置
     RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
@@ -0,0 +1,80 @@
+import numpy as np
+
+# 影片長度篩選的預設分類（秒）：Shorts上限與長影片下限
+SHORTS_MAX_SECONDS = 60
+LONG_FORM_MIN_SECONDS = 20 * 60
+
+# 日期部分與時間部分依序出現的單位（ISO 8601不允許其他順序）
+_DATE_UNITS = (('W', 604800), ('D', 86400))
+_TIME_UNITS = (('H', 3600), ('M', 60), ('S', 1))
+
+def _scan(part, units):
+    """依單位順序以str.partition切出各數字，任何剩餘字元都視為格式錯誤"""
+    total = 0
+    for unit, seconds in units:
+        number, found, rest = part.partition(unit)
+        if found:
+            # 只有秒數允許小數，其餘欄位以int()解析（格式錯誤時拋出ValueError）
+            total += (float(number) if unit == 'S' and '.' in number else int(number)) * seconds
+            part = rest
+    if part:
+        raise ValueError(part)
+    return total
+
+def parse_duration(value):
+    """
+    將ISO 8601時間長度轉換為整數秒數
+    
+    支援YouTube使用的PT#H#M#S與P#DT#H#M#S（以及P#W、P#D）；
+    不使用正規表示式，只以str.partition依單位順序切割。
+    直播中與尚未開始的影片回傳P0D，長度為0時視為未知，避免被歸類為Shorts。
+    
+    Args:
+        value: ISO 8601時間長度字串，例如PT1H2M3S、P1DT2H、P0D
+        
+    Returns:
+        int: 秒數（小數秒四捨五入），無法解析或長度為0時返回None
+    """
+    if not value or value[0] != 'P':
+        return None
+    
+    date_part, has_time, time_part = value[1:].partition('T')
+    if not date_part and not time_part:
+        return None
+    try:
+        total = _scan(date_part, _DATE_UNITS) if date_part else 0
+        if time_part:
+            total += _scan(time_part, _TIME_UNITS)
+    except ValueError:
+        return None
+    return int(round(total)) or None
+
+def parse_durations(values):
+    """
+    批次轉換時間長度
+    
+    同一批中重複的字串（例如大量相同長度的Shorts）只解析一次。
+    
+    Args:
+        values: ISO 8601時間長度字串的序列
+        
+    Returns:
+        list: 與輸入順序相同的秒數（無法解析時為None）
+    """
+    lookup = {value: parse_duration(value) for value in set(values)}
+    return [lookup[value] for value in values]
+
+def duration_array(values):
+    """
+    批次轉換時間長度為NumPy陣列
+    
+    Args:
+        values: ISO 8601時間長度字串的序列
+        
+    Returns:
+        numpy.ndarray: float64秒數，無法解析時為NaN
+    """
+    return np.array(
+        [np.nan if seconds is None else seconds for seconds in parse_durations(values)],
+        dtype=np.float64
+    )
@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from sqlalchemy import select
+from src.models.user import db
+from src.models.channel import Video, ChannelStatisticsHistory
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 可匯出的數據集：(模型, 日期篩選欄位, 排序欄位, [(輸出欄位名稱, 模型欄位)])
+EXPORT_DATASETS = {
+    'videos': (
+        Video, Video.published_at, (Video.channel_id, Video.published_at, Video.id), [
+            ('videoId', Video.video_id),
+            ('channelId', Video.channel_id),
+            ('title', Video.title),
+            ('publishedAt', Video.published_at),
+            ('duration', Video.duration),
+            ('durationSeconds', Video.duration_seconds),
+            ('viewCount', Video.view_count),
+            ('likeCount', Video.like_count),
+            ('commentCount', Video.comment_count),
+            ('engagementRate', Video.engagement_rate),
+            ('lastUpdated', Video.last_updated)
+        ]
+    ),
+    'statistics': (
+        ChannelStatisticsHistory, ChannelStatisticsHistory.date,
+        (ChannelStatisticsHistory.channel_id, ChannelStatisticsHistory.date), [
+            ('channelId', ChannelStatisticsHistory.channel_id),
+            ('date', ChannelStatisticsHistory.date),
+            ('viewCount', ChannelStatisticsHistory.view_count),
+            ('subscriberCount', ChannelStatisticsHistory.subscriber_count),
+            ('videoCount', ChannelStatisticsHistory.video_count),
+            ('estimatedMinutesWatched', ChannelStatisticsHistory.estimated_minutes_watched),
+            ('averageViewDuration', ChannelStatisticsHistory.average_view_duration)
+        ]
+    )
+}
+
+# 支援的輸出格式與對應的MIME類型
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def _plain(value):
+    """將資料庫值轉換為JSON/CSV可輸出的值"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+class ExportQuery:
+    """已驗證的匯出查詢
+    
+    建立時即檢查數據集、格式、頻道與日期範圍，讓參數錯誤能在開始串流前
+    以400返回；串流開始後響應標頭已送出，只能中斷連線。
+    """
+    
+    def __init__(self, dataset, channel_ids, start_date=None, end_date=None, output_format='ndjson', chunk_size=None):
+        """
+        Args:
+            dataset: 數據集名稱 ('videos' 或 'statistics')
+            channel_ids: 頻道ID列表
+            start_date: 開始日期 (YYYY-MM-DD)
+            end_date: 結束日期 (YYYY-MM-DD)
+            output_format: 'ndjson' 或 'csv'
+            chunk_size: 每次從資料庫游標讀取的資料列數量
+        """
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"不支援的數據集: {dataset}")
+        if output_format not in EXPORT_FORMATS:
+            raise ValueError(f"不支援的輸出格式: {output_format}")
+        
+        channel_ids = list(dict.fromkeys(channel_id for channel_id in channel_ids if channel_id))
+        if not channel_ids:
+            raise ValueError("請提供至少一個頻道ID")
+        if len(channel_ids) > Config.EXPORT_MAX_CHANNELS:
+            raise ValueError(f"一次最多匯出{Config.EXPORT_MAX_CHANNELS}個頻道")
+        
+        self.start = date.fromisoformat(start_date) if start_date else None
+        self.end = date.fromisoformat(end_date) if end_date else None
+        if self.start and self.end and self.start > self.end:
+            raise ValueError("開始日期不能晚於結束日期")
+        
+        self.dataset = dataset
+        self.channel_ids = channel_ids
+        self.format = output_format
+        self.chunk_size = chunk_size or Config.EXPORT_CHUNK_SIZE
+        self.model, self.date_column, self.order_by, columns = EXPORT_DATASETS[dataset]
+        self.names = [name for name, _ in columns]
+        self.columns = [column for _, column in columns]
+    
+    @property
+    def mimetype(self):
+        return EXPORT_FORMATS[self.format]
+    
+    @property
+    def filename(self):
+        return f'{self.dataset}.{self.format}'
+    
+    def statement(self):
+        """建立只選取欄位的查詢語句（不建立ORM物件）"""
+        stmt = select(*self.columns).where(self.model.channel_id.in_(self.channel_ids))
+        
+        if self.start:
+            stmt = stmt.where(self.date_column >= self.start)
+        if self.end:
+            # published_at為時間戳記，結束日期包含當天
+            if self.date_column.type.python_type is datetime:
+                stmt = stmt.where(self.date_column < datetime.combine(self.end + timedelta(days=1), time.min))
+            else:
+                stmt = stmt.where(self.date_column <= self.end)
+        
+        return stmt.order_by(*self.order_by).execution_options(stream_results=True, yield_per=self.chunk_size)
+    
+    def partitions(self):
+        """
+        以伺服器端游標分批讀取資料列
+        
+        Returns:
+            generator: 每次產生最多chunk_size筆欄位值tuple的列表
+        """
+        result = db.session.execute(self.statement())
+        try:
+            for partition in result.partitions():
+                yield partition
+        finally:
+            result.close()
+    
+    def stream(self):
+        """
+        串流輸出匯出內容
+        
+        每個資料庫分批編碼為一個區塊，記憶體用量只與chunk_size有關，
+        與匯出的總資料列數無關。
+        
+        Returns:
+            generator: 編碼後的文字區塊
+        """
+        encode = self._encode_csv if self.format == 'csv' else self._encode_ndjson
+        rows = 0
+        
+        if self.format == 'csv':
+            yield self._csv_line(self.names)
+        
+        try:
+            for partition in self.partitions():
+                rows += len(partition)
+                yield encode(partition)
+        except Exception as e:
+            logger.error(f"匯出{self.dataset}在第{rows}筆後中斷: {e}")
+            raise
+        
+        logger.info(f"已匯出{self.dataset} {rows}筆 ({self.format}, {len(self.channel_ids)}個頻道)")
+    
+    def _encode_ndjson(self, partition):
+        names = self.names
+        return ''.join(
+            json.dumps(dict(zip(names, map(_plain, row))), ensure_ascii=False, separators=(',', ':')) + '\n'
+            for row in partition
+        )
+    
+    def _encode_csv(self, partition):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([_plain(value) for value in row] for row in partition)
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _csv_line(values):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        return buffer.getvalue()
@@ -0,0 +1,157 @@
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from src.models.user import db
+from src.models.channel import Channel, Video
+from src.services.ingestion_service import refresh_channel, refresh_video
+from src.services.singleflight import SingleFlight
+from src.services.youtube_service import YouTubeService
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 背景刷新的共用執行緒池
+_refresh_executor = ThreadPoolExecutor(max_workers=Config.REFRESH_MAX_WORKERS, thread_name_prefix='revalidate')
+
+# 同步刷新的合併器，確保同一筆資料同時只有一個刷新在執行
+_refresh_flight = SingleFlight()
+
+class StaleWhileRevalidate:
+    """以資料表為來源的stale-while-revalidate讀取
+    
+    - 資料列在新鮮期內：直接返回，不呼叫YouTube
+    - 超過新鮮期但在過期期內：立即返回舊資料，並排入背景刷新
+    - 超過過期期或尚未儲存：同步刷新後返回
+    同一筆資料同時只會排入一個背景刷新，同步刷新也會與進行中的刷新合併。
+    """
+    
+    def __init__(self, model, key, refresh, fresh_seconds=None, stale_seconds=None):
+        """
+        Args:
+            model: 資料表模型 (Channel或Video)
+            key: YouTube ID欄位名稱
+            refresh: 以 (YouTubeService, ID) 呼叫的刷新函數
+            fresh_seconds: 新鮮期（秒）
+            stale_seconds: 過期期（秒），超過後不再提供舊資料
+        """
+        self.model = model
+        self.key = key
+        self.refresh = refresh
+        self.fresh_seconds = Config.FRESHNESS_WINDOW_SECONDS if fresh_seconds is None else fresh_seconds
+        self.stale_seconds = Config.STALENESS_WINDOW_SECONDS if stale_seconds is None else stale_seconds
+        self._scheduled = set()
+        self._lock = threading.Lock()
+    
+    def get(self, item_id, youtube_service=None):
+        """
+        讀取資料並附上新鮮度資訊
+        
+        Args:
+            item_id: YouTube ID
+            youtube_service: 同步刷新時使用的YouTubeService實例（None表示需要時才建立）
+            
+        Returns:
+            tuple: (to_dict()的結果或None, 新鮮度資訊)
+        """
+        row = self._load(item_id)
+        age = self._age(row)
+        
+        if row is not None and age <= self.fresh_seconds:
+            return row.to_dict(), self._freshness('fresh', row, age)
+        
+        if row is not None and age <= self.stale_seconds:
+            self._schedule(item_id)
+            return row.to_dict(), self._freshness('stale', row, age, refreshing=True)
+        
+        try:
+            self._refresh_now(item_id, youtube_service or YouTubeService())
+        except Exception as e:
+            db.session.rollback()
+            if row is None:
+                raise
+            # 無法刷新時仍提供已儲存的資料
+            logger.warning(f"刷新{self.model.__tablename__} {item_id}失敗，改為提供過期資料: {e}")
+            return row.to_dict(), self._freshness('stale', row, age, error=str(e))
+        
+        status = 'fetched' if row is None else 'revalidated'
+        row = self._load(item_id, reload=True)
+        if row is None:
+            return None, {'status': 'missing'}
+        return row.to_dict(), self._freshness(status, row, self._age(row))
+    
+    def _load(self, item_id, reload=False):
+        """從資料表讀取單一資料列"""
+        query = self.model.query.filter(getattr(self.model, self.key) == item_id)
+        if reload:
+            # 刷新可能在其他執行緒的session完成，必須覆蓋identity map中的舊值
+            query = query.populate_existing()
+        return query.first()
+    
+    @staticmethod
+    def _age(row):
+        """資料列距離上次刷新的秒數"""
+        if row is None or row.last_updated is None:
+            return float('inf')
+        return max(0.0, (datetime.utcnow() - row.last_updated).total_seconds())
+    
+    @staticmethod
+    def _freshness(status, row, age, refreshing=False, error=None):
+        """建立新鮮度資訊"""
+        freshness = {
+            'status': status,
+            'lastUpdated': row.last_updated.isoformat() if row.last_updated else None,
+            'ageSeconds': round(age, 1) if age != float('inf') else None,
+            'refreshing': refreshing
+        }
+        if error:
+            freshness['error'] = error
+        return freshness
+    
+    def _refresh_now(self, item_id, youtube_service):
+        """同步刷新（與同一筆資料進行中的刷新合併）"""
+        return _refresh_flight.do(
+            (self.model.__tablename__, item_id),
+            lambda: self.refresh(youtube_service, item_id)
+        )[0]
+    
+    def _schedule(self, item_id):
+        """
+        排入背景刷新
+        
+        Returns:
+            bool: 是否由本次呼叫排入（已有排程時返回False）
+        """
+        with self._lock:
+            if item_id in self._scheduled:
+                return False
+            self._scheduled.add(item_id)
+        
+        app = current_app._get_current_object()
+        try:
+            _refresh_executor.submit(self._background_refresh, app, item_id)
+        except Exception:
+            with self._lock:
+                self._scheduled.discard(item_id)
+            raise
+        return True
+    
+    def _background_refresh(self, app, item_id):
+        """在工作執行緒中刷新資料列"""
+        try:
+            with app.app_context():
+                try:
+                    self._refresh_now(item_id, YouTubeService())
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning(f"背景刷新{self.model.__tablename__} {item_id}失敗: {e}")
+                finally:
+                    db.session.remove()
+        finally:
+            with self._lock:
+                self._scheduled.discard(item_id)
+
+# 頻道與影片的讀取器
+channel_reader = StaleWhileRevalidate(Channel, 'channel_id', refresh_channel)
+video_reader = StaleWhileRevalidate(Video, 'video_id', refresh_video)
@@ -0,0 +1,419 @@
+import logging
+from datetime import datetime
+from sqlalchemy import bindparam, case, inspect, literal_column, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.user import db
+from src.models.channel import Channel, Video, ChannelStatisticsHistory, ChannelStatisticsRollup, AudienceDemographics
+from src.models.table_stats import TRACKED_MODELS, increment_row_count
+from src.services.youtube_service import NOT_MODIFIED
+from src.services.duration import parse_durations
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 支援ON CONFLICT DO UPDATE的資料庫方言
+_INSERT_CONSTRUCTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert
+}
+
+def _insert_for(model):
+    """依目前資料庫方言建立INSERT語句"""
+    dialect = db.engine.dialect.name
+    insert = _INSERT_CONSTRUCTS.get(dialect)
+    if insert is None:
+        raise ValueError(f"批次寫入不支援此資料庫: {dialect}")
+    return insert(model.__table__)
+
+def _chunks(rows, chunk_size):
+    """將資料列切分為固定大小的區塊"""
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+def _dedupe(rows, keys):
+    """同一語句中不可重複更新同一列，保留每個鍵最後一筆資料"""
+    return list({tuple(row[key] for key in keys): row for row in rows}.values())
+
+def _upsert(model, rows, keys, update_columns, extra_updates=None, chunk_size=None, commit=True):
+    """
+    以INSERT ... ON CONFLICT DO UPDATE分塊寫入資料列
+    
+    Args:
+        model: ORM模型
+        rows: 資料列字典列表
+        keys: 唯一鍵欄位名稱列表
+        update_columns: 衝突時以新值覆寫的欄位
+        extra_updates: 衝突時以SQL表達式計算的欄位 (函數，參數為excluded)
+        chunk_size: 每個語句的資料列數量
+        commit: 是否在寫入後提交交易（False時由呼叫者負責提交）
+        
+    Returns:
+        int: 寫入的資料列數量
+    """
+    rows = _dedupe(rows, keys)
+    if not rows:
+        return 0
+    
+    chunk_size = chunk_size or Config.INGEST_CHUNK_SIZE
+    has_last_updated = 'last_updated' in model.__table__.c
+    if has_last_updated:
+        now = datetime.utcnow()
+        for row in rows:
+            row['last_updated'] = now
+    
+    # 列數計數器需要知道實際新增了幾列（由寫入語句本身回報，並行寫入相同新鍵時不會重複計算）
+    count_rows = model in TRACKED_MODELS
+    
+    # 語句只編譯一次，各區塊以executemany傳入參數（多列VALUES每次都要重新編譯）
+    stmt = _insert_for(model)
+    set_ = {column: stmt.excluded[column] for column in update_columns}
+    if has_last_updated:
+        set_['last_updated'] = stmt.excluded.last_updated
+    if extra_updates:
+        set_.update(extra_updates(stmt.excluded))
+    stmt = stmt.on_conflict_do_update(index_elements=keys, set_=set_)
+    
+    insert_new = None
+    if count_rows:
+        if db.engine.dialect.name == 'postgresql':
+            # 新增的列xmax為0，衝突後更新的列xmax為目前交易ID
+            stmt = stmt.returning(literal_column('(xmax = 0)'))
+        else:
+            # SQLite先以DO NOTHING寫入新鍵，RETURNING只返回實際新增的列，其餘的鍵再以DO UPDATE覆寫
+            insert_new = _insert_for(model).on_conflict_do_nothing(index_elements=keys).returning(
+                *[model.__table__.c[key] for key in keys]
+            )
+    
+    try:
+        for chunk in _chunks(rows, chunk_size):
+            if not count_rows:
+                db.session.execute(stmt, chunk)
+                continue
+            
+            if insert_new is not None:
+                new_keys = set(db.session.execute(insert_new, chunk).tuples())
+                inserted = len(new_keys)
+                existing = [row for row in chunk if tuple(row[key] for key in keys) not in new_keys]
+                if existing:
+                    db.session.execute(stmt, existing)
+            else:
+                inserted = sum(1 for (is_new,) in db.session.execute(stmt, chunk) if is_new)
+            increment_row_count(db.session.connection(), model.__tablename__, inserted)
+        
+        if commit:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return len(rows)
+
+def bulk_upsert_channels(items, chunk_size=None, commit=True):
+    """
+    批次寫入或更新頻道
+    
+    Args:
+        items: channels.list響應中的頻道項目
+        chunk_size: 每個語句的資料列數量
+        commit: 是否在寫入後提交交易
+        
+    Returns:
+        int: 寫入的頻道數量
+    """
+    rows = [Channel.row_from_youtube_data(item) for item in items]
+    update_columns = [column for column in rows[0] if column != 'channel_id'] if rows else []
+    return _upsert(Channel, rows, ['channel_id'], update_columns, chunk_size=chunk_size, commit=commit)
+
+def bulk_upsert_videos(items, channel_id=None, chunk_size=None, commit=True):
+    """
+    批次寫入或更新影片
+    
+    互動率在更新時由資料庫依新的觀看、按讚與留言數在同一語句中重新計算。
+    
+    Args:
+        items: videos.list響應中的影片項目
+        channel_id: 影片所屬頻道ID（未指定時使用snippet.channelId）
+        chunk_size: 每個語句的資料列數量
+        commit: 是否在寫入後提交交易
+        
+    Returns:
+        int: 寫入的影片數量
+    """
+    rows = [
+        Video.row_from_youtube_data(item, channel_id or item.get('snippet', {}).get('channelId'))
+        for item in items
+    ]
+    update_columns = [
+        column for column in rows[0]
+        if column not in ('video_id', 'engagement_rate')
+    ] if rows else []
+    
+    def engagement_rate(excluded):
+        # 計算互動率 (按讚數 + 留言數) / 觀看數 * 100
+        return {
+            'engagement_rate': case(
+                (excluded.view_count > 0,
+                 (excluded.like_count + excluded.comment_count) * 100.0 / excluded.view_count),
+                else_=0
+            )
+        }
+    
+    return _upsert(Video, rows, ['video_id'], update_columns, extra_updates=engagement_rate, chunk_size=chunk_size, commit=commit)
+
+def bulk_upsert_statistics_history(items, snapshot_date, chunk_size=None, commit=True):
+    """
+    批次寫入頻道每日統計快照
+    
+    同一頻道同一天重複寫入時以最新數據覆寫，因此同一天內可重複執行。
+    
+    Args:
+        items: channels.list響應中的頻道項目（part須包含statistics）
+        snapshot_date: 快照日期
+        chunk_size: 每個語句的資料列數量
+        commit: 是否在寫入後提交交易
+        
+    Returns:
+        int: 寫入的資料列數量
+    """
+    rows = []
+    for item in items:
+        statistics = item.get('statistics', {})
+        rows.append({
+            'channel_id': item.get('id'),
+            'date': snapshot_date,
+            'view_count': int(statistics.get('viewCount', 0)),
+            'subscriber_count': int(statistics.get('subscriberCount', 0)),
+            'video_count': int(statistics.get('videoCount', 0)),
+            'created_at': datetime.utcnow()
+        })
+    
+    update_columns = ['view_count', 'subscriber_count', 'video_count']
+    return _upsert(ChannelStatisticsHistory, rows, ['channel_id', 'date'], update_columns, chunk_size=chunk_size, commit=commit)
+
+def bulk_upsert_rollups(rows, chunk_size=None, commit=True):
+    """
+    批次寫入頻道統計彙總
+    
+    Args:
+        rows: 彙總資料列字典列表
+        chunk_size: 每個語句的資料列數量
+        commit: 是否在寫入後提交交易
+        
+    Returns:
+        int: 寫入的資料列數量
+    """
+    keys = ['channel_id', 'period', 'period_start']
+    update_columns = [column for column in rows[0] if column not in keys] if rows else []
+    return _upsert(ChannelStatisticsRollup, rows, keys, update_columns, chunk_size=chunk_size, commit=commit)
+
+def bulk_upsert_demographics(rows, chunk_size=None, commit=True):
+    """
+    批次寫入或更新受眾輪廓
+    
+    Args:
+        rows: AudienceDemographics資料列字典
+        chunk_size: 每個語句的資料列數量
+        commit: 是否在寫入後提交交易
+        
+    Returns:
+        int: 寫入的資料列數量
+    """
+    return _upsert(
+        AudienceDemographics, rows,
+        ['channel_id', 'date_range_start', 'date_range_end', 'dimension_type', 'dimension_value'],
+        ['views_percentage', 'watch_time_percentage'],
+        chunk_size=chunk_size, commit=commit
+    )
+
+def refresh_channel(youtube_service, channel_id):
+    """
+    以ETag條件式請求刷新已儲存的頻道
+    
+    上游返回304時只更新last_updated，不重新下載與寫入頻道資料。
+    
+    Args:
+        youtube_service: YouTubeService實例
+        channel_id: YouTube頻道ID
+        
+    Returns:
+        bool: 數據是否有變更，頻道不存在時返回None
+    """
+    return _refresh_row(Channel, 'channel_id', channel_id, youtube_service.fetch_channel_if_changed, bulk_upsert_channels)
+
+def refresh_video(youtube_service, video_id):
+    """
+    以ETag條件式請求刷新已儲存的影片
+    
+    Args:
+        youtube_service: YouTubeService實例
+        video_id: YouTube影片ID
+        
+    Returns:
+        bool: 數據是否有變更，影片不存在時返回None
+    """
+    return _refresh_row(Video, 'video_id', video_id, youtube_service.fetch_video_if_changed, bulk_upsert_videos)
+
+def _refresh_row(model, key, item_id, fetch, upsert):
+    """以條件式請求刷新單一資料列"""
+    key_column = getattr(model, key)
+    etag = db.session.execute(select(model.etag).where(key_column == item_id)).scalar()
+    
+    result = fetch(item_id, etag)
+    if result is NOT_MODIFIED:
+        db.session.execute(update(model).where(key_column == item_id).values(last_updated=datetime.utcnow()))
+        db.session.commit()
+        return False
+    
+    item, new_etag = result
+    if item is None:
+        return None
+    
+    upsert([item], commit=False)
+    db.session.execute(update(model).where(key_column == item_id).values(etag=new_etag))
+    db.session.commit()
+    return True
+
+def bulk_update_channel_statistics(items, commit=True):
+    """
+    只更新已儲存頻道的統計欄位（用於只請求statistics的刷新）
+    
+    Args:
+        items: 只包含id與statistics的頻道項目
+        commit: 是否在寫入後提交交易
+        
+    Returns:
+        int: 更新的頻道數量
+    """
+    if not items:
+        return 0
+    
+    now = datetime.utcnow()
+    rows = [
+        {
+            'b_channel_id': item['id'],
+            'view_count': int(item.get('statistics', {}).get('viewCount', 0)),
+            'subscriber_count': int(item.get('statistics', {}).get('subscriberCount', 0)),
+            'video_count': int(item.get('statistics', {}).get('videoCount', 0)),
+            'last_updated': now
+        }
+        for item in items
+    ]
+    stmt = (
+        update(Channel.__table__)
+        .where(Channel.__table__.c.channel_id == bindparam('b_channel_id'))
+        .values(
+            view_count=bindparam('view_count'),
+            subscriber_count=bindparam('subscriber_count'),
+            video_count=bindparam('video_count'),
+            last_updated=bindparam('last_updated')
+        )
+    )
+    
+    try:
+        db.session.execute(stmt, rows)
+        if commit:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return len(rows)
+
+def ensure_etag_columns():
+    """
+    為既有資料庫加入channels.etag與videos.etag欄位（create_all不會修改既有資料表）
+    
+    Returns:
+        list: 新增了欄位的資料表名稱
+    """
+    inspector = inspect(db.engine)
+    added = []
+    for model in (Channel, Video):
+        if 'etag' not in {column['name'] for column in inspector.get_columns(model.__tablename__)}:
+            db.session.execute(text(f'ALTER TABLE {model.__tablename__} ADD COLUMN etag VARCHAR(64)'))
+            added.append(model.__tablename__)
+    
+    db.session.commit()
+    return added
+
+def ensure_video_duration_column():
+    """
+    為既有資料庫加入videos.duration_seconds欄位與索引（create_all不會修改既有資料表）
+    
+    Returns:
+        bool: 是否新增了欄位
+    """
+    inspector = inspect(db.engine)
+    added = 'duration_seconds' not in {column['name'] for column in inspector.get_columns(Video.__tablename__)}
+    if added:
+        db.session.execute(text(f'ALTER TABLE {Video.__tablename__} ADD COLUMN duration_seconds INTEGER'))
+    
+    existing = {index['name'] for index in inspector.get_indexes(Video.__tablename__)}
+    for index in Video.__table__.indexes:
+        if index.name not in existing and 'duration_seconds' in index.columns:
+            index.create(db.session.connection())
+    
+    db.session.commit()
+    return added
+
+def backfill_video_durations(chunk_size=None):
+    """
+    為尚未解析長度的既有影片填入duration_seconds
+    
+    依主鍵分批讀取並在每批後提交，中斷後重新執行只會處理剩餘的影片。
+    先前以0秒儲存的直播與預告影片（P0D）會先清回NULL，留待結束後重新抓取。
+    
+    Args:
+        chunk_size: 每批的影片數量
+        
+    Returns:
+        dict: 已更新、無法解析與清除為未知長度的影片數量
+    """
+    chunk_size = chunk_size or Config.INGEST_CHUNK_SIZE
+    ensure_video_duration_column()
+    
+    stmt = (
+        update(Video.__table__)
+        .where(Video.__table__.c.id == bindparam('b_id'))
+        .values(duration_seconds=bindparam('duration_seconds'))
+    )
+    
+    last_id = 0
+    updated = 0
+    unparsed = 0
+    try:
+        cleared = db.session.execute(
+            update(Video.__table__)
+            .where(Video.__table__.c.duration_seconds == 0)
+            .values(duration_seconds=None)
+        ).rowcount
+        db.session.commit()
+        
+        while True:
+            rows = db.session.execute(
+                select(Video.id, Video.duration)
+                .where(Video.id > last_id, Video.duration_seconds.is_(None), Video.duration.is_not(None))
+                .order_by(Video.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            
+            params = [
+                {'b_id': video_id, 'duration_seconds': seconds}
+                for (video_id, _), seconds in zip(rows, parse_durations([duration for _, duration in rows]))
+                if seconds is not None
+            ]
+            if params:
+                db.session.execute(stmt, params)
+            db.session.commit()
+            
+            updated += len(params)
+            unparsed += len(rows) - len(params)
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    logger.info(f"影片長度回填完成: 更新{updated}筆，無法解析{unparsed}筆，清除{cleared}筆")
+    return {'updated': updated, 'unparsed': unparsed, 'cleared': cleared}
@@ -0,0 +1,217 @@
+import logging
+from datetime import datetime
+import numpy as np
+from sqlalchemy import select
+from src.models.user import db
+from src.models.channel import Video
+from src.services.duration import parse_duration, SHORTS_MAX_SECONDS, LONG_FORM_MIN_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 分佈統計輸出的百分位數
+DISTRIBUTION_PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+# 以IQR判定離群值的倍數
+OUTLIER_IQR_FACTOR = 1.5
+
+# 每個分佈列出的最高離群影片數量
+TOP_OUTLIERS = 5
+
+# 影片長度分組：(名稱, 上限秒數)，上限包含在該組內
+DURATION_BUCKETS = (
+    ('shorts', SHORTS_MAX_SECONDS),
+    ('short', 240),
+    ('medium', LONG_FORM_MIN_SECONDS),
+    ('long', None)
+)
+DURATION_BUCKET_EDGES = np.array([limit for _, limit in DURATION_BUCKETS if limit is not None], dtype=np.float64)
+
+def load_channel_videos(channel_id):
+    """
+    以欄位tuple讀取頻道的全部影片並轉換為NumPy陣列
+    
+    Args:
+        channel_id: YouTube頻道ID
+        
+    Returns:
+        dict: 各欄位的陣列，頻道沒有已儲存的影片時返回None
+    """
+    rows = db.session.execute(
+        select(
+            Video.video_id, Video.published_at, Video.view_count, Video.like_count, Video.comment_count,
+            Video.duration_seconds, Video.duration
+        )
+        .where(Video.channel_id == channel_id)
+    ).all()
+    if not rows:
+        return None
+    
+    video_ids, published, views, likes, comments, seconds, durations = zip(*rows)
+    count = len(rows)
+    return {
+        'video_id': np.array(video_ids, dtype=object),
+        'published_at': np.array(published, dtype='datetime64[s]'),
+        'view_count': np.fromiter((value or 0 for value in views), dtype=np.int64, count=count),
+        'like_count': np.fromiter((value or 0 for value in likes), dtype=np.int64, count=count),
+        'comment_count': np.fromiter((value or 0 for value in comments), dtype=np.int64, count=count),
+        # 尚未回填duration_seconds的影片改為解析原始字串
+        'duration_seconds': np.fromiter(
+            (
+                np.nan if value is None else value
+                for value in (
+                    parsed if parsed is not None else parse_duration(duration)
+                    for parsed, duration in zip(seconds, durations)
+                )
+            ),
+            dtype=np.float64, count=count
+        )
+    }
+
+def _round(value):
+    return None if value is None or np.isnan(value) else round(float(value), 2)
+
+def _distribution(values, video_ids):
+    """
+    計算分佈的百分位數與IQR離群值
+    
+    Args:
+        values: 數值陣列（NaN會被略過）
+        video_ids: 對應的影片ID
+        
+    Returns:
+        dict: 數量、平均、百分位數、離群值界線與最高的離群影片
+    """
+    valid = ~np.isnan(values)
+    values = values[valid]
+    if not len(values):
+        return {'count': 0}
+    video_ids = video_ids[valid]
+    
+    quantiles = np.percentile(values, DISTRIBUTION_PERCENTILES)
+    p25 = quantiles[DISTRIBUTION_PERCENTILES.index(25)]
+    p75 = quantiles[DISTRIBUTION_PERCENTILES.index(75)]
+    iqr = p75 - p25
+    lower = p25 - OUTLIER_IQR_FACTOR * iqr
+    upper = p75 + OUTLIER_IQR_FACTOR * iqr
+    
+    high = np.flatnonzero(values > upper)
+    top = high
+    if len(top) > TOP_OUTLIERS:
+        top = top[np.argpartition(values[top], -TOP_OUTLIERS)[-TOP_OUTLIERS:]]
+    top = top[np.argsort(-values[top], kind='stable')]
+    
+    return {
+        'count': int(len(values)),
+        'mean': _round(values.mean()),
+        'min': _round(values.min()),
+        'max': _round(values.max()),
+        'percentiles': {f'p{percentile}': _round(value) for percentile, value in zip(DISTRIBUTION_PERCENTILES, quantiles)},
+        'iqr': _round(iqr),
+        'outlierBounds': {'lower': _round(lower), 'upper': _round(upper)},
+        'outliers': {
+            'low': int(np.count_nonzero(values < lower)),
+            'high': int(len(high)),
+            'top': [{'videoId': video_ids[index], 'value': _round(values[index])} for index in top]
+        }
+    }
+
+def _upload_cadence(published, now):
+    """依發布時間計算上傳頻率、間隔與星期/小時分佈（UTC）"""
+    times = np.sort(published[~np.isnat(published)].astype(np.int64))
+    if not len(times):
+        return {'uploads': 0}
+    
+    gaps = np.diff(times) / 86400.0
+    span_days = (times[-1] - times[0]) / 86400.0
+    now_seconds = now.astype(np.int64)
+    
+    return {
+        'uploads': int(len(times)),
+        'firstUpload': str(times[0].astype('datetime64[s]')),
+        'lastUpload': str(times[-1].astype('datetime64[s]')),
+        'daysSinceLastUpload': _round((now_seconds - times[-1]) / 86400.0),
+        'uploadsPerWeek': _round((len(times) - 1) / span_days * 7) if span_days > 0 else None,
+        'medianGapDays': _round(np.median(gaps)) if len(gaps) else None,
+        'p90GapDays': _round(np.percentile(gaps, 90)) if len(gaps) else None,
+        'longestGapDays': _round(gaps.max()) if len(gaps) else None,
+        'last30Days': int(np.count_nonzero(times >= now_seconds - 30 * 86400)),
+        'last90Days': int(np.count_nonzero(times >= now_seconds - 90 * 86400)),
+        # 1970-01-01為星期四，位移3天後0代表星期一
+        'byWeekday': np.bincount((times // 86400 + 3) % 7, minlength=7).tolist(),
+        'byHourUtc': np.bincount((times % 86400) // 3600, minlength=24).tolist()
+    }
+
+def _duration_breakout(durations, views, interactions, views_per_day):
+    """依影片長度分組彙總觀看、互動與每日觀看"""
+    # 無法解析長度的影片歸入最後的unknown組
+    unknown = len(DURATION_BUCKETS)
+    buckets = np.full(len(durations), unknown, dtype=np.int64)
+    known = ~np.isnan(durations)
+    buckets[known] = np.searchsorted(DURATION_BUCKET_EDGES, durations[known], side='left')
+    
+    slots = unknown + 1
+    counts = np.bincount(buckets, minlength=slots)
+    view_sums = np.bincount(buckets, weights=views, minlength=slots)
+    interaction_sums = np.bincount(buckets, weights=interactions, minlength=slots)
+    total_videos = counts.sum()
+    total_views = view_sums.sum()
+    
+    names = [name for name, _ in DURATION_BUCKETS] + ['unknown']
+    lower_limits = [0] + [limit for _, limit in DURATION_BUCKETS[:-1]] + [None]
+    upper_limits = [limit for _, limit in DURATION_BUCKETS] + [None]
+    
+    breakout = []
+    for index, name in enumerate(names):
+        if not counts[index]:
+            continue
+        members = buckets == index
+        breakout.append({
+            'bucket': name,
+            'minSeconds': lower_limits[index],
+            'maxSeconds': upper_limits[index],
+            'videos': int(counts[index]),
+            'shareOfVideos': _round(counts[index] / total_videos * 100),
+            'views': int(view_sums[index]),
+            'shareOfViews': _round(view_sums[index] / total_views * 100) if total_views else 0,
+            'engagementRate': _round(interaction_sums[index] / view_sums[index] * 100) if view_sums[index] else 0,
+            'medianViews': _round(np.median(views[members])),
+            'medianViewsPerDay': _round(np.nanmedian(views_per_day[members])) if not np.isnan(views_per_day[members]).all() else None
+        })
+    return breakout
+
+def channel_insights(videos, now=None):
+    """
+    以向量運算計算頻道整體的影片洞察
+    
+    Args:
+        videos: load_channel_videos()返回的欄位陣列
+        now: 計算影片年齡的基準時間（預設為目前UTC時間）
+        
+    Returns:
+        dict: 互動率與觀看分佈、每日觀看、上傳頻率與影片長度分組
+    """
+    now = np.datetime64(now or datetime.utcnow(), 's')
+    video_ids = videos['video_id']
+    published = videos['published_at']
+    views = videos['view_count'].astype(np.float64)
+    interactions = (videos['like_count'] + videos['comment_count']).astype(np.float64)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 與Video.from_youtube_data相同：(按讚 + 留言) / 觀看 × 100，沒有觀看的影片不列入
+        engagement = np.where(views > 0, interactions / views * 100, np.nan)
+        # 發布未滿一天的影片以一天計算，避免每日觀看被放大
+        age_days = np.maximum((now - published).astype(np.float64) / 86400.0, 1.0)
+        views_per_day = np.where(np.isnat(published), np.nan, views / age_days)
+    
+    total_views = views.sum()
+    return {
+        'videoCount': int(len(video_ids)),
+        'totalViews': int(total_views),
+        'overallEngagementRate': _round(interactions.sum() / total_views * 100) if total_views else 0,
+        'engagementRate': _distribution(engagement, video_ids),
+        'views': _distribution(views, video_ids),
+        'viewsPerDay': _distribution(views_per_day, video_ids),
+        'uploadCadence': _upload_cadence(published, now),
+        'durationBuckets': _duration_breakout(videos['duration_seconds'], views, interactions, views_per_day),
+        'generatedAt': str(now)
+    }
@@ -0,0 +1,83 @@
+from datetime import datetime
+from src.models.user import db
+
+# 尚未結束的工作狀態
+ACTIVE_JOB_STATUSES = ('queued', 'running')
+
+class Job(db.Model):
+    """背景工作模型
+    
+    資料表本身即為工作佇列：工作者以條件式UPDATE認領queued的工作，
+    執行中定期寫入checkpoint與心跳，重新啟動後可從checkpoint繼續。
+    """
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)  # 'crawl_uploads', 'backfill_demographics'
+    channel_id = db.Column(db.String(255), nullable=False, index=True)
+    params = db.Column(db.JSON, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+    concurrency = db.Column(db.Integer, default=1)  # 單一工作內同時進行的上游請求數量
+    checkpoint = db.Column(db.JSON)  # 恢復執行所需的狀態，例如下一頁的pageToken
+    progress_done = db.Column(db.Integer, default=0)
+    progress_total = db.Column(db.Integer)
+    run_progress_start = db.Column(db.Integer, default=0)  # 本次執行開始時的進度，用於估算剩餘時間
+    attempts = db.Column(db.Integer, default=0)
+    cancel_requested = db.Column(db.Boolean, default=False)
+    error = db.Column(db.Text)
+    worker_id = db.Column(db.String(100))
+    available_at = db.Column(db.DateTime, default=datetime.utcnow)  # 重試或等待配額重置時延後執行
+    heartbeat_at = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('idx_jobs_status_available', 'status', 'available_at'),
+    )
+    
+    def eta_seconds(self, now=None):
+        """
+        依本次執行的處理速度估算剩餘秒數
+        
+        Returns:
+            float: 剩餘秒數，無法估算時返回None
+        """
+        if self.status != 'running' or not self.progress_total or not self.started_at:
+            return None
+        
+        processed = (self.progress_done or 0) - (self.run_progress_start or 0)
+        elapsed = ((now or datetime.utcnow()) - self.started_at).total_seconds()
+        if processed <= 0 or elapsed <= 0:
+            return None
+        
+        remaining = max(0, self.progress_total - self.progress_done)
+        return round(remaining * elapsed / processed, 1)
+    
+    def to_dict(self):
+        """轉換為字典格式"""
+        percent = None
+        if self.progress_total:
+            percent = round(min(100.0, (self.progress_done or 0) * 100.0 / self.progress_total), 2)
+        
+        return {
+            'jobId': self.id,
+            'type': self.job_type,
+            'channelId': self.channel_id,
+            'params': self.params or {},
+            'status': self.status,
+            'progress': {
+                'done': self.progress_done or 0,
+                'total': self.progress_total,
+                'percent': percent
+            },
+            'etaSeconds': self.eta_seconds(),
+            'attempts': self.attempts or 0,
+            'cancelRequested': bool(self.cancel_requested),
+            'error': self.error,
+            'availableAt': self.available_at.isoformat() if self.available_at else None,
+            'heartbeatAt': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            'startedAt': self.started_at.isoformat() if self.started_at else None,
+            'finishedAt': self.finished_at.isoformat() if self.finished_at else None,
+            'createdAt': self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,475 @@
+import os
+import socket
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select, update
+from src.models.user import db, User
+from src.models.job import Job, ACTIVE_JOB_STATUSES
+from src.services.youtube_service import YouTubeService, DEMOGRAPHIC_DIMENSIONS, _parse_datetime, _playlist_page_video_ids
+from src.services.ingestion_service import bulk_upsert_channels, bulk_upsert_videos, bulk_upsert_demographics
+from src.services.quota_service import QuotaExceededError, quota_tracker
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+class JobCancelled(Exception):
+    """工作已被要求取消"""
+
+class JobType:
+    """工作類型設定"""
+    
+    def __init__(self, name, handler, max_running, requires_user=False):
+        """
+        Args:
+            name: 工作類型名稱
+            handler: 以JobContext呼叫的執行函數
+            max_running: 同時執行中的此類工作上限
+            requires_user: 是否需要用戶的OAuth憑證
+        """
+        self.name = name
+        self.handler = handler
+        self.max_running = max_running
+        self.requires_user = requires_user
+
+# 已註冊的工作類型
+JOB_TYPES = {}
+
+def job_type(name, max_running, requires_user=False):
+    """註冊工作類型的裝飾器"""
+    def register(handler):
+        JOB_TYPES[name] = JobType(name, handler, max_running, requires_user)
+        return handler
+    return register
+
+class JobContext:
+    """提供給工作執行函數的進度與checkpoint介面"""
+    
+    def __init__(self, job):
+        self.job = job
+    
+    @property
+    def state(self):
+        """上次寫入的checkpoint（首次執行時為空字典）"""
+        return dict(self.job.checkpoint or {})
+    
+    def checkpoint(self, state, done=None, total=None):
+        """
+        寫入checkpoint與進度並提交交易
+        
+        執行函數在呼叫前寫入的資料會與checkpoint在同一交易中提交，
+        因此重新執行時不會遺漏或重複處理已完成的部分。
+        
+        Args:
+            state: 恢復執行所需的狀態
+            done: 已完成的數量
+            total: 總數量
+            
+        Raises:
+            JobCancelled: 工作已被要求取消
+        """
+        values = {'checkpoint': state, 'heartbeat_at': datetime.utcnow()}
+        if done is not None:
+            values['progress_done'] = done
+        if total is not None:
+            values['progress_total'] = total
+        
+        db.session.execute(update(Job).where(Job.id == self.job.id).values(**values))
+        db.session.commit()
+        db.session.refresh(self.job)
+        
+        if self.job.cancel_requested:
+            raise JobCancelled()
+
+def enqueue(job_type_name, channel_id, params=None, concurrency=None, user_id=None):
+    """
+    建立工作，相同的工作尚未結束時直接返回該工作
+    
+    Args:
+        job_type_name: 工作類型
+        channel_id: YouTube頻道ID
+        params: 工作參數
+        concurrency: 單一工作內同時進行的上游請求數量
+        user_id: 需要OAuth憑證的工作所屬的用戶ID
+        
+    Returns:
+        tuple: (Job, 是否為新建立的工作)
+    """
+    definition = JOB_TYPES.get(job_type_name)
+    if definition is None:
+        raise ValueError(f"不支援的工作類型: {job_type_name}")
+    if definition.requires_user and user_id is None:
+        raise PermissionError(f"{job_type_name}需要登入後的OAuth憑證")
+    
+    params = dict(params or {})
+    if user_id is not None:
+        params['userId'] = user_id
+    concurrency = max(1, min(concurrency or Config.JOB_CONCURRENCY, Config.JOB_MAX_CONCURRENCY))
+    
+    for existing in Job.query.filter(
+        Job.job_type == job_type_name,
+        Job.channel_id == channel_id,
+        Job.status.in_(ACTIVE_JOB_STATUSES)
+    ).all():
+        if (existing.params or {}) == params:
+            return existing, False
+    
+    job = Job(job_type=job_type_name, channel_id=channel_id, params=params, concurrency=concurrency)
+    db.session.add(job)
+    db.session.commit()
+    return job, True
+
+def cancel(job_id):
+    """
+    取消工作：排隊中的工作直接取消，執行中的工作在下次checkpoint時停止
+    
+    Returns:
+        Job: 工作，不存在時返回None
+    """
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return None
+    
+    if job.status == 'queued':
+        job.status = 'cancelled'
+        job.finished_at = datetime.utcnow()
+    elif job.status == 'running':
+        job.cancel_requested = True
+    db.session.commit()
+    return job
+
+def recover_stale_jobs(timeout=None):
+    """
+    將心跳逾時的執行中工作重新排入佇列（工作者重新啟動或當機時）
+    
+    Returns:
+        int: 重新排入的工作數量
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=timeout or Config.JOB_HEARTBEAT_TIMEOUT)
+    result = db.session.execute(
+        update(Job)
+        .where(Job.status == 'running', Job.heartbeat_at < cutoff)
+        .values(status='queued', worker_id=None, available_at=datetime.utcnow())
+    )
+    db.session.commit()
+    if result.rowcount:
+        logger.info(f"已重新排入 {result.rowcount} 個逾時的工作")
+    return result.rowcount
+
+def claim_next(worker_id):
+    """
+    認領下一個可執行的工作
+    
+    以「WHERE status = 'queued'」的條件式UPDATE認領，多個工作者（包含其他行程）
+    同時認領同一個工作時只有一個會成功，SQLite與PostgreSQL皆適用。
+    每種工作類型的執行上限在認領前檢查，為近似限制。
+    
+    Args:
+        worker_id: 工作者識別字串
+        
+    Returns:
+        Job: 已認領的工作，沒有可執行的工作時返回None
+    """
+    now = datetime.utcnow()
+    running = dict(db.session.execute(
+        select(Job.job_type, func.count()).where(Job.status == 'running').group_by(Job.job_type)
+    ).all())
+    allowed = [name for name, definition in JOB_TYPES.items() if running.get(name, 0) < definition.max_running]
+    if not allowed:
+        return None
+    
+    candidate_ids = db.session.execute(
+        select(Job.id)
+        .where(Job.status == 'queued', Job.available_at <= now, Job.job_type.in_(allowed))
+        .order_by(Job.available_at, Job.id)
+        .limit(5)
+    ).scalars().all()
+    
+    for job_id in candidate_ids:
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == 'queued')
+            .values(
+                status='running',
+                worker_id=worker_id,
+                attempts=Job.attempts + 1,
+                run_progress_start=Job.progress_done,
+                started_at=now,
+                heartbeat_at=now
+            )
+        )
+        db.session.commit()
+        if result.rowcount == 1:
+            return db.session.get(Job, job_id)
+    
+    return None
+
+def run_job(job):
+    """
+    執行已認領的工作並記錄結果
+    
+    配額不足時延後到配額重置後重新排隊（不計入嘗試次數）；
+    其他錯誤在未超過JOB_MAX_ATTEMPTS前以遞增的間隔重試。
+    
+    Args:
+        job: 已認領的工作
+    """
+    definition = JOB_TYPES[job.job_type]
+    values = {'worker_id': None, 'heartbeat_at': datetime.utcnow()}
+    
+    try:
+        definition.handler(JobContext(job))
+        values.update(status='succeeded', error=None, finished_at=datetime.utcnow())
+    except JobCancelled:
+        values.update(status='cancelled', finished_at=datetime.utcnow())
+    except QuotaExceededError as e:
+        db.session.rollback()
+        logger.warning(f"工作 {job.id} 因配額不足延後執行: {e}")
+        values.update(status='queued', error=str(e), attempts=Job.attempts - 1,
+                      available_at=quota_tracker.reset_time().replace(tzinfo=None))
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"執行工作 {job.id} 時發生錯誤: {e}")
+        if job.attempts < Config.JOB_MAX_ATTEMPTS:
+            values.update(status='queued', error=str(e),
+                          available_at=datetime.utcnow() + timedelta(seconds=Config.JOB_RETRY_DELAY * job.attempts))
+        else:
+            values.update(status='failed', error=str(e), finished_at=datetime.utcnow())
+    
+    db.session.execute(update(Job).where(Job.id == job.id).values(**values))
+    db.session.commit()
+
+class JobWorkerPool:
+    """在背景執行緒中認領並執行工作的工作者池"""
+    
+    def __init__(self, app, workers=None, poll_interval=None):
+        """
+        初始化工作者池
+        
+        Args:
+            app: Flask應用程式
+            workers: 工作者執行緒數量
+            poll_interval: 沒有工作時的輪詢間隔（秒）
+        """
+        self.app = app
+        self.workers = workers or Config.JOB_MAX_WORKERS
+        self.poll_interval = poll_interval or Config.JOB_POLL_INTERVAL
+        self._stop = threading.Event()
+        self._threads = []
+        self._last_recovery = 0
+    
+    def start(self):
+        """啟動工作者執行緒"""
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        self._stop.clear()
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        self._threads = [
+            threading.Thread(target=self._loop, args=(f'{prefix}:{index}',), name=f'job-worker-{index}', daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def stop(self):
+        """停止工作者執行緒（執行中的工作會在下次重新啟動時從checkpoint繼續）"""
+        self._stop.set()
+    
+    def _loop(self, worker_id):
+        while not self._stop.is_set():
+            job = None
+            with self.app.app_context():
+                try:
+                    self._recover_if_due()
+                    job = claim_next(worker_id)
+                    if job is not None:
+                        logger.info(f"工作者 {worker_id} 開始執行工作 {job.id} ({job.job_type})")
+                        run_job(job)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"工作者 {worker_id} 發生錯誤: {e}")
+                finally:
+                    db.session.remove()
+            
+            if job is None:
+                self._stop.wait(self.poll_interval)
+    
+    def _recover_if_due(self):
+        """定期重新排入心跳逾時的工作"""
+        now = datetime.utcnow().timestamp()
+        if now - self._last_recovery < Config.JOB_HEARTBEAT_TIMEOUT / 2:
+            return
+        self._last_recovery = now
+        recover_stale_jobs()
+
+def _chunk_pages(service, playlist_id, page_token, pages, cutoff):
+    """依序讀取最多pages頁的影片ID"""
+    video_pages = []
+    for _ in range(pages):
+        response = service.fetch_playlist_page(playlist_id, page_token)
+        video_ids, reached_cutoff = _playlist_page_video_ids(response, cutoff)
+        video_pages.append(video_ids)
+        page_token = response.get('nextPageToken')
+        if reached_cutoff or not page_token:
+            return video_pages, None
+    return video_pages, page_token
+
+@job_type('crawl_uploads', max_running=max(Config.JOB_MAX_WORKERS, 1))
+def crawl_uploads(context):
+    """
+    走訪頻道的完整上傳列表並寫入影片
+    
+    參數: maxVideos（最多寫入的影片數量）、publishedAfter（發布時間下限）
+    每輪依序讀取concurrency頁，再以concurrency個執行緒並行補齊影片資訊，
+    寫入影片後與下一頁的pageToken一起提交checkpoint。
+    """
+    job = context.job
+    params = job.params or {}
+    service = YouTubeService()
+    state = context.state
+    
+    if 'playlistId' not in state:
+        channel = service.get_channel_details(job.channel_id)
+        if not channel:
+            raise ValueError(f"找不到指定的頻道: {job.channel_id}")
+        bulk_upsert_channels([channel], commit=False)
+        
+        total = int(channel.get('statistics', {}).get('videoCount', 0))
+        if params.get('maxVideos'):
+            total = min(total, int(params['maxVideos']))
+        state = {
+            'playlistId': channel.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads'),
+            'pageToken': None,
+            'finished': False
+        }
+        context.checkpoint(state, done=0, total=total)
+    
+    if not state['playlistId']:
+        return
+    
+    max_videos = int(params['maxVideos']) if params.get('maxVideos') else None
+    cutoff = _parse_datetime(params['publishedAfter']) if params.get('publishedAfter') else None
+    done = job.progress_done or 0
+    
+    with ThreadPoolExecutor(max_workers=job.concurrency or 1, thread_name_prefix=f'job-{job.id}') as executor:
+        while not state['finished'] and (max_videos is None or done < max_videos):
+            video_pages, next_token = _chunk_pages(
+                service, state['playlistId'], state['pageToken'], job.concurrency or 1, cutoff
+            )
+            if max_videos is not None:
+                remaining = max_videos - done
+                trimmed = []
+                for video_ids in video_pages:
+                    trimmed.append(video_ids[:max(0, remaining)])
+                    remaining -= len(trimmed[-1])
+                video_pages = trimmed
+            
+            # httplib2連線不是執行緒安全的，每個工作執行緒使用自己的客戶端
+            details = executor.map(
+                lambda video_ids: service.get_videos_details(video_ids, client=service.thread_client()) if video_ids else [],
+                video_pages
+            )
+            videos = [video for page in details for video in page]
+            if videos:
+                bulk_upsert_videos(videos, channel_id=job.channel_id, commit=False)
+            
+            done += sum(len(page) for page in video_pages)
+            state = {
+                **state,
+                'pageToken': next_token,
+                'finished': next_token is None or (max_videos is not None and done >= max_videos)
+            }
+            context.checkpoint(state, done=done)
+
+def _month_windows(start, end):
+    """將日期範圍切分為以月為單位的區間"""
+    windows = []
+    current = start
+    while current <= end:
+        next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        windows.append((current, min(end, next_month - timedelta(days=1))))
+        current = next_month
+    return windows
+
+def demographics_rows(channel_id, start, end, demographics_data):
+    """
+    將受眾輪廓響應轉換為AudienceDemographics資料列
+    
+    Args:
+        channel_id: YouTube頻道ID
+        start: 區間開始日
+        end: 區間結束日
+        demographics_data: get_audience_demographics的結果
+        
+    Returns:
+        list: 資料列字典
+    """
+    rows = []
+    for key, dimension in DEMOGRAPHIC_DIMENSIONS.items():
+        report = demographics_data.get(key)
+        if not report:
+            continue
+        
+        report_rows = report.get('rows') or []
+        total_views = sum(row[1] for row in report_rows)
+        total_minutes = sum(row[2] for row in report_rows)
+        for value, views, minutes in (row[:3] for row in report_rows):
+            rows.append({
+                'channel_id': channel_id,
+                'date_range_start': start,
+                'date_range_end': end,
+                'dimension_type': dimension,
+                'dimension_value': str(value),
+                'views_percentage': round(views * 100.0 / total_views, 2) if total_views else 0,
+                'watch_time_percentage': round(minutes * 100.0 / total_minutes, 2) if total_minutes else 0
+            })
+    return rows
+
+def _user_credentials(user_id):
+    """以儲存的OAuth令牌建立用戶的認證憑證"""
+    from google.oauth2.credentials import Credentials
+    
+    user = db.session.get(User, user_id)
+    if not user or not user.refresh_token:
+        raise PermissionError("用戶沒有可用的OAuth令牌")
+    
+    return Credentials(
+        token=user.access_token,
+        refresh_token=user.refresh_token,
+        token_uri='https://oauth2.googleapis.com/token',
+        client_id=os.environ.get('GOOGLE_CLIENT_ID'),
+        client_secret=os.environ.get('GOOGLE_CLIENT_SECRET')
+    )
+
+@job_type('backfill_demographics', max_running=1, requires_user=True)
+def backfill_demographics(context):
+    """
+    逐月回填受眾輪廓
+    
+    參數: startDate、endDate (YYYY-MM-DD)、dimensions（額外的維度鍵）
+    每完成一個月即提交該月的資料列與checkpoint。
+    """
+    job = context.job
+    params = job.params or {}
+    start = date.fromisoformat(params['startDate'])
+    end = date.fromisoformat(params.get('endDate') or date.today().isoformat())
+    windows = _month_windows(start, end)
+    
+    user_id = params['userId']
+    service = YouTubeService(credentials=_user_credentials(user_id), user_id=user_id)
+    next_window = context.state.get('nextWindow', 0)
+    if job.progress_total is None:
+        context.checkpoint({'nextWindow': next_window}, done=next_window, total=len(windows))
+    
+    for index in range(next_window, len(windows)):
+        window_start, window_end = windows[index]
+        demographics_data = service.get_audience_demographics(
+            job.channel_id, window_start.isoformat(), window_end.isoformat(),
+            extra_dimensions=params.get('dimensions')
+        )
+        if demographics_data['errors']:
+            raise RuntimeError(f"{window_start.isoformat()} 的受眾輪廓維度查詢失敗: {demographics_data['errors']}")
+        
+        bulk_upsert_demographics(demographics_rows(job.channel_id, window_start, window_end, demographics_data), commit=False)
+        context.checkpoint({'nextWindow': index + 1}, done=index + 1)
@@ -0,0 +1,151 @@
+from flask import Blueprint, request, jsonify, url_for
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from src.models.job import Job
+from src.services.job_service import JOB_TYPES, enqueue, cancel
+import logging
+
+logger = logging.getLogger(__name__)
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('', methods=['POST'])
+@jwt_required(optional=True)
+def create_job():
+    """建立背景工作（走訪上傳列表或回填受眾輪廓）"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        job_type = payload.get('type')
+        channel_id = payload.get('channelId')
+        
+        if not job_type or not channel_id:
+            return jsonify({
+                'success': False,
+                'error': {
+                    'code': 'MISSING_PARAMETERS',
+                    'message': '請提供工作類型與頻道ID'
+                }
+            }), 400
+        
+        # 只有需要OAuth憑證的工作記錄用戶，公開數據的相同工作可以共用
+        definition = JOB_TYPES.get(job_type)
+        user_id = get_jwt_identity() if definition and definition.requires_user else None
+        
+        job, created = enqueue(
+            job_type, channel_id,
+            params=payload.get('params'),
+            concurrency=payload.get('concurrency'),
+            user_id=user_id
+        )
+        
+        response = jsonify({
+            'success': True,
+            'data': {
+                'jobId': job.id,
+                'status': job.status,
+                'created': created,
+                'statusUrl': url_for('jobs.get_job', job_id=job.id)
+            }
+        })
+        return response, 202 if created else 200
+    except PermissionError as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'UNAUTHORIZED',
+                'message': str(e)
+            }
+        }), 401
+    except (ValueError, TypeError) as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': str(e)
+            }
+        }), 400
+    except Exception as e:
+        logger.error(f"建立背景工作失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'JOB_ERROR',
+                'message': '建立背景工作時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+@jobs_bp.route('', methods=['GET'])
+def list_jobs():
+    """列出最近的背景工作"""
+    try:
+        query = Job.query
+        if request.args.get('status'):
+            query = query.filter(Job.status == request.args['status'])
+        if request.args.get('channelId'):
+            query = query.filter(Job.channel_id == request.args['channelId'])
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        
+        jobs = query.order_by(Job.id.desc()).limit(limit).all()
+        return jsonify({
+            'success': True,
+            'data': {
+                'jobs': [job.to_dict() for job in jobs]
+            }
+        })
+    except Exception as e:
+        logger.error(f"列出背景工作失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'JOB_ERROR',
+                'message': '列出背景工作時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """獲取背景工作的狀態、進度與預估剩餘時間"""
+    job = Job.query.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'NOT_FOUND',
+                'message': '找不到指定的工作'
+            }
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': job.to_dict()
+    })
+
+@jobs_bp.route('/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消背景工作"""
+    try:
+        job = cancel(job_id)
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': {
+                    'code': 'NOT_FOUND',
+                    'message': '找不到指定的工作'
+                }
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': job.to_dict()
+        })
+    except Exception as e:
+        logger.error(f"取消背景工作失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'JOB_ERROR',
+                'message': '取消背景工作時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
@@ -3,16 +3,25 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+import time
+from flask import Flask, send_from_directory, request, g
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from src.models.user import db
+from src.models.table_stats import TableRowCount  # 註冊資料表列數計數器與ORM事件
+from src.models.job import Job
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.channel import channel_bp
 from src.routes.system import system_bp
+from src.routes.channel_analytics import channel_analytics_bp
+from src.routes.jobs import jobs_bp
+from src.routes.search import search_bp
 from src.config import config
+from src.services.quota_service import QuotaExceededError
+from src.services.metrics import HTTP_REQUEST_DURATION, instrument_database
 import logging
+import click
 
 # 設定日誌
 logging.basicConfig(
@@ -38,12 +47,96 @@ def create_app(config_name='default'):
     app.register_blueprint(user_bp, url_prefix='/api/users')
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(channel_bp, url_prefix='/api/channel')
+    app.register_blueprint(channel_analytics_bp, url_prefix='/api/channel')
     app.register_blueprint(system_bp, url_prefix='/api/system')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
     
     # 初始化數據庫
     db.init_app(app)
     with app.app_context():
         db.create_all()
+        from src.services.ingestion_service import ensure_etag_columns, ensure_video_duration_column
+        ensure_etag_columns()
+        ensure_video_duration_column()
+        instrument_database(db.engine)
+        try:
+            from src.services.search_service import ensure_search_index
+            ensure_search_index()
+        except Exception as e:
+            # 例如SQLite未編譯FTS5，本地搜尋無法使用但不影響其他功能
+            logging.getLogger(__name__).warning(f"建立本地全文索引失敗: {e}")
+    
+    # 記錄每個藍圖與路由的請求延遲
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request_latency(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                request.blueprint or '',
+                request.url_rule.rule if request.url_rule else 'unmatched',
+                request.method,
+                str(response.status_code)
+            )
+        return response
+    
+    # 頻道統計快照
+    @app.cli.command('snapshot-statistics')
+    def snapshot_statistics():
+        """立即為所有追蹤中的頻道寫入今日統計快照"""
+        from src.services.snapshot_service import StatisticsSnapshotter
+        print(StatisticsSnapshotter().run())
+    
+    @app.cli.command('recount-tables')
+    def recount_tables():
+        """以COUNT(*)校正資料表列數計數器"""
+        from src.models.table_stats import recount
+        print(recount())
+    
+    @app.cli.command('rebuild-rollups')
+    @click.argument('start_date')
+    @click.argument('end_date')
+    def rebuild_rollups(start_date, end_date):
+        """依每日快照重建週/月統計彙總 (日期格式 YYYY-MM-DD)"""
+        from datetime import date
+        from src.services.rollup_service import rollup_engine
+        written = rollup_engine.rebuild(date.fromisoformat(start_date), date.fromisoformat(end_date))
+        print(f'已寫入 {written} 筆彙總')
+    
+    @app.cli.command('backfill-durations')
+    @click.option('--chunk-size', type=int, default=None, help='每批的影片數量')
+    def backfill_durations(chunk_size):
+        """加入videos.duration_seconds欄位並為既有影片回填秒數"""
+        from src.services.ingestion_service import backfill_video_durations
+        print(backfill_video_durations(chunk_size=chunk_size))
+    
+    @app.cli.command('refresh-columnar')
+    @click.option('--full', is_flag=True, help='忽略水位完整重建')
+    def refresh_columnar(full):
+        """刷新影片與統計歷史的欄位快照"""
+        from src.services.columnar_service import columnar_store
+        print(columnar_store.run(full=full))
+    
+    @app.cli.command('run-jobs')
+    @click.option('--workers', type=int, default=None, help='工作者執行緒數量')
+    def run_jobs(workers):
+        """在前景執行背景工作者與排程（以WSGI伺服器部署時由這個獨立程序處理）"""
+        from src.services.job_service import JobWorkerPool
+        pool = JobWorkerPool(app, workers=workers or app.config['JOB_MAX_WORKERS'] or 1)
+        pool.start()
+        schedulers = start_schedulers(app)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pool.stop()
+            for scheduler in schedulers:
+                scheduler.stop()
     
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
@@ -51,7 +144,7 @@ def create_app(config_name='default'):
         static_folder_path = app.static_folder
         if static_folder_path is None:
                 return "Static folder not configured", 404
-
+        
         if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
             return send_from_directory(static_folder_path, path)
         else:
@@ -72,6 +165,17 @@ def create_app(config_name='default'):
             }
         }, 404
     
+    @app.errorhandler(QuotaExceededError)
+    def quota_exceeded(error):
+        return {
+            'success': False,
+            'error': {
+                'code': 'QUOTA_EXCEEDED',
+                'message': 'API配額超限',
+                'details': str(error)
+            }
+        }, 429
+    
     @app.errorhandler(500)
     def internal_error(error):
         return {
@@ -84,7 +188,61 @@ def create_app(config_name='default'):
     
     return app
 
+def start_job_workers(app):
+    """
+    在伺服器行程內啟動背景工作者（JOB_MAX_WORKERS為0時不啟動）
+    
+    只由伺服器啟動入口呼叫，匯入應用程式（flask指令、WSGI伺服器、效能測試）不會啟動工作者。
+    
+    Args:
+        app: Flask應用程式
+    """
+    if not app.config.get('JOB_MAX_WORKERS') or app.config.get('TESTING'):
+        return None
+    from src.services.job_service import JobWorkerPool
+    app.extensions['job_workers'] = JobWorkerPool(app, app.config['JOB_MAX_WORKERS'])
+    app.extensions['job_workers'].start()
+    return app.extensions['job_workers']
+
+def start_schedulers(app):
+    """
+    啟動定期的統計快照與欄位快照刷新排程（間隔為0時不啟動）
+    
+    與start_job_workers相同，只由伺服器入口與run-jobs呼叫；
+    WSGI worker與其他flask指令匯入應用程式時不會各自啟動一份，重複消耗配額。
+    
+    Args:
+        app: Flask應用程式
+        
+    Returns:
+        list: 已啟動的排程器
+    """
+    if app.config.get('TESTING'):
+        return []
+    
+    schedulers = []
+    if app.config.get('SNAPSHOT_INTERVAL_SECONDS'):
+        from src.services.snapshot_service import SnapshotScheduler
+        app.extensions['snapshot_scheduler'] = SnapshotScheduler(app, app.config['SNAPSHOT_INTERVAL_SECONDS'])
+        schedulers.append(app.extensions['snapshot_scheduler'])
+    
+    if app.config.get('COLUMNAR_REFRESH_SECONDS'):
+        from src.services.snapshot_service import SnapshotScheduler
+        from src.services.columnar_service import columnar_store
+        app.extensions['columnar_scheduler'] = SnapshotScheduler(
+            app, app.config['COLUMNAR_REFRESH_SECONDS'],
+            snapshotter_factory=lambda: columnar_store,
+            name='columnar-refresh'
+        )
+        schedulers.append(app.extensions['columnar_scheduler'])
+    
+    for scheduler in schedulers:
+        scheduler.start()
+    return schedulers
+
 app = create_app()
 
 if __name__ == '__main__':
+    start_job_workers(app)
+    start_schedulers(app)
     app.run(host='0.0.0.0', port=5005, debug=False)
@@ -0,0 +1,302 @@
+import os
+import time
+import shutil
+import threading
+from bisect import bisect_left
+
+# 行程啟動時間，用於計算運行時間
+PROCESS_START_TIME = time.time()
+
+# 預設延遲直方圖區間（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    """跳脫標籤值中的特殊字元"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(label_names, label_values, extra=None):
+    """將標籤格式化為Prometheus文字格式"""
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    """格式化數值"""
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class Counter:
+    """單調遞增的計數器"""
+    
+    metric_type = 'counter'
+    
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.exposition_name = name + '_total'
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values, amount=1):
+        """
+        增加計數
+        
+        Args:
+            *label_values: 依label_names順序的標籤值
+            amount: 增加的數量
+        """
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def samples(self):
+        """產生 (名稱, 標籤, 數值) 樣本"""
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield self.exposition_name, _format_labels(self.label_names, label_values), value
+
+class Histogram:
+    """固定區間的直方圖"""
+    
+    metric_type = 'histogram'
+    
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value, *label_values):
+        """
+        記錄一次觀測值
+        
+        Args:
+            value: 觀測值（秒）
+            *label_values: 依label_names順序的標籤值
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # 每個區間的非累積計數，最後一格為+Inf
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def time(self, *label_values):
+        """以context manager計時"""
+        return _Timer(self, label_values)
+    
+    def samples(self):
+        """產生 (名稱, 標籤, 數值) 樣本"""
+        with self._lock:
+            series_items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items()]
+        for label_values, (counts, total, count) in sorted(series_items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield (
+                    self.name + '_bucket',
+                    _format_labels(self.label_names, label_values, ('le', _format_value(float(bound)))),
+                    cumulative
+                )
+            yield self.name + '_sum', _format_labels(self.label_names, label_values), total
+            yield self.name + '_count', _format_labels(self.label_names, label_values), count
+
+class _Timer:
+    """直方圖計時器"""
+    
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+        return False
+
+class GaugeCallback:
+    """在輸出時才透過回呼函數取值的儀表"""
+    
+    metric_type = 'gauge'
+    
+    def __init__(self, name, documentation, callback, label_names=()):
+        """
+        Args:
+            callback: 返回 {標籤值tuple: 數值} 的函數
+        """
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.label_names = tuple(label_names)
+    
+    def samples(self):
+        """產生 (名稱, 標籤, 數值) 樣本"""
+        for label_values, value in sorted(self.callback().items()):
+            yield self.name, _format_labels(self.label_names, label_values), value
+
+class MetricsRegistry:
+    """行程內的指標註冊表"""
+    
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric):
+        """註冊指標，同名指標只註冊一次"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+    
+    def counter(self, name, documentation, label_names=()):
+        """建立或取得計數器"""
+        return self.register(Counter(name, documentation, label_names))
+    
+    def histogram(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        """建立或取得直方圖"""
+        return self.register(Histogram(name, documentation, label_names, buckets))
+    
+    def gauge_callback(self, name, documentation, callback, label_names=()):
+        """建立或取得回呼儀表"""
+        return self.register(GaugeCallback(name, documentation, callback, label_names))
+    
+    def render(self):
+        """
+        以Prometheus文字格式輸出所有指標
+        
+        Returns:
+            str: Prometheus exposition格式文字
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        
+        lines = []
+        for metric in metrics:
+            name = getattr(metric, 'exposition_name', metric.name)
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.metric_type}')
+            for sample_name, labels, value in metric.samples():
+                lines.append(f'{sample_name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+def memory_rss_bytes():
+    """
+    獲取目前行程的常駐記憶體（RSS）
+    
+    Returns:
+        int: 位元組數，無法取得時返回None
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS以位元組為單位，Linux以KB為單位
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except Exception:
+        return None
+
+def uptime_seconds():
+    """獲取行程運行時間（秒）"""
+    return time.time() - PROCESS_START_TIME
+
+def disk_usage(path='.'):
+    """
+    獲取路徑所在磁碟的使用量
+    
+    Returns:
+        dict: total、used、free位元組數
+    """
+    usage = shutil.disk_usage(path)
+    return {'total': usage.total, 'used': usage.used, 'free': usage.free}
+
+# 全域指標註冊表
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds', 'Flask請求處理延遲',
+    ('blueprint', 'route', 'method', 'status')
+)
+YOUTUBE_API_DURATION = registry.histogram(
+    'youtube_api_request_duration_seconds', 'YouTube上游API呼叫延遲',
+    ('method',)
+)
+YOUTUBE_API_ERRORS = registry.counter(
+    'youtube_api_errors', 'YouTube上游API呼叫錯誤次數',
+    ('method',)
+)
+YOUTUBE_API_COALESCED = registry.counter(
+    'youtube_api_coalesced', '與進行中的相同呼叫合併而未送出的YouTube API請求次數',
+    ('method',)
+)
+LOCAL_SEARCH_REQUESTS = registry.counter(
+    'local_search_requests', '本地全文搜尋次數（local為本地回答，fallback為改呼叫search.list）',
+    ('index', 'outcome')
+)
+SEARCH_QUOTA_SAVED = registry.counter(
+    'search_quota_units_saved', '由本地全文搜尋回答而省下的search.list配額單位'
+)
+DB_QUERY_DURATION = registry.histogram(
+    'db_query_duration_seconds', '資料庫查詢延遲',
+    ('statement',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+def _cache_stats():
+    from src.services.cache_service import response_cache
+    stats = response_cache.stats()
+    return {(name,): stats[name] for name in ('hits', 'misses', 'evictions', 'expirations', 'size', 'hitRate')}
+
+registry.gauge_callback('youtube_response_cache', 'YouTube響應緩存統計', _cache_stats, ('stat',))
+registry.gauge_callback('process_uptime_seconds', '行程運行時間', lambda: {(): uptime_seconds()})
+registry.gauge_callback('process_resident_memory_bytes', '行程常駐記憶體', lambda: {(): memory_rss_bytes() or 0})
+
+def instrument_database(engine):
+    """
+    以SQLAlchemy事件記錄資料庫查詢時間
+    
+    Args:
+        engine: SQLAlchemy Engine
+    """
+    from sqlalchemy import event
+    
+    def observe(context, statement):
+        # 開始時間存放在本次執行的上下文，記錄後清除，不會殘留在連線或上下文上
+        started = getattr(context, '_query_started', None)
+        if started is None:
+            return
+        context._query_started = None
+        # 以語句類型作為標籤，避免標籤數量無限增長
+        DB_QUERY_DURATION.observe(time.perf_counter() - started, statement.lstrip().split(' ', 1)[0].upper())
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        observe(context, statement)
+    
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(exception_context):
+        # 失敗的語句同樣計時（例如逾時或鎖等待），否則慢查詢失敗時會從延遲分佈中消失
+        if exception_context.statement is not None:
+            observe(exception_context.execution_context, exception_context.statement)
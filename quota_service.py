@@ -0,0 +1,287 @@
+import os
+import json
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from src.config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows沒有fcntl，只能在單一程序內協調計數
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# YouTube API配額於太平洋時間午夜重置
+PACIFIC = ZoneInfo('America/Los_Angeles')
+
+# 各方法的配額單位成本（依官方文件）
+QUOTA_COSTS = {
+    'search.list': 100,
+    'channels.list': 1,
+    'playlistItems.list': 1,
+    'videos.list': 1,
+    'reports.query': 1
+}
+
+# 方法所屬的API服務，未列出的方法屬於YouTube Data API
+METHOD_SERVICES = {
+    'reports.query': 'youtubeAnalyticsAPI'
+}
+
+# 成本大於等於此值的呼叫視為高成本呼叫
+EXPENSIVE_CALL_COST = 100
+
+class QuotaExceededError(Exception):
+    """API配額不足時拋出的例外"""
+    
+    def __init__(self, service, method, cost, remaining):
+        self.service = service
+        self.method = method
+        self.cost = cost
+        self.remaining = remaining
+        super().__init__(f"{service}配額不足：{method}需要{cost}單位，剩餘{remaining}單位")
+
+class QuotaTracker:
+    """YouTube API每日配額計量器
+    
+    指定state_file時，計數由所有共用此檔案的程序（各WSGI worker、flask run-jobs）共同維護：
+    每次扣除或退回都在檔案鎖內讀取最新計數、檢查並累加後立即寫回，
+    因此每日配額與QUOTA_RESERVE是全域而非逐程序計算，程序異常結束也不會遺失已送出的呼叫。
+    """
+    
+    def __init__(self, state_file=None, limits=None, reserve=0):
+        """
+        初始化配額計量器
+        
+        Args:
+            state_file: 多個程序共用的JSON計數檔案路徑（None表示只保存在記憶體）
+            limits: 各API服務的每日配額上限
+            reserve: 保留給低成本呼叫的配額，高成本呼叫不得使用
+        """
+        self.state_file = state_file
+        self.limits = limits or {}
+        self.reserve = reserve
+        self._lock = threading.Lock()
+        # 最後一次讀寫時計數檔案的 (inode, 修改時間, 大小)，未變更時不需重新解析
+        self._stamp = None
+        self._day = self._current_day()
+        self._usage = {}
+        if self.state_file:
+            self._load()
+    
+    @staticmethod
+    def _current_day():
+        """獲取目前的太平洋時間日期"""
+        return datetime.now(PACIFIC).date().isoformat()
+    
+    @staticmethod
+    def _file_stamp(stat):
+        # 每次寫入都以os.replace換上新檔案，inode改變即表示其他程序寫入過
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+    
+    def _load(self):
+        """從檔案載入今日的計數（呼叫者需持有鎖；檔案自上次讀寫後未變更時沿用記憶體中的計數）"""
+        try:
+            stamp = self._file_stamp(os.stat(self.state_file))
+        except FileNotFoundError:
+            return
+        if stamp == self._stamp:
+            return
+        
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception as e:
+            logger.warning(f"無法載入配額計數檔案: {e}")
+            return
+        
+        self._stamp = stamp
+        if state.get('day') == self._current_day():
+            self._day = state['day']
+            self._usage = state.get('usage', {})
+    
+    def _persist(self):
+        """將計數寫入檔案（呼叫者需持有鎖與檔案鎖）"""
+        try:
+            # 暫存檔名包含程序ID，避免不同程序互相覆寫寫到一半的暫存檔
+            tmp_file = f'{self.state_file}.{os.getpid()}.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'day': self._day, 'usage': self._usage}, f)
+            os.replace(tmp_file, self.state_file)
+            self._stamp = self._file_stamp(os.stat(self.state_file))
+        except Exception as e:
+            logger.warning(f"無法寫入配額計數檔案: {e}")
+    
+    @contextmanager
+    def _transaction(self, write=True):
+        """
+        在程序內的鎖與跨程序的檔案鎖內讀取最新計數，結束時寫回
+        
+        讀取、檢查、累加與寫回對共用同一檔案的所有程序是原子的；
+        區塊內拋出例外（例如配額不足）時不寫回。
+        
+        Args:
+            write: 是否在區塊結束後寫回檔案（只讀取狀態時為False）
+        """
+        with self._lock:
+            if not self.state_file:
+                self._roll_over()
+                yield
+                return
+            
+            with open(f'{self.state_file}.lock', 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._load()
+                    self._roll_over()
+                    yield
+                    if write:
+                        self._persist()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _roll_over(self):
+        """跨過太平洋時間午夜時重置計數（呼叫者需持有鎖）"""
+        day = self._current_day()
+        if day != self._day:
+            self._day = day
+            self._usage = {}
+    
+    def _service_used(self, service):
+        """獲取服務今日已使用的配額（呼叫者需持有鎖）"""
+        return sum(entry['units'] for entry in self._usage.get(service, {}).values())
+    
+    def _ensure_available(self, service, method, cost):
+        """
+        檢查配額是否足夠（呼叫者需持有鎖）
+        
+        高成本呼叫（例如search.list）不得動用保留配額，
+        讓低成本的list呼叫在配額接近用盡時仍可運作。
+        """
+        limit = self.limits.get(service)
+        if limit is None:
+            return
+        
+        remaining = limit - self._service_used(service)
+        required = cost + (self.reserve if cost >= EXPENSIVE_CALL_COST else 0)
+        if remaining < required:
+            raise QuotaExceededError(service, method, cost, remaining)
+    
+    def _add(self, service, method, calls, cost):
+        """累加方法的呼叫次數與配額單位（呼叫者需持有鎖）"""
+        entry = self._usage.setdefault(service, {}).setdefault(method, {'calls': 0, 'units': 0})
+        entry['calls'] += calls
+        entry['units'] += cost
+    
+    def check(self, method):
+        """
+        在呼叫前檢查配額是否足夠（不扣除配額）
+        
+        只用於預先判斷；實際送出請求前應呼叫acquire()，
+        否則並行的請求可能同時通過檢查而超支。
+        
+        Args:
+            method: API方法名稱 (例如 search.list)
+            
+        Raises:
+            QuotaExceededError: 配額不足
+        """
+        service = METHOD_SERVICES.get(method, 'youtubeDataAPI')
+        with self._transaction(write=False):
+            self._ensure_available(service, method, QUOTA_COSTS.get(method, 1))
+    
+    def acquire(self, method):
+        """
+        檢查配額並預先扣除一次呼叫的成本
+        
+        檢查與扣除在同一個鎖內完成。請求送出後不論成功或失敗都會消耗配額，
+        因此在送出前扣除；請求最後沒有送達上游時以release()退回。
+        
+        Args:
+            method: API方法名稱 (例如 search.list)
+            
+        Raises:
+            QuotaExceededError: 配額不足，未扣除任何配額
+        """
+        service = METHOD_SERVICES.get(method, 'youtubeDataAPI')
+        cost = QUOTA_COSTS.get(method, 1)
+        
+        with self._transaction():
+            self._ensure_available(service, method, cost)
+            self._add(service, method, 1, cost)
+    
+    def release(self, method):
+        """
+        退回acquire()預先扣除、但沒有送達上游的呼叫
+        
+        Args:
+            method: API方法名稱
+        """
+        service = METHOD_SERVICES.get(method, 'youtubeDataAPI')
+        
+        with self._transaction():
+            self._add(service, method, -1, -QUOTA_COSTS.get(method, 1))
+    
+    def record(self, method):
+        """
+        記錄一次已送出的API呼叫（不檢查配額）
+        
+        Args:
+            method: API方法名稱
+        """
+        service = METHOD_SERVICES.get(method, 'youtubeDataAPI')
+        
+        with self._transaction():
+            self._add(service, method, 1, QUOTA_COSTS.get(method, 1))
+    
+    def reset_time(self):
+        """
+        獲取下一次配額重置的時間
+        
+        Returns:
+            datetime: 下一個太平洋時間午夜（UTC）
+        """
+        now = datetime.now(PACIFIC)
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=PACIFIC)
+        return tomorrow.astimezone(timezone.utc)
+    
+    def status(self):
+        """
+        獲取今日配額使用狀況
+        
+        Returns:
+            dict: 各服務及各方法的使用量
+        """
+        with self._transaction(write=False):
+            services = {}
+            for service in ('youtubeDataAPI', 'youtubeAnalyticsAPI'):
+                used = self._service_used(service)
+                limit = self.limits.get(service)
+                services[service] = {
+                    'quotaUsed': used,
+                    'quotaLimit': limit,
+                    'quotaRemaining': max(limit - used, 0) if limit is not None else None,
+                    'methods': {method: dict(entry) for method, entry in self._usage.get(service, {}).items()}
+                }
+        
+        return {
+            'day': self._day,
+            'resetTime': self.reset_time().isoformat().replace('+00:00', 'Z'),
+            'reserve': self.reserve,
+            'services': services
+        }
+
+# 全域配額計量器
+quota_tracker = QuotaTracker(
+    state_file=Config.QUOTA_STATE_FILE,
+    limits={
+        'youtubeDataAPI': Config.YOUTUBE_DATA_API_DAILY_QUOTA,
+        'youtubeAnalyticsAPI': Config.YOUTUBE_ANALYTICS_API_DAILY_QUOTA
+    },
+    reserve=Config.QUOTA_RESERVE
+)
@@ -0,0 +1,281 @@
+import calendar
+import logging
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import select
+from src.models.user import db
+from src.models.channel import ChannelStatisticsHistory, ChannelStatisticsRollup
+from src.services.ingestion_service import bulk_upsert_rollups
+
+logger = logging.getLogger(__name__)
+
+# 支援的彙總期間
+PERIODS = ('week', 'month')
+
+# 計算移動平均時包含的期間數（含本期）
+MOVING_AVERAGE_WINDOWS = {
+    'week': 4,
+    'month': 3
+}
+
+# 每次查詢的頻道數量上限，避免IN子句過長
+CHANNEL_QUERY_CHUNK = 500
+
+def period_bounds(period, day):
+    """
+    獲取日期所屬期間的起訖日
+    
+    Args:
+        period: 'week'（週一開始）或'month'
+        day: 日期
+    
+    Returns:
+        tuple: (期間開始日, 期間結束日)
+    """
+    if period == 'week':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if period == 'month':
+        start = day.replace(day=1)
+        return start, day.replace(day=calendar.monthrange(day.year, day.month)[1])
+    raise ValueError(f"不支援的彙總期間: {period}")
+
+def previous_period_starts(period, period_start, count):
+    """
+    獲取之前count個期間的開始日（由近到遠）
+    
+    Args:
+        period: 彙總期間
+        period_start: 本期開始日
+        count: 期間數量
+    
+    Returns:
+        list: 期間開始日列表
+    """
+    starts = []
+    current = period_start
+    for _ in range(count):
+        current = period_bounds(period, current - timedelta(days=1))[0]
+        starts.append(current)
+    return starts
+
+def _growth_rate(delta, base):
+    """以向量運算計算成長百分比，起始值為0時為NaN"""
+    return np.divide(delta * 100.0, base, out=np.full(len(delta), np.nan), where=base > 0)
+
+def _nullable(value):
+    """將NaN轉為None以寫入資料庫"""
+    return None if np.isnan(value) else float(value)
+
+class RollupEngine:
+    """頻道統計週/月彙總引擎
+    
+    每日快照寫入後，只重新計算該日所屬的週與月，並以NumPy一次處理所有頻道。
+    期間的起始值取自期間開始前一天的快照（若有），否則取期間內第一筆快照，
+    因此相鄰期間的增量可以直接相加。
+    """
+    
+    def update(self, channel_ids, snapshot_date, commit=True):
+        """
+        在新的每日快照寫入後增量更新彙總
+        
+        Args:
+            channel_ids: 有新快照的頻道ID列表
+            snapshot_date: 快照日期
+            commit: 是否在寫入後提交交易
+        
+        Returns:
+            int: 寫入的彙總資料列數量
+        """
+        written = 0
+        for period in PERIODS:
+            period_start, period_end = period_bounds(period, snapshot_date)
+            for start in range(0, len(channel_ids), CHANNEL_QUERY_CHUNK):
+                written += self._update_period(
+                    channel_ids[start:start + CHANNEL_QUERY_CHUNK], period, period_start, period_end
+                )
+        
+        if commit:
+            db.session.commit()
+        return written
+    
+    def rebuild(self, start_date, end_date, channel_ids=None):
+        """
+        依時間順序重建指定日期範圍內的所有彙總（用於回填歷史資料）
+        
+        Args:
+            start_date: 開始日期
+            end_date: 結束日期
+            channel_ids: 頻道ID列表（None表示所有有快照的頻道）
+        
+        Returns:
+            int: 寫入的彙總資料列數量
+        """
+        if channel_ids is None:
+            channel_ids = list(db.session.execute(
+                select(ChannelStatisticsHistory.channel_id).distinct().order_by(ChannelStatisticsHistory.channel_id)
+            ).scalars())
+        
+        written = 0
+        for period in PERIODS:
+            period_start, period_end = period_bounds(period, start_date)
+            # 移動平均依賴前期結果，必須由舊到新計算
+            while period_start <= end_date:
+                for start in range(0, len(channel_ids), CHANNEL_QUERY_CHUNK):
+                    written += self._update_period(
+                        channel_ids[start:start + CHANNEL_QUERY_CHUNK], period, period_start, period_end
+                    )
+                db.session.commit()
+                period_start, period_end = period_bounds(period, period_end + timedelta(days=1))
+        
+        return written
+    
+    def _update_period(self, channel_ids, period, period_start, period_end):
+        """重新計算一個期間內一批頻道的彙總"""
+        if not channel_ids:
+            return 0
+        
+        history = ChannelStatisticsHistory
+        rows = db.session.execute(
+            select(history.channel_id, history.date, history.view_count, history.subscriber_count, history.video_count)
+            .where(
+                history.channel_id.in_(channel_ids),
+                history.date >= period_start - timedelta(days=1),
+                history.date <= period_end
+            )
+            .order_by(history.channel_id, history.date)
+        ).all()
+        if not rows:
+            return 0
+        
+        channels, dates, views, subscribers, videos = zip(*rows)
+        dates = np.array(dates, dtype='datetime64[D]')
+        views = np.array(views, dtype=np.int64)
+        subscribers = np.array(subscribers, dtype=np.int64)
+        videos = np.array(videos, dtype=np.int64)
+        
+        # 資料列已依頻道與日期排序，計算每個頻道的第一筆與最後一筆位置
+        channels = np.array(channels)
+        boundaries = np.flatnonzero(channels[1:] != channels[:-1]) + 1
+        first = np.concatenate(([0], boundaries))
+        last = np.concatenate((boundaries - 1, [len(channels) - 1]))
+        
+        has_baseline = dates[first] < np.datetime64(period_start)
+        days = (last - first + 1) - has_baseline
+        
+        view_delta = views[last] - views[first]
+        subscriber_delta = subscribers[last] - subscribers[first]
+        video_delta = videos[last] - videos[first]
+        view_growth = _growth_rate(view_delta, views[first])
+        subscriber_growth = _growth_rate(subscriber_delta, subscribers[first])
+        
+        group_channels = channels[first]
+        view_moving_avg, subscriber_moving_avg = self._moving_averages(
+            list(group_channels), period, period_start, view_delta, subscriber_delta
+        )
+        
+        now = datetime.utcnow()
+        rollups = []
+        for i in np.flatnonzero(days > 0):
+            rollups.append({
+                'channel_id': str(group_channels[i]),
+                'period': period,
+                'period_start': period_start,
+                'period_end': period_end,
+                'days': int(days[i]),
+                'start_view_count': int(views[first[i]]),
+                'end_view_count': int(views[last[i]]),
+                'start_subscriber_count': int(subscribers[first[i]]),
+                'end_subscriber_count': int(subscribers[last[i]]),
+                'end_video_count': int(videos[last[i]]),
+                'view_delta': int(view_delta[i]),
+                'subscriber_delta': int(subscriber_delta[i]),
+                'video_delta': int(video_delta[i]),
+                'view_growth_rate': _nullable(view_growth[i]),
+                'subscriber_growth_rate': _nullable(subscriber_growth[i]),
+                'view_delta_moving_avg': _nullable(view_moving_avg[i]),
+                'subscriber_delta_moving_avg': _nullable(subscriber_moving_avg[i]),
+                'updated_at': now
+            })
+        
+        return bulk_upsert_rollups(rollups, commit=False)
+    
+    def _moving_averages(self, channel_ids, period, period_start, view_delta, subscriber_delta):
+        """以本期與前幾期的增量計算移動平均"""
+        window = MOVING_AVERAGE_WINDOWS[period]
+        previous_starts = previous_period_starts(period, period_start, window - 1)
+        
+        # 第0欄為本期，其餘依序為前幾期，缺少的期間為NaN
+        view_matrix = np.full((len(channel_ids), window), np.nan)
+        subscriber_matrix = np.full((len(channel_ids), window), np.nan)
+        view_matrix[:, 0] = view_delta
+        subscriber_matrix[:, 0] = subscriber_delta
+        
+        if previous_starts:
+            rollup = ChannelStatisticsRollup
+            rows = db.session.execute(
+                select(rollup.channel_id, rollup.period_start, rollup.view_delta, rollup.subscriber_delta)
+                .where(
+                    rollup.channel_id.in_(channel_ids),
+                    rollup.period == period,
+                    rollup.period_start.in_(previous_starts)
+                )
+            ).all()
+            
+            row_index = {channel_id: i for i, channel_id in enumerate(channel_ids)}
+            column_index = {start: i + 1 for i, start in enumerate(previous_starts)}
+            for channel_id, start, views, subscribers in rows:
+                view_matrix[row_index[channel_id], column_index[start]] = views
+                subscriber_matrix[row_index[channel_id], column_index[start]] = subscribers
+        
+        return np.nanmean(view_matrix, axis=1), np.nanmean(subscriber_matrix, axis=1)
+
+def get_rollups(channel_id, period, start_date=None, end_date=None):
+    """
+    從彙總表查詢頻道在日期範圍內的成長曲線
+    
+    Args:
+        channel_id: YouTube頻道ID
+        period: 'week'或'month'
+        start_date: 開始日期（包含該日所屬期間）
+        end_date: 結束日期
+    
+    Returns:
+        list: 依期間排序的彙總資料
+    """
+    if period not in PERIODS:
+        raise ValueError(f"不支援的彙總期間: {period}")
+    
+    query = ChannelStatisticsRollup.query.filter_by(channel_id=channel_id, period=period)
+    if start_date:
+        query = query.filter(ChannelStatisticsRollup.period_end >= start_date)
+    if end_date:
+        query = query.filter(ChannelStatisticsRollup.period_start <= end_date)
+    
+    return [rollup.to_dict() for rollup in query.order_by(ChannelStatisticsRollup.period_start).all()]
+
+def summarize_growth(rollups):
+    """
+    彙總成長曲線的整體成長率
+    
+    Args:
+        rollups: get_rollups的結果
+    
+    Returns:
+        dict: 整體觀看數與訂閱數成長百分比
+    """
+    if not rollups:
+        return {'views': None, 'subscribers': None}
+    
+    view_base = rollups[0]['viewCount'] - rollups[0]['viewDelta']
+    subscriber_base = rollups[0]['subscriberCount'] - rollups[0]['subscriberDelta']
+    view_total = sum(rollup['viewDelta'] for rollup in rollups)
+    subscriber_total = sum(rollup['subscriberDelta'] for rollup in rollups)
+    
+    return {
+        'views': round(view_total * 100.0 / view_base, 4) if view_base > 0 else None,
+        'subscribers': round(subscriber_total * 100.0 / subscriber_base, 4) if subscriber_base > 0 else None
+    }
+
+# 全域彙總引擎
+rollup_engine = RollupEngine()
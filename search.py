@@ -0,0 +1,89 @@
+from flask import Blueprint, request, jsonify
+from src.services.youtube_service import YouTubeService
+from src.services.search_service import search_channels, search_local
+import logging
+
+logger = logging.getLogger(__name__)
+
+search_bp = Blueprint('search', __name__)
+
+def _search_arguments():
+    """解析搜尋參數，關鍵字為空時拋出ValueError"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        raise ValueError('請提供搜尋關鍵字')
+    max_results = min(max(request.args.get('maxResults', 10, type=int), 1), 50)
+    return query, max_results
+
+@search_bp.route('/channels', methods=['GET'])
+def search_channels_endpoint():
+    """搜尋頻道：先查本地全文索引，結果不足時才呼叫search.list（localOnly=true時只查本地）"""
+    try:
+        query, max_results = _search_arguments()
+        local_only = request.args.get('localOnly', 'false').lower() == 'true'
+        
+        channels, source = search_channels(
+            query, max_results=max_results,
+            youtube_service=None if local_only else YouTubeService()
+        )
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'query': query,
+                'source': source,
+                'channels': channels
+            }
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': str(e)
+            }
+        }), 400
+    except Exception as e:
+        logger.error(f"搜尋頻道失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'SEARCH_ERROR',
+                'message': '搜尋頻道時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
+
+@search_bp.route('/videos', methods=['GET'])
+def search_videos_endpoint():
+    """以本地全文索引搜尋已儲存的影片（不呼叫API）"""
+    try:
+        query, max_results = _search_arguments()
+        videos = search_local('videos', query, max_results)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'query': query,
+                'source': 'local',
+                'videos': [video.to_dict() for video in videos]
+            }
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'INVALID_PARAMETERS',
+                'message': str(e)
+            }
+        }), 400
+    except Exception as e:
+        logger.error(f"搜尋影片失敗: {e}")
+        return jsonify({
+            'success': False,
+            'error': {
+                'code': 'SEARCH_ERROR',
+                'message': '搜尋影片時發生錯誤',
+                'details': str(e)
+            }
+        }), 500
@@ -0,0 +1,294 @@
+import re
+import logging
+from sqlalchemy import text
+from src.models.user import db
+from src.models.channel import Channel, Video
+from src.services.ingestion_service import bulk_upsert_channels
+from src.services.quota_service import QUOTA_COSTS, QuotaExceededError
+from src.services.metrics import LOCAL_SEARCH_REQUESTS, SEARCH_QUOTA_SAVED
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# 全文索引涵蓋的欄位與BM25權重（標題最重要）
+SEARCH_INDEXES = {
+    'channels': (Channel, (('title', 10.0), ('custom_url', 5.0), ('description', 1.0))),
+    'videos': (Video, (('title', 10.0), ('description', 1.0)))
+}
+
+# PostgreSQL tsvector權重等級（依欄位順序）
+_PG_WEIGHTS = ('A', 'B', 'C')
+
+# 查詢詞只保留文字、數字與底線，避免使用者輸入被解讀為FTS語法
+_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# FTS5虛擬表定義中的分詞器設定
+_TOKENIZE_PATTERN = re.compile(r"tokenize\s*=\s*'([^']*)'")
+
+# trigram分詞器能以索引比對的最短查詢詞長度
+_TRIGRAM_MIN_LENGTH = 3
+
+def _terms(query):
+    """將搜尋字串切分為查詢詞（最多8個）"""
+    return _TERM_PATTERN.findall(query or '')[:8]
+
+def _fts_table(table):
+    return f'{table}_fts'
+
+def _trigram():
+    """索引是否使用trigram分詞器（子字串比對）"""
+    return Config.SEARCH_FTS_TOKENIZER.split()[0] == 'trigram'
+
+def _phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+def _like(term):
+    """子字串比對的LIKE樣式（查詢詞只含文字、數字與底線，只需跳脫底線）"""
+    return '%' + term.replace('_', '\\_') + '%'
+
+def _ensure_sqlite(table, columns):
+    """
+    建立外部內容的FTS5虛擬表與同步觸發器，首次建立時由既有資料重建索引
+    
+    虛擬表定義（sqlite_master）中記錄的分詞器與SEARCH_FTS_TOKENIZER不同時，
+    刪除虛擬表與觸發器後以新的分詞器重新建立。
+    """
+    fts = _fts_table(table)
+    tokenizer = Config.SEARCH_FTS_TOKENIZER
+    names = [name for name, _ in columns]
+    column_list = ', '.join(names)
+    new_values = ', '.join(f'new.{name}' for name in names)
+    old_values = ', '.join(f'old.{name}' for name in names)
+    # 只有被索引的欄位實際改變時才更新索引（upsert每次都會覆寫相同的標題與描述）
+    changed = ' OR '.join(f'old.{name} IS NOT new.{name}' for name in names)
+    
+    definition = db.session.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': fts}
+    ).scalar()
+    exists = definition is not None
+    if exists:
+        match = _TOKENIZE_PATTERN.search(definition)
+        current = match.group(1) if match else None
+        if current != tokenizer:
+            logger.info(f"{fts}的分詞器由{current}改為{tokenizer}，重建全文索引")
+            for suffix in ('ai', 'ad', 'au'):
+                db.session.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{suffix}"))
+            db.session.execute(text(f"DROP TABLE {fts}"))
+            exists = False
+    
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column_list}, content='{table}', content_rowid='id', tokenize='{tokenizer}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column_list} ON {table} WHEN {changed} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+    ]
+    for statement in statements:
+        db.session.execute(text(statement))
+    if not exists:
+        db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    return not exists
+
+def _ensure_postgresql(table, columns):
+    """建立由資料庫自動維護的tsvector生成欄位與GIN索引"""
+    vector = ' || '.join(
+        f"setweight(to_tsvector('simple', coalesce({name}, '')), '{weight}')"
+        for (name, _), weight in zip(columns, _PG_WEIGHTS)
+    )
+    db.session.execute(text(
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({vector}) STORED"
+    ))
+    db.session.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{table}_search ON {table} USING GIN (search_vector)"))
+    return False
+
+def ensure_search_index():
+    """
+    建立頻道與影片的全文索引（SQLite為FTS5，PostgreSQL為tsvector）
+    
+    索引由觸發器或生成欄位維護，寫入路徑不需要額外處理。
+    
+    Returns:
+        list: 本次新建並重建索引的資料表
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        ensure = _ensure_sqlite
+    elif dialect == 'postgresql':
+        ensure = _ensure_postgresql
+    else:
+        logger.warning(f"本地全文搜尋不支援此資料庫: {dialect}")
+        return []
+    
+    try:
+        created = [table for table, (_, columns) in SEARCH_INDEXES.items() if ensure(table, columns)]
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return created
+
+def search_local(table, query, limit=10):
+    """
+    以本地全文索引搜尋，依相關性排序
+    
+    SQLite以FTS5的bm25()排序；PostgreSQL沒有內建BM25，以加權的ts_rank_cd代替。
+    所有詞都必須出現：trigram分詞器以子字串比對，其他分詞器與PostgreSQL以前綴比對。
+    
+    Args:
+        table: 'channels' 或 'videos'
+        query: 搜尋字串
+        limit: 最大結果數量
+        
+    Returns:
+        list: 依相關性排序的模型物件
+    """
+    model, columns = SEARCH_INDEXES[table]
+    terms = _terms(query)
+    if not terms:
+        return []
+    
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        rows = _search_sqlite(table, columns, terms, limit)
+    elif dialect == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        rows = db.session.execute(
+            text(
+                f"SELECT id FROM {table} WHERE search_vector @@ to_tsquery('simple', :query) "
+                f"ORDER BY ts_rank_cd('{{0.1, 0.2, 0.4, 1.0}}', search_vector, to_tsquery('simple', :query)) DESC "
+                f"LIMIT :limit"
+            ),
+            {'query': tsquery, 'limit': limit}
+        ).all()
+    else:
+        return []
+    
+    ids = [row[0] for row in rows]
+    if not ids:
+        return []
+    items = {item.id: item for item in model.query.filter(model.id.in_(ids))}
+    return [items[item_id] for item_id in ids if item_id in items]
+
+def _search_sqlite(table, columns, terms, limit):
+    """
+    以FTS5索引搜尋
+    
+    trigram索引無法比對不足3個字元的詞（例如兩個字的中文詞），這些詞改以LIKE篩選內容表；
+    查詢只有短詞時沒有MATCH條件，需掃描整個資料表，並依命中欄位的權重排序。
+    
+    Returns:
+        list: 依相關性排序的 (rowid,) 資料列
+    """
+    fts = _fts_table(table)
+    weights = ', '.join(str(weight) for _, weight in columns)
+    if not _trigram():
+        match = ' '.join(_phrase(term) + '*' for term in terms)
+        return db.session.execute(
+            text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :match ORDER BY bm25({fts}, {weights}) LIMIT :limit"),
+            {'match': match, 'limit': limit}
+        ).all()
+    
+    long_terms = [term for term in terms if len(term) >= _TRIGRAM_MIN_LENGTH]
+    short_terms = [term for term in terms if len(term) < _TRIGRAM_MIN_LENGTH]
+    params = {'limit': limit}
+    conditions = []
+    for index, term in enumerate(short_terms):
+        params[f'term{index}'] = _like(term)
+        conditions.append('(' + ' OR '.join(f"t.{name} LIKE :term{index} ESCAPE '\\'" for name, _ in columns) + ')')
+    
+    if long_terms:
+        params['match'] = ' '.join(_phrase(term) for term in long_terms)
+        where = ' AND '.join([f"{fts} MATCH :match"] + conditions)
+        sql = (
+            f"SELECT {fts}.rowid FROM {fts} JOIN {table} t ON t.id = {fts}.rowid "
+            f"WHERE {where} ORDER BY bm25({fts}, {weights}) LIMIT :limit"
+        )
+    else:
+        score = ' + '.join(
+            f"(CASE WHEN t.{name} LIKE :term{index} ESCAPE '\\' THEN {weight} ELSE 0 END)"
+            for index in range(len(short_terms)) for name, weight in columns
+        )
+        sql = f"SELECT t.id FROM {table} t WHERE {' AND '.join(conditions)} ORDER BY {score} DESC, t.id LIMIT :limit"
+    
+    return db.session.execute(text(sql), params).all()
+
+def search_channels(query, max_results=10, youtube_service=None, min_local_results=None):
+    """
+    搜尋頻道：先查本地索引，結果不足時才呼叫search.list
+    
+    search.list找到的頻道會寫入channels資料表，之後相同的查詢即可由本地回答。
+    
+    Args:
+        query: 搜尋關鍵字
+        max_results: 最大結果數量
+        youtube_service: 需要時呼叫API的YouTubeService（None表示只查本地）
+        min_local_results: 本地結果達到此數量即不呼叫API（預設為SEARCH_MIN_LOCAL_RESULTS與max_results的較小值）
+        
+    Returns:
+        tuple: (頻道字典列表, 來源 'local'、'api' 或 'mixed')
+    """
+    if min_local_results is None:
+        min_local_results = min(max_results, Config.SEARCH_MIN_LOCAL_RESULTS)
+    
+    local = search_local('channels', query, max_results)
+    if len(local) >= min_local_results or youtube_service is None:
+        LOCAL_SEARCH_REQUESTS.inc('channels', 'local')
+        if youtube_service is not None:
+            SEARCH_QUOTA_SAVED.inc(amount=QUOTA_COSTS['search.list'])
+        return [channel.to_dict() for channel in local], 'local'
+    
+    try:
+        items = youtube_service.search_channels(query, max_results=max_results)
+    except QuotaExceededError as e:
+        # 配額不足時以本地結果回應，而不是整個搜尋失敗
+        logger.warning(f"配額不足，搜尋「{query}」只返回本地結果: {e}")
+        LOCAL_SEARCH_REQUESTS.inc('channels', 'quota_exceeded')
+        return [channel.to_dict() for channel in local], 'local'
+    
+    LOCAL_SEARCH_REQUESTS.inc('channels', 'fallback')
+    if items:
+        bulk_upsert_channels(items)
+    
+    # 本地結果在前，再補上API找到的其他頻道
+    results = [channel.to_dict() for channel in local]
+    seen = {channel.channel_id for channel in local}
+    api_ids = [item['id'] for item in items if item['id'] not in seen]
+    if api_ids:
+        stored = {channel.channel_id: channel for channel in Channel.query.filter(Channel.channel_id.in_(api_ids))}
+        results.extend(stored[channel_id].to_dict() for channel_id in api_ids if channel_id in stored)
+    
+    return results[:max_results], 'mixed' if local else 'api'
+
+def index_size_bytes():
+    """
+    獲取全文索引佔用的空間
+    
+    Returns:
+        dict: 各資料表索引的位元組數，無法取得時為None
+    """
+    dialect = db.engine.dialect.name
+    sizes = {}
+    for table in SEARCH_INDEXES:
+        try:
+            if dialect == 'sqlite':
+                # dbstat需要SQLITE_ENABLE_DBSTAT_VTAB，未啟用時返回None
+                size = db.session.execute(
+                    text("SELECT SUM(pgsize) FROM dbstat WHERE name LIKE :pattern"),
+                    {'pattern': f'{_fts_table(table)}%'}
+                ).scalar()
+            elif dialect == 'postgresql':
+                size = db.session.execute(
+                    text(f"SELECT pg_relation_size('idx_{table}_search')")
+                ).scalar()
+            else:
+                size = None
+        except Exception:
+            db.session.rollback()
+            size = None
+        sizes[table] = size
+    return sizes
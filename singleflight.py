@@ -0,0 +1,140 @@
+import asyncio
+import threading
+
+def flight_key(method, params, scope, etag=None):
+    """
+    建立正規化的合併鍵
+    
+    API金鑰與None參數會被略過，其餘參數依名稱排序，
+    確保參數順序不同但意義相同的呼叫對應到同一個鍵。
+    
+    Args:
+        method: API方法名稱 (例如 channels.list)
+        params: 查詢參數（dict或 (名稱, 值) 列表）
+        scope: 憑證範圍（公開數據為'public'，OAuth數據為各用戶的範圍）
+        etag: 條件式請求的ETag
+        
+    Returns:
+        tuple: 合併鍵
+    """
+    items = params.items() if isinstance(params, dict) else params
+    normalized = tuple(sorted(
+        (name, str(value)) for name, value in items
+        if value is not None and name != 'key'
+    ))
+    return (method, scope, etag) + normalized
+
+class _Call:
+    """進行中的同步呼叫"""
+    
+    __slots__ = ('event', 'result', 'error')
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class _AsyncCall:
+    """進行中的asyncio呼叫"""
+    
+    __slots__ = ('task', 'waiters')
+    
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """合併相同鍵的並行呼叫
+    
+    同一個鍵同時只會有一個呼叫在執行，其他呼叫者等待並取得同一個結果或例外。
+    呼叫完成後立即移除，不做任何緩存；執行緒與asyncio呼叫者各自合併。
+    所有等待者拿到的是同一個物件，呼叫者不應修改返回值。
+    
+    asyncio呼叫在獨立的任務中執行，發起的呼叫者被取消時由其他等待者繼續等待，
+    所有等待者都被取消後才取消共用的呼叫。
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}
+    
+    def do(self, key, fn):
+        """
+        在執行緒中執行或加入進行中的呼叫
+        
+        Args:
+            key: 合併鍵
+            fn: 實際執行的函數
+            
+        Returns:
+            tuple: (結果, 是否為合併取得的結果)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+    
+    async def do_async(self, key, fn):
+        """
+        在事件迴圈中執行或加入進行中的呼叫
+        
+        Args:
+            key: 合併鍵
+            fn: 返回協程的函數
+            
+        Returns:
+            tuple: (結果, 是否為合併取得的結果)
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (loop, key)
+        
+        call = self._async_calls.get(loop_key)
+        if call is not None:
+            return await self._wait(call), True
+        
+        call = self._async_calls[loop_key] = _AsyncCall(loop.create_task(fn()))
+        
+        def done(task):
+            if self._async_calls.get(loop_key) is call:
+                del self._async_calls[loop_key]
+        
+        call.task.add_done_callback(done)
+        return await self._wait(call), False
+    
+    async def _wait(self, call):
+        """等待共用的呼叫完成"""
+        call.waiters += 1
+        try:
+            # 以shield等待，避免某個等待者被取消時連帶取消共用的呼叫
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+    
+    def in_flight(self):
+        """獲取目前進行中的呼叫數量"""
+        with self._lock:
+            return len(self._calls) + len(self._async_calls)
+
+# 全域上游呼叫合併器
+upstream_flight = SingleFlight()
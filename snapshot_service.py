@@ -0,0 +1,145 @@
+import time
+import threading
+import logging
+from datetime import datetime
+from sqlalchemy import select
+from src.models.user import db
+from src.models.channel import Channel, ChannelStatisticsHistory
+from src.services.youtube_service import YouTubeService, MAX_IDS_PER_REQUEST
+from src.services.ingestion_service import bulk_update_channel_statistics, bulk_upsert_statistics_history
+from src.services.quota_service import QUOTA_COSTS
+from src.services.rollup_service import rollup_engine
+
+logger = logging.getLogger(__name__)
+
+class StatisticsSnapshotter:
+    """頻道統計快照器
+    
+    以每次channels.list查詢50個頻道（只請求statistics）的方式刷新所有追蹤中的頻道，
+    並為每個頻道每天寫入一筆ChannelStatisticsHistory。
+    每批次在同一交易中提交，已有當日快照的頻道會被略過，
+    因此中斷後重新執行即可從未完成的批次繼續，同一天內重複執行也不會產生重複資料。
+    """
+    
+    def __init__(self, youtube_service=None, batch_size=MAX_IDS_PER_REQUEST):
+        """
+        初始化快照器
+        
+        Args:
+            youtube_service: YouTubeService實例
+            batch_size: 每次channels.list查詢的頻道數量（最多50）
+        """
+        self.youtube_service = youtube_service or YouTubeService()
+        self.batch_size = min(batch_size, MAX_IDS_PER_REQUEST)
+    
+    def pending_channel_ids(self, snapshot_date):
+        """
+        獲取尚未有當日快照的追蹤頻道
+        
+        Args:
+            snapshot_date: 快照日期
+            
+        Returns:
+            list: 依頻道ID排序的頻道ID列表
+        """
+        done = select(ChannelStatisticsHistory.channel_id).where(ChannelStatisticsHistory.date == snapshot_date)
+        query = (
+            select(Channel.channel_id)
+            .where(Channel.channel_id.not_in(done))
+            .order_by(Channel.channel_id)
+        )
+        return list(db.session.execute(query).scalars())
+    
+    def run(self, snapshot_date=None):
+        """
+        執行一次快照
+        
+        Args:
+            snapshot_date: 快照日期（預設為今天UTC日期）
+            
+        Returns:
+            dict: 執行結果與吞吐量統計
+        """
+        snapshot_date = snapshot_date or datetime.utcnow().date()
+        started = time.perf_counter()
+        
+        total_tracked = db.session.query(Channel.id).count()
+        channel_ids = self.pending_channel_ids(snapshot_date)
+        
+        api_calls = 0
+        snapshotted = 0
+        missing = 0
+        for start in range(0, len(channel_ids), self.batch_size):
+            chunk = channel_ids[start:start + self.batch_size]
+            # 只請求statistics，響應大小遠小於完整的頻道資訊
+            items = self.youtube_service.get_channels_statistics(chunk)
+            api_calls += 1
+            
+            # 頻道資料、當日快照與週/月彙總在同一交易中提交，作為可續傳的檢查點
+            bulk_update_channel_statistics(items, commit=False)
+            bulk_upsert_statistics_history(items, snapshot_date, commit=False)
+            db.session.flush()
+            rollup_engine.update([item['id'] for item in items], snapshot_date, commit=False)
+            db.session.commit()
+            
+            snapshotted += len(items)
+            missing += len(chunk) - len(items)
+        
+        elapsed = time.perf_counter() - started
+        quota_units = api_calls * QUOTA_COSTS['channels.list']
+        report = {
+            'date': snapshot_date.isoformat(),
+            'trackedChannels': total_tracked,
+            'alreadySnapshotted': total_tracked - len(channel_ids),
+            'snapshotted': snapshotted,
+            'missing': missing,
+            'apiCalls': api_calls,
+            'quotaUnits': quota_units,
+            'elapsedSeconds': round(elapsed, 3),
+            'channelsPerSecond': round(snapshotted / elapsed, 2) if elapsed > 0 else 0,
+            'quotaUnitsPerChannel': round(quota_units / snapshotted, 4) if snapshotted else 0
+        }
+        logger.info(f"頻道統計快照完成: {report}")
+        return report
+
+class SnapshotScheduler:
+    """在背景執行緒中定期執行統計快照"""
+    
+    def __init__(self, app, interval_seconds, snapshotter_factory=StatisticsSnapshotter, name='statistics-snapshot'):
+        """
+        初始化排程器
+        
+        Args:
+            app: Flask應用程式
+            interval_seconds: 兩次快照之間的間隔（秒）
+            snapshotter_factory: 建立快照器的函數（快照器需提供run()）
+            name: 執行緒名稱
+        """
+        self.app = app
+        self.interval_seconds = interval_seconds
+        self.snapshotter_factory = snapshotter_factory
+        self.name = name
+        self.last_report = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """啟動排程執行緒"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """停止排程執行緒"""
+        self._stop.set()
+    
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    self.last_report = self.snapshotter_factory().run()
+            except Exception as e:
+                logger.error(f"執行排程{self.name}時發生錯誤: {e}")
+            self._stop.wait(self.interval_seconds)
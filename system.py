@@ -1,12 +1,17 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, current_app, request, Response
 from datetime import datetime
 import os
 import logging
+from src.services.cache_service import TTLCache, MISSING
+from src.config import Config
 
 logger = logging.getLogger(__name__)
 
 system_bp = Blueprint('system', __name__)
 
+# 系統統計的短暫緩存
+stats_cache = TTLCache(max_entries=8, default_ttl=Config.STATS_CACHE_TIMEOUT)
+
 @system_bp.route('/health', methods=['GET'])
 def health_check():
     """健康檢查端點"""
@@ -16,27 +21,20 @@ def health_check():
 def quota_status():
     """檢查API配額狀態"""
     try:
-        # 這裡可以實作實際的配額檢查邏輯
-        # 目前返回模擬數據
+        from src.services.quota_service import quota_tracker
+        
+        status = quota_tracker.status()
+        data_api = status['services']['youtubeDataAPI']
+        
         return jsonify({
             'success': True,
             'data': {
-                'quotaUsed': 1234,
-                'quotaLimit': 10000,
-                'quotaRemaining': 8766,
-                'resetTime': (datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)).isoformat() + 'Z',
-                'services': {
-                    'youtubeDataAPI': {
-                        'quotaUsed': 800,
-                        'quotaLimit': 10000,
-                        'quotaRemaining': 9200
-                    },
-                    'youtubeAnalyticsAPI': {
-                        'quotaUsed': 434,
-                        'quotaLimit': 10000,
-                        'quotaRemaining': 9566
-                    }
-                }
+                'quotaUsed': data_api['quotaUsed'],
+                'quotaLimit': data_api['quotaLimit'],
+                'quotaRemaining': data_api['quotaRemaining'],
+                'resetTime': status['resetTime'],
+                'reserve': status['reserve'],
+                'services': status['services']
             }
         })
     except Exception as e:
@@ -61,21 +59,17 @@ def get_config():
                     'youtubeDataAPI': bool(os.environ.get('YOUTUBE_API_KEY')),
                     'youtubeAnalyticsAPI': bool(os.environ.get('GOOGLE_CLIENT_ID')),
                     'oauth': bool(os.environ.get('GOOGLE_CLIENT_ID') and os.environ.get('GOOGLE_CLIENT_SECRET')),
-                    'caching': True,
+                    'caching': current_app.config.get('CACHE_TYPE') != 'null',
                     'rateLimit': True
                 },
                 'limits': {
-                    'maxChannelsCompare': 5,
+                    'maxChannelsCompare': current_app.config['MAX_CHANNELS_COMPARE'],
                     'maxSearchResults': 50,
-                    'maxVideosPerChannel': 50,
+                    'maxVideosPerChannel': current_app.config['MAX_VIDEOS_PER_CHANNEL'],
+                    'videoScanLimit': current_app.config['VIDEO_SCAN_LIMIT'],
                     'defaultDateRangeDays': 30
                 },
-                'cache': {
-                    'channelBasicInfo': 3600,  # 1小時
-                    'channelStatistics': 1800,  # 30分鐘
-                    'audienceDemographics': 21600,  # 6小時
-                    'videosList': 3600  # 1小時
-                },
+                'cache': current_app.config['CACHE_TIMEOUTS'],
                 'rateLimit': {
                     'requestsPerMinute': 100,
                     'requestsPerHour': 1000
@@ -93,45 +87,29 @@ def get_config():
             }
         }), 500
 
+@system_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """以Prometheus文字格式輸出行程內指標"""
+    from src.services.metrics import registry
+    
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 @system_bp.route('/stats', methods=['GET'])
 def get_system_stats():
     """獲取系統統計資訊"""
     try:
-        from src.models.channel import Channel, Video
-        from src.models.user import User
+        estimate = request.args.get('estimate', 'false').lower() == 'true'
+        cache_key = ('systemStats', estimate)
         
-        # 獲取數據庫統計
-        total_channels = Channel.query.count()
-        total_videos = Video.query.count()
-        total_users = User.query.count()
-        
-        # 獲取最近活動
-        recent_channels = Channel.query.order_by(Channel.last_updated.desc()).limit(5).all()
+        # 儀表板會頻繁輪詢，短暫緩存整個統計結果
+        data = stats_cache.get(cache_key)
+        if data is MISSING:
+            data = _collect_system_stats(estimate)
+            stats_cache.set(cache_key, data)
         
         return jsonify({
             'success': True,
-            'data': {
-                'database': {
-                    'totalChannels': total_channels,
-                    'totalVideos': total_videos,
-                    'totalUsers': total_users
-                },
-                'recentActivity': {
-                    'recentChannels': [
-                        {
-                            'channelId': channel.channel_id,
-                            'title': channel.title,
-                            'lastUpdated': channel.last_updated.isoformat()
-                        }
-                        for channel in recent_channels
-                    ]
-                },
-                'systemInfo': {
-                    'uptime': 'N/A',  # 可以實作實際的運行時間計算
-                    'memoryUsage': 'N/A',  # 可以實作記憶體使用量監控
-                    'diskUsage': 'N/A'  # 可以實作磁碟使用量監控
-                }
-            }
+            'data': data
         })
     except Exception as e:
         logger.error(f"獲取系統統計失敗: {e}")
@@ -144,3 +122,51 @@ def get_system_stats():
             }
         }), 500
 
+
+def _collect_system_stats(estimate):
+    """
+    收集系統統計資訊
+    
+    Args:
+        estimate: 是否使用查詢規劃器的估計列數
+        
+    Returns:
+        dict: 系統統計
+    """
+    from src.models.channel import Channel
+    from src.models.table_stats import get_row_counts
+    from src.services.cache_service import response_cache
+    from src.services.youtube_service import etag_stats
+    from src.services.metrics import uptime_seconds, memory_rss_bytes, disk_usage
+    
+    # 從計數器讀取數據庫統計，不對大型資料表執行COUNT(*)
+    row_counts = get_row_counts(estimate=estimate)
+    
+    # 獲取最近活動（last_updated有索引）
+    recent_channels = Channel.query.order_by(Channel.last_updated.desc()).limit(5).all()
+    
+    return {
+        'database': {
+            'totalChannels': row_counts.get('channels', 0),
+            'totalVideos': row_counts.get('videos', 0),
+            'totalUsers': row_counts.get('users', 0),
+            'estimated': estimate
+        },
+        'recentActivity': {
+            'recentChannels': [
+                {
+                    'channelId': channel.channel_id,
+                    'title': channel.title,
+                    'lastUpdated': channel.last_updated.isoformat()
+                }
+                for channel in recent_channels
+            ]
+        },
+        'cache': response_cache.stats(),
+        'etag': etag_stats.stats(),
+        'systemInfo': {
+            'uptime': round(uptime_seconds(), 1),  # 秒
+            'memoryUsage': memory_rss_bytes(),  # 常駐記憶體位元組數
+            'diskUsage': disk_usage(current_app.instance_path if os.path.exists(current_app.instance_path) else '.')
+        }
+    }
@@ -0,0 +1,114 @@
+from datetime import datetime
+from sqlalchemy import event, func, select, text, update
+from src.models.user import db, User
+from src.models.channel import Channel, Video
+
+class TableRowCount(db.Model):
+    """資料表列數計數器模型
+
+    由ORM事件與批次寫入路徑在同一交易中維護，
+    讓統計端點不需要對大型資料表執行COUNT(*)。
+    """
+    __tablename__ = 'table_row_counts'
+    
+    table_name = db.Column(db.String(64), primary_key=True)
+    row_count = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """轉換為字典格式"""
+        return {
+            'tableName': self.table_name,
+            'rowCount': self.row_count,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+# 維護列數計數器的模型
+TRACKED_MODELS = (Channel, Video, User)
+
+def increment_row_count(connection, table_name, delta):
+    """
+    在目前交易中調整資料表的列數計數
+    
+    計數器尚未建立時不做任何事，第一次讀取時會以COUNT(*)建立。
+    
+    Args:
+        connection: 資料庫連線（與寫入使用同一交易）
+        table_name: 資料表名稱
+        delta: 增減的列數
+    """
+    if not delta:
+        return
+    connection.execute(
+        update(TableRowCount.__table__)
+        .where(TableRowCount.__table__.c.table_name == table_name)
+        .values(
+            row_count=TableRowCount.__table__.c.row_count + delta,
+            updated_at=datetime.utcnow()
+        )
+    )
+
+def _register_counter_events(model):
+    """為模型註冊ORM新增與刪除事件"""
+    table_name = model.__tablename__
+    
+    @event.listens_for(model, 'after_insert')
+    def after_insert(mapper, connection, target):
+        increment_row_count(connection, table_name, 1)
+    
+    @event.listens_for(model, 'after_delete')
+    def after_delete(mapper, connection, target):
+        increment_row_count(connection, table_name, -1)
+
+for _model in TRACKED_MODELS:
+    _register_counter_events(_model)
+
+def recount(models=TRACKED_MODELS):
+    """
+    以COUNT(*)重新計算並寫入計數器（用於初始化或以批次查詢刪除資料後校正）
+    
+    Args:
+        models: 要重新計算的模型
+        
+    Returns:
+        dict: 資料表名稱與列數
+    """
+    counts = {}
+    for model in models:
+        count = db.session.execute(select(func.count()).select_from(model.__table__)).scalar()
+        db.session.merge(TableRowCount(table_name=model.__tablename__, row_count=count, updated_at=datetime.utcnow()))
+        counts[model.__tablename__] = count
+    db.session.commit()
+    return counts
+
+def get_row_counts(models=TRACKED_MODELS, estimate=False):
+    """
+    獲取資料表列數
+    
+    Args:
+        models: 要查詢的模型
+        estimate: 是否使用PostgreSQL查詢規劃器的估計值（不需精確數字時使用）
+        
+    Returns:
+        dict: 資料表名稱與列數
+    """
+    table_names = [model.__tablename__ for model in models]
+    
+    if estimate and db.engine.dialect.name == 'postgresql':
+        rows = db.session.execute(
+            text('SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(:names)'),
+            {'names': table_names}
+        ).all()
+        estimates = {name: max(count, 0) for name, count in rows}
+        if len(estimates) == len(table_names):
+            return estimates
+    
+    counters = {
+        counter.table_name: counter.row_count
+        for counter in TableRowCount.query.filter(TableRowCount.table_name.in_(table_names)).all()
+    }
+    missing = [model for model in models if model.__tablename__ not in counters]
+    if missing:
+        counters.update(recount(missing))
+    
+    return counters
@@ -0,0 +1,174 @@
+import os
+import json
+import email
+import threading
+from urllib.parse import urlsplit, parse_qs
+
+# 載入應用程式前設定測試環境：記憶體資料庫、不寫入配額檔案、不啟動背景執行緒
+os.environ.setdefault('YOUTUBE_API_KEY', 'test')
+os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+os.environ['QUOTA_STATE_FILE'] = ''
+os.environ['JOB_MAX_WORKERS'] = '0'
+os.environ['SNAPSHOT_INTERVAL_SECONDS'] = '0'
+os.environ['COLUMNAR_REFRESH_SECONDS'] = '0'
+
+import httplib2
+import pytest
+
+def channel_item(channel_id, view_count=1000, subscriber_count=100, video_count=10, etag=None):
+    """產生channels.list響應中的頻道項目"""
+    item = {
+        'kind': 'youtube#channel',
+        'id': channel_id,
+        'snippet': {'title': f'Channel {channel_id}', 'publishedAt': '2020-01-01T00:00:00Z'},
+        'statistics': {
+            'viewCount': str(view_count),
+            'subscriberCount': str(subscriber_count),
+            'videoCount': str(video_count)
+        },
+        'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + channel_id[2:]}}
+    }
+    if etag:
+        item['etag'] = etag
+    return item
+
+def video_item(video_id, view_count=100, published_at='2024-01-01T00:00:00Z', duration='PT4M13S', channel_id=None):
+    """產生videos.list響應中的影片項目"""
+    return {
+        'kind': 'youtube#video',
+        'id': video_id,
+        'snippet': {'title': f'Video {video_id}', 'publishedAt': published_at, 'channelId': channel_id},
+        'statistics': {'viewCount': str(view_count), 'likeCount': '10', 'commentCount': '1'},
+        'contentDetails': {'duration': duration}
+    }
+
+def playlist_pages(entries, page_size=50):
+    """
+    建立playlistItems.list的處理函數
+    
+    Args:
+        entries: 新到舊排序的 (影片ID, 發布時間) 列表
+        page_size: 每頁的項目數量
+    """
+    def handler(params, headers):
+        start = int(params.get('pageToken', 0))
+        page = entries[start:start + page_size]
+        response = {
+            'items': [
+                {'contentDetails': {'videoId': video_id, 'videoPublishedAt': published_at}}
+                for video_id, published_at in page
+            ]
+        }
+        if start + page_size < len(entries):
+            response['nextPageToken'] = str(start + page_size)
+        return 200, response
+    return handler
+
+class FakeYouTubeHttp:
+    """攔截httplib2請求的假YouTube API
+    
+    以資源名稱（search、channels、videos、playlistItems、reports）註冊處理函數，
+    處理函數收到查詢參數與請求標頭，返回 (狀態碼, 響應)。
+    所有請求都會記錄下來，供測試檢查上游呼叫次數與參數。
+    
+    new_batch_http_request送出的multipart批次會拆成子請求交給相同的處理函數，
+    並以multipart/mixed返回；註冊'batch'處理函數可讓整個批次請求失敗。
+    """
+    
+    def __init__(self):
+        self.handlers = {}
+        self.requests = []
+        self.batches = []
+        self._lock = threading.Lock()
+    
+    def on(self, resource, handler):
+        """註冊資源的處理函數"""
+        self.handlers[resource] = handler
+    
+    def calls(self, resource):
+        """獲取某資源收到的請求參數"""
+        with self._lock:
+            return [params for name, params, _ in self.requests if name == resource]
+    
+    def headers(self, resource):
+        """獲取某資源收到的請求標頭"""
+        with self._lock:
+            return [headers for name, _, headers in self.requests if name == resource]
+    
+    def request(self, http, uri, method='GET', body=None, headers=None, **kwargs):
+        url = urlsplit(uri)
+        if method == 'POST' and url.path.rstrip('/').split('/')[1:2] == ['batch']:
+            return self._batch(body, headers)
+        resource = url.path.rstrip('/').rsplit('/', 1)[-1]
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        with self._lock:
+            self.requests.append((resource, params, headers))
+        
+        handler = self.handlers.get(resource)
+        if handler is None:
+            status, payload = 404, {'error': {'code': 404, 'message': f'no handler for {resource}'}}
+        else:
+            status, payload = handler(params, headers)
+        content = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        return httplib2.Response({'status': str(status), 'content-type': 'application/json'}), content
+    
+    def _batch(self, body, headers):
+        """處理multipart批次請求"""
+        content_type = {key.lower(): value for key, value in headers.items()}['content-type']
+        message = email.message_from_string(f'content-type: {content_type}\r\n\r\n{body}')
+        parts = message.get_payload()
+        with self._lock:
+            self.batches.append(len(parts))
+        
+        handler = self.handlers.get('batch')
+        if handler is not None:
+            status, payload = handler(len(parts))
+            if status != 200:
+                return httplib2.Response({'status': str(status)}), json.dumps(payload).encode('utf-8')
+        
+        boundary = 'fake-batch-boundary'
+        chunks = []
+        for part in parts:
+            content_id = ' '.join(part['Content-ID'].split())
+            path = part.get_payload().split('\n', 1)[0].split(' ')[1]
+            response, content = self.request(None, f'https://www.googleapis.com{path}')
+            chunks.append(
+                f'--{boundary}\r\nContent-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id[1:]}\r\n\r\n'
+                f'HTTP/1.1 {response.status} Status\r\nContent-Type: application/json\r\n\r\n'
+                f'{content.decode("utf-8")}\r\n'
+            )
+        content = ''.join(chunks) + f'--{boundary}--'
+        return httplib2.Response({
+            'status': '200',
+            'content-type': f'multipart/mixed; boundary={boundary}'
+        }), content.encode('utf-8')
+
+@pytest.fixture
+def youtube_http(monkeypatch):
+    """以FakeYouTubeHttp取代所有上游HTTP請求"""
+    fake = FakeYouTubeHttp()
+    monkeypatch.setattr(
+        httplib2.Http, 'request',
+        lambda http, uri, *args, **kwargs: fake.request(http, uri, *args, **kwargs)
+    )
+    return fake
+
+@pytest.fixture
+def app():
+    """使用記憶體SQLite的測試應用程式（已推入應用程式上下文）"""
+    from src.main import create_app
+    from src.models.user import db
+    from src.services.cache_service import response_cache
+    
+    app = create_app('testing')
+    response_cache.clear()
+    with app.app_context():
+        yield app
+        db.session.remove()
+    response_cache.clear()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
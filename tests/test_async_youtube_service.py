@@ -0,0 +1,121 @@
+import os
+import sys
+import asyncio
+import subprocess
+from urllib.parse import urlsplit
+
+import pytest
+
+from conftest import channel_item, video_item, playlist_pages
+from src.config import Config
+from src.services.youtube_service import SCAN_ALL
+from src.services.async_youtube_service import AsyncBridge, HostLimiter
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status = status
+        self._payload = payload
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+    
+    async def json(self, content_type=None):
+        return self._payload
+
+class FakeSession:
+    """取代aiohttp.ClientSession的假session，記錄每個資源同時進行的請求數量"""
+    
+    def __init__(self, latency=0.01, latencies=None):
+        self.latency = latency
+        self.latencies = latencies or {}
+        self.handlers = {}
+        self.calls = {}
+        self.in_flight = {}
+        self.max_in_flight = {}
+    
+    def on(self, resource, handler):
+        self.handlers[resource] = handler
+    
+    def get(self, url, params=None, headers=None):
+        return _FakeRequest(self, urlsplit(url).path.rsplit('/', 1)[-1], params or {}, headers or {})
+    
+    async def close(self):
+        pass
+
+class _FakeRequest:
+    def __init__(self, session, resource, params, headers):
+        self.session = session
+        self.resource = resource
+        self.params = params
+        self.headers = headers
+    
+    async def __aenter__(self):
+        session, resource = self.session, self.resource
+        session.calls.setdefault(resource, []).append(self.params)
+        session.in_flight[resource] = session.in_flight.get(resource, 0) + 1
+        session.max_in_flight[resource] = max(session.max_in_flight.get(resource, 0), session.in_flight[resource])
+        try:
+            await asyncio.sleep(session.latencies.get(resource, session.latency))
+        finally:
+            session.in_flight[resource] -= 1
+        status, payload = session.handlers[resource](self.params, self.headers)
+        return FakeResponse(status, payload)
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+@pytest.fixture
+def bridge():
+    """使用假session的非同步橋接器"""
+    bridge = AsyncBridge()
+    bridge._session = FakeSession()
+    bridge._limiter = HostLimiter()
+    yield bridge
+    bridge.close()
+
+def _entries(prefix, count):
+    return [(f'{prefix}{i:04d}', '2024-01-01T00:00:00Z') for i in range(count)]
+
+def test_collect_playlists_caps_concurrent_crawls(bridge, monkeypatch):
+    monkeypatch.setattr(Config, 'ASYNC_MAX_TASKS', 3)
+    playlists = {f'UCasync{i:02d}': f'UUasync{i:02d}' for i in range(12)}
+    handlers = {playlist_id: playlist_pages(_entries(playlist_id, 120)) for playlist_id in playlists.values()}
+    bridge._session.on('playlistItems', lambda params, headers: handlers[params['playlistId']](params, headers))
+    
+    result = bridge.run(lambda client: client.collect_playlist_video_ids(playlists, max_videos=100))
+    
+    assert list(result) == list(playlists)
+    assert result['UCasync05'] == [f'UUasync05{i:04d}' for i in range(100)]
+    assert len(bridge._session.calls['playlistItems']) == 12 * 2
+    assert bridge._session.max_in_flight['playlistItems'] == 3
+
+def test_channel_videos_caps_pending_detail_pages(bridge, monkeypatch):
+    monkeypatch.setattr(Config, 'ASYNC_MAX_TASKS', 2)
+    session = bridge._session
+    # 補齊影片比翻頁慢，沒有上限時補齊中的頁數會持續累積
+    session.latencies['videos'] = 0.05
+    session.on('channels', lambda params, headers: (200, {'items': [channel_item(params['id'])]}))
+    session.on('playlistItems', playlist_pages(_entries('vpage', 500)))
+    session.on('videos', lambda params, headers: (200, {
+        'items': [video_item(video_id, view_count=int(video_id[5:])) for video_id in params['id'].split(',')]
+    }))
+    
+    videos = bridge.call('get_top_videos_by_views', 'UCpending', n=3, max_scan=SCAN_ALL)
+    
+    assert [video['id'] for video in videos] == ['vpage0499', 'vpage0498', 'vpage0497']
+    assert len(session.calls['videos']) == 10
+    assert session.max_in_flight['videos'] == 2
+
+def test_compare_service_does_not_require_aiohttp():
+    # 未啟用非同步客戶端時，沒有安裝aiohttp也能匯入比較服務
+    code = (
+        "import sys; sys.modules['aiohttp'] = None\n"
+        "import src.services.compare_service\n"
+        "assert 'src.services.async_youtube_service' not in sys.modules\n"
+    )
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(path for path in sys.path if path)}
+    completed = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
@@ -0,0 +1,63 @@
+import pytest
+
+from src.services import cache_service
+from src.services.cache_service import TTLCache, MISSING, make_cache_key
+
+class FakeClock:
+    """可手動推進的monotonic時鐘"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_service, 'time', fake)
+    return fake
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(max_entries=10, default_ttl=60)
+    cache.set('default', 1)
+    cache.set('short', 2, ttl=5)
+    cache.set('disabled', 3, ttl=0)
+    
+    clock.now += 5
+    assert cache.get('short') is MISSING
+    assert cache.get('default') == 1
+    assert cache.get('disabled') is MISSING
+    
+    clock.now += 55
+    assert cache.get('default') is MISSING
+    # 沒有ETag的過期項目直接刪除
+    assert cache.get_stale('default') is None
+    assert cache.stats()['expirations'] == 2
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(max_entries=2, default_ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # 讀取a後，b成為最久未使用的項目
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    
+    assert cache.get('b') is MISSING
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+def test_expired_entries_with_etag_are_kept_for_revalidation(clock):
+    cache = TTLCache(max_entries=10, default_ttl=60)
+    cache.set('channel', {'id': 'UCa'}, etag='"e1"', meta={'bytes': 120})
+    
+    clock.now += 61
+    assert cache.get('channel') is MISSING
+    assert cache.get_stale('channel') == ({'id': 'UCa'}, '"e1"', {'bytes': 120})
+    
+    # 304後重設存活時間即可再次命中
+    cache.set('channel', {'id': 'UCa'}, etag='"e1"')
+    assert cache.get('channel') == {'id': 'UCa'}
+
+def test_cache_keys_are_normalized():
+    assert make_cache_key('channelBasicInfo', 'public', ' UCa ', None) == ('channelBasicInfo', 'public', 'UCa')
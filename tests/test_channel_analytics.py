@@ -0,0 +1,65 @@
+from conftest import channel_item, video_item, playlist_pages
+from src.config import Config
+from src.services.quota_service import quota_tracker
+
+def test_compare_returns_429_when_quota_is_exhausted(client, youtube_http, monkeypatch):
+    youtube_http.on('channels', lambda params, headers: (200, {'items': [channel_item('UCa'), channel_item('UCb')]}))
+    monkeypatch.setattr(quota_tracker, 'limits', {'youtubeDataAPI': 0, 'youtubeAnalyticsAPI': 0})
+    
+    response = client.post('/api/channel/compare', json={'channelIds': ['UCa', 'UCb']})
+    
+    assert response.status_code == 429
+    assert response.get_json()['error']['code'] == 'QUOTA_EXCEEDED'
+    assert youtube_http.requests == []
+
+def _uploads(youtube_http, count):
+    """上傳數量為count的頻道，觀看數隨影片編號遞增（較舊的影片觀看數較高）"""
+    entries = [(f'v{i:04d}', '2024-01-01T00:00:00Z') for i in range(count)]
+    youtube_http.on('channels', lambda params, headers: (200, {'items': [channel_item(params['id'])]}))
+    youtube_http.on('playlistItems', playlist_pages(entries))
+    youtube_http.on('videos', lambda params, headers: (200, {
+        'items': [video_item(video_id, view_count=int(video_id[1:])) for video_id in params['id'].split(',')]
+    }))
+
+def test_videos_route_reports_truncated_scan(client, youtube_http, monkeypatch):
+    monkeypatch.setattr(Config, 'VIDEO_SCAN_LIMIT', 100)
+    _uploads(youtube_http, 300)
+    
+    data = client.get('/api/channel/UCbig/videos?maxResults=3').get_json()['data']
+    assert [video['videoId'] for video in data['videos']] == ['v0099', 'v0098', 'v0097']
+    assert (data['scanned'], data['scanLimit'], data['truncated']) == (100, 100, True)
+    
+    data = client.get('/api/channel/UCbig/videos?maxResults=3&maxScan=all').get_json()['data']
+    assert [video['videoId'] for video in data['videos']] == ['v0299', 'v0298', 'v0297']
+    assert (data['scanned'], data['scanLimit'], data['truncated']) == (300, None, False)
+
+def test_videos_route_rejects_invalid_max_scan(client, youtube_http):
+    response = client.get('/api/channel/UCbig/videos?maxScan=lots')
+    
+    assert response.status_code == 400
+    assert response.get_json()['error']['code'] == 'INVALID_PARAMETERS'
+    assert youtube_http.requests == []
+
+def _known_channels(youtube_http, known):
+    youtube_http.on('channels', lambda params, headers: (200, {
+        'items': [channel_item(channel_id) for channel_id in params['id'].split(',') if channel_id in known]
+    }))
+    youtube_http.on('playlistItems', lambda params, headers: (200, {'items': []}))
+
+def test_compare_lists_unknown_channels(client, youtube_http):
+    _known_channels(youtube_http, {'UCa'})
+    
+    response = client.post('/api/channel/compare', json={'channelIds': ['UCa', 'UCtypo']})
+    
+    data = response.get_json()['data']
+    assert response.status_code == 200
+    assert [entry['channelId'] for entry in data['comparison']] == ['UCa']
+    assert data['notFound'] == ['UCtypo']
+
+def test_compare_returns_404_when_no_channel_resolves(client, youtube_http):
+    _known_channels(youtube_http, set())
+    
+    response = client.post('/api/channel/compare', json={'channelIds': ['UCtypo', 'UCgone']})
+    
+    assert response.status_code == 404
+    assert response.get_json()['error']['notFound'] == ['UCtypo', 'UCgone']
@@ -0,0 +1,82 @@
+import os
+import time
+import fcntl
+import threading
+import numpy as np
+
+from conftest import video_item
+from src.models.user import db
+from src.models.channel import Video
+from src.services.columnar_service import ColumnarStore
+from src.services.ingestion_service import bulk_upsert_videos
+
+def _snapshot(table):
+    return dict(zip(table['id'].tolist(), table['view_count'].tolist()))
+
+def _video_ids():
+    return dict(db.session.execute(db.select(Video.video_id, Video.id)).all())
+
+def test_incremental_refresh_merges_updates_inserts_and_deletes(app, tmp_path):
+    store = ColumnarStore(base_dir=str(tmp_path), chunk_size=2)
+    bulk_upsert_videos([video_item(f'v{i}', view_count=100 * i) for i in range(5)], channel_id='UCcol')
+    
+    report = store.refresh('videos')
+    assert (report['mode'], report['rows']) == ('full', 5)
+    
+    # 沒有變更時不寫入新世代
+    generation = store.load('videos').generation
+    report = store.refresh('videos')
+    assert (report['removed'], report['rows']) == (0, 5)
+    assert store.load('videos').generation == generation
+    
+    bulk_upsert_videos([video_item('v1', view_count=111), video_item('v5', view_count=500)], channel_id='UCcol')
+    db.session.delete(Video.query.filter_by(video_id='v3').one())
+    db.session.commit()
+    ids = _video_ids()
+    
+    report = store.refresh('videos')
+    table = store.load('videos')
+    
+    assert (report['mode'], report['removed'], report['rows']) == ('incremental', 1, 5)
+    assert table.generation != generation
+    assert _snapshot(table) == {
+        ids['v0']: 0, ids['v1']: 111, ids['v2']: 200, ids['v4']: 400, ids['v5']: 500
+    }
+    assert np.all(np.diff(table['id']) > 0)
+    assert table.channels == ['UCcol']
+    
+    # 只有刪除時同樣會寫入新世代
+    db.session.delete(Video.query.filter_by(video_id='v0').one())
+    db.session.commit()
+    report = store.refresh('videos')
+    assert (report['removed'], report['rows']) == (1, 4)
+    assert ids['v0'] not in _snapshot(store.load('videos'))
+
+def test_refresh_waits_for_another_process_holding_the_table_lock(app, tmp_path):
+    bulk_upsert_videos([video_item(f'v{i}', view_count=i) for i in range(3)], channel_id='UCcol')
+    first, second = ColumnarStore(base_dir=str(tmp_path)), ColumnarStore(base_dir=str(tmp_path))
+    first.refresh('videos')
+    generation = first.load('videos').generation
+    
+    # 以另一個檔案描述元持有刷新鎖，模擬其他程序正在刷新
+    locked = threading.Event()
+    
+    def hold_lock():
+        with open(os.path.join(str(tmp_path), 'videos', '.refresh.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            locked.set()
+            time.sleep(0.3)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+    started = time.perf_counter()
+    report = second.refresh('videos')
+    holder.join()
+    
+    assert time.perf_counter() - started >= 0.25
+    # 以另一個程序寫入的世代為基礎增量刷新，沒有變更時不寫入新世代
+    assert (report['mode'], report['rows']) == ('incremental', 3)
+    assert second.load('videos').generation == generation
+    assert not [name for name in os.listdir(os.path.join(str(tmp_path), 'videos')) if name.endswith('.tmp')]
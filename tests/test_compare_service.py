@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+import pytest
+from conftest import channel_item, video_item, playlist_pages
+from src.services.youtube_service import YouTubeService
+from src.services.compare_service import ChannelCompareEngine
+
+# 每個頻道300部每日上傳的影片，新到舊排序
+UPLOADS = {
+    channel_id: [
+        (f'{channel_id}-{i:03d}', f'{date(2024, 12, 31) - timedelta(days=i)}T12:00:00Z')
+        for i in range(300)
+    ]
+    for channel_id in ('UCa', 'UCb')
+}
+PUBLISHED = {video_id: published_at for entries in UPLOADS.values() for video_id, published_at in entries}
+
+@pytest.fixture
+def uploads(youtube_http):
+    playlists = {'UU' + channel_id[2:]: playlist_pages(entries) for channel_id, entries in UPLOADS.items()}
+    youtube_http.on('channels', lambda params, headers: (200, {
+        'items': [channel_item(channel_id) for channel_id in params['id'].split(',')]
+    }))
+    youtube_http.on('playlistItems', lambda params, headers: playlists[params['playlistId']](params, headers))
+    youtube_http.on('videos', lambda params, headers: (200, {
+        'items': [video_item(video_id, published_at=PUBLISHED[video_id]) for video_id in params['id'].split(',')]
+    }))
+    return youtube_http
+
+@pytest.mark.parametrize('batch_mode', [False, True])
+def test_past_end_date_samples_videos_before_cutoff(uploads, batch_mode):
+    service = YouTubeService(api_key='test', cache=None, quota=None, coalesce=False, batch_mode=batch_mode)
+    
+    comparison = ChannelCompareEngine(service).compare(['UCa', 'UCb'], end_date='2024-06-30')
+    
+    assert [entry['metrics']['recentVideoCount'] for entry in comparison] == [50, 50]
+    # 2024-07-01之後的184部影片在翻頁時略過，取樣的是截止日前最新的50部
+    hydrated = [video_id for params in uploads.calls('videos') for video_id in params['id'].split(',')]
+    assert sorted(hydrated) == sorted(
+        f'{channel_id}-{i:03d}' for channel_id in ('UCa', 'UCb') for i in range(184, 234)
+    )
+    assert len(uploads.calls('playlistItems')) == 10
+
+def test_end_date_crawl_is_bounded(uploads, monkeypatch):
+    from src.config import Config
+    monkeypatch.setattr(Config, 'VIDEO_SCAN_LIMIT', 100)
+    service = YouTubeService(api_key='test', cache=None, quota=None, coalesce=False)
+    
+    comparison = ChannelCompareEngine(service).compare(['UCa'], end_date='2024-01-01')
+    
+    # 最多讀取ceil(100 / 50) = 2頁，截止日前的影片不在範圍內
+    assert len(uploads.calls('playlistItems')) == 2
+    assert comparison[0]['metrics']['recentVideoCount'] == 0
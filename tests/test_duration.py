@@ -0,0 +1,17 @@
+import numpy as np
+
+from src.services.duration import parse_duration, parse_durations, duration_array
+
+def test_parse_duration_formats():
+    assert parse_duration('PT4M13S') == 253
+    assert parse_duration('P1DT2H') == 93600
+    assert parse_duration('PT1.6S') == 2
+    assert parse_duration('PT4X') is None
+    assert parse_duration('') is None
+
+def test_zero_duration_is_unknown():
+    # 直播中與尚未開始的影片回傳P0D，不應被歸類為Shorts
+    assert parse_duration('P0D') is None
+    assert parse_duration('PT0S') is None
+    assert parse_durations(['P0D', 'PT30S', 'P0D']) == [None, 30, None]
+    assert np.isnan(duration_array(['P0D', 'PT30S'])).tolist() == [True, False]
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+
+from conftest import video_item
+from src.models.user import db
+from src.models.channel import ChannelStatisticsHistory
+from src.services.ingestion_service import bulk_upsert_videos
+from src.services.export_service import ExportQuery
+
+def _seed_videos():
+    bulk_upsert_videos([
+        video_item('vjan01', view_count=10, published_at='2024-01-01T00:00:00Z'),
+        video_item('vjan31', view_count=20, published_at='2024-01-31T23:59:59Z'),
+        video_item('vfeb01', view_count=30, published_at='2024-02-01T00:00:00Z')
+    ], channel_id='UCa')
+    bulk_upsert_videos([video_item('vother', published_at='2024-01-15T00:00:00Z')], channel_id='UCb')
+
+def _seed_statistics(channel_id, days):
+    db.session.add_all([
+        ChannelStatisticsHistory(channel_id=channel_id, date=date(2024, 3, day), view_count=day * 100,
+                                 subscriber_count=day, video_count=1)
+        for day in days
+    ])
+    db.session.commit()
+
+def test_ndjson_export_includes_whole_end_date(client):
+    _seed_videos()
+    
+    response = client.get('/api/channel/export/videos?channelIds=UCa&startDate=2024-01-01&endDate=2024-01-31')
+    
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=videos.ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    # 結束日當天23:59:59發布的影片仍包含在內，隔天00:00的影片不包含
+    assert [row['videoId'] for row in rows] == ['vjan01', 'vjan31']
+    assert rows[1]['publishedAt'] == '2024-01-31T23:59:59'
+    assert rows[1]['viewCount'] == 20
+    assert rows[1]['durationSeconds'] == 253
+
+def test_csv_export_of_statistics_history(client):
+    _seed_statistics('UCa', [3, 1, 2, 4])
+    _seed_statistics('UCb', [1])
+    
+    response = client.get('/api/channel/export/statistics?channelIds=UCb,UCa&format=csv&startDate=2024-03-02&endDate=2024-03-03')
+    
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ['channelId', 'date', 'viewCount', 'subscriberCount', 'videoCount',
+                       'estimatedMinutesWatched', 'averageViewDuration']
+    assert [row[:3] for row in rows[1:]] == [['UCa', '2024-03-02', '200'], ['UCa', '2024-03-03', '300']]
+
+@pytest.mark.parametrize('path', [
+    '/api/channel/export/videos?channelIds=UCa&startDate=2024-13-01',
+    '/api/channel/export/videos?channelIds=UCa&endDate=yesterday',
+    '/api/channel/export/videos?channelIds=UCa&startDate=2024-02-01&endDate=2024-01-01',
+    '/api/channel/export/comments?channelIds=UCa',
+    '/api/channel/export/videos?channelIds=UCa&format=xlsx',
+    '/api/channel/export/videos'
+])
+def test_invalid_export_is_rejected_before_streaming(client, path):
+    response = client.get(path)
+    
+    assert response.status_code == 400
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['error']['code'] == 'INVALID_PARAMETERS'
+
+def test_stream_yields_one_chunk_per_partition(app):
+    _seed_statistics('UCa', [1, 2, 3, 4, 5])
+    
+    chunks = list(ExportQuery('statistics', ['UCa'], chunk_size=2).stream())
+    assert [len(chunk.splitlines()) for chunk in chunks] == [2, 2, 1]
+    assert [json.loads(line)['date'] for chunk in chunks for line in chunk.splitlines()] == [
+        f'2024-03-0{day}' for day in range(1, 6)
+    ]
+    
+    chunks = list(ExportQuery('statistics', ['UCa'], output_format='csv', chunk_size=2).stream())
+    # 第一個區塊為CSV標題列
+    assert [len(chunk.splitlines()) for chunk in chunks] == [1, 2, 2, 1]
@@ -0,0 +1,138 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import channel_item
+from src.models.user import db
+from src.models.channel import Channel
+from src.services.freshness_service import channel_reader
+
+FRESH = channel_reader.fresh_seconds
+STALE = channel_reader.stale_seconds
+
+def _stored_channel(channel_id, age_seconds, view_count=1):
+    """儲存一個last_updated為age_seconds秒前的頻道"""
+    db.session.add(Channel(
+        channel_id=channel_id,
+        title=f'Channel {channel_id}',
+        view_count=view_count,
+        last_updated=datetime.utcnow() - timedelta(seconds=age_seconds)
+    ))
+    db.session.commit()
+
+def _upstream(youtube_http, view_count, gate=None):
+    """channels.list返回新的觀看次數；gate不為None時等待其設定後才響應"""
+    def handler(params, headers):
+        if gate is not None:
+            gate.wait(5)
+        return 200, {'etag': f'"e{view_count}"', 'items': [channel_item(params['id'], view_count=view_count)]}
+    youtube_http.on('channels', handler)
+
+def _wait_for_background_refresh(timeout=5):
+    deadline = time.monotonic() + timeout
+    while channel_reader._scheduled:
+        assert time.monotonic() < deadline, '背景刷新沒有在時限內完成'
+        time.sleep(0.01)
+
+def _stored_view_count(channel_id):
+    db.session.expire_all()
+    return Channel.query.filter_by(channel_id=channel_id).one().view_count
+
+def test_fresh_row_is_served_without_calling_youtube(app, youtube_http):
+    _stored_channel('UCfresh', age_seconds=FRESH - 60)
+    
+    data, freshness = channel_reader.get('UCfresh')
+    
+    assert data['statistics']['viewCount'] == 1
+    assert freshness['status'] == 'fresh'
+    assert freshness['refreshing'] is False
+    assert FRESH - 61 <= freshness['ageSeconds'] <= FRESH - 59
+    assert youtube_http.requests == []
+
+def test_stale_row_is_served_then_refreshed_in_background(app, youtube_http):
+    _stored_channel('UCstale', age_seconds=FRESH + 60)
+    gate = threading.Event()
+    _upstream(youtube_http, view_count=500, gate=gate)
+    
+    data, freshness = channel_reader.get('UCstale')
+    
+    # 舊資料立即返回，刷新仍在等待上游
+    assert data['statistics']['viewCount'] == 1
+    assert (freshness['status'], freshness['refreshing']) == ('stale', True)
+    assert 'UCstale' in channel_reader._scheduled
+    
+    gate.set()
+    _wait_for_background_refresh()
+    assert len(youtube_http.calls('channels')) == 1
+    assert _stored_view_count('UCstale') == 500
+    
+    data, freshness = channel_reader.get('UCstale')
+    assert data['statistics']['viewCount'] == 500
+    assert freshness['status'] == 'fresh'
+
+def test_expired_row_is_refreshed_synchronously(app, youtube_http):
+    _stored_channel('UCexpired', age_seconds=STALE + 60)
+    _upstream(youtube_http, view_count=700)
+    
+    data, freshness = channel_reader.get('UCexpired')
+    
+    assert data['statistics']['viewCount'] == 700
+    assert freshness['status'] == 'revalidated'
+    assert freshness['refreshing'] is False
+    assert freshness['ageSeconds'] < 5
+    assert len(youtube_http.calls('channels')) == 1
+    assert not channel_reader._scheduled
+
+def test_missing_row_is_fetched_synchronously(app, youtube_http):
+    _upstream(youtube_http, view_count=900)
+    
+    data, freshness = channel_reader.get('UCnew')
+    
+    assert data['statistics']['viewCount'] == 900
+    assert freshness['status'] == 'fetched'
+    assert _stored_view_count('UCnew') == 900
+
+def test_concurrent_stale_hits_schedule_one_refresh(app, youtube_http):
+    _stored_channel('UCbusy', age_seconds=FRESH + 60)
+    gate = threading.Event()
+    _upstream(youtube_http, view_count=42, gate=gate)
+    barrier = threading.Barrier(8)
+    
+    def reader():
+        with app.app_context():
+            barrier.wait(5)
+            try:
+                return channel_reader.get('UCbusy')[1]
+            finally:
+                db.session.remove()
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: reader(), range(8)))
+    
+    assert all(freshness['status'] == 'stale' and freshness['refreshing'] for freshness in results)
+    gate.set()
+    _wait_for_background_refresh()
+    assert len(youtube_http.calls('channels')) == 1
+    assert _stored_view_count('UCbusy') == 42
+
+def test_profile_route_reports_freshness(client, youtube_http):
+    _stored_channel('UCroute', age_seconds=120)
+    
+    response = client.get('/api/channel/UCroute/profile')
+    
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['data']['channelId'] == 'UCroute'
+    assert body['freshness']['status'] == 'fresh'
+    assert body['freshness']['lastUpdated'] == body['data']['lastUpdated']
+    assert 119 <= int(response.headers['Age']) <= 121
+    assert youtube_http.requests == []
+
+def test_profile_route_returns_404_for_unknown_channel(client, youtube_http):
+    youtube_http.on('channels', lambda params, headers: (200, {'items': []}))
+    
+    response = client.get('/api/channel/UCnobody/profile')
+    
+    assert response.status_code == 404
+    assert response.get_json()['error']['code'] == 'NOT_FOUND'
@@ -0,0 +1,106 @@
+from sqlalchemy import func, inspect, select, text
+
+from conftest import channel_item, video_item
+from src.config import TestingConfig
+from src.models.user import db
+from src.models.channel import Channel, Video
+from src.services.youtube_service import YouTubeService
+from src.services.ingestion_service import (
+    backfill_video_durations, bulk_upsert_channels, bulk_upsert_videos, ensure_etag_columns, refresh_channel, refresh_video
+)
+
+def _count(model):
+    return db.session.execute(select(func.count()).select_from(model.__table__)).scalar()
+
+def test_reupsert_updates_videos_in_place(app):
+    items = [video_item(f'v{i:03d}', view_count=100) for i in range(30)]
+    assert bulk_upsert_videos(items, channel_id='UCone', chunk_size=8) == 30
+    ids = dict(db.session.execute(select(Video.video_id, Video.id)).all())
+    
+    # 同一批次中重複的鍵只保留最後一筆
+    updated = [video_item(f'v{i:03d}', view_count=1000 + i) for i in range(30)]
+    assert bulk_upsert_videos(updated + updated[:5], channel_id='UCone', chunk_size=8) == 30
+    db.session.expire_all()
+    
+    assert _count(Video) == 30
+    assert dict(db.session.execute(select(Video.video_id, Video.id)).all()) == ids
+    video = Video.query.filter_by(video_id='v007').one()
+    assert video.view_count == 1007
+    # 互動率依新的數字在同一語句中重新計算：(10 + 1) / 1007 * 100
+    assert float(video.engagement_rate) == round(11 / 1007 * 100, 2)
+
+def test_reupsert_updates_channels_in_place(app):
+    bulk_upsert_channels([channel_item('UCa', view_count=1), channel_item('UCb', view_count=2)])
+    bulk_upsert_channels([channel_item('UCb', view_count=20), channel_item('UCc', view_count=30)])
+    db.session.expire_all()
+    
+    assert _count(Channel) == 3
+    assert {channel.channel_id: channel.view_count for channel in Channel.query.all()} == {'UCa': 1, 'UCb': 20, 'UCc': 30}
+
+def test_etag_migration_is_idempotent(app):
+    for table in ('channels', 'videos'):
+        db.session.execute(text(f'ALTER TABLE {table} DROP COLUMN etag'))
+    db.session.commit()
+    
+    assert ensure_etag_columns() == ['channels', 'videos']
+    assert ensure_etag_columns() == []
+    for table in ('channels', 'videos'):
+        assert 'etag' in {column['name'] for column in inspect(db.engine).get_columns(table)}
+
+def test_create_app_adds_duration_column_to_existing_database(tmp_path, monkeypatch):
+    from src.main import create_app
+    
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'legacy.db'}")
+    with create_app('testing').app_context():
+        # 加入duration_seconds之前建立的資料庫
+        db.session.execute(text('DROP INDEX ix_videos_duration_seconds'))
+        db.session.execute(text('DROP INDEX idx_videos_channel_duration'))
+        db.session.execute(text('ALTER TABLE videos DROP COLUMN duration_seconds'))
+        db.session.commit()
+        db.session.remove()
+        db.engine.dispose()
+    
+    with create_app('testing').app_context():
+        inspector = inspect(db.engine)
+        assert 'duration_seconds' in {column['name'] for column in inspector.get_columns('videos')}
+        assert {'ix_videos_duration_seconds', 'idx_videos_channel_duration'} <= {index['name'] for index in inspector.get_indexes('videos')}
+        
+        bulk_upsert_videos([video_item('vclip', duration='PT45S')], channel_id='UCone')
+        assert Video.query.filter(Video.duration_seconds <= 60).one().video_id == 'vclip'
+        db.session.remove()
+        db.engine.dispose()
+
+def _conditional(make_item, current_etag):
+    """內容未變更（If-None-Match相同）時返回304的處理函數"""
+    def handler(params, headers):
+        if headers.get('if-none-match') == current_etag:
+            return 304, None
+        return 200, {'etag': current_etag, 'items': [make_item(params['id'])]}
+    return handler
+
+def test_refresh_revalidates_with_stored_etag(app, youtube_http):
+    service = YouTubeService(api_key='test', cache=None, quota=None, coalesce=False)
+    youtube_http.on('channels', _conditional(lambda channel_id: channel_item(channel_id, view_count=42), '"c1"'))
+    youtube_http.on('videos', _conditional(lambda video_id: video_item(video_id, view_count=7, channel_id='UCetag'), '"v1"'))
+    
+    assert refresh_channel(service, 'UCetag') is True
+    assert refresh_video(service, 'vetag') is True
+    assert Channel.query.filter_by(channel_id='UCetag').one().etag == '"c1"'
+    assert Video.query.filter_by(video_id='vetag').one().etag == '"v1"'
+    
+    # 第二次刷新送出已儲存的ETag，上游返回304，資料列不需重新寫入
+    assert refresh_channel(service, 'UCetag') is False
+    assert refresh_video(service, 'vetag') is False
+    assert [headers.get('if-none-match') for headers in youtube_http.headers('channels')] == [None, '"c1"']
+    assert [headers.get('if-none-match') for headers in youtube_http.headers('videos')] == [None, '"v1"']
+    assert Channel.query.filter_by(channel_id='UCetag').one().view_count == 42
+
+def test_backfill_clears_zero_durations(app):
+    bulk_upsert_videos([video_item('vlive', duration='P0D'), video_item('vclip', duration='PT45S')], channel_id='UCone')
+    # 修正前的回填以0秒儲存直播影片
+    db.session.execute(text("UPDATE videos SET duration_seconds = 0 WHERE video_id = 'vlive'"))
+    db.session.commit()
+    
+    assert backfill_video_durations() == {'updated': 0, 'unparsed': 1, 'cleared': 1}
+    db.session.expire_all()
+    assert dict(db.session.execute(select(Video.video_id, Video.duration_seconds)).all()) == {'vlive': None, 'vclip': 45}
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import update
+
+from conftest import video_item
+from src.models.user import db
+from src.models.channel import Video
+from src.services.ingestion_service import bulk_upsert_videos
+from src.services.insights_service import channel_insights, load_channel_videos
+
+NOW = datetime(2024, 6, 1)
+
+def _videos(views, likes=None, published=None, durations=None):
+    """以欄位陣列建立channel_insights的輸入"""
+    count = len(views)
+    return {
+        'video_id': np.array([f'v{i:03d}' for i in range(count)], dtype=object),
+        'published_at': np.array(published or ['2024-01-01T00:00:00'] * count, dtype='datetime64[s]'),
+        'view_count': np.array(views, dtype=np.int64),
+        'like_count': np.array(likes or [0] * count, dtype=np.int64),
+        'comment_count': np.zeros(count, dtype=np.int64),
+        'duration_seconds': np.array(durations or [np.nan] * count, dtype=np.float64)
+    }
+
+def test_view_distribution_uses_iqr_outlier_bounds():
+    views = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 1000, 2000]
+    
+    distribution = channel_insights(_videos(views), now=NOW)['views']
+    
+    # p25 = 37.5、p75 = 92.5（線性插值），IQR = 55
+    assert distribution['percentiles']['p25'] == 37.5
+    assert distribution['percentiles']['p75'] == 92.5
+    assert distribution['iqr'] == 55
+    assert distribution['outlierBounds'] == {'lower': -45, 'upper': 175}
+    assert distribution['outliers']['low'] == 0
+    assert distribution['outliers']['high'] == 2
+    assert distribution['outliers']['top'] == [{'videoId': 'v011', 'value': 2000}, {'videoId': 'v010', 'value': 1000}]
+
+def test_top_outliers_are_limited_and_sorted():
+    views = [100] * 40 + [200, 800, 400, 300, 700, 500, 600]
+    
+    outliers = channel_insights(_videos(views), now=NOW)['views']['outliers']
+    
+    assert outliers['high'] == 7
+    assert [entry['value'] for entry in outliers['top']] == [800, 700, 600, 500, 400]
+    assert outliers['top'][0]['videoId'] == 'v041'
+
+def test_zero_view_videos_are_excluded_from_engagement():
+    insights = channel_insights(_videos([0, 100, 200], likes=[5, 10, 10]), now=NOW)
+    
+    assert insights['engagementRate']['count'] == 2
+    assert insights['engagementRate']['percentiles']['p50'] == 7.5
+    assert insights['views']['count'] == 3
+    # 整體互動率以總觀看次數計算：25 / 300
+    assert insights['overallEngagementRate'] == 8.33
+
+def test_weekday_histogram_starts_on_monday():
+    published = ['2024-01-01T09:00:00', '2024-01-03T00:00:00', '2024-01-03T23:59:59', '2024-01-07T12:00:00']
+    
+    cadence = channel_insights(_videos([1] * 4, published=published), now=NOW)['uploadCadence']
+    
+    # 2024-01-01為星期一、2024-01-07為星期日
+    assert cadence['byWeekday'] == [1, 0, 2, 0, 0, 0, 1]
+    assert cadence['byHourUtc'][9] == 1 and cadence['byHourUtc'][23] == 1
+    assert cadence['uploads'] == 4
+
+def _bucket_sizes(insights):
+    return {bucket['bucket']: bucket['videos'] for bucket in insights['durationBuckets']}
+
+def test_duration_buckets_include_limits_and_unknown(app):
+    durations = ['PT30S', 'PT1M', 'PT61S', 'PT4M', 'PT10M', 'PT20M', 'PT21M', 'P0D', None]
+    bulk_upsert_videos(
+        [video_item(f'v{i}', duration=duration) for i, duration in enumerate(durations)],
+        channel_id='UCbuckets'
+    )
+    
+    insights = channel_insights(load_channel_videos('UCbuckets'), now=NOW)
+    
+    # 上限包含在該組內；直播的P0D與沒有長度的影片歸入unknown
+    assert _bucket_sizes(insights) == {'shorts': 2, 'short': 2, 'medium': 2, 'long': 1, 'unknown': 2}
+    unknown = insights['durationBuckets'][-1]
+    assert (unknown['bucket'], unknown['minSeconds'], unknown['maxSeconds']) == ('unknown', None, None)
+
+def test_unbackfilled_durations_are_parsed_from_iso_string(app):
+    bulk_upsert_videos([video_item('vshort', duration='PT2M'), video_item('vlong', duration='PT1H')], channel_id='UCold')
+    db.session.execute(update(Video).values(duration_seconds=None))
+    db.session.commit()
+    
+    videos = load_channel_videos('UCold')
+    
+    assert sorted(videos['duration_seconds'].tolist()) == [120.0, 3600.0]
+    assert _bucket_sizes(channel_insights(videos, now=NOW)) == {'short': 1, 'long': 1}
+
+def test_insights_route(client):
+    assert client.get('/api/channel/UCempty/insights').status_code == 404
+    
+    bulk_upsert_videos([video_item('v1', view_count=100), video_item('v2', view_count=300)], channel_id='UCroute')
+    response = client.get('/api/channel/UCroute/insights')
+    
+    data = response.get_json()['data']
+    assert response.status_code == 200
+    assert (data['channelId'], data['videoCount'], data['totalViews']) == ('UCroute', 2, 400)
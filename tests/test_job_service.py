@@ -0,0 +1,202 @@
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func, select, update
+
+from conftest import channel_item, video_item, playlist_pages
+from src.config import Config, TestingConfig
+from src.models.user import db
+from src.models.job import Job
+from src.models.channel import Video
+from src.services.quota_service import QuotaExceededError, quota_tracker
+from src.services.job_service import (
+    JOB_TYPES, JobContext, JobType, cancel, claim_next, enqueue, recover_stale_jobs, run_job
+)
+
+class WorkerDied(BaseException):
+    """模擬工作者在執行途中被終止（不經過run_job的錯誤處理）"""
+
+def _register(monkeypatch, name, handler, max_running=1):
+    monkeypatch.setitem(JOB_TYPES, name, JobType(name, handler, max_running))
+
+def _reload(job_id):
+    db.session.expire_all()
+    return db.session.get(Job, job_id)
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """使用SQLite檔案的應用程式，讓每個執行緒有自己的資料庫連線"""
+    from src.main import create_app
+    
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'jobs.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+def test_only_one_worker_claims_a_job(file_app, monkeypatch):
+    _register(monkeypatch, 'noop', lambda context: None, max_running=2)
+    job, _ = enqueue('noop', 'UCone')
+    barrier = threading.Barrier(2)
+    
+    def worker(worker_id):
+        with file_app.app_context():
+            barrier.wait(5)
+            try:
+                claimed = claim_next(worker_id)
+                return claimed.id if claimed else None
+            finally:
+                db.session.remove()
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(worker, ['w1', 'w2']))
+    
+    assert sorted(results, key=str) == [job.id, None]
+    job = _reload(job.id)
+    assert job.status == 'running'
+    assert job.worker_id == ('w1' if results[0] else 'w2')
+    assert job.attempts == 1
+
+def test_claim_honors_max_running(app, monkeypatch):
+    _register(monkeypatch, 'single', lambda context: None, max_running=1)
+    first, _ = enqueue('single', 'UCa')
+    second, _ = enqueue('single', 'UCb')
+    
+    assert claim_next('w1').id == first.id
+    # 同類型已有一個執行中的工作，第二個工作留在佇列中
+    assert claim_next('w2') is None
+    
+    run_job(_reload(first.id))
+    assert claim_next('w2').id == second.id
+
+def test_crawl_resumes_from_checkpoint_after_recovery(app, youtube_http):
+    entries = [(f'v{i:03d}', '2024-01-01T00:00:00Z') for i in range(150)]
+    pages = playlist_pages(entries)
+    state = {'die_at': '100'}
+    
+    def playlist(params, headers):
+        if params.get('pageToken') == state['die_at']:
+            raise WorkerDied()
+        return pages(params, headers)
+    
+    youtube_http.on('channels', lambda params, headers: (200, {'items': [channel_item('UCcrawl', video_count=150)]}))
+    youtube_http.on('playlistItems', playlist)
+    youtube_http.on('videos', lambda params, headers: (200, {
+        'items': [video_item(video_id) for video_id in params['id'].split(',')]
+    }))
+    job, _ = enqueue('crawl_uploads', 'UCcrawl', concurrency=1)
+    
+    claimed = claim_next('w1')
+    with pytest.raises(WorkerDied):
+        JOB_TYPES['crawl_uploads'].handler(JobContext(claimed))
+    db.session.rollback()
+    
+    job = _reload(job.id)
+    assert (job.status, job.progress_done, job.progress_total) == ('running', 100, 150)
+    assert job.checkpoint['pageToken'] == '100'
+    
+    # 心跳未逾時前不會被重新排入
+    assert recover_stale_jobs(timeout=60) == 0
+    db.session.execute(update(Job).where(Job.id == job.id).values(heartbeat_at=datetime.utcnow() - timedelta(minutes=5)))
+    db.session.commit()
+    assert recover_stale_jobs(timeout=60) == 1
+    assert _reload(job.id).status == 'queued'
+    
+    state['die_at'] = None
+    tokens_before = len(youtube_http.calls('playlistItems'))
+    run_job(claim_next('w2'))
+    
+    job = _reload(job.id)
+    assert (job.status, job.progress_done, job.attempts) == ('succeeded', 150, 2)
+    # 從checkpoint的pageToken繼續，不重新讀取已完成的頁面，也不再重新讀取頻道
+    assert [params.get('pageToken') for params in youtube_http.calls('playlistItems')[tokens_before:]] == ['100']
+    assert len(youtube_http.calls('channels')) == 1
+    assert db.session.execute(select(func.count()).select_from(Video)).scalar() == 150
+
+def test_quota_exhaustion_defers_job_without_counting_attempt(app, monkeypatch):
+    reset_at = datetime(2030, 1, 2, 8, 0)
+    monkeypatch.setattr(quota_tracker, 'reset_time', lambda: reset_at.replace(tzinfo=None))
+    
+    def handler(context):
+        raise QuotaExceededError('youtubeDataAPI', 'search.list', 100, 0)
+    
+    _register(monkeypatch, 'hungry', handler)
+    job, _ = enqueue('hungry', 'UCquota')
+    
+    run_job(claim_next('w1'))
+    
+    job = _reload(job.id)
+    assert job.status == 'queued'
+    assert job.attempts == 0
+    assert job.available_at == reset_at
+    assert 'search.list' in job.error
+    assert job.finished_at is None
+    assert claim_next('w1') is None
+
+def test_failed_job_is_retried_until_max_attempts(app, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_MAX_ATTEMPTS', 2)
+    
+    def handler(context):
+        raise RuntimeError('upstream exploded')
+    
+    _register(monkeypatch, 'flaky', handler)
+    job, _ = enqueue('flaky', 'UCflaky')
+    
+    run_job(claim_next('w1'))
+    job = _reload(job.id)
+    assert (job.status, job.attempts) == ('queued', 1)
+    assert job.available_at > datetime.utcnow()
+    
+    db.session.execute(update(Job).where(Job.id == job.id).values(available_at=datetime.utcnow()))
+    db.session.commit()
+    run_job(claim_next('w1'))
+    job = _reload(job.id)
+    assert (job.status, job.attempts, job.error) == ('failed', 2, 'upstream exploded')
+
+def test_cancel_stops_running_job_at_next_checkpoint(app, monkeypatch):
+    steps = []
+    
+    def handler(context):
+        for step in range(1, 4):
+            steps.append(step)
+            if step == 2:
+                # 另一個請求在執行途中要求取消
+                assert cancel(context.job.id).cancel_requested
+            context.checkpoint({'step': step}, done=step, total=3)
+    
+    _register(monkeypatch, 'steps', handler)
+    job, _ = enqueue('steps', 'UCcancel')
+    
+    run_job(claim_next('w1'))
+    
+    job = _reload(job.id)
+    assert steps == [1, 2]
+    assert job.status == 'cancelled'
+    assert job.checkpoint == {'step': 2}
+    assert job.finished_at is not None
+
+def test_cancel_queued_job_finishes_it_immediately(app, monkeypatch):
+    _register(monkeypatch, 'noop', lambda context: None)
+    job, _ = enqueue('noop', 'UCqueued')
+    
+    assert cancel(job.id).status == 'cancelled'
+    assert claim_next('w1') is None
+    assert cancel(job.id + 1) is None
+
+def test_eta_uses_progress_of_current_run():
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    job = Job(status='running', progress_total=100, progress_done=40, run_progress_start=20,
+              started_at=now - timedelta(seconds=10))
+    
+    # 本次執行10秒處理20筆，剩餘60筆
+    assert job.eta_seconds(now) == 30.0
+    
+    job.progress_done = 20
+    assert job.eta_seconds(now) is None
+    job.progress_done, job.status = 40, 'queued'
+    assert job.eta_seconds(now) is None
+    job.status, job.progress_total = 'running', None
+    assert job.eta_seconds(now) is None
@@ -0,0 +1,48 @@
+import threading
+
+from src.config import Config
+from src.services.job_service import JobWorkerPool
+from src.services.snapshot_service import SnapshotScheduler
+from src.main import create_app, start_job_workers, start_schedulers
+
+def test_workers_start_only_from_entry_point(monkeypatch):
+    started = []
+    monkeypatch.setattr(Config, 'JOB_MAX_WORKERS', 2)
+    monkeypatch.setattr(JobWorkerPool, 'start', lambda pool: started.append(pool.workers))
+    
+    app = create_app('production')
+    
+    assert 'job_workers' not in app.extensions
+    assert not any(thread.name.startswith('job-worker-') for thread in threading.enumerate())
+    
+    assert start_job_workers(app) is app.extensions['job_workers']
+    assert started == [2]
+
+def test_entry_point_respects_zero_workers(monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_MAX_WORKERS', 0)
+    assert start_job_workers(create_app('production')) is None
+
+def test_snapshot_scheduler_starts_only_from_entry_point(monkeypatch):
+    started = []
+    monkeypatch.setattr(Config, 'SNAPSHOT_INTERVAL_SECONDS', 3600)
+    monkeypatch.setattr(SnapshotScheduler, 'start', lambda scheduler: started.append(scheduler.name))
+    
+    # 每個WSGI worker與flask指令都會匯入並建立應用程式，不應各自排程快照
+    app = create_app('production')
+    assert 'snapshot_scheduler' not in app.extensions
+    assert started == []
+    
+    assert start_schedulers(app) == [app.extensions['snapshot_scheduler']]
+    assert started == ['statistics-snapshot']
+
+def test_columnar_scheduler_starts_only_from_entry_point(monkeypatch):
+    started = []
+    monkeypatch.setattr(Config, 'COLUMNAR_REFRESH_SECONDS', 600)
+    monkeypatch.setattr(SnapshotScheduler, 'start', lambda scheduler: started.append(scheduler.name))
+    
+    app = create_app('production')
+    assert 'columnar_scheduler' not in app.extensions
+    assert started == []
+    
+    assert start_schedulers(app) == [app.extensions['columnar_scheduler']]
+    assert started == ['columnar-refresh']
@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from src.services.metrics import DB_QUERY_DURATION, instrument_database
+
+def _observations(label):
+    with DB_QUERY_DURATION._lock:
+        series = DB_QUERY_DURATION._series.get((label,))
+        return series[2] if series else 0
+
+def test_failed_statements_are_timed_without_leaking_start_times():
+    engine = create_engine('sqlite://')
+    instrument_database(engine)
+    contexts = []
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        contexts.append(context)
+    
+    before = _observations('SELECT')
+    
+    with engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text('SELECT * FROM missing_table'))
+        assert connection.execute(text('SELECT 1')).scalar() == 1
+    
+    # 失敗與成功的語句都被計時，且記錄後不再保留開始時間
+    assert _observations('SELECT') == before + 4
+    assert len(contexts) == 4
+    assert all(context._query_started is None for context in contexts)
@@ -0,0 +1,94 @@
+import threading
+import pytest
+from src.services.quota_service import QuotaTracker, QuotaExceededError
+
+def _tracker(limit, reserve=0):
+    return QuotaTracker(limits={'youtubeDataAPI': limit, 'youtubeAnalyticsAPI': limit}, reserve=reserve)
+
+def test_concurrent_acquire_never_overspends():
+    tracker = _tracker(100)
+    granted = []
+    rejected = []
+    barrier = threading.Barrier(50)
+    
+    def worker():
+        barrier.wait()
+        for _ in range(4):
+            try:
+                tracker.acquire('channels.list')
+                granted.append(1)
+            except QuotaExceededError:
+                rejected.append(1)
+    
+    threads = [threading.Thread(target=worker) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(granted) == 100
+    assert len(rejected) == 100
+    assert tracker.status()['services']['youtubeDataAPI']['quotaUsed'] == 100
+
+def test_release_refunds_acquired_units():
+    tracker = _tracker(1000)
+    tracker.acquire('search.list')
+    tracker.release('search.list')
+    
+    methods = tracker.status()['services']['youtubeDataAPI']['methods']
+    assert methods['search.list'] == {'calls': 0, 'units': 0}
+
+def test_expensive_calls_cannot_use_reserve():
+    tracker = _tracker(150, reserve=60)
+    with pytest.raises(QuotaExceededError):
+        tracker.acquire('search.list')
+    # 低成本呼叫仍可使用保留配額
+    tracker.acquire('channels.list')
+    assert tracker.status()['services']['youtubeDataAPI']['quotaUsed'] == 1
+
+def _shared(path, limit, reserve=0):
+    return QuotaTracker(state_file=str(path), limits={'youtubeDataAPI': limit}, reserve=reserve)
+
+def _used(tracker):
+    return tracker.status()['services']['youtubeDataAPI']['quotaUsed']
+
+def test_trackers_sharing_a_state_file_enforce_one_budget(tmp_path):
+    # 兩個計量器模擬兩個WSGI worker
+    first = _shared(tmp_path / 'quota.json', 10, reserve=5)
+    second = _shared(tmp_path / 'quota.json', 10, reserve=5)
+    
+    for _ in range(6):
+        first.acquire('channels.list')
+    for _ in range(4):
+        second.acquire('channels.list')
+    with pytest.raises(QuotaExceededError):
+        first.acquire('channels.list')
+    assert _used(first) == _used(second) == 10
+    
+    second.release('channels.list')
+    assert _used(first) == 9
+    # 新啟動的程序從檔案接續今日的計數
+    assert _used(_shared(tmp_path / 'quota.json', 10)) == 9
+
+def test_concurrent_trackers_never_overspend_shared_budget(tmp_path):
+    trackers = [_shared(tmp_path / 'quota.json', 60) for _ in range(3)]
+    granted = []
+    barrier = threading.Barrier(12)
+    
+    def worker(tracker):
+        barrier.wait()
+        for _ in range(10):
+            try:
+                tracker.acquire('channels.list')
+                granted.append(1)
+            except QuotaExceededError:
+                pass
+    
+    threads = [threading.Thread(target=worker, args=(trackers[i % 3],)) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(granted) == 60
+    assert [_used(tracker) for tracker in trackers] == [60, 60, 60]
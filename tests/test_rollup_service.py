@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src.models.user import db
+from src.models.channel import ChannelStatisticsHistory
+from src.services.rollup_service import rollup_engine, get_rollups, summarize_growth
+
+FIRST_DAY = date(2024, 1, 7)  # 週日，作為2024-01-08那一週的起始值
+LAST_DAY = date(2024, 1, 21)
+
+def _views(day):
+    """第一週每天增加100，第二週每天增加200"""
+    offset = (day - FIRST_DAY).days
+    return 1000 + 100 * min(offset, 7) + 200 * max(offset - 7, 0)
+
+def _seed():
+    day = FIRST_DAY
+    while day <= LAST_DAY:
+        db.session.add(ChannelStatisticsHistory(channel_id='UCa', date=day, view_count=_views(day), subscriber_count=50, video_count=3))
+        db.session.add(ChannelStatisticsHistory(channel_id='UCb', date=day, view_count=500, subscriber_count=0, video_count=1))
+        day += timedelta(days=1)
+    db.session.commit()
+
+def _without_timestamps(rollups):
+    return [{key: value for key, value in rollup.items() if key != 'updatedAt'} for rollup in rollups]
+
+def test_weekly_and_monthly_rollup_values(app):
+    _seed()
+    rollup_engine.rebuild(FIRST_DAY, LAST_DAY)
+    
+    weeks = get_rollups('UCa', 'week')
+    assert [(week['periodStart'], week['days'], week['viewDelta']) for week in weeks] == [
+        ('2024-01-01', 1, 0),
+        ('2024-01-08', 7, 700),
+        ('2024-01-15', 7, 1400)
+    ]
+    assert weeks[1]['viewGrowthRate'] == pytest.approx(70.0)
+    assert weeks[2]['viewGrowthRate'] == pytest.approx(1400 / 1700 * 100)
+    # 四週移動平均只計入已有的期間
+    assert [week['viewDeltaMovingAverage'] for week in weeks] == [0, 350, 700]
+    
+    month, = get_rollups('UCa', 'month')
+    assert (month['periodStart'], month['periodEnd'], month['days']) == ('2024-01-01', '2024-01-31', 15)
+    assert (month['viewCount'], month['viewDelta'], month['subscriberDelta']) == (3100, 2100, 0)
+    assert month['viewGrowthRate'] == pytest.approx(210.0)
+    assert summarize_growth(weeks) == {'views': 210.0, 'subscribers': 0.0}
+    
+    # 起始值為0時成長率為空
+    flat, = get_rollups('UCb', 'month')
+    assert (flat['viewGrowthRate'], flat['subscriberGrowthRate']) == (0.0, None)
+
+def test_incremental_updates_match_rebuild(app):
+    _seed()
+    day = FIRST_DAY
+    while day <= LAST_DAY:
+        rollup_engine.update(['UCa', 'UCb'], day)
+        day += timedelta(days=1)
+    incremental = {period: _without_timestamps(get_rollups('UCa', period)) for period in ('week', 'month')}
+    
+    rollup_engine.rebuild(FIRST_DAY, LAST_DAY)
+    assert {period: _without_timestamps(get_rollups('UCa', period)) for period in ('week', 'month')} == incremental
@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import text
+
+from conftest import channel_item
+from src.models.user import db
+from src.models.channel import Channel
+from src.services.youtube_service import YouTubeService
+from src.services.ingestion_service import bulk_upsert_channels
+from src.config import Config
+from src.services.search_service import ensure_search_index, search_local, search_channels
+
+@pytest.fixture
+def search_app(app):
+    """建立應用程式時已建立FTS5索引；SQLite未編譯FTS5時略過"""
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'channels_fts'")
+    ).first() is not None
+    if not exists:
+        pytest.skip('SQLite未支援FTS5')
+    return app
+
+def _channel(channel_id, title):
+    item = channel_item(channel_id)
+    item['snippet']['title'] = title
+    return item
+
+def _found(query):
+    return [channel.channel_id for channel in search_local('channels', query)]
+
+def test_fts_index_follows_insert_update_delete(search_app):
+    bulk_upsert_channels([_channel('UCcook', 'Weekend Cooking'), _channel('UCgame', 'Retro Gaming')])
+    assert _found('cooking') == ['UCcook']
+    # 前綴比對
+    assert _found('gam') == ['UCgame']
+    
+    # upsert改名後舊標題不再命中
+    bulk_upsert_channels([_channel('UCcook', 'Weekend Baking')])
+    assert _found('cooking') == []
+    assert _found('baking') == ['UCcook']
+    
+    db.session.delete(Channel.query.filter_by(channel_id='UCgame').one())
+    db.session.commit()
+    assert _found('gaming') == []
+    assert db.session.execute(text("SELECT COUNT(*) FROM channels_fts")).scalar() == 1
+
+def test_cjk_terms_match_inside_titles(search_app):
+    bulk_upsert_channels([
+        _channel('UCfood', '台灣美食頻道'),
+        _channel('UCtravel', '日本旅遊日記'),
+        _channel('UCmix', '美食 Vlog 100%_real')
+    ])
+    
+    # 兩個字的詞不足trigram長度，改以子字串篩選；標題命中者在前
+    assert _found('美食') == ['UCfood', 'UCmix']
+    assert _found('灣美食') == ['UCfood']
+    assert _found('美食 vlog') == ['UCmix']
+    assert _found('旅遊 美食') == []
+    # 底線是LIKE的萬用字元，必須照字面比對
+    assert _found('0_') == []
+    assert _found('%_r') == ['UCmix']
+
+def _tokenizer(table):
+    definition = db.session.execute(
+        text("SELECT sql FROM sqlite_master WHERE name = :name"), {'name': f'{table}_fts'}
+    ).scalar()
+    return definition.split("tokenize='")[1].split("'")[0]
+
+def test_index_is_rebuilt_when_tokenizer_changes(search_app, monkeypatch):
+    bulk_upsert_channels([_channel('UCcook', 'Weekend Cooking')])
+    assert _tokenizer('channels') == 'trigram'
+    assert ensure_search_index() == []
+    
+    monkeypatch.setattr(Config, 'SEARCH_FTS_TOKENIZER', 'unicode61 remove_diacritics 2')
+    assert ensure_search_index() == ['channels', 'videos']
+    assert _tokenizer('channels') == 'unicode61 remove_diacritics 2'
+    assert ensure_search_index() == []
+    
+    # 既有資料已重建到新的索引，觸發器也重新建立
+    assert _found('cook') == ['UCcook']
+    bulk_upsert_channels([_channel('UCgame', 'Retro Gaming')])
+    assert _found('gaming') == ['UCgame']
+    assert db.session.execute(text("SELECT COUNT(*) FROM channels_fts")).scalar() == 2
+
+def _youtube(youtube_http, titles):
+    """search.list依序返回titles中的頻道"""
+    youtube_http.on('search', lambda params, headers: (200, {
+        'items': [{'id': {'channelId': channel_id}} for channel_id in titles]
+    }))
+    youtube_http.on('channels', lambda params, headers: (200, {
+        'items': [_channel(channel_id, titles[channel_id]) for channel_id in params['id'].split(',')]
+    }))
+    return YouTubeService(api_key='test', cache=None, quota=None, coalesce=False)
+
+def test_search_channels_sources(search_app, youtube_http):
+    service = _youtube(youtube_http, {'UCjazz': 'Late Night Jazz', 'UCjazz2': 'Jazz Piano Covers'})
+    
+    # 本地沒有結果：全部來自search.list，並寫入channels資料表
+    channels, source = search_channels('jazz', youtube_service=service)
+    assert source == 'api'
+    assert [channel['channelId'] for channel in channels] == ['UCjazz', 'UCjazz2']
+    assert len(youtube_http.calls('search')) == 1
+    
+    # 本地結果不足：本地在前，再補上API找到的其他頻道
+    channels, source = search_channels('jazz', youtube_service=service, min_local_results=3)
+    assert source == 'mixed'
+    assert sorted(channel['channelId'] for channel in channels) == ['UCjazz', 'UCjazz2']
+    assert len(youtube_http.calls('search')) == 2
+    
+    # 本地結果足夠時不呼叫search.list
+    channels, source = search_channels('jazz', youtube_service=service, min_local_results=2)
+    assert source == 'local'
+    assert sorted(channel['channelId'] for channel in channels) == ['UCjazz', 'UCjazz2']
+    assert len(youtube_http.calls('search')) == 2
@@ -0,0 +1,142 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services.singleflight import SingleFlight, flight_key
+
+def test_flight_key_ignores_order_api_key_and_none():
+    assert flight_key('channels.list', {'id': 'UC1', 'part': 'statistics', 'key': 'secret', 'pageToken': None}, 'public') == \
+        flight_key('channels.list', [('part', 'statistics'), ('id', 'UC1')], 'public')
+
+def _thread_callers(flight, fn, count):
+    """讓count個執行緒同時以相同的鍵呼叫，返回各自的結果或例外"""
+    barrier = threading.Barrier(count)
+    
+    def caller():
+        barrier.wait(5)
+        try:
+            return flight.do('key', fn)
+        except Exception as e:
+            return e
+    
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return list(executor.map(lambda _: caller(), range(count)))
+
+def test_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)  # 足以讓所有呼叫者在完成前加入
+        return {'id': 'UC1'}
+    
+    results = _thread_callers(flight, fn, 10)
+    
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 9
+    assert all(result is results[0][0] for result, _ in results)
+    assert flight.in_flight() == 0
+
+def test_thread_error_reaches_every_caller():
+    flight = SingleFlight()
+    calls = []
+    
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)
+        raise ValueError('upstream failed')
+    
+    outcomes = _thread_callers(flight, fn, 5)
+    
+    assert len(calls) == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert flight.in_flight() == 0
+
+async def _gather_callers(flight, fn, count):
+    tasks = [asyncio.ensure_future(flight.do_async('key', fn)) for _ in range(count)]
+    await asyncio.sleep(0)
+    return tasks
+
+def test_async_callers_share_one_call():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+        
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {'id': 'UC1'}
+        
+        results = await asyncio.gather(*(flight.do_async('key', fn) for _ in range(20)))
+        return flight, calls, results
+    
+    flight, calls, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 19
+    assert all(result is results[0][0] for result, _ in results)
+    assert flight.in_flight() == 0
+
+def test_async_error_reaches_every_caller():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+        
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError('upstream failed')
+        
+        outcomes = await asyncio.gather(*(flight.do_async('key', fn) for _ in range(5)), return_exceptions=True)
+        assert flight.in_flight() == 0
+        
+        # 失敗的呼叫不會被保留，之後的呼叫重新執行
+        retried = await asyncio.gather(flight.do_async('key', fn), return_exceptions=True)
+        return calls, outcomes + retried
+    
+    calls, outcomes = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+        
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 'result'
+        
+        tasks = await _gather_callers(flight, fn, 3)
+        tasks[0].cancel()
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        return calls, outcomes
+    
+    calls, outcomes = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert isinstance(outcomes[0], asyncio.CancelledError)
+    assert outcomes[1:] == [('result', True), ('result', True)]
+
+def test_call_is_cancelled_when_every_caller_is_cancelled():
+    async def scenario():
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+        
+        async def fn():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        tasks = await _gather_callers(flight, fn, 3)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        return flight.in_flight()
+    
+    assert asyncio.run(scenario()) == 0
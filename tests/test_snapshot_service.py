@@ -0,0 +1,43 @@
+from datetime import date
+
+from conftest import channel_item
+from src.models.user import db
+from src.models.channel import Channel, ChannelStatisticsHistory
+from src.services.ingestion_service import bulk_upsert_channels
+from src.services.snapshot_service import StatisticsSnapshotter
+
+class FakeStatisticsClient:
+    """只提供get_channels_statistics的假YouTubeService"""
+    
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.calls = []
+    
+    def get_channels_statistics(self, channel_ids):
+        self.calls.append(list(channel_ids))
+        return [
+            channel_item(channel_id, view_count=5000, subscriber_count=700)
+            for channel_id in channel_ids if channel_id not in self.missing
+        ]
+
+def test_snapshot_batches_and_resumes(app):
+    channel_ids = [f'UCsnap{i:03d}' for i in range(120)]
+    bulk_upsert_channels([channel_item(channel_id) for channel_id in channel_ids])
+    client = FakeStatisticsClient(missing={'UCsnap005'})
+    snapshot_date = date(2024, 6, 1)
+    
+    report = StatisticsSnapshotter(youtube_service=client).run(snapshot_date)
+    
+    assert [len(chunk) for chunk in client.calls] == [50, 50, 20]
+    assert report['apiCalls'] == 3
+    assert report['snapshotted'] == 119
+    assert report['missing'] == 1
+    assert ChannelStatisticsHistory.query.filter_by(date=snapshot_date).count() == 119
+    assert Channel.query.filter_by(channel_id='UCsnap010').one().view_count == 5000
+    
+    # 同一天再次執行只重新查詢沒有快照的頻道
+    client.calls.clear()
+    report = StatisticsSnapshotter(youtube_service=client).run(snapshot_date)
+    assert client.calls == [['UCsnap005']]
+    assert report['alreadySnapshotted'] == 119
+    assert ChannelStatisticsHistory.query.filter_by(date=snapshot_date).count() == 119
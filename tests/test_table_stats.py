@@ -0,0 +1,76 @@
+from sqlalchemy import event, func, select
+
+from conftest import channel_item, video_item
+from src.models.user import db
+from src.models.channel import Channel, Video
+from src.models.table_stats import TRACKED_MODELS, get_row_counts
+from src.services.ingestion_service import bulk_upsert_channels, bulk_upsert_videos
+
+def _actual_counts():
+    return {
+        model.__tablename__: db.session.execute(select(func.count()).select_from(model.__table__)).scalar()
+        for model in TRACKED_MODELS
+    }
+
+def _orm_video(video_id):
+    return Video.from_youtube_data(video_item(video_id), 'UCorm')
+
+def test_counters_match_count_after_mixed_writes(app):
+    # 第一次讀取時以COUNT(*)建立計數器
+    assert get_row_counts() == _actual_counts()
+    
+    # ORM新增
+    db.session.add_all([_orm_video(f'vorm{i}') for i in range(3)])
+    db.session.add(Channel.from_youtube_data(channel_item('UCorm')))
+    db.session.commit()
+    
+    # 批次寫入：新鍵、已存在的鍵（ORM與先前批次寫入的列）與同一批次內重複的鍵
+    bulk_upsert_videos([video_item(f'vbulk{i}') for i in range(10)], channel_id='UCbulk', chunk_size=4)
+    bulk_upsert_videos(
+        [video_item(f'vbulk{i}') for i in range(5, 15)] + [video_item('vorm0'), video_item('vbulk14')],
+        channel_id='UCbulk', chunk_size=4
+    )
+    bulk_upsert_channels([channel_item('UCorm'), channel_item('UCbulk')])
+    
+    # ORM刪除
+    for video in Video.query.filter(Video.video_id.in_(['vorm1', 'vbulk3'])).all():
+        db.session.delete(video)
+    db.session.commit()
+    
+    # 回滾的寫入不影響計數
+    db.session.add(_orm_video('vrolledback'))
+    db.session.flush()
+    db.session.rollback()
+    
+    counts = get_row_counts()
+    assert counts == _actual_counts()
+    assert (counts['videos'], counts['channels']) == (16, 2)
+
+def test_concurrent_upsert_of_same_new_keys_is_counted_once(app):
+    assert get_row_counts() == _actual_counts()
+    
+    # 另一個寫入者在本次寫入送出前新增並計數了相同的新鍵（模擬兩個並行的批次寫入）
+    competing = [f'vrace{i}' for i in range(6)]
+    raced = []
+    
+    def other_writer(conn, cursor, statement, parameters, context, executemany):
+        if raced or not statement.startswith('INSERT INTO videos'):
+            return
+        raced.append(True)
+        raw = conn.connection.driver_connection
+        raw.executemany(
+            "INSERT INTO videos (video_id, channel_id, title) VALUES (?, 'UCrace', 'other writer')",
+            [(video_id,) for video_id in competing]
+        )
+        raw.execute("UPDATE table_row_counts SET row_count = row_count + ? WHERE table_name = 'videos'", (len(competing),))
+    
+    event.listen(db.engine, 'before_cursor_execute', other_writer)
+    try:
+        bulk_upsert_videos([video_item(video_id) for video_id in competing + ['vsolo']], channel_id='UCrace')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', other_writer)
+    
+    assert raced
+    counts = get_row_counts()
+    assert counts == _actual_counts()
+    assert counts['videos'] == 7
@@ -0,0 +1,178 @@
+import pytest
+from googleapiclient.errors import HttpError
+
+from conftest import channel_item, video_item, playlist_pages
+from src.config import Config
+from src.services.quota_service import QuotaTracker, QuotaExceededError
+from src.services.youtube_service import YouTubeService, SCAN_ALL
+
+def _service(**kwargs):
+    kwargs.setdefault('cache', None)
+    kwargs.setdefault('quota', None)
+    kwargs.setdefault('coalesce', False)
+    return YouTubeService(api_key='test', **kwargs)
+
+def _channels_handler(missing=()):
+    """依請求的ID返回頻道，missing中的ID視為不存在"""
+    def handler(params, headers):
+        ids = params['id'].split(',')
+        return 200, {'items': [channel_item(channel_id) for channel_id in ids if channel_id not in missing]}
+    return handler
+
+def test_search_hydrates_with_single_channels_list(youtube_http):
+    ids = [f'UCsearch{i:04d}' for i in range(50)]
+    youtube_http.on('search', lambda params, headers: (200, {'items': [{'id': {'channelId': channel_id}} for channel_id in ids]}))
+    youtube_http.on('channels', _channels_handler(missing={ids[3]}))
+    
+    channels = _service().search_channels('test', max_results=50)
+    
+    assert len(youtube_http.calls('search')) == 1
+    channel_calls = youtube_http.calls('channels')
+    assert len(channel_calls) == 1
+    assert channel_calls[0]['id'].split(',') == ids
+    # 保留search.list的順序並略過不存在的頻道
+    assert [channel['id'] for channel in channels] == ids[:3] + ids[4:]
+
+def test_channel_details_chunks_fifty_ids_per_call(youtube_http):
+    ids = [f'UCchunk{i:04d}' for i in range(120)]
+    youtube_http.on('channels', _channels_handler())
+    
+    channels = _service().get_channels_details(ids + ids[:10])
+    
+    assert [len(params['id'].split(',')) for params in youtube_http.calls('channels')] == [50, 50, 20]
+    assert [channel['id'] for channel in channels] == ids
+
+def _uploads(youtube_http, count):
+    """建立上傳數量為count的頻道，觀看數隨影片編號遞增"""
+    entries = [(f'v{i:05d}', '2024-01-01T00:00:00Z') for i in range(count)]
+    youtube_http.on('channels', _channels_handler())
+    youtube_http.on('playlistItems', playlist_pages(entries))
+    youtube_http.on('videos', lambda params, headers: (200, {
+        'items': [video_item(video_id, view_count=int(video_id[1:])) for video_id in params['id'].split(',')]
+    }))
+
+def test_top_videos_scan_is_capped_by_default(youtube_http, monkeypatch):
+    monkeypatch.setattr(Config, 'VIDEO_SCAN_LIMIT', 100)
+    _uploads(youtube_http, 1000)
+    
+    videos = _service().get_channel_videos('UCbig', max_results=5, order='viewCount')
+    
+    assert len(youtube_http.calls('playlistItems')) == 2
+    assert len(youtube_http.calls('videos')) == 2
+    assert [video['id'] for video in videos] == ['v00099', 'v00098', 'v00097', 'v00096', 'v00095']
+
+def test_top_videos_scan_all_is_explicit(youtube_http, monkeypatch):
+    monkeypatch.setattr(Config, 'VIDEO_SCAN_LIMIT', 100)
+    _uploads(youtube_http, 1000)
+    
+    videos = _service().get_channel_videos('UCbig', max_results=3, order='viewCount', max_scan=SCAN_ALL)
+    
+    assert len(youtube_http.calls('playlistItems')) == 20
+    assert [video['id'] for video in videos] == ['v00999', 'v00998', 'v00997']
+
+def _batched_channel_calls(service, groups):
+    return [(service.youtube.channels().list(part='statistics', id=','.join(ids)), 'channels.list') for ids in groups]
+
+def _channels_used(tracker):
+    return tracker.status()['services']['youtubeDataAPI']['quotaUsed']
+
+GROUPS = [['UCone'], ['UCmissing'], ['UCthree']]
+
+def test_batch_does_not_retry_client_errors(youtube_http):
+    youtube_http.on('channels', lambda params, headers: (
+        (404, {'error': {'code': 404, 'message': 'not found'}}) if params['id'] == 'UCmissing'
+        else (200, {'items': [channel_item(params['id'])]})
+    ))
+    tracker = QuotaTracker(limits={'youtubeDataAPI': 100})
+    service = _service(quota=tracker, batch_mode=True)
+    
+    results = service.execute_batch(_batched_channel_calls(service, GROUPS), return_exceptions=True)
+    
+    assert youtube_http.batches == [3]
+    assert len(youtube_http.calls('channels')) == 3
+    assert isinstance(results[1], HttpError) and results[1].resp.status == 404
+    assert [results[0]['items'][0]['id'], results[2]['items'][0]['id']] == ['UCone', 'UCthree']
+    assert _channels_used(tracker) == 3
+    
+    with pytest.raises(HttpError):
+        service.execute_batch(_batched_channel_calls(service, GROUPS))
+
+def test_batch_retries_server_errors_individually(youtube_http):
+    failures = {'UCmissing': 1}
+    
+    def handler(params, headers):
+        if failures.get(params['id']):
+            failures[params['id']] -= 1
+            return 500, {'error': {'code': 500, 'message': 'backend error'}}
+        return 200, {'items': [channel_item(params['id'])]}
+    
+    youtube_http.on('channels', handler)
+    tracker = QuotaTracker(limits={'youtubeDataAPI': 100})
+    service = _service(quota=tracker, batch_mode=True)
+    
+    results = service.execute_batch(_batched_channel_calls(service, GROUPS))
+    
+    assert [result['items'][0]['id'] for result in results] == ['UCone', 'UCmissing', 'UCthree']
+    assert len(youtube_http.calls('channels')) == 4
+    # 失敗的子請求有響應，計量一次；單獨重試再計量一次
+    assert _channels_used(tracker) == 4
+
+def test_failed_batch_charges_each_call_once(youtube_http):
+    youtube_http.on('batch', lambda parts: (503, {'error': {'code': 503, 'message': 'unavailable'}}))
+    youtube_http.on('channels', _channels_handler())
+    tracker = QuotaTracker(limits={'youtubeDataAPI': 100})
+    service = _service(quota=tracker, batch_mode=True)
+    
+    results = service.execute_batch(_batched_channel_calls(service, GROUPS))
+    
+    assert [result['items'][0]['id'] for result in results] == ['UCone', 'UCmissing', 'UCthree']
+    assert len(youtube_http.calls('channels')) == 3
+    assert _channels_used(tracker) == 3
+
+def test_batch_over_quota_is_not_sent(youtube_http):
+    youtube_http.on('channels', _channels_handler())
+    tracker = QuotaTracker(limits={'youtubeDataAPI': 2})
+    service = _service(quota=tracker, batch_mode=True)
+    
+    with pytest.raises(QuotaExceededError):
+        service.execute_batch(_batched_channel_calls(service, GROUPS))
+    
+    assert youtube_http.batches == []
+    assert _channels_used(tracker) == 0
+
+def _analytics_service(**kwargs):
+    from google.oauth2.credentials import Credentials
+    return _service(credentials=Credentials(token='test-token'), user_id=1, **kwargs)
+
+def _reports_handler(failing):
+    """依dimensions返回一列數據，failing中的維度返回403"""
+    def handler(params, headers):
+        dimension = params['dimensions']
+        if dimension in failing:
+            return 403, {'error': {'code': 403, 'message': f'{dimension} forbidden'}}
+        return 200, {'columnHeaders': [{'name': dimension}], 'rows': [[f'{dimension}-value', 10, 20]]}
+    return handler
+
+@pytest.mark.parametrize('batch_mode', [False, True])
+def test_failing_demographic_dimension_is_reported_separately(youtube_http, batch_mode):
+    youtube_http.on('reports', _reports_handler(failing={'gender'}))
+    
+    data = _analytics_service(batch_mode=batch_mode).get_audience_demographics(
+        'UCa', '2024-01-01', '2024-01-31', extra_dimensions=['deviceTypes']
+    )
+    
+    assert sorted(params['dimensions'] for params in youtube_http.calls('reports')) == [
+        'ageGroup', 'country', 'deviceType', 'gender'
+    ]
+    assert youtube_http.batches == ([4] if batch_mode else [])
+    assert list(data['errors']) == ['gender'] and 'forbidden' in data['errors']['gender']
+    assert data['gender'] is None
+    assert [data[key]['rows'][0][0] for key in ('ageGroups', 'countries', 'deviceTypes')] == [
+        'ageGroup-value', 'country-value', 'deviceType-value'
+    ]
+
+def test_demographics_fail_when_every_dimension_fails(youtube_http):
+    youtube_http.on('reports', _reports_handler(failing={'ageGroup', 'gender', 'country'}))
+    
+    with pytest.raises(HttpError):
+        _analytics_service().get_audience_demographics('UCa', '2024-01-01', '2024-01-31')
@@ -1,32 +1,281 @@
 import os
-from datetime import datetime, timedelta
-from googleapiclient.discovery import build
+import heapq
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+from datetime import datetime, timedelta, timezone
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import Flow
+from googleapiclient.errors import HttpError
+from src.services.client_pool import client_pool
+from src.services.cache_service import response_cache, make_cache_key, MISSING
+from src.services.quota_service import quota_tracker, QuotaExceededError
+from src.services.metrics import YOUTUBE_API_DURATION, YOUTUBE_API_ERRORS, YOUTUBE_API_COALESCED
+from src.services.singleflight import upstream_flight, flight_key
+from src.config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 
+# YouTube Data API 單次list請求可帶入的最大ID數量
+MAX_IDS_PER_REQUEST = 50
+
+# 以max_scan=SCAN_ALL明確要求走訪完整上傳列表（大型頻道可能需要數千次呼叫）
+SCAN_ALL = 'all'
+
+def scan_limit(max_scan, n=0):
+    """
+    獲取依觀看數排序時實際掃描的影片數量上限
+    
+    Args:
+        max_scan: 呼叫者指定的上限（None使用VIDEO_SCAN_LIMIT，SCAN_ALL表示不限制）
+        n: 回傳的影片數量，預設上限不會小於此值
+        
+    Returns:
+        int: 掃描上限，不限制時返回None
+    """
+    if max_scan == SCAN_ALL:
+        return None
+    if max_scan is None:
+        return max(Config.VIDEO_SCAN_LIMIT, n)
+    return max_scan
+
+def parse_max_scan(value):
+    """
+    解析查詢參數中的掃描上限
+    
+    Args:
+        value: 查詢參數字串（None或空字串使用預設上限，'all'表示掃描全部上傳影片）
+        
+    Returns:
+        None、SCAN_ALL或正整數
+    """
+    if value is None or value == '':
+        return None
+    if value.lower() == SCAN_ALL:
+        return SCAN_ALL
+    try:
+        max_scan = int(value)
+    except ValueError:
+        raise ValueError(f"maxScan必須是正整數或{SCAN_ALL}: {value}")
+    if max_scan <= 0:
+        raise ValueError(f"maxScan必須是正整數或{SCAN_ALL}: {value}")
+    return max_scan
+
+# 受眾輪廓的回應鍵與對應的YouTube Analytics維度
+DEMOGRAPHIC_DIMENSIONS = {
+    'ageGroups': 'ageGroup',
+    'gender': 'gender',
+    'countries': 'country',
+    'deviceTypes': 'deviceType',
+    'trafficSources': 'insightTrafficSourceType'
+}
+DEFAULT_DEMOGRAPHIC_KEYS = ('ageGroups', 'gender', 'countries')
+
+# 並行查詢Analytics維度的共用執行緒池
+_analytics_executor = ThreadPoolExecutor(max_workers=Config.ANALYTICS_MAX_WORKERS, thread_name_prefix='analytics')
+
+def _parse_datetime(value):
+    """將datetime或RFC 3339字串轉換為帶時區的datetime（未指定時區視為UTC）"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+# 各使用情境的部分響應設定：part決定回傳的資源區塊，fields再裁剪為實際用到的欄位
+# fields為None表示回傳part內的所有欄位
+PROJECTIONS = {
+    'searchChannelIds': {
+        'part': 'snippet',
+        'fields': 'items/id/channelId'
+    },
+    'channelFull': {
+        'part': 'snippet,statistics,contentDetails,brandingSettings',
+        'fields': None
+    },
+    'channelUploads': {
+        'part': 'contentDetails',
+        'fields': 'items(id,contentDetails/relatedPlaylists/uploads)'
+    },
+    'channelStatistics': {
+        'part': 'statistics',
+        'fields': 'items(id,statistics(viewCount,subscriberCount,videoCount,hiddenSubscriberCount))'
+    },
+    'playlistVideoIds': {
+        'part': 'contentDetails',
+        'fields': 'nextPageToken,items/contentDetails(videoId,videoPublishedAt)'
+    },
+    'videoFull': {
+        'part': 'snippet,statistics,contentDetails',
+        'fields': None
+    }
+}
+
+def _projection(name):
+    """
+    獲取部分響應的請求參數
+    
+    Args:
+        name: PROJECTIONS中的使用情境名稱
+        
+    Returns:
+        dict: part與fields參數
+    """
+    projection = PROJECTIONS[name]
+    params = {'part': projection['part']}
+    if projection['fields']:
+        params['fields'] = projection['fields']
+    return params
+
+# 條件式請求返回304時的標記
+NOT_MODIFIED = object()
+
+class ConditionalFetchStats:
+    """ETag條件式請求的統計"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.conditional_requests = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+        self.parse_seconds_saved = 0.0
+    
+    def record(self, not_modified, meta=None):
+        """
+        記錄一次條件式請求
+        
+        Args:
+            not_modified: 上游是否返回304
+            meta: 被重用的響應資訊（bytes與parseSeconds）
+        """
+        with self._lock:
+            self.conditional_requests += 1
+            if not_modified:
+                self.not_modified += 1
+                if meta:
+                    self.bytes_saved += meta.get('bytes', 0)
+                    self.parse_seconds_saved += meta.get('parseSeconds', 0)
+    
+    def stats(self):
+        """獲取統計結果"""
+        with self._lock:
+            return {
+                'conditionalRequests': self.conditional_requests,
+                'notModified': self.not_modified,
+                'bytesSaved': self.bytes_saved,
+                'parseSecondsSaved': round(self.parse_seconds_saved, 6)
+            }
+
+# 全域ETag統計
+etag_stats = ConditionalFetchStats()
+
+def _payload_meta(response):
+    """
+    估算響應的大小與解析時間，用於計算304節省的成本
+    
+    Args:
+        response: API響應
+        
+    Returns:
+        dict: bytes與parseSeconds
+    """
+    payload = json.dumps(response)
+    started = time.perf_counter()
+    json.loads(payload)
+    return {
+        'bytes': len(payload.encode('utf-8')),
+        'parseSeconds': time.perf_counter() - started
+    }
+
+def _playlist_page_video_ids(response, cutoff=None, before=None):
+    """
+    從playlistItems.list響應取出影片ID
+    
+    Args:
+        response: playlistItems.list響應（part須包含contentDetails）
+        cutoff: 發布時間下限，遇到較舊的影片即停止
+        before: 發布時間上限，較新的影片會被略過
+        
+    Returns:
+        tuple: (影片ID列表, 是否已到達發布時間下限)
+    """
+    video_ids = []
+    for item in response.get('items', []):
+        content_details = item.get('contentDetails', {})
+        published_at = content_details.get('videoPublishedAt')
+        if published_at and (cutoff or before):
+            published_at = _parse_datetime(published_at)
+            if cutoff and published_at < cutoff:
+                return video_ids, True
+            if before and published_at > before:
+                continue
+        video_ids.append(content_details['videoId'])
+    return video_ids, False
+
+def _retryable(error):
+    """批次子請求的錯誤是否值得單獨重試（傳輸錯誤或5xx；4xx如403配額不足、404重試也不會成功）"""
+    if isinstance(error, HttpError):
+        return error.resp.status >= 500
+    return True
+
+def _first_item(response):
+    """取出list響應的第一個項目，沒有項目時返回None"""
+    items = response.get('items')
+    return items[0] if items else None
+
+def private_scope(user_id, credentials):
+    """
+    獲取OAuth私人數據的緩存範圍
+    
+    Args:
+        user_id: 憑證所屬的用戶ID
+        credentials: OAuth2認證憑證
+        
+    Returns:
+        str: 每個用戶唯一的範圍字串
+    """
+    if user_id is not None:
+        return f'user:{user_id}'
+    
+    # 未提供用戶ID時，以憑證的雜湊值區隔，確保不同用戶的數據不會互相命中
+    secret = getattr(credentials, 'refresh_token', None) or getattr(credentials, 'token', None) or ''
+    return 'credentials:' + hashlib.sha256(secret.encode('utf-8')).hexdigest()
+
 class YouTubeService:
     """YouTube API服務類"""
     
-    def __init__(self, api_key=None, credentials=None):
+    def __init__(self, api_key=None, credentials=None, user_id=None, cache=response_cache, quota=quota_tracker, batch_mode=None, coalesce=None):
         """
         初始化YouTube服務
         
         Args:
             api_key: YouTube Data API金鑰（用於公開數據）
             credentials: OAuth2認證憑證（用於私人數據）
+            user_id: 憑證所屬的用戶ID，用於區隔OAuth數據的緩存
+            cache: 響應緩存（None表示停用緩存）
+            quota: 配額計量器（None表示不計量）
+            batch_mode: 是否以批次HTTP請求合併多個獨立呼叫（預設依YOUTUBE_BATCH_MODE設定）
+            coalesce: 是否合併相同的進行中上游呼叫（預設依YOUTUBE_SINGLE_FLIGHT設定）
         """
         self.api_key = api_key or os.environ.get('YOUTUBE_API_KEY')
         self.credentials = credentials
+        self.user_id = user_id
+        self.cache = cache if Config.CACHE_TYPE != 'null' else None
+        self.cache_timeouts = Config.CACHE_TIMEOUTS
+        self.quota = quota
+        self.batch_mode = Config.YOUTUBE_BATCH_MODE if batch_mode is None else batch_mode
+        self.coalesce = Config.YOUTUBE_SINGLE_FLIGHT if coalesce is None else coalesce
         
-        # 建立YouTube Data API服務
+        # 建立YouTube Data API服務（由客戶端池提供，避免每次請求重新解析探索文件）
         if self.credentials:
-            self.youtube = build('youtube', 'v3', credentials=self.credentials)
+            self.youtube = client_pool.get_client('youtube', 'v3', credentials=self.credentials)
         elif self.api_key:
-            self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+            self.youtube = client_pool.get_client('youtube', 'v3', api_key=self.api_key)
         else:
             raise ValueError("需要提供API金鑰或OAuth2認證憑證")
         
@@ -34,10 +283,215 @@ class YouTubeService:
         self.youtube_analytics = None
         if self.credentials:
             try:
-                self.youtube_analytics = build('youtubeAnalytics', 'v2', credentials=self.credentials)
+                self.youtube_analytics = client_pool.get_client('youtubeAnalytics', 'v2', credentials=self.credentials)
             except Exception as e:
                 logger.warning(f"無法建立YouTube Analytics API服務: {e}")
     
+    def _execute(self, request, method, etag=None):
+        """
+        執行API請求並計量配額
+        
+        相同方法、參數與憑證範圍的請求正在進行時，直接等待並共用其結果，
+        不會重複送出上游請求或消耗配額。
+        
+        Args:
+            request: googleapiclient的HttpRequest
+            method: API方法名稱 (例如 channels.list)
+            etag: 先前響應的ETag，提供時以If-None-Match送出條件式請求
+            
+        Returns:
+            dict: API響應，內容未變更時返回NOT_MODIFIED
+            
+        Raises:
+            QuotaExceededError: 配額不足，請求未送出
+        """
+        if etag:
+            request.headers['If-None-Match'] = etag
+        
+        if not self.coalesce:
+            return self._send(request, method, etag)
+        
+        key = flight_key(method, parse_qsl(urlsplit(request.uri).query), self._flight_scope(), etag)
+        response, shared = upstream_flight.do(key, lambda: self._send(request, method, etag))
+        if shared:
+            YOUTUBE_API_COALESCED.inc(method)
+        return response
+    
+    def _send(self, request, method, etag=None):
+        """送出API請求（配額計量與指標記錄）"""
+        if self.quota is not None:
+            # 檢查並預先扣除配額（失敗的請求同樣會消耗配額）
+            self.quota.acquire(method)
+        started = time.perf_counter()
+        try:
+            return request.execute()
+        except HttpError as e:
+            if etag and e.resp.status == 304:
+                return NOT_MODIFIED
+            YOUTUBE_API_ERRORS.inc(method)
+            raise
+        except Exception:
+            YOUTUBE_API_ERRORS.inc(method)
+            raise
+        finally:
+            YOUTUBE_API_DURATION.observe(time.perf_counter() - started, method)
+    
+    def execute_batch(self, calls, client=None, return_exceptions=False):
+        """
+        執行多個獨立的API請求
+        
+        批次模式下，請求會以new_batch_http_request合併為multipart批次，
+        每批最多BATCH_MAX_SIZE個子請求。只有收到響應的子請求會計量配額；
+        整個批次失敗、或子請求遇到傳輸錯誤與5xx時改為單獨重新執行，
+        4xx錯誤（例如403配額不足、404）不重試。
+        非批次模式下則逐一執行。同一批次內的請求必須屬於同一個API。
+        
+        Args:
+            calls: (HttpRequest, 方法名稱) 的列表
+            client: 用於建立批次請求的客戶端（預設為YouTube Data API客戶端）
+            return_exceptions: 為True時，失敗的請求以例外物件放在結果中而不拋出
+            
+        Returns:
+            list: 依傳入順序排列的響應
+        """
+        results = [MISSING] * len(calls)
+        
+        if self.batch_mode and len(calls) > 1:
+            client = client or self.youtube
+            
+            def callback(request_id, response, exception):
+                results[int(request_id)] = exception if exception is not None else response
+            
+            for start in range(0, len(calls), Config.BATCH_MAX_SIZE):
+                indexes = range(start, min(start + Config.BATCH_MAX_SIZE, len(calls)))
+                batch = client.new_batch_http_request(callback=callback)
+                acquired = []
+                try:
+                    for index in indexes:
+                        request, method = calls[index]
+                        if self.quota is not None:
+                            self.quota.acquire(method)
+                            acquired.append(method)
+                        batch.add(request, request_id=str(index))
+                except QuotaExceededError:
+                    # 批次沒有送出，退回已預先扣除的子請求
+                    for method in acquired:
+                        self.quota.release(method)
+                    raise
+                
+                started = time.perf_counter()
+                try:
+                    batch.execute()
+                except Exception as e:
+                    YOUTUBE_API_ERRORS.inc('batch')
+                    logger.warning(f"批次請求失敗，改為逐一執行: {e}")
+                finally:
+                    YOUTUBE_API_DURATION.observe(time.perf_counter() - started, 'batch')
+                    # 沒有收到響應的子請求不計量，單獨執行時才扣除
+                    if self.quota is not None:
+                        for index in indexes:
+                            if results[index] is MISSING:
+                                self.quota.release(calls[index][1])
+        
+        for index, result in enumerate(results):
+            if result is not MISSING and not isinstance(result, Exception):
+                continue
+            if isinstance(result, Exception):
+                if not _retryable(result):
+                    YOUTUBE_API_ERRORS.inc(calls[index][1])
+                    if not return_exceptions:
+                        raise result
+                    continue
+                logger.warning(f"批次子請求失敗，改為單獨執行: {result}")
+            
+            request, method = calls[index]
+            try:
+                results[index] = self._execute(request, method)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results[index] = e
+        
+        return results
+    
+    def _flight_scope(self):
+        """獲取合併上游呼叫時使用的憑證範圍（公開數據不區分API金鑰）"""
+        return self._private_scope() if self.credentials else 'public'
+    
+    def _private_scope(self):
+        """
+        獲取OAuth私人數據的緩存範圍
+        
+        Returns:
+            str: 每個用戶唯一的範圍字串
+        """
+        return private_scope(self.user_id, self.credentials)
+    
+    def _cached(self, resource, key, loader, scope='public'):
+        """
+        透過響應緩存讀取數據
+        
+        Args:
+            resource: 資源類型，決定存活時間
+            key: 緩存鍵參數（tuple）
+            loader: 未命中時呼叫的數據載入函數
+            scope: 數據範圍
+            
+        Returns:
+            object: 緩存或新載入的數據
+        """
+        if self.cache is None:
+            return loader()
+        
+        cache_key = make_cache_key(resource, scope, *key)
+        value = self.cache.get(cache_key)
+        if value is MISSING:
+            value = loader()
+            self.cache.set(cache_key, value, ttl=self.cache_timeouts.get(resource))
+        return value
+    
+    def _cached_conditional(self, resource, key, fetch, extract, scope='public'):
+        """
+        透過響應緩存讀取數據，過期時以ETag條件式請求重新驗證
+        
+        上游返回304時直接沿用已緩存的數據並重設存活時間，不需重新下載與解析。
+        
+        Args:
+            resource: 資源類型，決定存活時間
+            key: 緩存鍵參數（tuple）
+            fetch: 以ETag（可能為None）呼叫的請求函數，返回API響應或NOT_MODIFIED
+            extract: 從API響應取出要緩存的數據
+            scope: 數據範圍
+            
+        Returns:
+            object: 緩存或新載入的數據
+        """
+        if self.cache is None:
+            return extract(fetch(None))
+        
+        cache_key = make_cache_key(resource, scope, *key)
+        value = self.cache.get(cache_key)
+        if value is not MISSING:
+            return value
+        
+        ttl = self.cache_timeouts.get(resource)
+        stale = self.cache.get_stale(cache_key)
+        etag = stale[1] if stale else None
+        
+        response = fetch(etag)
+        if response is NOT_MODIFIED:
+            value, etag, meta = stale
+            etag_stats.record(True, meta)
+            self.cache.set(cache_key, value, ttl=ttl, etag=etag, meta=meta)
+            return value
+        
+        if etag:
+            etag_stats.record(False)
+        
+        value = extract(response)
+        self.cache.set(cache_key, value, ttl=ttl, etag=response.get('etag'), meta=_payload_meta(response))
+        return value
+    
     def search_channels(self, query, max_results=10):
         """
         搜尋YouTube頻道
@@ -51,26 +505,77 @@ class YouTubeService:
         """
         try:
             request = self.youtube.search().list(
-                part='snippet',
+                **_projection('searchChannelIds'),
                 q=query,
                 type='channel',
                 maxResults=max_results
             )
-            response = request.execute()
+            response = self._execute(request, 'search.list')
             
-            channels = []
-            for item in response.get('items', []):
-                channel_id = item['id']['channelId']
-                # 獲取頻道的詳細統計資訊
-                channel_details = self.get_channel_details(channel_id)
-                if channel_details:
-                    channels.append(channel_details)
+            channel_ids = [item['id']['channelId'] for item in response.get('items', [])]
             
-            return channels
+            # 以單次channels.list批次獲取頻道的詳細統計資訊，並保留搜尋結果順序
+            return self.get_channels_details(channel_ids)
         except Exception as e:
             logger.error(f"搜尋頻道時發生錯誤: {e}")
             raise
     
+    def get_channels_details(self, channel_ids):
+        """
+        批次獲取多個頻道的詳細資訊
+        
+        每次channels.list最多可查詢50個ID，結果依傳入順序排列，
+        找不到的頻道會被略過。
+        
+        Args:
+            channel_ids: YouTube頻道ID列表
+            
+        Returns:
+            list: 頻道詳細資訊列表
+        """
+        try:
+            # 去除重複ID但保留原始順序
+            unique_ids = list(dict.fromkeys(channel_ids))
+            
+            # 先從緩存讀取，只向API查詢未命中的頻道
+            items_by_id = {}
+            missing_ids = []
+            for channel_id in unique_ids:
+                cached = MISSING
+                if self.cache is not None:
+                    cached = self.cache.get(make_cache_key('channelBasicInfo', 'public', 'id', channel_id))
+                if cached is MISSING:
+                    missing_ids.append(channel_id)
+                elif cached is not None:
+                    items_by_id[channel_id] = cached
+            
+            chunks = [missing_ids[start:start + MAX_IDS_PER_REQUEST] for start in range(0, len(missing_ids), MAX_IDS_PER_REQUEST)]
+            calls = [
+                (self.youtube.channels().list(
+                    **_projection('channelFull'),
+                    id=','.join(chunk),
+                    maxResults=len(chunk)
+                ), 'channels.list')
+                for chunk in chunks
+            ]
+            
+            for response in self.execute_batch(calls):
+                for item in response.get('items', []):
+                    items_by_id[item['id']] = item
+            
+            if self.cache is not None:
+                for channel_id in missing_ids:
+                    self.cache.set(
+                        make_cache_key('channelBasicInfo', 'public', 'id', channel_id),
+                        items_by_id.get(channel_id),
+                        ttl=self.cache_timeouts.get('channelBasicInfo')
+                    )
+            
+            return [items_by_id[channel_id] for channel_id in unique_ids if channel_id in items_by_id]
+        except Exception as e:
+            logger.error(f"批次獲取頻道詳細資訊時發生錯誤: {e}")
+            raise
+    
     def get_channel_details(self, channel_id):
         """
         獲取頻道詳細資訊
@@ -82,20 +587,70 @@ class YouTubeService:
             dict: 頻道詳細資訊
         """
         try:
-            request = self.youtube.channels().list(
-                part='snippet,statistics,contentDetails,brandingSettings',
-                id=channel_id
+            return self._cached_conditional(
+                'channelBasicInfo', ('id', channel_id),
+                lambda etag: self._fetch_channel_response(etag, id=channel_id),
+                _first_item
             )
-            response = request.execute()
-            
-            if not response.get('items'):
-                return None
-            
-            return response['items'][0]
         except Exception as e:
             logger.error(f"獲取頻道詳細資訊時發生錯誤: {e}")
             raise
     
+    def get_uploads_playlist_id(self, channel_id):
+        """
+        獲取頻道的上傳播放列表ID
+        
+        已緩存完整頻道資訊時直接沿用，否則只請求contentDetails中的uploads欄位。
+        
+        Args:
+            channel_id: YouTube頻道ID
+            
+        Returns:
+            str: 上傳播放列表ID，找不到頻道時返回None
+        """
+        if self.cache is not None:
+            channel_details = self.cache.get(make_cache_key('channelBasicInfo', 'public', 'id', channel_id))
+            if channel_details is not MISSING:
+                if not channel_details:
+                    return None
+                return channel_details.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+        
+        def load():
+            request = self.youtube.channels().list(**_projection('channelUploads'), id=channel_id)
+            channel = _first_item(self._execute(request, 'channels.list'))
+            if not channel:
+                return None
+            return channel.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+        
+        return self._cached('channelBasicInfo', ('uploads', channel_id), load)
+    
+    def get_channels_statistics(self, channel_ids):
+        """
+        批次獲取多個頻道的最新統計數據（只請求statistics，不經過緩存）
+        
+        Args:
+            channel_ids: YouTube頻道ID列表
+            
+        Returns:
+            list: 依傳入順序排列的頻道項目（只包含id與statistics），找不到的頻道會被略過
+        """
+        unique_ids = list(dict.fromkeys(channel_ids))
+        calls = [
+            (self.youtube.channels().list(
+                **_projection('channelStatistics'),
+                id=','.join(unique_ids[start:start + MAX_IDS_PER_REQUEST]),
+                maxResults=len(unique_ids[start:start + MAX_IDS_PER_REQUEST])
+            ), 'channels.list')
+            for start in range(0, len(unique_ids), MAX_IDS_PER_REQUEST)
+        ]
+        
+        items_by_id = {}
+        for response in self.execute_batch(calls):
+            for item in response.get('items', []):
+                items_by_id[item['id']] = item
+        
+        return [items_by_id[channel_id] for channel_id in unique_ids if channel_id in items_by_id]
+    
     def get_channel_by_username(self, username):
         """
         透過用戶名獲取頻道資訊
@@ -107,21 +662,74 @@ class YouTubeService:
             dict: 頻道資訊
         """
         try:
-            request = self.youtube.channels().list(
-                part='snippet,statistics,contentDetails,brandingSettings',
-                forUsername=username
+            # YouTube用戶名不區分大小寫
+            return self._cached_conditional(
+                'channelBasicInfo', ('username', username.strip().lower()),
+                lambda etag: self._fetch_channel_response(etag, forUsername=username),
+                _first_item
             )
-            response = request.execute()
-            
-            if not response.get('items'):
-                return None
-            
-            return response['items'][0]
         except Exception as e:
             logger.error(f"透過用戶名獲取頻道資訊時發生錯誤: {e}")
             raise
     
-    def get_channel_videos(self, channel_id, max_results=10, order='viewCount'):
+    def _fetch_channel_response(self, etag=None, **filters):
+        """
+        以channels.list查詢單一頻道
+        
+        Args:
+            etag: 先前響應的ETag
+            **filters: 查詢條件 (id或forUsername)
+            
+        Returns:
+            dict: API響應，內容未變更時返回NOT_MODIFIED
+        """
+        request = self.youtube.channels().list(
+            **_projection('channelFull'),
+            **filters
+        )
+        return self._execute(request, 'channels.list', etag=etag)
+    
+    def fetch_channel_if_changed(self, channel_id, etag=None):
+        """
+        以ETag條件式請求獲取頻道（不經過緩存，用於刷新已儲存的頻道）
+        
+        Args:
+            channel_id: YouTube頻道ID
+            etag: 已儲存的ETag
+            
+        Returns:
+            tuple: (頻道資訊或None, 新的ETag)，內容未變更時返回NOT_MODIFIED
+        """
+        response = self._fetch_channel_response(etag, id=channel_id)
+        if etag:
+            etag_stats.record(response is NOT_MODIFIED)
+        if response is NOT_MODIFIED:
+            return NOT_MODIFIED
+        return _first_item(response), response.get('etag')
+    
+    def fetch_video_if_changed(self, video_id, etag=None):
+        """
+        以ETag條件式請求獲取影片（不經過緩存，用於刷新已儲存的影片）
+        
+        Args:
+            video_id: YouTube影片ID
+            etag: 已儲存的ETag
+            
+        Returns:
+            tuple: (影片資訊或None, 新的ETag)，內容未變更時返回NOT_MODIFIED
+        """
+        request = self.youtube.videos().list(
+            **_projection('videoFull'),
+            id=video_id
+        )
+        response = self._execute(request, 'videos.list', etag=etag)
+        if etag:
+            etag_stats.record(response is NOT_MODIFIED)
+        if response is NOT_MODIFIED:
+            return NOT_MODIFIED
+        return _first_item(response), response.get('etag')
+    
+    def get_channel_videos(self, channel_id, max_results=10, order='viewCount', max_scan=None):
         """
         獲取頻道的影片列表
         
@@ -129,57 +737,235 @@ class YouTubeService:
             channel_id: YouTube頻道ID
             max_results: 最大結果數量
             order: 排序方式 (date, rating, relevance, title, videoCount, viewCount)
+            max_scan: viewCount排序時最多掃描的影片數量（None為VIDEO_SCAN_LIMIT，SCAN_ALL表示掃描全部上傳影片）
             
         Returns:
             list: 影片列表
         """
+        return self.get_channel_videos_scan(channel_id, max_results, order, max_scan)['videos']
+    
+    def get_channel_videos_scan(self, channel_id, max_results=10, order='viewCount', max_scan=None):
+        """
+        獲取頻道的影片列表與viewCount排序時的掃描資訊
+        
+        Args:
+            channel_id: YouTube頻道ID
+            max_results: 最大結果數量
+            order: 排序方式
+            max_scan: viewCount排序時最多掃描的影片數量（None為VIDEO_SCAN_LIMIT，SCAN_ALL表示掃描全部上傳影片）
+            
+        Returns:
+            dict: videos為影片列表；scan為掃描資訊（scanned、limit、truncated），非viewCount排序時為None
+        """
         try:
-            # 首先獲取頻道的上傳播放列表ID
-            channel_details = self.get_channel_details(channel_id)
-            if not channel_details:
-                return []
-            
-            uploads_playlist_id = channel_details.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
-            if not uploads_playlist_id:
-                return []
-            
-            # 獲取播放列表中的影片
-            request = self.youtube.playlistItems().list(
-                part='snippet',
-                playlistId=uploads_playlist_id,
-                maxResults=max_results
+            return self._cached(
+                'videosList', (channel_id, max_results, order, max_scan),
+                lambda: self._load_channel_videos(channel_id, max_results, order, max_scan)
             )
-            response = request.execute()
+        except Exception as e:
+            logger.error(f"獲取頻道影片時發生錯誤: {e}")
+            raise
+    
+    def _load_channel_videos(self, channel_id, max_results, order, max_scan):
+        """從API載入頻道影片列表（不經過緩存）"""
+        if order == 'viewCount':
+            # 走訪上傳列表（預設最多VIDEO_SCAN_LIMIT部），以堆積取得觀看數最高的影片
+            videos, scan = self.scan_top_videos_by_views(channel_id, max_results, max_scan=max_scan)
+            return {'videos': videos, 'scan': scan}
+        
+        # 上傳播放列表本身即為新到舊排序，只需讀取前max_results部影片
+        return {'videos': list(self.iter_channel_videos(channel_id, max_videos=max_results)), 'scan': None}
+    
+    def get_top_videos_by_views(self, channel_id, n=10, max_scan=None, published_after=None):
+        """
+        獲取頻道觀看數最高的N部影片
+        
+        使用大小為N的堆積逐頁篩選，記憶體用量與頻道上傳數量無關。
+        
+        Args:
+            channel_id: YouTube頻道ID
+            n: 回傳的影片數量
+            max_scan: 最多掃描的影片數量（None為VIDEO_SCAN_LIMIT，SCAN_ALL表示不限制）
+            published_after: 只考慮此時間之後發布的影片
             
-            video_ids = []
-            for item in response.get('items', []):
-                video_id = item['snippet']['resourceId']['videoId']
-                video_ids.append(video_id)
+        Returns:
+            list: 依觀看數由高至低排序的影片列表
+        """
+        return self.scan_top_videos_by_views(channel_id, n, max_scan=max_scan, published_after=published_after)[0]
+    
+    def scan_top_videos_by_views(self, channel_id, n=10, max_scan=None, published_after=None):
+        """
+        獲取頻道觀看數最高的N部影片，並回報實際掃描的影片數量
+        
+        掃描數量達到上限時truncated為True，表示頻道可能還有未掃描的較舊影片，
+        結果只是最新limit部中的前N名。
+        
+        Args:
+            channel_id: YouTube頻道ID
+            n: 回傳的影片數量
+            max_scan: 最多掃描的影片數量（None為VIDEO_SCAN_LIMIT，SCAN_ALL表示不限制）
+            published_after: 只考慮此時間之後發布的影片
             
-            if not video_ids:
-                return []
+        Returns:
+            tuple: (依觀看數由高至低排序的影片列表, {'scanned', 'limit', 'truncated'})
+        """
+        limit = scan_limit(max_scan, n)
+        scanned = 0
+        
+        def counted():
+            nonlocal scanned
+            for video in self.iter_channel_videos(channel_id, max_videos=limit, published_after=published_after):
+                scanned += 1
+                yield video
+        
+        videos = heapq.nlargest(n, counted(), key=lambda x: int(x.get('statistics', {}).get('viewCount', 0)))
+        return videos, {'scanned': scanned, 'limit': limit, 'truncated': limit is not None and scanned >= limit}
+    
+    def iter_channel_videos(self, channel_id, max_videos=None, published_after=None):
+        """
+        逐步產生頻道的所有上傳影片
+        
+        Args:
+            channel_id: YouTube頻道ID
+            max_videos: 最多產生的影片數量（None表示不限制）
+            published_after: 發布時間下限 (datetime或RFC 3339字串)，到達後停止翻頁
             
-            # 獲取影片的詳細統計資訊
-            videos_request = self.youtube.videos().list(
-                part='snippet,statistics,contentDetails',
-                id=','.join(video_ids)
-            )
-            videos_response = videos_request.execute()
+        Yields:
+            dict: 影片詳細資訊
+        """
+        # 首先獲取頻道的上傳播放列表ID
+        uploads_playlist_id = self.get_uploads_playlist_id(channel_id)
+        if not uploads_playlist_id:
+            return
+        
+        yield from self.iter_playlist_videos(uploads_playlist_id, max_videos=max_videos, published_after=published_after)
+    
+    def iter_playlist_videos(self, playlist_id, max_videos=None, published_after=None):
+        """
+        依nextPageToken走訪播放列表，並逐頁以videos.list補齊影片資訊
+        
+        每次只保留一頁（最多50部）影片在記憶體中。
+        
+        Args:
+            playlist_id: 播放列表ID
+            max_videos: 最多產生的影片數量（None表示不限制）
+            published_after: 發布時間下限 (datetime或RFC 3339字串)
             
-            videos = videos_response.get('items', [])
+        Yields:
+            dict: 影片詳細資訊
+        """
+        for video_ids in self.iter_playlist_pages(playlist_id, max_videos=max_videos, published_after=published_after):
+            yield from self.get_videos_details(video_ids)
+    
+    def iter_playlist_pages(self, playlist_id, max_videos=None, published_after=None, client=None,
+                            published_before=None, max_pages=None, page_token=None):
+        """
+        依nextPageToken逐頁產生播放列表中的影片ID
+        
+        上傳播放列表為新到舊排序，因此遇到早於published_after的影片即可停止翻頁；
+        晚於published_before的影片在翻頁時略過，不計入max_videos。
+        
+        Args:
+            playlist_id: 播放列表ID
+            max_videos: 最多產生的影片ID數量（None表示不限制）
+            published_after: 發布時間下限 (datetime或RFC 3339字串)
+            client: 指定使用的YouTube客戶端（在其他執行緒中呼叫時使用）
+            published_before: 發布時間上限 (datetime或RFC 3339字串)
+            max_pages: 最多讀取的頁數（None表示不限制）
+            page_token: 開始讀取的頁面（None表示第一頁）
             
-            # 根據指定的順序排序
-            if order == 'viewCount':
-                videos.sort(key=lambda x: int(x.get('statistics', {}).get('viewCount', 0)), reverse=True)
-            elif order == 'date':
-                videos.sort(key=lambda x: x.get('snippet', {}).get('publishedAt', ''), reverse=True)
+        Yields:
+            list: 每頁的影片ID列表
+        """
+        client = client or self.youtube
+        cutoff = _parse_datetime(published_after) if published_after else None
+        before = _parse_datetime(published_before) if published_before else None
+        yielded = 0
+        pages = 0
+        
+        while True:
+            response = self.fetch_playlist_page(playlist_id, page_token, client=client)
+            pages += 1
+            video_ids, reached_cutoff = _playlist_page_video_ids(response, cutoff, before)
             
-            return videos
-        except Exception as e:
-            logger.error(f"獲取頻道影片時發生錯誤: {e}")
-            raise
+            if max_videos is not None:
+                video_ids = video_ids[:max_videos - yielded]
+            
+            if video_ids:
+                yield video_ids
+                yielded += len(video_ids)
+            
+            page_token = response.get('nextPageToken')
+            if reached_cutoff or not page_token or (max_videos is not None and yielded >= max_videos):
+                return
+            if max_pages is not None and pages >= max_pages:
+                return
+    
+    def fetch_playlist_page(self, playlist_id, page_token=None, client=None):
+        """
+        獲取播放列表的一頁影片（只包含影片ID與發布時間）
+        
+        Args:
+            playlist_id: 播放列表ID
+            page_token: 上一頁響應的nextPageToken（None表示第一頁）
+            client: 指定使用的YouTube客戶端（在其他執行緒中呼叫時使用）
+            
+        Returns:
+            dict: playlistItems.list響應
+        """
+        client = client or self.youtube
+        params = {
+            **_projection('playlistVideoIds'),
+            'playlistId': playlist_id,
+            'maxResults': MAX_IDS_PER_REQUEST
+        }
+        if page_token:
+            params['pageToken'] = page_token
+        
+        return self._execute(client.playlistItems().list(**params), 'playlistItems.list')
+    
+    def get_videos_details(self, video_ids, client=None):
+        """
+        批次獲取多部影片的詳細資訊
+        
+        每次videos.list最多查詢50個ID，結果依傳入順序排列，找不到的影片會被略過。
+        
+        Args:
+            video_ids: YouTube影片ID列表
+            client: 指定使用的YouTube客戶端（在其他執行緒中呼叫時使用）
+            
+        Returns:
+            list: 影片詳細資訊列表
+        """
+        client = client or self.youtube
+        calls = [
+            (client.videos().list(
+                **_projection('videoFull'),
+                id=','.join(video_ids[start:start + MAX_IDS_PER_REQUEST]),
+                maxResults=len(video_ids[start:start + MAX_IDS_PER_REQUEST])
+            ), 'videos.list')
+            for start in range(0, len(video_ids), MAX_IDS_PER_REQUEST)
+        ]
+        
+        items_by_id = {}
+        for response in self.execute_batch(calls, client=client):
+            for item in response.get('items', []):
+                items_by_id[item['id']] = item
+        
+        return [items_by_id[video_id] for video_id in video_ids if video_id in items_by_id]
     
-    def get_channel_analytics(self, channel_id, start_date, end_date, metrics='views,estimatedMinutesWatched', dimensions=None):
+    def thread_client(self):
+        """
+        獲取可在目前執行緒使用的YouTube Data API客戶端
+        
+        Returns:
+            Resource: YouTube客戶端
+        """
+        if self.credentials:
+            return client_pool.get_client('youtube', 'v3', credentials=self.credentials)
+        return client_pool.get_client('youtube', 'v3', api_key=self.api_key)
+    
+    def get_channel_analytics(self, channel_id, start_date, end_date, metrics='views,estimatedMinutesWatched', dimensions=None, client=None):
         """
         獲取頻道的分析數據（需要OAuth2認證）
         
@@ -189,6 +975,7 @@ class YouTubeService:
             end_date: 結束日期 (YYYY-MM-DD)
             metrics: 指標列表
             dimensions: 維度列表
+            client: 指定使用的Analytics客戶端（在其他執行緒中呼叫時使用）
             
         Returns:
             dict: 分析數據
@@ -196,6 +983,8 @@ class YouTubeService:
         if not self.youtube_analytics:
             raise ValueError("YouTube Analytics API需要OAuth2認證")
         
+        client = client or self.youtube_analytics
+        
         try:
             params = {
                 'ids': f'channel=={channel_id}',
@@ -207,60 +996,120 @@ class YouTubeService:
             if dimensions:
                 params['dimensions'] = dimensions
             
-            request = self.youtube_analytics.reports().query(**params)
-            response = request.execute()
-            
-            return response
+            # 分析數據屬於用戶私人數據，緩存鍵必須包含用戶範圍
+            return self._cached(
+                'channelStatistics', (channel_id, start_date, end_date, metrics, dimensions),
+                lambda: self._execute(client.reports().query(**params), 'reports.query'),
+                scope=self._private_scope()
+            )
         except Exception as e:
             logger.error(f"獲取頻道分析數據時發生錯誤: {e}")
             raise
     
-    def get_audience_demographics(self, channel_id, start_date, end_date):
+    def get_audience_demographics(self, channel_id, start_date, end_date, extra_dimensions=None):
         """
         獲取受眾輪廓數據
         
+        各維度的查詢會在有上限的執行緒池中並行執行，
+        單一維度失敗時只記錄在errors中，不影響其他維度。
+        
         Args:
             channel_id: YouTube頻道ID
             start_date: 開始日期 (YYYY-MM-DD)
             end_date: 結束日期 (YYYY-MM-DD)
+            extra_dimensions: 額外的維度鍵，例如 ['deviceTypes', 'trafficSources']
             
         Returns:
-            dict: 受眾輪廓數據
+            dict: 受眾輪廓數據，失敗的維度列於errors
         """
         if not self.youtube_analytics:
             raise ValueError("YouTube Analytics API需要OAuth2認證")
         
-        demographics_data = {}
+        keys = list(DEFAULT_DEMOGRAPHIC_KEYS)
+        for key in extra_dimensions or []:
+            if key not in DEMOGRAPHIC_DIMENSIONS:
+                raise ValueError(f"不支援的受眾輪廓維度: {key}")
+            if key not in keys:
+                keys.append(key)
+        
+        scope = self._private_scope()
+        cache_key = make_cache_key('audienceDemographics', scope, channel_id, start_date, end_date, *keys)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not MISSING:
+                return cached
         
         try:
-            # 獲取年齡組數據
-            age_groups = self.get_channel_analytics(
-                channel_id, start_date, end_date,
-                metrics='views,estimatedMinutesWatched',
-                dimensions='ageGroup'
-            )
-            demographics_data['ageGroups'] = age_groups
-            
-            # 獲取性別數據
-            gender = self.get_channel_analytics(
+            demographics_data = self._load_audience_demographics(channel_id, start_date, end_date, keys)
+        except Exception as e:
+            logger.error(f"獲取受眾輪廓數據時發生錯誤: {e}")
+            raise
+        
+        # 只緩存完整成功的結果，部分失敗的維度下次請求會重新查詢
+        if self.cache is not None and not demographics_data['errors']:
+            self.cache.set(cache_key, demographics_data, ttl=self.cache_timeouts.get('audienceDemographics'))
+        
+        return demographics_data
+    
+    def _load_audience_demographics(self, channel_id, start_date, end_date, keys):
+        """從API並行載入各維度的受眾輪廓數據（不經過緩存）"""
+        if self.batch_mode:
+            return self._load_audience_demographics_batch(channel_id, start_date, end_date, keys)
+        
+        def query(dimension):
+            # httplib2連線不是執行緒安全的，每個工作執行緒使用自己的客戶端
+            client = client_pool.get_client('youtubeAnalytics', 'v2', credentials=self.credentials)
+            return self.get_channel_analytics(
                 channel_id, start_date, end_date,
                 metrics='views,estimatedMinutesWatched',
-                dimensions='gender'
+                dimensions=dimension,
+                client=client
             )
-            demographics_data['gender'] = gender
-            
-            # 獲取國家數據
-            countries = self.get_channel_analytics(
-                channel_id, start_date, end_date,
+        
+        futures = {key: _analytics_executor.submit(query, DEMOGRAPHIC_DIMENSIONS[key]) for key in keys}
+        
+        demographics_data = {'errors': {}}
+        for key, future in futures.items():
+            try:
+                demographics_data[key] = future.result()
+            except Exception as e:
+                logger.warning(f"獲取受眾輪廓維度{key}時發生錯誤: {e}")
+                demographics_data[key] = None
+                demographics_data['errors'][key] = str(e)
+        
+        if len(demographics_data['errors']) == len(keys):
+            # 所有維度皆失敗時視為整體失敗
+            raise futures[keys[0]].exception()
+        
+        return demographics_data
+    
+    def _load_audience_demographics_batch(self, channel_id, start_date, end_date, keys):
+        """以單一批次HTTP請求載入各維度的受眾輪廓數據"""
+        calls = [
+            (self.youtube_analytics.reports().query(
+                ids=f'channel=={channel_id}',
+                startDate=start_date,
+                endDate=end_date,
                 metrics='views,estimatedMinutesWatched',
-                dimensions='country'
-            )
-            demographics_data['countries'] = countries
-            
-            return demographics_data
-        except Exception as e:
-            logger.error(f"獲取受眾輪廓數據時發生錯誤: {e}")
-            raise
+                dimensions=DEMOGRAPHIC_DIMENSIONS[key]
+            ), 'reports.query')
+            for key in keys
+        ]
+        results = self.execute_batch(calls, client=self.youtube_analytics, return_exceptions=True)
+        
+        demographics_data = {'errors': {}}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                logger.warning(f"獲取受眾輪廓維度{key}時發生錯誤: {result}")
+                demographics_data[key] = None
+                demographics_data['errors'][key] = str(result)
+            else:
+                demographics_data[key] = result
+        
+        if len(demographics_data['errors']) == len(keys):
+            raise results[0]
+        
+        return demographics_data
 
 class YouTubeOAuthService:
     """YouTube OAuth認證服務"""